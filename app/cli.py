@@ -0,0 +1,202 @@
+"""Interfaz de línea de comandos (sin Qt) para trabajar sobre directorios de tags"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.aggregator import TagAggregator
+from app.core.export import (
+    DEFAULT_CHUNK_SIZE, ExportFormat, export_scan, format_from_path, parquet_available, relation_path_for
+)
+from app.core.shards import PartialAggregate, merge_partials, scan_parallel, scan_shard, write_partial
+from app.utils.logger import LEVEL_NAMES, get_logger, setup_logger
+
+logger = get_logger(__name__)
+
+_ROOT_HELP = (
+    "Raíz con la que resolver las rutas de los parciales, una vez por raíz y en el orden del "
+    "escaneo (por defecto, las raíces del primer parcial)"
+)
+
+
+def _partial_roots(roots: Optional[List[str]]) -> Optional[List[Path]]:
+    """Raíces con las que resolver las rutas de los parciales (None = las del primero)"""
+    return [Path(root) for root in roots] if roots else None
+
+
+def _load_inputs(inputs: List[str], roots: Optional[List[str]] = None) -> Optional[TagAggregator]:
+    """
+    Escanea los directorios dados o combina los agregados parciales dados
+    
+    Args:
+        inputs: Directorios o agregados parciales
+        roots: Raíces con las que resolver las rutas de los parciales (opcional)
+    
+    Returns:
+        TagAggregator, o None si las entradas no son válidas (ya registrado)
+    """
+    paths = [Path(path) for path in inputs]
+    if all(path.is_file() for path in paths):
+        return merge_partials(paths, roots=_partial_roots(roots)).aggregator
+    for path in paths:
+        if not path.is_dir():
+            logger.error("No es un directorio ni un agregado parcial: %s", path)
+            return None
+    return scan_shard(paths)
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    """Escanea (o combina parciales) y exporta los agregados (y la relación archivo ↔ tag si se pide)"""
+    output = Path(args.output)
+    fmt = args.format or format_from_path(output)
+    if fmt is None:
+        logger.error("No se reconoce el formato de %s: use --format o la extensión .csv, .jsonl o .parquet", output)
+        return 1
+    if fmt == ExportFormat.PARQUET and not parquet_available():
+        logger.error("La exportación a Parquet requiere pyarrow (pip install pyarrow)")
+        return 1
+    relation_path = None
+    if args.relation is not None:
+        relation_path = Path(args.relation) if args.relation else relation_path_for(output)
+    
+    aggregator = _load_inputs(args.inputs, args.root)
+    if aggregator is None:
+        return 1
+    summary = export_scan(aggregator, output, fmt, relation_path, chunk_size=args.chunk_size)
+    print(f"Exportados {summary.describe()}")
+    return 0
+
+
+def _check_roots(directories: List[str]) -> Optional[List[Path]]:
+    """Raíces como Path, o None si alguna no es un directorio (ya registrado)"""
+    roots = [Path(directory) for directory in directories]
+    for root in roots:
+        if not root.is_dir():
+            logger.error("No es un directorio: %s", root)
+            return None
+    return roots
+
+
+def _cmd_scan(args: argparse.Namespace) -> int:
+    """Escanea en uno o varios procesos locales y guarda el agregado combinado"""
+    roots = _check_roots(args.directories)
+    if roots is None:
+        return 1
+    if args.processes > 1:
+        partial = scan_parallel(roots, args.processes, Path(args.keep_partials) if args.keep_partials else None)
+    else:
+        partial = PartialAggregate(scan_shard(roots), shard_count=1, shards=[0])
+    write_partial(partial, Path(args.output))
+    print(f"Guardado {args.output}: {partial.aggregator.file_count} archivos, {partial.aggregator.tag_count} tags")
+    return 0
+
+
+def _cmd_scan_shard(args: argparse.Namespace) -> int:
+    """Escanea un fragmento y guarda su agregado parcial"""
+    roots = _check_roots(args.directories)
+    if roots is None:
+        return 1
+    if not 0 <= args.shard < args.shards:
+        logger.error("--shard debe estar entre 0 y %s", args.shards - 1)
+        return 1
+    aggregator = scan_shard(roots, args.shard, args.shards)
+    write_partial(PartialAggregate(aggregator, args.shards, [args.shard]), Path(args.output))
+    print(f"Guardado fragmento {args.shard}/{args.shards} en {args.output}: {aggregator.file_count} archivos")
+    return 0
+
+
+def _cmd_merge(args: argparse.Namespace) -> int:
+    """Combina agregados parciales en uno"""
+    partial = merge_partials([Path(path) for path in args.partials], roots=_partial_roots(args.root))
+    write_partial(partial, Path(args.output))
+    missing = f" (faltan fragmentos {partial.missing})" if partial.missing else ""
+    print(
+        f"Guardado {args.output}: {len(partial.shards)}/{partial.shard_count} fragmentos, "
+        f"{partial.aggregator.file_count} archivos, {partial.aggregator.tag_count} tags{missing}"
+    )
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Tag File Editor sin interfaz gráfica"
+    )
+    parser.add_argument("--log-level", choices=LEVEL_NAMES, type=str.upper,
+                        help="Nivel de log (por defecto TAG_EDITOR_LOG_LEVEL o INFO)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    export = commands.add_parser(
+        "export",
+        help="Escanear uno o varios directorios y exportar agregados y relación archivo ↔ tag",
+        description="Escribe por bloques: la relación completa nunca se materializa en memoria."
+    )
+    export.add_argument("inputs", nargs="+", metavar="input",
+                        help="Directorios con archivos .txt (los repetidos entre raíces se cuentan una vez) "
+                             "o agregados parciales .tagagg a combinar")
+    export.add_argument("output", help="Archivo de agregados (.csv, .jsonl o .parquet)")
+    export.add_argument("--format", choices=(ExportFormat.CSV, ExportFormat.JSONL, ExportFormat.PARQUET),
+                        help="Formato (por defecto según la extensión; parquet requiere pyarrow)")
+    export.add_argument("--relation", nargs="?", const="", metavar="PATH",
+                        help="Exportar también la relación archivo ↔ tag (por defecto <output>_files.<ext>)")
+    export.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Filas por bloque escrito")
+    export.add_argument("--root", action="append", metavar="DIR", help=_ROOT_HELP)
+    export.set_defaults(handler=_cmd_export)
+    
+    scan = commands.add_parser(
+        "scan",
+        help="Escanear en varios procesos locales y guardar el agregado combinado (.tagagg)",
+        description="Cada proceso escanea un fragmento; el resultado se abre en la aplicación o se exporta."
+    )
+    scan.add_argument("directories", nargs="+", metavar="directory", help="Directorios con archivos .txt")
+    scan.add_argument("-o", "--output", required=True, help="Agregado combinado (.tagagg)")
+    scan.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                      help="Procesos (y fragmentos) en paralelo (por defecto, uno por CPU)")
+    scan.add_argument("--keep-partials", metavar="DIR", help="Conservar los agregados parciales en DIR")
+    scan.set_defaults(handler=_cmd_scan)
+    
+    scan_shard_cmd = commands.add_parser(
+        "scan-shard",
+        help="Escanear un fragmento de un escaneo repartido y guardar su agregado parcial",
+        description="Los archivos se reparten por un hash de su ruta relativa a la raíz: cada proceso o "
+                    "máquina escanea un fragmento (--shard) de los --shards totales."
+    )
+    scan_shard_cmd.add_argument("directories", nargs="+", metavar="directory", help="Directorios con archivos .txt")
+    scan_shard_cmd.add_argument("--shard", type=int, required=True, help="Fragmento a escanear (desde 0)")
+    scan_shard_cmd.add_argument("--shards", type=int, required=True, help="Número total de fragmentos")
+    scan_shard_cmd.add_argument("-o", "--output", required=True, help="Agregado parcial (.tagagg)")
+    scan_shard_cmd.set_defaults(handler=_cmd_scan_shard)
+    
+    merge = commands.add_parser(
+        "merge",
+        help="Combinar agregados parciales en uno",
+        description="Acepta cualquier número de parciales del mismo reparto, incluidos resultados de otros merge."
+    )
+    merge.add_argument("partials", nargs="+", metavar="partial", help="Agregados parciales (.tagagg)")
+    merge.add_argument("-o", "--output", required=True, help="Agregado combinado (.tagagg)")
+    merge.add_argument("--root", action="append", metavar="DIR", help=_ROOT_HELP)
+    merge.set_defaults(handler=_cmd_merge)
+    
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Función principal"""
+    args = parse_args(argv)
+    setup_logger(level=args.log_level)
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        logger.warning("Interrumpido por el usuario")
+        return 130
+    except (OSError, RuntimeError, ValueError) as e:
+        logger.error("%s", e)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
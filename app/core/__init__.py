@@ -1,7 +1,40 @@
 """Lógica de negocio: parsing, agregación, filtrado"""
 
-from .tag_parser import parse_line, format_tag
-from .aggregator import TagAggregator
-from .filter import TagFilter
+from typing import TYPE_CHECKING
 
-__all__ = ["parse_line", "format_tag", "TagAggregator", "TagFilter"]
+from ..utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .tag_parser import parse_line, format_tag
+    from .aggregator import TagAggregator
+    from .filter import TagFilter
+    from .rewrite import RewritePlan
+    from .search_index import TrigramIndex, TagSearchIndex
+    from .cooccurrence import CooccurrenceIndex
+    from .duplicates import find_duplicate_groups
+    from .export import export_scan, ExportFormat
+    from .shards import scan_shard, merge_partials, PartialAggregate
+    from .content_dedup import ContentDeduplicator
+
+# Se importan al primer uso: el escaneo no necesita co-ocurrencias ni duplicados
+__getattr__ = lazy_exports(__name__, {
+    "parse_line": ".tag_parser",
+    "format_tag": ".tag_parser",
+    "TagAggregator": ".aggregator",
+    "TagFilter": ".filter",
+    "RewritePlan": ".rewrite",
+    "TrigramIndex": ".search_index",
+    "TagSearchIndex": ".search_index",
+    "CooccurrenceIndex": ".cooccurrence",
+    "find_duplicate_groups": ".duplicates",
+    "export_scan": ".export",
+    "ExportFormat": ".export",
+    "scan_shard": ".shards",
+    "merge_partials": ".shards",
+    "PartialAggregate": ".shards",
+    "ContentDeduplicator": ".content_dedup",
+})
+
+__all__ = ["parse_line", "format_tag", "TagAggregator", "TagFilter", "RewritePlan", "TrigramIndex", "TagSearchIndex", "CooccurrenceIndex",
+           "find_duplicate_groups", "export_scan", "ExportFormat", "scan_shard", "merge_partials", "PartialAggregate",
+           "ContentDeduplicator"]
@@ -1,42 +1,138 @@
 """Agregación de tags desde múltiples archivos"""
 
+import os
+import time
+from array import array
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..models.tag_models import Tag, TagFile, TagAggregate
+from ..utils.metrics import metrics
+from .normalize import TagNormalizer
 from .tag_parser import parse_line
 
+_ADD_FILE_TIMER = metrics.timer("aggregate.add_file", "Tiempo de agregación por archivo")
+_TAGS_PER_FILE = metrics.histogram(
+    "aggregate.tags_per_file",
+    "Tags por archivo agregado",
+    (5, 10, 25, 50, 100, 250, 1000)
+)
+
 
 class TagAggregator:
-    """Agrega tags de múltiples archivos y mantiene conteos"""
+    """
+    Agrega tags de múltiples archivos y mantiene conteos
+    
+    Además de los conteos, guarda para cada tag la lista compacta de archivos
+    donde aparece (ids enteros en un array). Con retain_files=False no se
+    conservan los TagFile: la memoria queda acotada por el número de tags
+    distintos y las postings, y los archivos se releen de disco al aplicar.
+    
+    Con un normalizador, los tags se agrupan por su clave normalizada: cada
+    agregado cuenta las grafías originales (variants) y se muestra con la
+    más frecuente. Las consultas por (namespace, tag) aceptan cualquier grafía.
+    
+    Con varias raíces, cada archivo recuerda su raíz y se mantienen además
+    agregados por raíz, para poder filtrar la vista sin volver a escanear.
+    """
     
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        retain_files: bool = True,
+        normalizer: Optional[TagNormalizer] = None,
+        roots: Optional[List[Path]] = None
+    ) -> None:
+        """
+        Inicializa el agregador
+        
+        Args:
+            retain_files: Conservar los TagFile completos de cada archivo
+            normalizer: Agrupar los tags por su forma normalizada (opcional)
+            roots: Directorios raíz escaneados (opcional)
+        """
+        self.retain_files = retain_files
+        self.normalizer = normalizer
+        self.roots: List[Path] = list(roots or [])
+        self._root_file_counts: List[int] = [0] * max(len(self.roots), 1)
+        # Agregados por raíz: solo hacen falta si hay más de una
+        self._root_aggregates: List[Dict[Tuple[str, str], TagAggregate]] = (
+            [{} for _ in self.roots] if len(self.roots) > 1 else []
+        )
         self._aggregates: Dict[Tuple[str, str], TagAggregate] = {}
         self._files: Dict[Path, TagFile] = {}
+        self._paths: List[str] = []  # id de archivo -> ruta
+        self._path_roots = array('H')  # id de archivo -> raíz (solo con varias raíces)
+        self._postings: Dict[Tuple[str, str], array] = {}  # tag -> ids de archivo
+        self.total_occurrences = 0
     
-    def add_file(self, file_path: Path, tags: List[Tag]) -> None:
+    def _key(self, namespace: str, tag: str) -> Tuple[str, str]:
+        """Clave interna de un tag (normalizada si hay normalizador)"""
+        if self.normalizer is None:
+            return (namespace, tag)
+        return (namespace, self.normalizer.normalize(namespace, tag))
+    
+    def add_file(self, file_path: Path, tags: List[Tag], line_endings: str = "\n", root: int = 0) -> None:
         """
         Añade un archivo con sus tags al agregador
         
         Args:
             file_path: Ruta del archivo
             tags: Lista de tags encontrados en el archivo
+            line_endings: Fin de línea del archivo (solo se usa si se conservan archivos)
+            root: Índice de la raíz del archivo en roots
         """
-        tag_file = TagFile(path=file_path, tags=tags)
-        self._files[file_path] = tag_file
+        measure = metrics.enabled
+        if measure:
+            start = time.perf_counter()
+        
+        if self.retain_files:
+            self._files[file_path] = TagFile(path=file_path, tags=tags, line_endings=line_endings)
+        
+        file_id = len(self._paths)
+        self._paths.append(str(file_path))
+        self.total_occurrences += len(tags)
+        self._root_file_counts[root] += 1
+        if self._root_aggregates:
+            self._path_roots.append(root)
+        
+        seen = set()
+        normalizer = self.normalizer
+        root_aggregates = self._root_aggregates[root] if self._root_aggregates else None
         
         # Agregar cada tag
         for tag in tags:
-            key = (tag.namespace, tag.tag)
+            if normalizer is None:
+                key = (tag.namespace, tag.tag)
+            else:
+                key = (tag.namespace, normalizer.normalize(tag.namespace, tag.tag))
             
-            if key not in self._aggregates:
-                self._aggregates[key] = TagAggregate(
+            agg = self._aggregates.get(key)
+            if agg is None:
+                agg = self._aggregates[key] = TagAggregate(
                     namespace=tag.namespace,
                     tag=tag.tag
                 )
+                self._postings[key] = array('I')
             
-            self._aggregates[key].add_occurrence(file_path)
+            new_in_file = key not in seen
+            agg.add_occurrence(new_in_file)
+            if normalizer is not None:
+                agg.add_variant(tag.tag)
+            if root_aggregates is not None:
+                root_agg = root_aggregates.get(key)
+                if root_agg is None:
+                    root_agg = root_aggregates[key] = TagAggregate(namespace=tag.namespace, tag=tag.tag)
+                root_agg.add_occurrence(new_in_file)
+                if normalizer is not None:
+                    root_agg.add_variant(tag.tag)
+            if new_in_file:
+                seen.add(key)
+                self._postings[key].append(file_id)
+        
+        if measure:
+            _ADD_FILE_TIMER.observe(time.perf_counter() - start)
+            _TAGS_PER_FILE.observe(len(tags))
     
     def get_aggregates(self) -> List[TagAggregate]:
         """
@@ -50,6 +146,37 @@ class TagAggregator:
             key=lambda x: (x.namespace, x.tag)
         )
     
+    def iter_aggregates(self, root: Optional[int] = None) -> Iterator[TagAggregate]:
+        """
+        Itera los agregados sin ordenar (para recorridos que no necesitan orden)
+        
+        Args:
+            root: Limitar a los archivos de una raíz (None = todas)
+        
+        Yields:
+            TagAggregate en orden de aparición
+        """
+        if root is not None and self._root_aggregates:
+            return iter(self._root_aggregates[root].values())
+        return iter(self._aggregates.values())
+    
+    def get_aggregate(self, namespace: str, tag: str) -> Optional[TagAggregate]:
+        """Agregado de un tag (None si no apareció en el escaneo)"""
+        return self._aggregates.get(self._key(namespace, tag))
+    
+    def get_variant_keys(self, namespace: str, tag: str) -> List[Tuple[str, str]]:
+        """
+        Claves exactas de todas las grafías de un tag, tal como están en los archivos
+        
+        Si el tag no apareció, es solo la clave dada.
+        """
+        agg = self.get_aggregate(namespace, tag)
+        if agg is None:
+            return [(namespace, tag)]
+        if not agg.variants:
+            return [(namespace, agg.tag)]
+        return [(namespace, variant) for variant in agg.variants]
+    
     def get_aggregates_by_namespace(self) -> Dict[str, List[TagAggregate]]:
         """
         Obtiene agregados agrupados por namespace
@@ -73,27 +200,336 @@ class TagAggregator:
         Obtiene todos los archivos procesados
         
         Returns:
-            Diccionario {path: TagFile}
+            Diccionario {path: TagFile} (vacío si no se conservan archivos)
         """
         return self._files.copy()
     
+    @property
+    def file_count(self) -> int:
+        """Número de archivos agregados"""
+        return len(self._paths)
+    
+    def root_file_count(self, root: int) -> int:
+        """Número de archivos agregados de una raíz"""
+        return self._root_file_counts[root]
+    
+    @property
+    def tag_count(self) -> int:
+        """Número de tags distintos (claves normalizadas si hay normalizador)"""
+        return len(self._aggregates)
+    
     def clear(self) -> None:
         """Limpia todos los datos agregados"""
         self._aggregates.clear()
         self._files.clear()
+        self._paths.clear()
+        del self._path_roots[:]
+        self._postings.clear()
+        for root_aggregates in self._root_aggregates:
+            root_aggregates.clear()
+        self._root_file_counts = [0] * len(self._root_file_counts)
+        self.total_occurrences = 0
     
     def get_file_paths_for_tag(self, namespace: str, tag: str) -> List[Path]:
         """
         Obtiene las rutas de archivos que contienen un tag específico
         
+        Para tags muy frecuentes es preferible paginar con get_file_page().
+        
         Args:
             namespace: Namespace del tag
             tag: Texto del tag
-            
+        
+        Returns:
+            Lista de rutas de archivos en el orden de escaneo
+        """
+        return self.get_file_page(namespace, tag, 0, self.get_file_count_for_tag(namespace, tag))
+    
+    def get_file_count_for_tag(self, namespace: str, tag: str) -> int:
+        """Número de archivos que contienen un tag"""
+        postings = self._postings.get(self._key(namespace, tag))
+        return len(postings) if postings is not None else 0
+    
+    def get_file_page(self, namespace: str, tag: str, start: int, count: int) -> List[Path]:
+        """
+        Obtiene una página de los archivos que contienen un tag
+        
+        Solo se resuelven las rutas de la página pedida.
+        
+        Args:
+            namespace: Namespace del tag
+            tag: Texto del tag
+            start: Posición del primer archivo (en el orden de escaneo)
+            count: Número de archivos
+        
         Returns:
             Lista de rutas de archivos
         """
-        key = (namespace, tag)
-        if key in self._aggregates:
-            return sorted(list(self._aggregates[key].file_paths))
-        return []
+        postings = self._postings.get(self._key(namespace, tag))
+        if postings is None:
+            return []
+        paths = self._paths
+        return [Path(paths[i]) for i in postings[start:start + count]]
+    
+    def iter_postings(self) -> Iterator[Tuple[Tuple[str, str], array]]:
+        """
+        Itera las postings de cada tag (no modificar los arrays)
+        
+        Yields:
+            Tuplas ((namespace, tag mostrado), ids de archivo en orden de escaneo)
+        """
+        if self.normalizer is None:
+            yield from self._postings.items()
+            return
+        aggregates = self._aggregates
+        for key, postings in self._postings.items():
+            agg = aggregates[key]
+            yield (agg.namespace, agg.tag), postings
+    
+    def iter_file_tags(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Itera la relación archivo ↔ tag a partir de las postings, sin materializarla
+        
+        Yields:
+            Tuplas (ruta, namespace, tag mostrado), agrupadas por tag
+        """
+        paths = self._paths
+        for (namespace, tag), postings in self.iter_postings():
+            for file_id in postings:
+                yield paths[file_id], namespace, tag
+    
+    @property
+    def relation_size(self) -> int:
+        """Número de pares archivo-tag distintos"""
+        return sum(len(postings) for postings in self._postings.values())
+    
+    def get_files_for_keys(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        all_files: bool = False
+    ) -> List[Path]:
+        """
+        Obtiene los archivos que contienen al menos uno de los tags dados
+        
+        Args:
+            keys: Claves (namespace, tag)
+            all_files: Retornar todos los archivos (ej: reglas que añaden siempre)
+        
+        Returns:
+            Lista de rutas en el orden de escaneo
+        """
+        if all_files:
+            return [Path(p) for p in self._paths]
+        
+        file_ids = set()
+        for key in keys:
+            postings = self._postings.get(self._key(*key))
+            if postings is not None:
+                file_ids.update(postings)
+        
+        return [Path(self._paths[i]) for i in sorted(file_ids)]
+    
+    def merge(self, other: "TagAggregator") -> None:
+        """
+        Añade los archivos y agregados de otro agregador (ej: un fragmento de
+        un escaneo repartido)
+        
+        Los ids de archivo del otro se desplazan detrás de los propios. Ambos
+        deben tener las mismas raíces y el mismo normalizador, y no compartir
+        archivos (cada archivo contaría dos veces).
+        
+        Args:
+            other: Agregador a incorporar (no se modifica)
+        
+        Raises:
+            ValueError: Si las raíces o la normalización no coinciden
+        """
+        if [str(root) for root in other.roots] != [str(root) for root in self.roots]:
+            raise ValueError("Los agregados a combinar tienen raíces distintas")
+        if _normalizer_dict(other.normalizer) != _normalizer_dict(self.normalizer):
+            raise ValueError("Los agregados a combinar usan normalizaciones distintas")
+        
+        offset = len(self._paths)
+        self._paths.extend(other._paths)
+        self._path_roots.extend(other._path_roots)
+        if self.retain_files:
+            self._files.update(other._files)
+        self.total_occurrences += other.total_occurrences
+        for root_id, count in enumerate(other._root_file_counts):
+            self._root_file_counts[root_id] += count
+        
+        for key, agg in other._aggregates.items():
+            _merge_aggregate(self._aggregates, key, agg)
+            postings = self._postings.get(key)
+            if postings is None:
+                postings = self._postings[key] = array('I')
+            postings.extend(file_id + offset for file_id in other._postings[key])
+        for root_aggregates, other_root_aggregates in zip(self._root_aggregates, other._root_aggregates):
+            for key, agg in other_root_aggregates.items():
+                _merge_aggregate(root_aggregates, key, agg)
+    
+    def to_dict(self) -> dict:
+        """
+        Serializa agregados, postings y raíces a un diccionario compatible con JSON
+        
+        Los TagFile no se incluyen: al reconstruirlo, los archivos se releen de
+        disco como en el modo de bajo consumo. Las rutas se guardan relativas a
+        su raíz (con separadores "/") junto al índice de la raíz, de modo que
+        pueden cargarse con las raíces montadas en otro lugar. Las postings se
+        guardan como diferencias entre ids consecutivos, que ocupan mucho menos.
+        """
+        return {
+            "roots": [str(root) for root in self.roots],
+            "normalizer": _normalizer_dict(self.normalizer),
+            "paths": self._relative_paths(),
+            "path_roots": _run_encode(self._path_roots),
+            "root_file_counts": self._root_file_counts,
+            "total_occurrences": self.total_occurrences,
+            "tags": [
+                [key[0], key[1], _aggregate_to_list(agg), _delta_encode(self._postings[key])]
+                for key, agg in self._aggregates.items()
+            ],
+            "root_tags": [
+                [[key[0], key[1], _aggregate_to_list(agg)] for key, agg in root_aggregates.items()]
+                for root_aggregates in self._root_aggregates
+            ]
+        }
+    
+    def _relative_paths(self) -> List[str]:
+        """Ruta de cada archivo relativa a su raíz (con separadores /)"""
+        prefixes = [os.path.join(str(root), "") for root in self.roots] or [""]
+        path_roots = self._path_roots
+        relative = []
+        for file_id, path in enumerate(self._paths):
+            prefix = prefixes[path_roots[file_id] if path_roots else 0]
+            # Una ruta fuera de su raíz se guarda absoluta (join la conserva al cargar)
+            if prefix and path.startswith(prefix):
+                path = path[len(prefix):]
+            relative.append(path.replace(os.sep, "/") if os.sep != "/" else path)
+        return relative
+    
+    @classmethod
+    def from_dict(cls, data: dict, roots: Optional[List[Path]] = None) -> "TagAggregator":
+        """
+        Reconstruye un agregador serializado con to_dict() (sin TagFile)
+        
+        Args:
+            data: Diccionario de to_dict()
+            roots: Raíces con las que resolver las rutas, en el mismo orden que
+                al escanear (None = las guardadas). Sirve para cargar un escaneo
+                hecho en otra máquina que monta el almacenamiento en otra ruta.
+        
+        Raises:
+            ValueError: Si el número de raíces no coincide
+        """
+        if roots is None:
+            roots = [Path(root) for root in data["roots"]]
+        elif len(roots) != len(data["roots"]):
+            raise ValueError(
+                f"El escaneo tiene {len(data['roots'])} raíces y se indicaron {len(roots)}"
+            )
+        normalizer = TagNormalizer.from_dict(data["normalizer"]) if data.get("normalizer") else None
+        aggregator = cls(retain_files=False, normalizer=normalizer, roots=roots)
+        aggregator._path_roots = _run_decode(data["path_roots"])
+        root_names = [str(root) for root in roots] or [""]
+        path_roots = aggregator._path_roots
+        aggregator._paths = [
+            os.path.join(root_names[path_roots[file_id] if path_roots else 0], relative.replace("/", os.sep))
+            for file_id, relative in enumerate(data["paths"])
+        ]
+        aggregator._root_file_counts = list(data["root_file_counts"])
+        aggregator.total_occurrences = data["total_occurrences"]
+        for namespace, key_tag, agg_data, deltas in data["tags"]:
+            key = (namespace, key_tag)
+            aggregator._aggregates[key] = _aggregate_from_list(namespace, agg_data)
+            aggregator._postings[key] = _delta_decode(deltas)
+        for root_aggregates, root_tags in zip(aggregator._root_aggregates, data["root_tags"]):
+            for namespace, key_tag, agg_data in root_tags:
+                root_aggregates[(namespace, key_tag)] = _aggregate_from_list(namespace, agg_data)
+        return aggregator
+    
+    def get_tag_file(self, file_path: Path) -> Optional[TagFile]:
+        """
+        Obtiene el TagFile conservado de un archivo
+        
+        Args:
+            file_path: Ruta del archivo
+        
+        Returns:
+            TagFile o None si no se conservan archivos
+        """
+        return self._files.get(file_path)
+
+
+def _normalizer_dict(normalizer: Optional[TagNormalizer]) -> Optional[dict]:
+    """Configuración serializable de un normalizador (None si no hay)"""
+    return normalizer.to_dict() if normalizer is not None else None
+
+
+def _merge_aggregate(
+    aggregates: Dict[Tuple[str, str], TagAggregate],
+    key: Tuple[str, str],
+    agg: TagAggregate
+) -> None:
+    """Suma un agregado a un diccionario de agregados sin compartir objetos"""
+    existing = aggregates.get(key)
+    if existing is None:
+        aggregates[key] = TagAggregate(
+            namespace=agg.namespace,
+            tag=agg.tag,
+            count=agg.count,
+            file_count=agg.file_count,
+            variants=dict(agg.variants) if agg.variants is not None else None
+        )
+    else:
+        existing.merge(agg)
+
+
+def _aggregate_to_list(agg: TagAggregate) -> list:
+    """Forma compacta de un agregado: [tag mostrado, count, file_count, grafías]"""
+    return [agg.tag, agg.count, agg.file_count, agg.variants]
+
+
+def _aggregate_from_list(namespace: str, data: list) -> TagAggregate:
+    """Inverso de _aggregate_to_list"""
+    tag, count, file_count, variants = data
+    return TagAggregate(namespace=namespace, tag=tag, count=count, file_count=file_count, variants=variants)
+
+
+def _run_encode(values: array) -> List[List[int]]:
+    """Valores como pares [valor, repeticiones] (los archivos de una raíz van seguidos)"""
+    runs: List[List[int]] = []
+    for value in values:
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    return runs
+
+
+def _run_decode(runs: List[List[int]]) -> array:
+    """Inverso de _run_encode"""
+    values = array('H')
+    for value, repeat in runs:
+        values.extend([value] * repeat)
+    return values
+
+
+def _delta_encode(postings: array) -> List[int]:
+    """Ids crecientes como diferencias entre consecutivos"""
+    previous = 0
+    deltas = []
+    for file_id in postings:
+        deltas.append(file_id - previous)
+        previous = file_id
+    return deltas
+
+
+def _delta_decode(deltas: List[int]) -> array:
+    """Inverso de _delta_encode"""
+    postings = array('I')
+    current = 0
+    for delta in deltas:
+        current += delta
+        postings.append(current)
+    return postings
@@ -0,0 +1,126 @@
+"""Detección de archivos de tags con contenido idéntico durante el escaneo"""
+
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..models.tag_models import ContentGroup, Tag, TagFile
+from ..utils.metrics import metrics
+
+_DEDUP_HITS = metrics.counter("dedup.parse_reused", "Archivos cuyo resultado parseado se reutilizó")
+_DEDUP_FILES = metrics.counter("dedup.duplicate_files", "Archivos con el mismo contenido que otro ya leído")
+
+# Contenidos parseados que se conservan en modo de bajo consumo (los más recientes)
+DEFAULT_CACHE_SIZE = 4096
+
+
+class ContentDeduplicator:
+    """
+    Reconoce archivos con los mismos bytes y reutiliza su resultado parseado
+    
+    El hash (BLAKE2b de 128 bits) se calcula sobre los bytes leídos, antes de
+    decodificar y parsear: un archivo repetido solo cuesta la lectura y el
+    hash, y su TagFile comparte la lista de tags con el primero (no debe
+    modificarse en el sitio). Los grupos de archivos repetidos se conservan
+    para mostrar cuánto del corpus es redundante.
+    
+    Con cache_size, solo se guardan los resultados parseados de los últimos
+    contenidos distintos (las copias de un mismo caption suelen estar juntas);
+    un contenido expulsado se vuelve a parsear, pero sigue contando en su grupo.
+    """
+    
+    def __init__(self, cache_size: Optional[int] = DEFAULT_CACHE_SIZE) -> None:
+        """
+        Inicializa el detector
+        
+        Args:
+            cache_size: Máximo de contenidos parseados en memoria (None = sin límite)
+        """
+        self.cache_size = cache_size
+        self._parsed: "OrderedDict[bytes, Tuple[List[Tag], str]]" = OrderedDict()
+        self._first: Dict[bytes, Path] = {}  # hash -> primer archivo con ese contenido
+        self._groups: Dict[bytes, ContentGroup] = {}  # solo contenidos repetidos
+        self.file_count = 0
+        self.total_bytes = 0
+        # Último archivo registrado: (hash, tamaño, si se reutilizó un resultado ya parseado)
+        self.last: Optional[Tuple[bytes, int, bool]] = None
+    
+    @staticmethod
+    def digest(data: bytes) -> bytes:
+        """Hash del contenido de un archivo"""
+        return hashlib.blake2b(data, digest_size=16).digest()
+    
+    def reuse(self, digest: bytes, file_path: Path, size: int) -> Optional[TagFile]:
+        """
+        TagFile de un contenido ya parseado, o None si hay que parsearlo
+        
+        Si se reutiliza, el archivo queda registrado (no llamar a add()).
+        """
+        parsed = self._parsed.get(digest)
+        if parsed is None:
+            return None
+        if self.cache_size is not None:
+            self._parsed.move_to_end(digest)
+        tags, line_endings = parsed
+        self._register(digest, file_path, size, len(tags))
+        self.last = (digest, size, True)
+        if metrics.enabled:
+            _DEDUP_HITS.inc()
+        return TagFile(path=file_path, tags=tags, line_endings=line_endings)
+    
+    def add(self, digest: bytes, tag_file: TagFile, size: int) -> None:
+        """Registra un archivo recién parseado y guarda su resultado para las copias"""
+        self._parsed[digest] = (tag_file.tags, tag_file.line_endings)
+        if self.cache_size is not None and len(self._parsed) > self.cache_size:
+            self._parsed.popitem(last=False)
+        self._register(digest, tag_file.path, size, len(tag_file.tags))
+        self.last = (digest, size, False)
+    
+    def _register(self, digest: bytes, file_path: Path, size: int, tag_count: int) -> None:
+        """Cuenta un archivo y lo añade al grupo de su contenido"""
+        self.file_count += 1
+        self.total_bytes += size
+        first = self._first.setdefault(digest, file_path)
+        if first is file_path:
+            return
+        group = self._groups.get(digest)
+        if group is None:
+            group = self._groups[digest] = ContentGroup(digest.hex(), size, tag_count, [first])
+        group.paths.append(file_path)
+        if metrics.enabled:
+            _DEDUP_FILES.inc()
+    
+    @property
+    def unique_count(self) -> int:
+        """Contenidos distintos"""
+        return len(self._first)
+    
+    @property
+    def duplicate_files(self) -> int:
+        """Archivos que repiten un contenido ya visto"""
+        return self.file_count - len(self._first)
+    
+    @property
+    def redundant_bytes(self) -> int:
+        """Bytes ocupados por las copias"""
+        return sum(group.redundant_bytes for group in self._groups.values())
+    
+    def groups(self) -> List[ContentGroup]:
+        """
+        Grupos de archivos con el mismo contenido
+        
+        Returns:
+            Lista de ContentGroup, de más a menos copias
+        """
+        return sorted(self._groups.values(), key=lambda group: (-len(group.paths), -group.size))
+    
+    def describe(self) -> str:
+        """Resumen legible"""
+        if not self.file_count:
+            return "sin archivos"
+        return (
+            f"{self.duplicate_files} de {self.file_count} archivos "
+            f"({self.duplicate_files / self.file_count:.1%}) repiten el contenido de otro "
+            f"en {len(self._groups)} grupos, {self.redundant_bytes} bytes redundantes"
+        )
@@ -0,0 +1,278 @@
+"""Co-ocurrencia de tags e implicaciones candidatas a partir de las postings"""
+
+from array import array
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models.tag_models import CoOccurrence, ImplicationCandidate
+from .aggregator import TagAggregator
+
+try:  # Dependencias opcionales: multiplicación de matrices dispersas
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+    sparse = None
+
+TagKey = Tuple[str, str]
+
+
+def scipy_available() -> bool:
+    """True si numpy y scipy están instalados"""
+    return sparse is not None
+
+
+class CooccurrenceIndex:
+    """
+    Matriz dispersa archivos × tags construida desde las postings del agregador
+    
+    Guarda las dos orientaciones en formato CSR (tag -> archivos y
+    archivo -> tags) como arrays compactos. La fila de co-ocurrencia de un tag
+    se obtiene sumando los tags de sus archivos: con scipy como producto de
+    matrices dispersas, y si no con Counter sobre los arrays. Los resultados
+    de los tags más frecuentes se precalculan y el resto se cachea (LRU).
+    """
+    
+    # Resultados guardados por tag en la caché
+    CACHE_TOP_N = 200
+    # Tags no precalculados que se mantienen en la caché
+    LRU_SIZE = 1024
+    
+    def __init__(self, aggregator: TagAggregator) -> None:
+        """
+        Construye la matriz
+        
+        Args:
+            aggregator: Agregador con las postings del escaneo
+        """
+        self.keys: List[TagKey] = []
+        self._ids: Dict[TagKey, int] = {}
+        self.file_total = aggregator.file_count
+        
+        # tag -> archivos (concatenación de las postings)
+        tag_ptr = array('Q', [0])
+        tag_files = array('I')
+        for key, postings in aggregator.iter_postings():
+            self._ids[key] = len(self.keys)
+            self.keys.append(key)
+            tag_files.extend(postings)
+            tag_ptr.append(len(tag_files))
+        self._tag_ptr = tag_ptr
+        self._tag_files = tag_files
+        
+        # Número de archivos de cada tag
+        self.file_counts = array('I', (tag_ptr[i + 1] - tag_ptr[i] for i in range(len(self.keys))))
+        
+        self._pinned: Dict[int, List[Tuple[int, int]]] = {}  # precalculados (top-K)
+        self._lru: "OrderedDict[int, List[Tuple[int, int]]]" = OrderedDict()
+        self._implications: Dict[Tuple[float, int], List[ImplicationCandidate]] = {}
+        
+        if sparse is not None and self.file_total:
+            self._build_sparse()
+        else:
+            self._build_transpose()
+    
+    @property
+    def backend(self) -> str:
+        """Implementación usada: "scipy" o "python" """
+        return "scipy" if sparse is not None and self.file_total else "python"
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def _build_sparse(self) -> None:
+        """Crea las matrices CSR de scipy"""
+        n_tags = len(self.keys)
+        indices = np.frombuffer(self._tag_files, dtype=np.uint32).astype(np.int32)
+        indptr = np.frombuffer(self._tag_ptr, dtype=np.uint64).astype(np.int64)
+        data = np.ones(len(indices), dtype=np.int32)
+        self._tags_by_file = sparse.csr_matrix(
+            (data, indices, indptr), shape=(n_tags, self.file_total)
+        )
+        self._files_by_tag = self._tags_by_file.transpose().tocsr()
+    
+    def _build_transpose(self) -> None:
+        """Crea la orientación archivo -> tags sin numpy (ordenamiento por conteo)"""
+        degree = array('I', bytes(4 * (self.file_total + 1)))
+        for file_id in self._tag_files:
+            degree[file_id + 1] += 1
+        
+        file_ptr = array('Q', bytes(8 * (self.file_total + 1)))
+        total = 0
+        for file_id in range(self.file_total):
+            total += degree[file_id + 1]
+            file_ptr[file_id + 1] = total
+        
+        file_tags = array('I', bytes(4 * total))
+        cursor = array('Q', file_ptr[:-1]) if self.file_total else array('Q')
+        tag_ptr = self._tag_ptr
+        tag_files = self._tag_files
+        for tag_id in range(len(self.keys)):
+            for pos in range(tag_ptr[tag_id], tag_ptr[tag_id + 1]):
+                file_id = tag_files[pos]
+                file_tags[cursor[file_id]] = tag_id
+                cursor[file_id] += 1
+        
+        self._file_ptr = file_ptr
+        self._file_tags = file_tags
+    
+    def _row(self, tag_id: int) -> List[Tuple[int, int]]:
+        """
+        Fila de co-ocurrencia de un tag
+        
+        Returns:
+            Lista (tag_id, archivos en común) sin el propio tag, de mayor a menor
+        """
+        if self.backend == "scipy":
+            row = self._tags_by_file.getrow(tag_id).dot(self._files_by_tag)
+            pairs = zip(row.indices.tolist(), row.data.tolist())
+        else:
+            counter: Counter = Counter()
+            file_ptr = self._file_ptr
+            file_tags = self._file_tags
+            for pos in range(self._tag_ptr[tag_id], self._tag_ptr[tag_id + 1]):
+                file_id = self._tag_files[pos]
+                counter.update(file_tags[file_ptr[file_id]:file_ptr[file_id + 1]])
+            pairs = counter.items()
+        
+        result = [(other, int(count)) for other, count in pairs if other != tag_id]
+        result.sort(key=lambda item: (-item[1], item[0]))
+        return result
+    
+    def _cached_row(self, tag_id: int, top_n: int) -> List[Tuple[int, int]]:
+        """Fila de co-ocurrencia usando la caché (completa si top_n la supera)"""
+        row = self._pinned.get(tag_id)
+        if row is None:
+            row = self._lru.get(tag_id)
+            if row is not None:
+                self._lru.move_to_end(tag_id)
+        if row is not None and (top_n <= self.CACHE_TOP_N or len(row) < self.CACHE_TOP_N):
+            return row[:top_n]
+        
+        full = self._row(tag_id)
+        self._lru[tag_id] = full[:self.CACHE_TOP_N]
+        self._lru.move_to_end(tag_id)
+        while len(self._lru) > self.LRU_SIZE:
+            self._lru.popitem(last=False)
+        return full[:top_n]
+    
+    def precompute(
+        self,
+        top_k: int = 500,
+        progress: Optional[Callable[[int, int], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> int:
+        """
+        Precalcula las filas de los top_k tags con más archivos
+        
+        Args:
+            top_k: Número de tags a precalcular
+            progress: Callback (hechos, total)
+            should_stop: Callback que retorna True para interrumpir
+        
+        Returns:
+            Número de tags precalculados
+        """
+        frequent = sorted(range(len(self.keys)), key=lambda i: -self.file_counts[i])[:top_k]
+        for done, tag_id in enumerate(frequent, start=1):
+            if should_stop is not None and should_stop():
+                return done - 1
+            if tag_id not in self._pinned:
+                self._pinned[tag_id] = self._row(tag_id)[:self.CACHE_TOP_N]
+                self._lru.pop(tag_id, None)
+            if progress is not None:
+                progress(done, len(frequent))
+        return len(frequent)
+    
+    def cooccurring(self, namespace: str, tag: str, top_n: int = 20) -> List[CoOccurrence]:
+        """
+        Tags que más aparecen junto a uno dado
+        
+        Args:
+            namespace: Namespace del tag
+            tag: Texto del tag
+            top_n: Número máximo de resultados
+        
+        Returns:
+            Lista de CoOccurrence ordenada por archivos en común
+        """
+        tag_id = self._ids.get((namespace, tag))
+        if tag_id is None:
+            return []
+        query_files = self.file_counts[tag_id]
+        result = []
+        for other, together in self._cached_row(tag_id, top_n):
+            other_files = self.file_counts[other]
+            result.append(CoOccurrence(
+                namespace=self.keys[other][0],
+                tag=self.keys[other][1],
+                together=together,
+                file_count=other_files,
+                p_given_query=together / query_files if query_files else 0.0,
+                p_query_given=together / other_files if other_files else 0.0
+            ))
+        return result
+    
+    def implication_candidates(
+        self,
+        min_confidence: float = 0.95,
+        min_support: int = 5,
+        progress: Optional[Callable[[int, int], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[ImplicationCandidate]:
+        """
+        Pares antecedente -> consecuente con P(consecuente | antecedente) alta
+        
+        Un par con confianza alta en ambos sentidos se marca como alias
+        (candidato a fusionar); si solo se cumple en un sentido, el
+        consecuente es redundante donde aparece el antecedente.
+        
+        Args:
+            min_confidence: Confianza mínima
+            min_support: Mínimo de archivos con ambos tags
+            progress: Callback (hechos, total)
+            should_stop: Callback que retorna True para interrumpir
+        
+        Returns:
+            Candidatos ordenados por soporte (los resultados completos se cachean)
+        """
+        cache_key = (min_confidence, min_support)
+        cached = self._implications.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        file_counts = self.file_counts
+        antecedents = [i for i in range(len(self.keys)) if file_counts[i] >= min_support]
+        candidates: List[ImplicationCandidate] = []
+        for done, tag_id in enumerate(antecedents, start=1):
+            if should_stop is not None and should_stop():
+                return candidates
+            antecedent_files = file_counts[tag_id]
+            needed = max(min_support, min_confidence * antecedent_files)
+            row = self._pinned.get(tag_id)
+            if row is None or (len(row) >= self.CACHE_TOP_N and row[-1][1] >= needed):
+                row = self._row(tag_id)
+            for other, together in row:
+                if together < needed:
+                    break  # la fila está ordenada de mayor a menor
+                reverse = together / file_counts[other]
+                candidates.append(ImplicationCandidate(
+                    antecedent=self.keys[tag_id],
+                    consequent=self.keys[other],
+                    support=together,
+                    confidence=together / antecedent_files,
+                    reverse_confidence=reverse,
+                    alias=reverse >= min_confidence
+                ))
+            if progress is not None and (done % 256 == 0 or done == len(antecedents)):
+                progress(done, len(antecedents))
+        
+        # Un par alias aparece en ambos sentidos: conservar el del antecedente menos frecuente
+        candidates = [
+            c for c in candidates
+            if not c.alias or (file_counts[self._ids[c.antecedent]], c.antecedent)
+            < (file_counts[self._ids[c.consequent]], c.consequent)
+        ]
+        candidates.sort(key=lambda c: (-c.support, -c.confidence, c.antecedent, c.consequent))
+        self._implications[cache_key] = candidates
+        return candidates
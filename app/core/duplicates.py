@@ -0,0 +1,241 @@
+"""Detección de tags casi duplicados (separadores, mayúsculas y erratas)"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..models.tag_models import TagAggregate, DuplicateGroup
+
+# Espacios, guiones bajos y guiones se consideran el mismo separador
+_SEPARATORS = re.compile(r'[\s_\-]+')
+
+# Longitud mínima (sin separadores) para buscar erratas: en tags cortos una
+# sola edición suele dar otra palabra (cat / bat)
+MIN_FUZZY_LENGTH = 5
+
+# Variantes de borrado compartidas por más claves se ignoran (no son erratas
+# sino familias de tags parecidos, y compararlas sería cuadrático)
+MAX_BUCKET_SIZE = 64
+
+# Cada cuántas claves se informa el progreso
+PROGRESS_INTERVAL = 4096
+
+
+def fold_tag(text: str) -> str:
+    """
+    Forma normalizada de un tag para comparar variantes
+    
+    Aplica NFKC, casefold y unifica los separadores (`witch_hat`,
+    `Witch-Hat` y `witch  hat` dan `witch hat`).
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def squash_tag(text: str) -> str:
+    """Forma normalizada sin separadores (`witch hat` y `witchhat` coinciden)"""
+    return fold_tag(text).replace(' ', '')
+
+
+def _is_typo_edit(a: str, b: str) -> bool:
+    """
+    True si a y b difieren en exactamente una edición que parece una errata
+    
+    Se acepta una sustitución, inserción/borrado o transposición de dos
+    caracteres vecinos. Las ediciones que tocan dígitos no cuentan
+    (`page 1` / `page 2` son tags distintos).
+    """
+    if a == b:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            i = diffs[0]
+            return not (a[i].isdigit() or b[i].isdigit())
+        if len(diffs) == 2:
+            i, j = diffs
+            return j == i + 1 and a[i] == b[j] and a[j] == b[i]
+        return False
+    
+    if len(b) - len(a) != 1:
+        return False
+    # b tiene un carácter extra: buscar su posición
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:] and not b[i].isdigit()
+
+
+class _UnionFind:
+    """Conjuntos disjuntos sobre ids enteros (compresión de caminos)"""
+    
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+    
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+    
+    def union(self, a: int, b: int) -> bool:
+        """Une los conjuntos de a y b; False si ya estaban unidos"""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        self.parent[root_b] = root_a
+        return True
+
+
+def find_duplicate_groups(
+    aggregates: Iterable[TagAggregate],
+    fuzzy: bool = True,
+    progress: Optional[Callable[[int, int], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> List[DuplicateGroup]:
+    """
+    Agrupa las variantes de un mismo tag dentro de cada namespace
+    
+    Primero se unen los tags con la misma forma normalizada sin
+    separadores (squash_tag). Con fuzzy=True se unen además las formas a una
+    edición de distancia: en lugar de comparar todos los pares, cada forma
+    se indexa por sus variantes con un carácter borrado (dos formas a una
+    sustitución o transposición comparten una variante, y una inserción
+    convierte una forma en variante de la otra). Los grupos resultan de la
+    clausura transitiva (union-find).
+    
+    Args:
+        aggregates: Agregados de todos los namespaces
+        fuzzy: Buscar también erratas (una edición de distancia)
+        progress: Callback (claves procesadas, total)
+        should_stop: Callback que retorna True para interrumpir
+    
+    Returns:
+        Grupos con al menos dos variantes, de mayor a menor count combinado
+    """
+    by_namespace: Dict[str, List[TagAggregate]] = defaultdict(list)
+    for agg in aggregates:
+        by_namespace[agg.namespace].append(agg)
+    total = sum(len(aggs) for aggs in by_namespace.values())
+    
+    groups: List[DuplicateGroup] = []
+    done = 0
+    for namespace in sorted(by_namespace):
+        aggs = by_namespace[namespace]
+        
+        def namespace_progress(count: int) -> None:
+            if progress is not None:
+                progress(done + count, total)
+        
+        found = _namespace_groups(namespace, aggs, fuzzy, namespace_progress, should_stop)
+        if found is None:
+            break
+        groups.extend(found)
+        done += len(aggs)
+    
+    if progress is not None:
+        progress(done, total)
+    groups.sort(key=lambda g: (-g.total_count, g.namespace, g.canonical.tag))
+    return groups
+
+
+def _namespace_groups(
+    namespace: str,
+    aggregates: List[TagAggregate],
+    fuzzy: bool,
+    progress: Callable[[int], None],
+    should_stop: Optional[Callable[[], bool]]
+) -> Optional[List[DuplicateGroup]]:
+    """Grupos de variantes de un namespace (None si se interrumpió)"""
+    # Forma sin separadores -> id; los tags con la misma forma ya son un grupo
+    key_ids: Dict[str, int] = {}
+    keys: List[str] = []
+    members: List[List[TagAggregate]] = []
+    for agg in aggregates:
+        key = squash_tag(agg.tag)
+        key_id = key_ids.get(key)
+        if key_id is None:
+            key_id = key_ids[key] = len(keys)
+            keys.append(key)
+            members.append([])
+        members[key_id].append(agg)
+    
+    union_find = _UnionFind(len(keys))
+    fuzzy_ids = set()  # formas unidas por una errata
+    
+    def join(id_a: int, id_b: int) -> None:
+        if union_find.find(id_a) != union_find.find(id_b) and _is_typo_edit(keys[id_a], keys[id_b]):
+            union_find.union(id_a, id_b)
+            fuzzy_ids.update((id_a, id_b))
+    
+    if fuzzy:
+        by_length: Dict[int, List[int]] = defaultdict(list)
+        for key_id, key in enumerate(keys):
+            if len(key) >= MIN_FUZZY_LENGTH:
+                by_length[len(key)].append(key_id)
+        
+        # Las variantes se indexan por longitud: solo las formas de igual
+        # longitud pueden compartir una variante, y la memoria queda acotada
+        processed = 0
+        for length in sorted(by_length):
+            buckets: Dict[str, object] = {}  # variante -> id o lista de ids
+            for key_id in by_length[length]:
+                key = keys[key_id]
+                for i in range(length):
+                    variant = key[:i] + key[i + 1:]
+                    
+                    # Inserción: la variante es otra forma existente
+                    other = key_ids.get(variant)
+                    if other is not None and len(variant) >= MIN_FUZZY_LENGTH:
+                        join(other, key_id)
+                    
+                    bucket = buckets.get(variant)
+                    if bucket is None:
+                        buckets[variant] = key_id
+                    elif isinstance(bucket, int):
+                        if bucket != key_id:
+                            buckets[variant] = [bucket, key_id]
+                    elif len(bucket) <= MAX_BUCKET_SIZE and bucket[-1] != key_id:
+                        bucket.append(key_id)
+                
+                processed += 1
+                if processed % PROGRESS_INTERVAL == 0:
+                    progress(processed)
+                    if should_stop is not None and should_stop():
+                        return None
+            
+            # Sustituciones y transposiciones: formas que comparten una variante
+            for bucket in buckets.values():
+                if isinstance(bucket, int) or len(bucket) > MAX_BUCKET_SIZE:
+                    continue
+                for a in range(len(bucket)):
+                    for b in range(a + 1, len(bucket)):
+                        join(bucket[a], bucket[b])
+    
+    progress(len(aggregates))
+    
+    components: Dict[int, List[int]] = defaultdict(list)
+    for key_id in range(len(keys)):
+        components[union_find.find(key_id)].append(key_id)
+    
+    groups = []
+    for ids in components.values():
+        group_members = [agg for key_id in ids for agg in members[key_id]]
+        if len(group_members) < 2:
+            continue
+        group_members.sort(key=lambda agg: (-agg.count, agg.tag))
+        groups.append(DuplicateGroup(
+            namespace=namespace,
+            members=group_members,
+            fuzzy=any(key_id in fuzzy_ids for key_id in ids)
+        ))
+    return groups
+
@@ -0,0 +1,256 @@
+"""Exportación en streaming de agregados y de la relación archivo ↔ tag (CSV, JSONL, Parquet)"""
+
+import csv
+import importlib.util
+import json
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..models.tag_models import ExportSummary
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .aggregator import TagAggregator
+
+logger = get_logger(__name__)
+
+_EXPORT_TIMER = metrics.timer("export.total", "Duración de las exportaciones")
+_EXPORT_ROWS = metrics.counter("export.rows", "Filas exportadas")
+
+# Columnas: (nombre, tipo) con tipo "str" o "int"
+AGGREGATE_COLUMNS = (("namespace", "str"), ("tag", "str"), ("count", "int"), ("file_count", "int"))
+RELATION_COLUMNS = (("path", "str"), ("namespace", "str"), ("tag", "str"))
+
+# Filas por bloque: lo único que se mantiene en memoria durante la escritura
+DEFAULT_CHUNK_SIZE = 50_000
+
+Row = Tuple
+Columns = Sequence[Tuple[str, str]]
+
+
+class ExportFormat:
+    """Formatos de exportación"""
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+
+def parquet_available() -> bool:
+    """True si pyarrow está instalado (se importa solo al exportar a Parquet)"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def available_formats() -> List[str]:
+    """Formatos utilizables en este entorno"""
+    formats = [ExportFormat.CSV, ExportFormat.JSONL]
+    if parquet_available():
+        formats.append(ExportFormat.PARQUET)
+    return formats
+
+
+def format_from_path(path: Path) -> Optional[str]:
+    """Formato según la extensión (None si no se reconoce)"""
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix in (ExportFormat.CSV, ExportFormat.JSONL, ExportFormat.PARQUET):
+        return suffix
+    if suffix == "ndjson":
+        return ExportFormat.JSONL
+    return None
+
+
+def relation_path_for(path: Path) -> Path:
+    """Ruta por defecto de la relación archivo ↔ tag junto a la de agregados"""
+    return path.with_name(f"{path.stem}_files{path.suffix}")
+
+
+class _CsvWriter:
+    """Escribe bloques de filas en CSV (UTF-8 con encabezado)"""
+    
+    def __init__(self, path: Path, columns: Columns) -> None:
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+    
+    def write(self, rows: List[Row]) -> None:
+        self._writer.writerows(rows)
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class _JsonlWriter:
+    """Escribe bloques de filas como un objeto JSON por línea"""
+    
+    def __init__(self, path: Path, columns: Columns) -> None:
+        self._file = open(path, "w", encoding="utf-8", newline="\n")
+        self._names = [name for name, _ in columns]
+    
+    def write(self, rows: List[Row]) -> None:
+        names = self._names
+        self._file.write("".join(
+            json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n" for row in rows
+        ))
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Escribe cada bloque de filas como un row group de Parquet"""
+    
+    def __init__(self, path: Path, columns: Columns) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("La exportación a Parquet requiere pyarrow (pip install pyarrow)") from None
+        self._pa = pa
+        self._schema = pa.schema([
+            (name, pa.int64() if kind == "int" else pa.string()) for name, kind in columns
+        ])
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+    
+    def write(self, rows: List[Row]) -> None:
+        pa = self._pa
+        arrays = [
+            pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows), self._schema)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+    
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS = {
+    ExportFormat.CSV: _CsvWriter,
+    ExportFormat.JSONL: _JsonlWriter,
+    ExportFormat.PARQUET: _ParquetWriter,
+}
+
+
+def export_rows(
+    rows: Iterable[Row],
+    path: Path,
+    fmt: str,
+    columns: Columns,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[int, bool]:
+    """
+    Escribe filas en bloques de `chunk_size` sin materializar el iterable
+    
+    Args:
+        rows: Filas (tuplas en el orden de `columns`)
+        path: Archivo de salida
+        fmt: Formato (ver ExportFormat)
+        columns: Columnas (nombre, tipo)
+        chunk_size: Filas por bloque
+        progress: Callback con las filas escritas tras cada bloque
+        should_stop: Consultado entre bloques; True cancela
+    
+    Returns:
+        (filas escritas, cancelada); una exportación cancelada borra el archivo parcial
+    """
+    writer_class = _WRITERS.get(fmt)
+    if writer_class is None:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+    
+    iterator: Iterator[Row] = iter(rows)
+    written = 0
+    cancelled = False
+    writer = writer_class(path, columns)
+    try:
+        while True:
+            if should_stop is not None and should_stop():
+                cancelled = True
+                break
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            writer.write(chunk)
+            written += len(chunk)
+            if metrics.enabled:
+                _EXPORT_ROWS.inc(len(chunk))
+            if progress is not None:
+                progress(written)
+    finally:
+        writer.close()
+    
+    if cancelled:
+        path.unlink(missing_ok=True)
+    return written, cancelled
+
+
+def iter_aggregate_rows(aggregator: TagAggregator) -> Iterator[Row]:
+    """Filas (namespace, tag, count, file_count) ordenadas por namespace y tag"""
+    for agg in aggregator.get_aggregates():
+        yield agg.namespace, agg.tag, agg.count, agg.file_count
+
+
+def export_scan(
+    aggregator: TagAggregator,
+    path: Path,
+    fmt: Optional[str] = None,
+    relation_path: Optional[Path] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> ExportSummary:
+    """
+    Exporta los agregados de un escaneo y, si se pide, la relación archivo ↔ tag
+    
+    La relación se genera desde las postings del agregador (un par por archivo
+    y tag distinto) y se escribe por bloques: con decenas de millones de
+    ocurrencias solo hay un bloque en memoria a la vez.
+    
+    Args:
+        aggregator: Resultado del escaneo
+        path: Archivo de agregados
+        fmt: Formato (por defecto según la extensión de `path`)
+        relation_path: Archivo de la relación archivo ↔ tag (None = no exportarla)
+        chunk_size: Filas por bloque
+        progress: Callback (filas escritas, filas totales)
+        should_stop: Consultado entre bloques; True cancela
+    
+    Returns:
+        ExportSummary con las filas escritas
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt is None:
+        raise ValueError(f"No se reconoce el formato de {path.name}: use .csv, .jsonl o .parquet")
+    
+    total = aggregator.tag_count + (aggregator.relation_size if relation_path is not None else 0)
+    summary = ExportSummary(format=fmt, aggregates_path=path, relation_path=relation_path)
+    started = time.perf_counter()
+    
+    with _EXPORT_TIMER.time():
+        logger.info("Exportando %s agregados a %s (%s)", aggregator.tag_count, path, fmt)
+        summary.aggregate_rows, summary.cancelled = export_rows(
+            iter_aggregate_rows(aggregator),
+            path,
+            fmt,
+            AGGREGATE_COLUMNS,
+            chunk_size,
+            progress=(lambda written: progress(written, total)) if progress else None,
+            should_stop=should_stop
+        )
+        
+        if relation_path is not None and not summary.cancelled:
+            logger.info("Exportando %s filas archivo-tag a %s", aggregator.relation_size, relation_path)
+            offset = summary.aggregate_rows
+            summary.relation_rows, summary.cancelled = export_rows(
+                aggregator.iter_file_tags(),
+                relation_path,
+                fmt,
+                RELATION_COLUMNS,
+                chunk_size,
+                progress=(lambda written: progress(offset + written, total)) if progress else None,
+                should_stop=should_stop
+            )
+    
+    summary.elapsed = time.perf_counter() - started
+    logger.info("Exportación %s: %s", "cancelada" if summary.cancelled else "completada", summary.describe())
+    return summary
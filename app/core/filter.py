@@ -1,9 +1,15 @@
 """Filtrado de tags según threshold y banned tags"""
 
 import re
-from typing import List, Set
+from typing import Iterable, List, Set
 
 from ..models.tag_models import TagAggregate
+from ..utils.metrics import metrics
+
+_FILTER_TIMER = metrics.timer("filter.run", "Tiempo de filtrado de los agregados")
+_EVALUATED = metrics.counter("filter.evaluated", "Agregados evaluados por el filtro")
+_BELOW_THRESHOLD = metrics.counter("filter.below_threshold", "Agregados descartados por threshold")
+_BANNED = metrics.counter("filter.banned", "Agregados descartados por tags prohibidos")
 
 
 class BannedMatchMode:
@@ -98,27 +104,36 @@ class TagFilter:
         
         return False
     
-    def filter(self, aggregates: List[TagAggregate]) -> List[TagAggregate]:
+    def filter(self, aggregates: Iterable[TagAggregate]) -> List[TagAggregate]:
         """
         Filtra agregados según threshold y banned tags
         
         Args:
-            aggregates: Lista de agregados a filtrar
+            aggregates: Agregados a filtrar (lista o iterador)
             
         Returns:
             Lista filtrada de agregados
         """
         filtered = []
+        evaluated = below_threshold = banned = 0
         
-        for agg in aggregates:
-            # Filtrar por threshold
-            if agg.count < self.threshold:
-                continue
-            
-            # Filtrar por banned tags
-            if self.is_banned(agg.namespace, agg.tag):
-                continue
-            
-            filtered.append(agg)
+        with _FILTER_TIMER.time():
+            for agg in aggregates:
+                evaluated += 1
+                # Filtrar por threshold
+                if agg.count < self.threshold:
+                    below_threshold += 1
+                    continue
+                
+                # Filtrar por banned tags
+                if self.is_banned(agg.namespace, agg.tag):
+                    banned += 1
+                    continue
+                
+                filtered.append(agg)
         
+        if metrics.enabled:
+            _EVALUATED.inc(evaluated)
+            _BELOW_THRESHOLD.inc(below_threshold)
+            _BANNED.inc(banned)
         return filtered
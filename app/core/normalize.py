@@ -0,0 +1,122 @@
+"""Normalización opcional de tags (mayúsculas, Unicode y separadores)"""
+
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+# Guiones bajos y espacios repetidos equivalen a un espacio
+_SEPARATORS = re.compile(r'[\s_]+')
+
+
+@dataclass(frozen=True)
+class NormalizationRule:
+    """Transformaciones aplicadas a los tags de un namespace"""
+    casefold: bool = True
+    nfkc: bool = True
+    fold_separators: bool = True
+    
+    def is_identity(self) -> bool:
+        """True si la regla no transforma nada"""
+        return not (self.casefold or self.nfkc or self.fold_separators)
+    
+    def apply(self, text: str) -> str:
+        """Forma normalizada de un texto"""
+        if self.nfkc:
+            text = unicodedata.normalize('NFKC', text)
+        if self.casefold:
+            text = text.casefold()
+        if self.fold_separators:
+            text = _SEPARATORS.sub(' ', text).strip()
+        return text
+    
+    def describe(self) -> str:
+        """Resumen legible de la regla"""
+        parts = [
+            name for name, enabled in (
+                ("NFKC", self.nfkc),
+                ("mayúsculas", self.casefold),
+                ("separadores", self.fold_separators)
+            ) if enabled
+        ]
+        return ", ".join(parts) if parts else "sin normalizar"
+
+
+class TagNormalizer:
+    """
+    Calcula la clave normalizada de cada tag, con una regla por namespace
+    
+    El resultado se memoriza por texto distinto: durante un escaneo cada
+    variante se normaliza una sola vez aunque aparezca en millones de líneas.
+    """
+    
+    def __init__(
+        self,
+        default: NormalizationRule = NormalizationRule(),
+        overrides: Optional[Dict[str, NormalizationRule]] = None
+    ) -> None:
+        """
+        Inicializa el normalizador
+        
+        Args:
+            default: Regla para los namespaces sin regla propia
+            overrides: Reglas por namespace (ej: dejar `artist` sin cambios)
+        """
+        self.default = default
+        self.overrides = dict(overrides or {})
+        self._cache: Dict[Tuple[str, str], str] = {}
+    
+    @classmethod
+    def excluding(cls, namespaces: Iterable[str], default: NormalizationRule = NormalizationRule()) -> "TagNormalizer":
+        """Normalizador que deja sin cambios los namespaces dados"""
+        identity = NormalizationRule(casefold=False, nfkc=False, fold_separators=False)
+        return cls(default, {namespace: identity for namespace in namespaces})
+    
+    def rule_for(self, namespace: str) -> NormalizationRule:
+        """Regla aplicada a un namespace"""
+        return self.overrides.get(namespace, self.default)
+    
+    def normalize(self, namespace: str, tag: str) -> str:
+        """
+        Clave normalizada de un tag (memorizada)
+        
+        Args:
+            namespace: Namespace del tag
+            tag: Texto del tag tal como aparece en el archivo
+        
+        Returns:
+            Texto normalizado según la regla del namespace
+        """
+        key = (namespace, tag)
+        normalized = self._cache.get(key)
+        if normalized is None:
+            normalized = self._cache[key] = self.rule_for(namespace).apply(tag)
+        return normalized
+    
+    def to_dict(self) -> dict:
+        """Serializa la configuración a un diccionario compatible con JSON"""
+        return {
+            "default": asdict(self.default),
+            "overrides": {namespace: asdict(rule) for namespace, rule in sorted(self.overrides.items())}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "TagNormalizer":
+        """Reconstruye un normalizador serializado con to_dict()"""
+        return cls(
+            NormalizationRule(**data.get("default", {})),
+            {namespace: NormalizationRule(**rule) for namespace, rule in data.get("overrides", {}).items()}
+        )
+    
+    def clear_cache(self) -> None:
+        """Descarta los resultados memorizados"""
+        self._cache.clear()
+    
+    def describe(self) -> str:
+        """Resumen legible de la configuración"""
+        text = self.default.describe()
+        if self.overrides:
+            text += " | " + ", ".join(
+                f"{namespace}: {rule.describe()}" for namespace, rule in sorted(self.overrides.items())
+            )
+        return text
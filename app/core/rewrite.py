@@ -0,0 +1,366 @@
+"""Plan de reescritura de tags: remover, renombrar, fusionar y añadir"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.tag_models import Tag, TagAggregate, FileRewrite
+from .tag_parser import parse_line, format_tag
+
+TagKey = Tuple[str, str]
+
+
+class RewritePlan:
+    """
+    Conjunto de reglas que se aplican a cada archivo en una sola pasada
+    
+    Cada clave (namespace, tag) puede mapearse a una tupla vacía (remover),
+    a una clave (renombrar/fusionar) o a varias (reemplazar por muchas).
+    Las reglas de adición añaden tags implicados cuando un disparador está
+    presente en el resultado, o siempre si no tienen disparador.
+    """
+    
+    def __init__(self) -> None:
+        self._replacements: Dict[TagKey, Tuple[TagKey, ...]] = {}
+        self._implications: Dict[TagKey, Tuple[TagKey, ...]] = {}
+        self._additions: List[TagKey] = []
+    
+    @classmethod
+    def from_removals(cls, keys: Iterable[TagKey]) -> "RewritePlan":
+        """Crea un plan que solo remueve las claves dadas"""
+        plan = cls()
+        for key in keys:
+            plan.remove(key)
+        return plan
+    
+    @classmethod
+    def from_variants(cls, aggregates: Iterable[TagAggregate]) -> "RewritePlan":
+        """
+        Crea un plan que reescribe cada grafía en la forma canónica de su agregado
+        
+        Args:
+            aggregates: Agregados con grafías (escaneo con normalización)
+        
+        Returns:
+            RewritePlan con un renombrado por cada grafía no canónica
+        """
+        plan = cls()
+        for agg in aggregates:
+            if not agg.variants or len(agg.variants) < 2:
+                continue
+            target = (agg.namespace, agg.tag)
+            for variant in agg.variants:
+                if variant != agg.tag:
+                    plan.rename((agg.namespace, variant), target)
+        return plan
+    
+    def remove(self, key: TagKey) -> None:
+        """Remueve el tag de todos los archivos"""
+        self._replacements[key] = ()
+    
+    def rename(self, key: TagKey, new_key: TagKey) -> None:
+        """Renombra un tag (si el nuevo ya existe en el archivo, se deduplica)"""
+        self.replace(key, [new_key])
+    
+    def replace(self, key: TagKey, new_keys: Iterable[TagKey]) -> None:
+        """Reemplaza un tag por uno o varios tags, en su misma posición"""
+        targets = tuple(new_keys)
+        if targets == (key,):
+            self._replacements.pop(key, None)
+            return
+        self._replacements[key] = targets
+    
+    def merge(self, keys: Iterable[TagKey], target: TagKey) -> None:
+        """Fusiona varios alias en un tag destino"""
+        for key in keys:
+            if key != target:
+                self.rename(key, target)
+    
+    def add(self, keys: Iterable[TagKey], when: Optional[TagKey] = None) -> None:
+        """
+        Añade tags al final de cada archivo
+        
+        Args:
+            keys: Tags a añadir
+            when: Tag disparador; si es None se añaden a todos los archivos
+        """
+        keys = tuple(keys)
+        if when is None:
+            self._additions.extend(k for k in keys if k not in self._additions)
+        else:
+            current = self._implications.get(when, ())
+            self._implications[when] = current + tuple(
+                k for k in keys if k not in current
+            )
+    
+    def update(self, other: "RewritePlan") -> None:
+        """Incorpora las reglas de otro plan (las de `other` tienen prioridad)"""
+        self._replacements.update(other._replacements)
+        for trigger, implied in other._implications.items():
+            self.add(implied, when=trigger)
+        self.add(other._additions)
+    
+    def expand_keys(self, variant_keys: Callable[[TagKey], Iterable[TagKey]]) -> None:
+        """
+        Extiende las reglas a todas las grafías de sus claves de origen
+        
+        Para un escaneo con normalización: `witch hat -> hat` debe reescribir
+        también `Witch_Hat` y `witch_hat`. Una grafía con su propia regla
+        conserva esa regla.
+        
+        Args:
+            variant_keys: Función clave -> claves de todas sus grafías
+        """
+        explicit = set(self._replacements)
+        for key, targets in list(self._replacements.items()):
+            for variant in variant_keys(key):
+                if variant not in explicit:
+                    self.replace(variant, targets)
+        for trigger, implied in list(self._implications.items()):
+            for variant in variant_keys(trigger):
+                if variant != trigger:
+                    self.add(implied, when=variant)
+    
+    def is_empty(self) -> bool:
+        """True si el plan no tiene reglas"""
+        return not (self._replacements or self._implications or self._additions)
+    
+    @property
+    def removals(self) -> Set[TagKey]:
+        """Claves que se remueven sin reemplazo"""
+        return {key for key, targets in self._replacements.items() if not targets}
+    
+    @property
+    def replacements(self) -> Dict[TagKey, Tuple[TagKey, ...]]:
+        """Claves que se reemplazan por otras"""
+        return {key: targets for key, targets in self._replacements.items() if targets}
+    
+    @property
+    def implications(self) -> Dict[TagKey, Tuple[TagKey, ...]]:
+        """Reglas de adición con disparador"""
+        return dict(self._implications)
+    
+    @property
+    def additions(self) -> List[TagKey]:
+        """Tags que se añaden a todos los archivos"""
+        return list(self._additions)
+    
+    def source_keys(self) -> Set[TagKey]:
+        """Claves cuya presencia en un archivo hace que el plan lo modifique"""
+        return set(self._replacements) | set(self._implications)
+    
+    def to_dict(self) -> dict:
+        """Serializa el plan a un diccionario compatible con JSON"""
+        return {
+            "replacements": [
+                [list(key), [list(t) for t in targets]]
+                for key, targets in sorted(self._replacements.items())
+            ],
+            "implications": [
+                [list(key), [list(t) for t in implied]]
+                for key, implied in sorted(self._implications.items())
+            ],
+            "additions": [list(key) for key in self._additions]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "RewritePlan":
+        """Reconstruye un plan serializado con to_dict()"""
+        plan = cls()
+        for key, targets in data.get("replacements", []):
+            plan._replacements[tuple(key)] = tuple(tuple(t) for t in targets)
+        for key, implied in data.get("implications", []):
+            plan._implications[tuple(key)] = tuple(tuple(t) for t in implied)
+        plan._additions = [tuple(key) for key in data.get("additions", [])]
+        return plan
+    
+    def fingerprint(self) -> str:
+        """Hash estable de las reglas (identifica el plan en checkpoints)"""
+        payload = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def describe(self) -> str:
+        """Resumen legible del plan"""
+        return (
+            f"{len(self.removals)} tags a remover, "
+            f"{len(self.replacements)} tags a reemplazar, "
+            f"{len(self._implications) + len(self._additions)} reglas de adición"
+        )
+    
+    def rewrite(self, tags: List[Tag]) -> Tuple[List[Tag], int, int, int, int]:
+        """
+        Aplica el plan a la lista de tags de un archivo
+        
+        Mantiene el orden original: los reemplazos ocupan la posición del tag
+        original y los tags añadidos van al final. Si hay cambios, los
+        duplicados se remueven manteniendo la primera aparición.
+        
+        Args:
+            tags: Tags originales del archivo
+        
+        Returns:
+            Tupla (tags_resultantes, removidos, reemplazados, añadidos,
+            duplicados_removidos). Si no hay cambios se retorna la lista original.
+        """
+        result: List[Tag] = []
+        tags_removed = 0
+        tags_replaced = 0
+        
+        replacements = self._replacements
+        for tag in tags:
+            targets = replacements.get((tag.namespace, tag.tag))
+            if targets is None:
+                result.append(tag)
+            elif not targets:
+                tags_removed += 1
+            else:
+                tags_replaced += 1
+                result.extend(Tag(namespace=ns, tag=t) for ns, t in targets)
+        
+        tags_added = 0
+        if self._implications or self._additions:
+            present = {(tag.namespace, tag.tag) for tag in result}
+            pending: List[TagKey] = []
+            additions_queued = False
+            # Recorrer también los tags añadidos para resolver implicaciones en cadena
+            idx = 0
+            while idx < len(result) or pending or not additions_queued:
+                if not pending and idx >= len(result):
+                    pending.extend(self._additions)
+                    additions_queued = True
+                    continue
+                if pending:
+                    key = pending.pop(0)
+                    if key in present:
+                        continue
+                    present.add(key)
+                    result.append(Tag(namespace=key[0], tag=key[1]))
+                    tags_added += 1
+                    continue
+                tag = result[idx]
+                idx += 1
+                implied = self._implications.get((tag.namespace, tag.tag))
+                if implied:
+                    pending.extend(implied)
+        
+        if not (tags_removed or tags_replaced or tags_added):
+            return tags, 0, 0, 0, 0
+        
+        # Remover duplicados manteniendo orden
+        seen = set()
+        unique_tags = []
+        for tag in result:
+            key = (tag.namespace, tag.tag)
+            if key not in seen:
+                seen.add(key)
+                unique_tags.append(tag)
+        
+        duplicates_removed = len(result) - len(unique_tags)
+        return unique_tags, tags_removed, tags_replaced, tags_added, duplicates_removed
+    
+    def rewrite_file(self, path: Path, tags: List[Tag]) -> Tuple[List[Tag], FileRewrite]:
+        """
+        Aplica el plan a un archivo y retorna sus tags finales con estadísticas
+        
+        Args:
+            path: Ruta del archivo
+            tags: Tags originales del archivo
+        
+        Returns:
+            Tupla (tags_resultantes, FileRewrite)
+        """
+        new_tags, removed, replaced, added, duplicates = self.rewrite(tags)
+        return new_tags, FileRewrite(
+            path=path,
+            original_count=len(tags),
+            final_count=len(new_tags),
+            tags_removed=removed,
+            tags_replaced=replaced,
+            tags_added=added,
+            duplicates_removed=duplicates
+        )
+    
+    @classmethod
+    def parse_rules(cls, text: str) -> "RewritePlan":
+        """
+        Crea un plan a partir de reglas en texto, una por línea:
+        
+        - `viejo -> nuevo`          renombrar
+        - `alias1 | alias2 -> tag`  fusionar alias
+        - `viejo -> uno | dos`      reemplazar por varios
+        - `viejo ->`                remover
+        - `tag => implicado | otro` añadir tags implicados
+        - `+ tag`                   añadir a todos los archivos
+        
+        Las líneas vacías y las que empiezan con `#` se ignoran.
+        
+        Args:
+            text: Texto con las reglas
+        
+        Returns:
+            RewritePlan con las reglas
+        
+        Raises:
+            ValueError: Si una línea no tiene un formato válido
+        """
+        plan = cls()
+        
+        for line_number, raw_line in enumerate(text.splitlines(), start=1):
+            line = raw_line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            if line.startswith('+'):
+                keys = _parse_keys(line[1:])
+                if not keys:
+                    raise ValueError(f"Línea {line_number}: falta el tag a añadir")
+                plan.add(keys)
+            elif '=>' in line:
+                left, right = line.split('=>', 1)
+                triggers = _parse_keys(left)
+                implied = _parse_keys(right)
+                if not triggers or not implied:
+                    raise ValueError(f"Línea {line_number}: regla de implicación incompleta")
+                for trigger in triggers:
+                    plan.add(implied, when=trigger)
+            elif '->' in line:
+                left, right = line.split('->', 1)
+                sources = _parse_keys(left)
+                targets = _parse_keys(right)
+                if not sources:
+                    raise ValueError(f"Línea {line_number}: falta el tag de origen")
+                for source in sources:
+                    plan.replace(source, targets)
+            else:
+                raise ValueError(f"Línea {line_number}: regla no reconocida: {line}")
+        
+        return plan
+
+
+def _parse_keys(text: str) -> List[TagKey]:
+    """Parsea una lista de tags separados por '|'"""
+    keys = []
+    for part in text.split('|'):
+        parsed = parse_line(part)
+        if parsed:
+            keys.append(parsed)
+    return keys
+
+
+def format_content(tags: List[Tag], line_ending: str = "\n") -> str:
+    """
+    Formatea una lista de tags como contenido de archivo
+    
+    Args:
+        tags: Tags a escribir
+        line_ending: Fin de línea original del archivo
+    
+    Returns:
+        Contenido del archivo (con fin de línea final si hay tags)
+    """
+    lines = [format_tag(tag.namespace, tag.tag) for tag in tags]
+    content = line_ending.join(lines)
+    if lines:  # Si hay líneas, añadir line ending al final
+        content += line_ending
+    return content
@@ -0,0 +1,388 @@
+"""Índice de trigramas para búsqueda rápida de tags (subcadena, prefijo y comodines)"""
+
+import heapq
+import re
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.tag_models import TagAggregate
+
+GRAM_SIZE = 3
+WILDCARDS = "*?"
+# Marcas de inicio y fin: los trigramas anclados resuelven prefijos y sufijos
+START = "\x02"
+END = "\x03"
+
+TagKey = Tuple[str, str]
+
+
+def has_wildcards(query: str) -> bool:
+    """True si la consulta usa comodines (* o ?)"""
+    return any(c in query for c in WILDCARDS)
+
+
+def _grams(text: str) -> Set[str]:
+    """Trigramas distintos de un texto"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _wildcard_pattern(query: str) -> "re.Pattern":
+    """Convierte una consulta con comodines en una regex anclada"""
+    parts = []
+    for c in query:
+        if c == '*':
+            parts.append('.*')
+        elif c == '?':
+            parts.append('.')
+        else:
+            parts.append(re.escape(c))
+    return re.compile(''.join(parts), re.DOTALL)
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas sobre claves casefold
+    
+    Cada texto añadido recibe un id entero estable. Las consultas sin
+    comodines buscan subcadenas; con `*` y `?` la consulta se ancla al texto
+    completo (`foo*` es una búsqueda por prefijo). Los trigramas de la
+    consulta reducen los candidatos antes de verificarlos, y si la consulta
+    extiende a la anterior se verifica solo sobre el resultado previo. Las
+    claves se indexan con marcas de inicio y fin, así que un patrón como
+    `ab*` usa el trigrama anclado de su prefijo.
+    """
+    
+    def __init__(self) -> None:
+        self._keys: List[Optional[str]] = []  # id -> clave casefold (None = removido)
+        self._postings: Dict[str, array] = {}  # trigrama -> ids (ascendentes)
+        self._removed = 0
+        self._stale = 0  # ids removidos que siguen en las postings
+        self._last: Optional[Tuple[str, List[int]]] = None  # (consulta, resultado)
+    
+    def __len__(self) -> int:
+        return len(self._keys) - self._removed
+    
+    def add(self, text: str) -> int:
+        """
+        Añade un texto al índice
+        
+        Args:
+            text: Texto a indexar
+        
+        Returns:
+            Id asignado al texto
+        """
+        key = text.casefold()
+        item_id = len(self._keys)
+        self._keys.append(key)
+        for gram in _grams(START + key + END):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('I')
+            postings.append(item_id)
+        self._last = None
+        return item_id
+    
+    def extend(self, texts: Iterable[str]) -> None:
+        """Añade varios textos (reciben ids consecutivos)"""
+        for text in texts:
+            self.add(text)
+    
+    def remove(self, item_id: int) -> None:
+        """
+        Remueve un texto del índice (el id no se reutiliza)
+        
+        Args:
+            item_id: Id retornado por add()
+        """
+        if self._keys[item_id] is None:
+            return
+        self._keys[item_id] = None
+        self._removed += 1
+        self._stale += 1
+        self._last = None
+        # Compactar las postings cuando acumulan más ids removidos que vivos
+        if self._stale > 1024 and self._stale > len(self):
+            self._compact()
+    
+    def _compact(self) -> None:
+        """Reconstruye las postings sin los ids removidos"""
+        self._postings.clear()
+        for item_id, key in enumerate(self._keys):
+            if key is None:
+                continue
+            for gram in _grams(START + key + END):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array('I')
+                postings.append(item_id)
+        self._stale = 0
+    
+    def clear(self) -> None:
+        """Vacía el índice"""
+        self._keys.clear()
+        self._postings.clear()
+        self._removed = 0
+        self._stale = 0
+        self._last = None
+    
+    def search(self, query: str) -> List[int]:
+        """
+        Busca los textos que coinciden con la consulta
+        
+        Args:
+            query: Subcadena, o patrón con `*` (cualquier secuencia) y `?`
+                (un carácter) anclado al texto completo. Sin distinguir mayúsculas.
+        
+        Returns:
+            Ids coincidentes en orden ascendente
+        """
+        query = query.casefold()
+        keys = self._keys
+        if not query:
+            return [i for i, key in enumerate(keys) if key is not None]
+        
+        if has_wildcards(query):
+            pattern = _wildcard_pattern(query)
+            fragments = re.split(r'[*?]+', query)
+            # Los fragmentos de los extremos sin comodín están anclados
+            anchored = list(fragments)
+            anchored[0] = START + anchored[0]
+            anchored[-1] = anchored[-1] + END
+            fragments = [f for f in fragments if f]
+            matches = lambda key: pattern.fullmatch(key) is not None
+        else:
+            fragments = anchored = [query]
+            matches = lambda key: query in key
+        
+        candidates = self._narrow(fragments)
+        if candidates is None:
+            candidates = self._candidates(anchored)
+        
+        if candidates is None:
+            result = [i for i, key in enumerate(keys) if key is not None and matches(key)]
+        else:
+            result = sorted(
+                i for i in candidates
+                if keys[i] is not None and matches(keys[i])
+            )
+        
+        self._last = (query, result)
+        return result
+    
+    def _narrow(self, fragments: List[str]) -> Optional[List[int]]:
+        """
+        Reutiliza el resultado anterior si la consulta lo refina
+        
+        Toda coincidencia contiene cada fragmento literal, así que si la
+        consulta anterior era una subcadena sin comodines contenida en alguno
+        de ellos, sus resultados son un superconjunto de los nuevos.
+        """
+        if self._last is None:
+            return None
+        last_query, last_result = self._last
+        if has_wildcards(last_query):
+            return None
+        if any(last_query in fragment for fragment in fragments):
+            return last_result
+        return None
+    
+    def _candidates(self, fragments: List[str]) -> Optional[Iterable[int]]:
+        """
+        Intersecta las postings de los trigramas de los fragmentos
+        
+        Returns:
+            Ids candidatos, o None si la consulta no tiene trigramas
+            (hay que recorrer todas las claves)
+        """
+        grams = set()
+        for fragment in fragments:
+            grams.update(_grams(fragment))
+        if not grams:
+            return None
+        
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(ids)
+        return candidates
+    
+    def key(self, item_id: int) -> Optional[str]:
+        """Clave casefold indexada para un id (None si fue removido)"""
+        return self._keys[item_id]
+
+
+class RankedResults:
+    """
+    Resultados de búsqueda ordenados por relevancia bajo demanda
+    
+    Solo se ordena lo necesario para las páginas pedidas: con muchos
+    resultados se usa una selección parcial (heap) en lugar de ordenar todo.
+    """
+    
+    def __init__(self, ids: List[int], rank_key: Callable[[int], tuple]) -> None:
+        self._ids = ids
+        self._rank_key = rank_key
+        self._ranked: List[int] = []
+        self._complete = not ids
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def page(self, start: int, count: int) -> List[int]:
+        """
+        Obtiene un rango de resultados en orden de relevancia
+        
+        Args:
+            start: Posición del primer resultado
+            count: Número de resultados
+        
+        Returns:
+            Ids de los resultados
+        """
+        end = start + count
+        if end > len(self._ranked) and not self._complete:
+            # Ampliar al menos al doble para amortizar páginas sucesivas
+            needed = max(end, 2 * len(self._ranked))
+            if needed * 4 >= len(self._ids):
+                self._ranked = sorted(self._ids, key=self._rank_key)
+                self._complete = True
+            else:
+                self._ranked = heapq.nsmallest(needed, self._ids, key=self._rank_key)
+        return self._ranked[start:end]
+
+
+class TagSearchIndex:
+    """
+    Índice de búsqueda compartido sobre los agregados de todos los namespaces
+    
+    Se mantiene de forma incremental con sync(): las claves que siguen
+    existiendo solo actualizan su agregado y solo las nuevas se indexan.
+    Las consultas `namespace:texto` se restringen a ese namespace.
+    """
+    
+    # Nivel de relevancia de cada coincidencia
+    RANK_EXACT = 0
+    RANK_PREFIX = 1
+    RANK_OTHER = 2
+    
+    def __init__(self) -> None:
+        self._index = TrigramIndex()
+        self._ids: Dict[TagKey, int] = {}
+        self._aggregates: Dict[int, TagAggregate] = {}
+        self._namespaces: Dict[str, int] = {}  # namespace casefold -> nº de tags
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add(self, aggregate: TagAggregate) -> None:
+        """Indexa un agregado o actualiza el existente con la misma clave"""
+        key = (aggregate.namespace, aggregate.tag)
+        item_id = self._ids.get(key)
+        if item_id is None:
+            item_id = self._ids[key] = self._index.add(aggregate.tag)
+            namespace = aggregate.namespace.casefold()
+            self._namespaces[namespace] = self._namespaces.get(namespace, 0) + 1
+        self._aggregates[item_id] = aggregate
+    
+    def remove(self, key: TagKey) -> None:
+        """Remueve una clave (namespace, tag) del índice"""
+        item_id = self._ids.pop(key, None)
+        if item_id is None:
+            return
+        self._index.remove(item_id)
+        del self._aggregates[item_id]
+        namespace = key[0].casefold()
+        self._namespaces[namespace] -= 1
+        if not self._namespaces[namespace]:
+            del self._namespaces[namespace]
+    
+    def sync(self, aggregates: Iterable[TagAggregate]) -> Tuple[int, int]:
+        """
+        Actualiza el índice para que contenga exactamente los agregados dados
+        
+        Args:
+            aggregates: Agregados actuales
+        
+        Returns:
+            Tupla (claves añadidas, claves removidas)
+        """
+        before = len(self._ids)
+        seen: Set[TagKey] = set()
+        for aggregate in aggregates:
+            seen.add((aggregate.namespace, aggregate.tag))
+            self.add(aggregate)
+        added = len(self._ids) - before
+        
+        stale = [key for key in self._ids if key not in seen]
+        for key in stale:
+            self.remove(key)
+        return added, len(stale)
+    
+    def clear(self) -> None:
+        """Vacía el índice"""
+        self._index.clear()
+        self._ids.clear()
+        self._aggregates.clear()
+        self._namespaces.clear()
+    
+    def aggregate(self, item_id: int) -> TagAggregate:
+        """Agregado correspondiente a un id de resultado"""
+        return self._aggregates[item_id]
+    
+    def search(self, query: str) -> RankedResults:
+        """
+        Busca tags en todos los namespaces
+        
+        Args:
+            query: Texto a buscar (subcadena, o `*` y `?` anclados al tag),
+                opcionalmente precedido de `namespace:`
+        
+        Returns:
+            RankedResults: coincidencia exacta, luego prefijo, luego el
+            resto; a igual nivel, mayor count primero
+        """
+        query = query.strip()
+        namespace = None
+        if ':' in query:
+            head, rest = query.split(':', 1)
+            if head.casefold() in self._namespaces:
+                namespace, query = head.casefold(), rest
+        
+        if query:
+            ids = self._index.search(query)
+        elif namespace is not None:
+            ids = list(self._aggregates)
+        else:
+            ids = []
+        
+        aggregates = self._aggregates
+        if namespace is not None:
+            ids = [i for i in ids if aggregates[i].namespace.casefold() == namespace]
+        
+        text = query.casefold()
+        wildcard = has_wildcards(text)
+        index = self._index
+        
+        def rank_key(item_id: int) -> tuple:
+            key = index.key(item_id)
+            if wildcard or not text:
+                rank = self.RANK_OTHER
+            elif key == text:
+                rank = self.RANK_EXACT
+            elif key.startswith(text):
+                rank = self.RANK_PREFIX
+            else:
+                rank = self.RANK_OTHER
+            return rank, -aggregates[item_id].count, key
+        
+        return RankedResults(ids, rank_key)
@@ -0,0 +1,350 @@
+"""Escaneo repartido en fragmentos (shards) con agregados parciales combinables"""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from ..utils.logger import get_logger, get_log_level, set_log_level, LogSummary
+from ..utils.metrics import metrics
+from ..utils.path_utils import TxtDiscovery, discover_txt_files
+from .aggregator import TagAggregator
+from .content_dedup import ContentDeduplicator
+from .normalize import TagNormalizer
+from .tag_io import read_tag_file
+
+logger = get_logger(__name__)
+
+_SHARD_SCAN_TIMER = metrics.timer("shards.scan", "Duración del escaneo de un fragmento")
+_MERGE_TIMER = metrics.timer("shards.merge", "Tiempo de combinación de agregados parciales")
+
+# Extensión de los archivos de agregados parciales
+PARTIAL_SUFFIX = ".tagagg"
+
+_PARTIAL_FORMAT = "tag-editor-partial"
+_PARTIAL_VERSION = 2  # 2: rutas relativas a su raíz
+
+
+@dataclass
+class PartialAggregate:
+    """Agregado de uno o varios fragmentos de un escaneo repartido en shard_count"""
+    aggregator: TagAggregator
+    shard_count: int
+    shards: List[int] = field(default_factory=list)  # fragmentos incluidos, ordenados
+    
+    @property
+    def missing(self) -> List[int]:
+        """Fragmentos que faltan para cubrir todo el escaneo"""
+        present = set(self.shards)
+        return [index for index in range(self.shard_count) if index not in present]
+    
+    @property
+    def complete(self) -> bool:
+        """True si incluye todos los fragmentos"""
+        return not self.missing
+
+
+def shard_of(relative_path: str, shard_count: int) -> int:
+    """
+    Fragmento al que pertenece un archivo
+    
+    Se calcula con la ruta relativa a su raíz (CRC32, estable entre procesos
+    y versiones de Python), de modo que máquinas que montan el almacenamiento
+    compartido en rutas distintas se reparten los mismos archivos. Los
+    parciales guardan también rutas relativas, y merge_partials() los
+    resuelve con unas mismas raíces.
+    
+    Args:
+        relative_path: Ruta relativa a la raíz, con separadores "/"
+        shard_count: Número total de fragmentos
+    
+    Returns:
+        Índice del fragmento (0 .. shard_count - 1)
+    """
+    return zlib.crc32(relative_path.encode('utf-8')) % shard_count
+
+
+def select_shard(discovery: TxtDiscovery, shard_index: int, shard_count: int) -> List[Tuple[Path, int]]:
+    """
+    Archivos de un fragmento, en el orden de descubrimiento
+    
+    Args:
+        discovery: Archivos encontrados (ver discover_txt_files)
+        shard_index: Fragmento a seleccionar
+        shard_count: Número total de fragmentos
+    
+    Returns:
+        Lista de (ruta, índice de raíz)
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Fragmento {shard_index} fuera de rango (0..{shard_count - 1})")
+    if shard_count == 1:
+        return list(zip(discovery.files, discovery.root_ids))
+    
+    selected = []
+    for file_path, root_id in zip(discovery.files, discovery.root_ids):
+        relative = file_path.relative_to(discovery.roots[root_id]).as_posix()
+        if shard_of(relative, shard_count) == shard_index:
+            selected.append((file_path, root_id))
+    return selected
+
+
+def scan_shard(
+    roots: Sequence[Path],
+    shard_index: int = 0,
+    shard_count: int = 1,
+    normalizer: Optional[TagNormalizer] = None
+) -> TagAggregator:
+    """
+    Escanea los archivos de un fragmento conservando solo agregados y postings
+    
+    Con shard_count=1 es un escaneo completo sin interfaz gráfica.
+    
+    Args:
+        roots: Directorios con archivos .txt (los repetidos entre raíces se leen una vez)
+        shard_index: Fragmento a escanear
+        shard_count: Número total de fragmentos
+        normalizer: Agrupar los tags por su forma normalizada (opcional)
+    
+    Returns:
+        TagAggregator con el resultado (los archivos con error se omiten)
+    """
+    roots = list(roots)
+    aggregator = TagAggregator(retain_files=False, normalizer=normalizer, roots=roots)
+    with _SHARD_SCAN_TIMER.time():
+        discovery = discover_txt_files(roots)
+        files = select_shard(discovery, shard_index, shard_count)
+        if shard_count == 1:
+            logger.info(
+                "Escaneando %s archivos .txt en %s (%s duplicados omitidos)",
+                len(files), ", ".join(str(root) for root in roots), discovery.duplicates
+            )
+        else:
+            logger.info(
+                "Escaneando fragmento %s/%s: %s de %s archivos .txt en %s",
+                shard_index, shard_count, len(files), len(discovery.files), ", ".join(str(root) for root in roots)
+            )
+        progress = LogSummary(logger, "Archivos escaneados", level=logging.INFO)
+        # Las copias de un mismo contenido se parsean una vez
+        dedup = ContentDeduplicator()
+        for file_path, root_id in files:
+            try:
+                tag_file = read_tag_file(file_path, dedup=dedup)
+            except Exception as e:
+                logger.error("Error procesando %s: %s", file_path, e)
+                continue
+            aggregator.add_file(file_path, tag_file.tags, tag_file.line_endings, root_id)
+            progress.add(file_path, tags=len(tag_file.tags))
+        progress.flush()
+    logger.info(
+        "Escaneo completado: %s archivos, %s tags distintos, %s ocurrencias",
+        aggregator.file_count, aggregator.tag_count, aggregator.total_occurrences
+    )
+    if dedup.duplicate_files:
+        logger.info("Contenido repetido: %s", dedup.describe())
+    return aggregator
+
+
+def write_partial(partial: PartialAggregate, path: Path) -> None:
+    """
+    Guarda un agregado parcial (JSON comprimido con gzip)
+    
+    Se escribe en un temporal y se renombra: un proceso que combina los
+    parciales nunca lee un archivo a medio escribir.
+    
+    Args:
+        partial: Agregado y fragmentos que cubre
+        path: Archivo de destino (por convención con extensión .tagagg)
+    """
+    payload = {
+        "format": _PARTIAL_FORMAT,
+        "version": _PARTIAL_VERSION,
+        "shard_count": partial.shard_count,
+        "shards": partial.shards,
+        "aggregator": partial.aggregator.to_dict()
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    logger.info(
+        "Agregado parcial guardado en %s: fragmentos %s de %s, %s archivos, %s tags",
+        path, partial.shards, partial.shard_count, partial.aggregator.file_count, partial.aggregator.tag_count
+    )
+
+
+def read_partial(path: Path, roots: Optional[Sequence[Path]] = None) -> PartialAggregate:
+    """
+    Carga un agregado parcial guardado con write_partial()
+    
+    Args:
+        path: Archivo .tagagg
+        roots: Raíces con las que resolver las rutas, en el orden del escaneo
+            (None = las guardadas en el parcial)
+    
+    Raises:
+        ValueError: Si el archivo no es un agregado parcial compatible o el
+            número de raíces no coincide
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (gzip.BadGzipFile, EOFError) as e:
+        raise ValueError(f"{path.name} no es un agregado parcial: {e}") from e
+    if not isinstance(payload, dict) or payload.get("format") != _PARTIAL_FORMAT:
+        raise ValueError(f"{path.name} no es un agregado parcial")
+    if payload.get("version") != _PARTIAL_VERSION:
+        raise ValueError(f"{path.name}: versión de agregado parcial no soportada ({payload.get('version')})")
+    
+    data = payload["aggregator"]
+    if roots is not None:
+        roots = list(roots)
+        stored = data["roots"]
+        if len(stored) == len(roots) and stored != [str(root) for root in roots]:
+            logger.warning(
+                "%s se escaneó con las raíces %s; sus rutas se resuelven en %s",
+                path.name, ", ".join(stored), ", ".join(str(root) for root in roots)
+            )
+    try:
+        aggregator = TagAggregator.from_dict(data, roots)
+    except ValueError as e:
+        raise ValueError(f"{path.name}: {e}") from e
+    return PartialAggregate(
+        aggregator=aggregator,
+        shard_count=payload["shard_count"],
+        shards=list(payload["shards"])
+    )
+
+
+def merge_partials(
+    paths: Sequence[Path],
+    progress: Optional[Callable[[int, int], None]] = None,
+    roots: Optional[Sequence[Path]] = None
+) -> PartialAggregate:
+    """
+    Combina cualquier número de agregados parciales en uno solo
+    
+    Los parciales deben venir del mismo reparto (número de raíces,
+    normalización y número de fragmentos) y no repetir fragmentos. Si falta
+    alguno, el resultado es válido pero parcial (ver PartialAggregate.missing).
+    
+    Las rutas se resuelven con roots o, si no se indican, con las raíces del
+    primer parcial: las raíces se emparejan por posición, así que máquinas que
+    montan el almacenamiento en rutas distintas pueden combinar sus parciales
+    (se avisa en el log de cada reasignación).
+    
+    Args:
+        paths: Archivos de agregados parciales
+        progress: Callback (parciales combinados, total)
+        roots: Raíces del resultado, en el orden del escaneo (opcional)
+    
+    Returns:
+        PartialAggregate con la unión de los fragmentos
+    
+    Raises:
+        ValueError: Si los parciales no son compatibles o se solapan
+    """
+    if not paths:
+        raise ValueError("No hay agregados parciales que combinar")
+    
+    merged: Optional[PartialAggregate] = None
+    with _MERGE_TIMER.time():
+        for done, path in enumerate(paths, 1):
+            partial = read_partial(path, roots if merged is None else merged.aggregator.roots)
+            if merged is None:
+                merged = partial
+            else:
+                if partial.shard_count != merged.shard_count:
+                    raise ValueError(
+                        f"{path.name} pertenece a un reparto en {partial.shard_count} fragmentos, "
+                        f"no en {merged.shard_count}"
+                    )
+                overlap = set(partial.shards) & set(merged.shards)
+                if overlap:
+                    raise ValueError(f"{path.name} repite fragmentos ya combinados: {sorted(overlap)}")
+                try:
+                    merged.aggregator.merge(partial.aggregator)
+                except ValueError as e:
+                    raise ValueError(f"{path.name}: {e}") from e
+                merged.shards = sorted(merged.shards + partial.shards)
+            if progress is not None:
+                progress(done, len(paths))
+    
+    if merged.missing:
+        logger.warning(
+            "Faltan fragmentos %s de %s: el resultado no cubre todo el escaneo",
+            merged.missing, merged.shard_count
+        )
+    logger.info(
+        "Combinados %s agregados parciales: %s archivos, %s tags distintos",
+        len(paths), merged.aggregator.file_count, merged.aggregator.tag_count
+    )
+    return merged
+
+
+def _scan_shard_to_file(roots: List[str], shard_index: int, shard_count: int, path: str) -> str:
+    """Escanea un fragmento y guarda su parcial (se ejecuta en un proceso aparte)"""
+    aggregator = scan_shard([Path(root) for root in roots], shard_index, shard_count)
+    write_partial(PartialAggregate(aggregator, shard_count, [shard_index]), Path(path))
+    return path
+
+
+def scan_parallel(
+    roots: Sequence[Path],
+    processes: int,
+    partial_dir: Optional[Path] = None
+) -> PartialAggregate:
+    """
+    Escanea en varios procesos locales, un fragmento por proceso, y combina el resultado
+    
+    Es el mismo camino que un escaneo repartido entre máquinas (scan_shard +
+    write_partial + merge_partials), solo que en una.
+    
+    Args:
+        roots: Directorios con archivos .txt
+        processes: Número de procesos (y de fragmentos)
+        partial_dir: Dónde conservar los parciales (None = directorio temporal)
+    
+    Returns:
+        PartialAggregate completo
+    """
+    if processes < 1:
+        raise ValueError("Se necesita al menos un proceso")
+    started = time.perf_counter()
+    root_names = [str(root) for root in roots]
+    
+    # Sin partial_dir, los parciales se borran al terminar
+    if partial_dir is not None:
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        storage = nullcontext(str(partial_dir))
+    else:
+        storage = tempfile.TemporaryDirectory(prefix="tag_editor_shards_")
+    with storage as tmp:
+        directory = Path(tmp)
+        paths = [str(directory / f"shard_{index:03d}_of_{processes:03d}{PARTIAL_SUFFIX}") for index in range(processes)]
+        # spawn: mismo comportamiento en todas las plataformas y sin heredar hilos del padre
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=get_context("spawn"),
+            initializer=set_log_level,
+            initargs=(get_log_level(), False)
+        ) as pool:
+            futures = [
+                pool.submit(_scan_shard_to_file, root_names, index, processes, path)
+                for index, path in enumerate(paths)
+            ]
+            written = [Path(future.result()) for future in futures]
+        merged = merge_partials(written)
+    
+    logger.info("Escaneo en %s procesos completado en %.2f s", processes, time.perf_counter() - started)
+    return merged
@@ -0,0 +1,182 @@
+"""Lectura y escritura de archivos de tags"""
+
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from ..models.tag_models import Tag, TagFile
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.throttle import IOScheduler
+from .tag_parser import parse_line
+from .rewrite import format_content
+
+if TYPE_CHECKING:
+    from .content_dedup import ContentDeduplicator
+
+logger = get_logger(__name__)
+
+# Métricas por etapa de la lectura (lectura, decodificación, parsing) y de la escritura
+_READ_TIMER = metrics.timer("io.read", "Tiempo de lectura de bytes por archivo")
+_DECODE_TIMER = metrics.timer("io.decode", "Tiempo de decodificación por archivo")
+_PARSE_TIMER = metrics.timer("io.parse", "Tiempo de parsing de líneas por archivo")
+_WRITE_TIMER = metrics.timer("io.write", "Tiempo de escritura por archivo")
+_BYTES_READ = metrics.counter("io.bytes_read", "Bytes leídos de archivos de tags")
+_BYTES_WRITTEN = metrics.counter("io.bytes_written", "Bytes escritos en archivos de tags")
+_LATIN1_FALLBACKS = metrics.counter("io.latin1_fallbacks", "Archivos decodificados como Latin-1")
+_FILE_SIZE = metrics.histogram(
+    "io.file_size_bytes",
+    "Tamaño de los archivos leídos",
+    (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+
+
+def detect_line_ending(content: str) -> str:
+    """
+    Detecta el fin de línea usado en un contenido
+    
+    Args:
+        content: Texto del archivo leído con newline=''
+    
+    Returns:
+        '\\r\\n', '\\r' o '\\n'
+    """
+    if '\r\n' in content:
+        return '\r\n'
+    elif '\r' in content:
+        return '\r'
+    return '\n'
+
+
+def parse_content(file_path: Path, content: str) -> TagFile:
+    """
+    Parsea el contenido de un archivo de tags
+    
+    Args:
+        file_path: Ruta del archivo
+        content: Texto del archivo leído con newline=''
+    
+    Returns:
+        TagFile con los tags y el fin de línea detectado
+    """
+    tags: List[Tag] = []
+    
+    for line in content.splitlines():
+        parsed = parse_line(line)
+        if parsed:
+            namespace, tag = parsed
+            tags.append(Tag(namespace=namespace, tag=tag))
+    
+    return TagFile(path=file_path, tags=tags, line_endings=detect_line_ending(content))
+
+
+def decode_content(file_path: Path, data: bytes) -> str:
+    """
+    Decodifica el contenido de un archivo (UTF-8 con fallback a Latin-1)
+    
+    Args:
+        file_path: Ruta del archivo (para el log)
+        data: Bytes leídos del archivo
+    
+    Returns:
+        Texto con los fines de línea originales
+    """
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        # Latin-1 acepta cualquier secuencia de bytes
+        logger.warning("Error de codificación UTF-8 en %s, intentando Latin-1", file_path)
+        if metrics.enabled:
+            _LATIN1_FALLBACKS.inc()
+        return data.decode('latin-1')
+
+
+def read_tag_file(
+    file_path: Path,
+    scheduler: Optional[IOScheduler] = None,
+    dedup: Optional["ContentDeduplicator"] = None
+) -> TagFile:
+    """
+    Lee y parsea un archivo de tags (UTF-8 con fallback a Latin-1)
+    
+    Args:
+        file_path: Ruta del archivo
+        scheduler: Limitador de E/S (opcional)
+        dedup: Reutilizar el resultado de archivos con el mismo contenido (opcional)
+    
+    Returns:
+        TagFile con los tags encontrados
+    """
+    measure = metrics.enabled
+    if measure:
+        start = time.perf_counter()
+    
+    if scheduler is None:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    else:
+        with scheduler.open_slot():
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        scheduler.throttle_bytes(len(data))
+    
+    digest = None
+    if dedup is not None:
+        # Contenido ya visto: sin decodificar ni parsear
+        digest = dedup.digest(data)
+        tag_file = dedup.reuse(digest, file_path, len(data))
+        if tag_file is not None:
+            if measure:
+                _READ_TIMER.observe(time.perf_counter() - start)
+                _BYTES_READ.inc(len(data))
+                _FILE_SIZE.observe(len(data))
+            return tag_file
+    
+    if not measure:
+        tag_file = parse_content(file_path, decode_content(file_path, data))
+    else:
+        # Con métricas: medir cada etapa por separado (el tiempo de lectura incluye la espera del limitador)
+        read_done = time.perf_counter()
+        content = decode_content(file_path, data)
+        decode_done = time.perf_counter()
+        tag_file = parse_content(file_path, content)
+        _READ_TIMER.observe(read_done - start)
+        _DECODE_TIMER.observe(decode_done - read_done)
+        _PARSE_TIMER.observe(time.perf_counter() - decode_done)
+        _BYTES_READ.inc(len(data))
+        _FILE_SIZE.observe(len(data))
+    
+    if digest is not None:
+        dedup.add(digest, tag_file, len(data))
+    return tag_file
+
+
+def write_tag_file(
+    file_path: Path,
+    tags: List[Tag],
+    line_ending: str = "\n",
+    scheduler: Optional[IOScheduler] = None
+) -> None:
+    """
+    Escribe un archivo de tags en UTF-8 con el fin de línea indicado
+    
+    Args:
+        file_path: Ruta del archivo
+        tags: Tags a escribir (en orden)
+        line_ending: Fin de línea original del archivo
+        scheduler: Limitador de E/S (opcional)
+    """
+    data = format_content(tags, line_ending).encode('utf-8')
+    if metrics.enabled:
+        _BYTES_WRITTEN.inc(len(data))
+    
+    with _WRITE_TIMER.time():
+        if scheduler is None:
+            with open(file_path, 'wb') as f:
+                f.write(data)
+            return
+        
+        scheduler.throttle_bytes(len(data))
+        with scheduler.open_slot():
+            with open(file_path, 'wb') as f:
+                f.write(data)
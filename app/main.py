@@ -1,35 +1,124 @@
 """Punto de entrada principal de la aplicación"""
 
+import time
+
+# Origen de la medición del arranque (antes de cualquier otra importación)
+_STARTED = time.perf_counter()
+
+import argparse
 import sys
 from pathlib import Path
 
+from PySide6.QtCore import QObject, QEvent, QTimer
 from PySide6.QtWidgets import QApplication
 
-from app.ui.main_window import MainWindow
-from app.utils.logger import setup_logger, get_logger
+# La ventana principal se importa en main(), con el arranque ya medido
+from app.utils.logger import setup_logger, get_logger, LEVEL_NAMES, LOG_LEVEL_ENV_VAR
+from app.utils.metrics import metrics, METRICS_ENV_VAR
+from app.utils.profiling import PROFILE_ENV_VAR, profiling_env_enabled
+from app.utils.startup import StartupTimer, STARTUP_TIMING_ENV_VAR, startup_timing_env_enabled
+from app.utils.throttle import IOBudget
+
+
+class _FirstPaintProbe(QObject):
+    """Marca el primer pintado de la ventana y escribe el informe de arranque"""
+    
+    def __init__(self, timing: StartupTimer, logger, parent=None):
+        super().__init__(parent)
+        self.timing = timing
+        self.logger = logger
+    
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            # La marca se toma cuando el pintado ya terminó (siguiente vuelta del loop)
+            QTimer.singleShot(0, self._finish)
+        return False
+    
+    def _finish(self) -> None:
+        self.timing.mark("primer pintado")
+        self.timing.log(self.logger)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Tag File Editor")
+    io_group = parser.add_argument_group("Límites de E/S (0 = sin límite, ajustables luego en la UI)")
+    io_group.add_argument("--max-files-per-sec", type=float, default=0.0,
+                          help="Máximo de archivos procesados por segundo")
+    io_group.add_argument("--max-mb-per-sec", type=float, default=0.0,
+                          help="Máximo de MB leídos/escritos por segundo")
+    io_group.add_argument("--max-open-files", type=int, default=0,
+                          help="Máximo de archivos abiertos simultáneamente")
+    io_group.add_argument("--low-priority", action="store_true",
+                          help="Ejecutar los workers con prioridad baja")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Escanear conservando solo agregados y postings (los archivos se releen al aplicar)")
+    parser.add_argument("--metrics", action="store_true",
+                        help=f"Recolectar métricas por etapa desde el inicio (también con {METRICS_ENV_VAR}=1)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Perfilar escaneos y aplicaciones con cProfile y tracemalloc (también con {PROFILE_ENV_VAR}=1)")
+    parser.add_argument("--log-level", choices=LEVEL_NAMES, type=str.upper,
+                        help=f"Nivel de log inicial (por defecto {LOG_LEVEL_ENV_VAR} o INFO; ajustable en Herramientas)")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help=f"Medir importaciones, construcción de la ventana y primer pintado (también con {STARTUP_TIMING_ENV_VAR}=1)")
+    parser.add_argument("--stall-threshold-ms", type=int, default=250,
+                        help="Bloqueo de la interfaz (ms) a partir del cual se registra con su pila (0 = sin monitor)")
+    # Qt procesa sus propios argumentos (ej: -style)
+    args, _ = parser.parse_known_args(argv)
+    return args
 
 
 def main():
     """Función principal"""
+    args = parse_args(sys.argv[1:])
+    timing = StartupTimer(_STARTED, enabled=args.startup_timing or startup_timing_env_enabled())
+    timing.mark("importaciones iniciales")
+    
     # Configurar logging
-    setup_logger()
+    setup_logger(level=args.log_level)
     logger = get_logger(__name__)
     
     logger.info("Iniciando aplicación Tag File Editor")
     
+    if args.metrics:
+        metrics.set_enabled(True)
+    if metrics.enabled:
+        logger.info("Métricas por etapa activadas (Herramientas > Diagnóstico)")
+    profile = args.profile or profiling_env_enabled()
+    if profile:
+        logger.info("Perfilado de escaneos y aplicaciones activado (informes en logs/)")
+    
+    io_budget = IOBudget(
+        max_files_per_sec=args.max_files_per_sec,
+        max_mb_per_sec=args.max_mb_per_sec,
+        max_open_files=args.max_open_files,
+        low_priority=args.low_priority
+    )
+    if not io_budget.is_unlimited():
+        logger.info("Límites de E/S: %s", io_budget.describe())
+    
     # Crear aplicación Qt
     app = QApplication(sys.argv)
     app.setApplicationName("Tag File Editor")
     app.setOrganizationName("TagEditor")
+    timing.mark("QApplication")
+    
+    from app.ui.main_window import MainWindow
+    timing.mark("importar ventana principal")
     
     # Crear y mostrar ventana principal
-    window = MainWindow()
+    window = MainWindow(io_budget=io_budget, low_memory=args.low_memory, profile=profile,
+                        stall_threshold_ms=args.stall_threshold_ms)
+    timing.mark("construir ventana")
+    if timing.enabled:
+        window.installEventFilter(_FirstPaintProbe(timing, logger, window))
     window.show()
     
     # Ejecutar loop de eventos
     exit_code = app.exec()
     
-    logger.info(f"Aplicación finalizada con código {exit_code}")
+    logger.info("Aplicación finalizada con código %s", exit_code)
     return exit_code
 
 
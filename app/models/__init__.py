@@ -1,5 +1,9 @@
 """Modelos de datos para la aplicación"""
 
-from .tag_models import Tag, TagFile, TagAggregate
+from .tag_models import (
+    Tag, TagFile, TagAggregate, FileRewrite, RewriteSummary, CoOccurrence, ImplicationCandidate,
+    DuplicateGroup, ExportSummary, ContentGroup
+)
 
-__all__ = ["Tag", "TagFile", "TagAggregate"]
+__all__ = ["Tag", "TagFile", "TagAggregate", "FileRewrite", "RewriteSummary",
+           "CoOccurrence", "ImplicationCandidate", "DuplicateGroup", "ExportSummary", "ContentGroup"]
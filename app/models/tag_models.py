@@ -1,7 +1,7 @@
 """Modelos de datos para tags y archivos"""
 
 from dataclasses import dataclass, field
-from typing import List, Set
+from typing import Dict, List, Optional
 from pathlib import Path
 
 
@@ -38,13 +38,47 @@ class TagAggregate:
     namespace: str
     tag: str
     count: int = 0
-    file_paths: Set[Path] = field(default_factory=set)
-    marked_for_removal: bool = False
+    file_count: int = 0  # Archivos distintos (las rutas están en el agregador)
+    variants: Optional[Dict[str, int]] = None  # Grafía -> ocurrencias (solo si hay más de una)
     
-    def add_occurrence(self, file_path: Path) -> None:
-        """Añade una ocurrencia del tag desde un archivo"""
+    def add_occurrence(self, new_file: bool = True) -> None:
+        """Añade una ocurrencia del tag (new_file si es la primera en su archivo)"""
         self.count += 1
-        self.file_paths.add(file_path)
+        if new_file:
+            self.file_count += 1
+    
+    def add_variant(self, spelling: str) -> None:
+        """
+        Cuenta una grafía original tras add_occurrence(); el tag se muestra con
+        la más frecuente
+        
+        El diccionario se crea al aparecer la segunda grafía: hasta entonces
+        todas las ocurrencias son de self.tag.
+        """
+        variants = self.variants
+        if variants is None:
+            if spelling == self.tag:
+                return
+            variants = self.variants = {self.tag: self.count - 1}
+        count = variants.get(spelling, 0) + 1
+        variants[spelling] = count
+        if spelling != self.tag and count > variants.get(self.tag, 0):
+            self.tag = spelling
+    
+    def merge(self, other: "TagAggregate") -> None:
+        """
+        Suma los conteos y grafías de otro agregado del mismo tag (ej: de otro
+        fragmento de un escaneo repartido)
+        """
+        if self.variants is not None or other.variants is not None or other.tag != self.tag:
+            variants = self.variants if self.variants is not None else {self.tag: self.count}
+            for spelling, count in (other.variants or {other.tag: other.count}).items():
+                variants[spelling] = variants.get(spelling, 0) + count
+            self.variants = variants
+            # En caso de empate se mantiene la grafía actual
+            self.tag = max(variants, key=lambda spelling: (variants[spelling], spelling == self.tag))
+        self.count += other.count
+        self.file_count += other.file_count
     
     def __hash__(self) -> int:
         return hash((self.namespace, self.tag))
@@ -53,3 +87,123 @@ class TagAggregate:
         if not isinstance(other, TagAggregate):
             return False
         return self.namespace == other.namespace and self.tag == other.tag
+
+
+@dataclass
+class FileRewrite:
+    """Resultado de aplicar un plan de reescritura a un archivo"""
+    path: Path
+    original_count: int
+    final_count: int
+    tags_removed: int = 0
+    tags_replaced: int = 0
+    tags_added: int = 0
+    duplicates_removed: int = 0
+    
+    @property
+    def modified(self) -> bool:
+        """True si el plan cambia el contenido del archivo"""
+        return bool(self.tags_removed or self.tags_replaced or self.tags_added)
+
+
+@dataclass
+class RewriteSummary:
+    """Totales de un plan de reescritura sobre varios archivos"""
+    files_processed: int = 0
+    files_modified: int = 0
+    tags_removed: int = 0
+    tags_replaced: int = 0
+    tags_added: int = 0
+    duplicates_removed: int = 0
+    
+    def add(self, rewrite: FileRewrite) -> None:
+        """Acumula el resultado de un archivo"""
+        self.files_processed += 1
+        if not rewrite.modified:
+            return
+        self.files_modified += 1
+        self.tags_removed += rewrite.tags_removed
+        self.tags_replaced += rewrite.tags_replaced
+        self.tags_added += rewrite.tags_added
+        self.duplicates_removed += rewrite.duplicates_removed
+
+
+@dataclass
+class CoOccurrence:
+    """Co-ocurrencia de un tag con otro, contada en archivos"""
+    namespace: str
+    tag: str
+    together: int  # Archivos que contienen ambos tags
+    file_count: int  # Archivos que contienen este tag
+    p_given_query: float  # P(este tag | tag consultado)
+    p_query_given: float  # P(tag consultado | este tag)
+
+
+@dataclass
+class ImplicationCandidate:
+    """Par de tags donde uno (casi) siempre aparece con el otro"""
+    antecedent: tuple[str, str]
+    consequent: tuple[str, str]
+    support: int  # Archivos con ambos tags
+    confidence: float  # P(consecuente | antecedente)
+    reverse_confidence: float  # P(antecedente | consecuente)
+    alias: bool = False  # La relación se cumple en ambos sentidos (tags redundantes)
+
+
+@dataclass
+class DuplicateGroup:
+    """Variantes de un mismo tag (mayúsculas, separadores o erratas)"""
+    namespace: str
+    members: List[TagAggregate]  # De mayor a menor count
+    fuzzy: bool = False  # Incluye variantes unidas por distancia de edición
+    
+    @property
+    def total_count(self) -> int:
+        """Ocurrencias sumadas de todas las variantes"""
+        return sum(member.count for member in self.members)
+    
+    @property
+    def canonical(self) -> TagAggregate:
+        """Variante más frecuente (destino sugerido de la fusión)"""
+        return self.members[0]
+
+
+@dataclass
+class ExportSummary:
+    """Resultado de exportar los agregados (y opcionalmente la relación archivo ↔ tag)"""
+    format: str
+    aggregates_path: Path
+    aggregate_rows: int = 0
+    relation_path: Optional[Path] = None
+    relation_rows: int = 0
+    elapsed: float = 0.0
+    cancelled: bool = False
+    
+    def describe(self) -> str:
+        """Resumen legible"""
+        text = f"{self.aggregate_rows} agregados en {self.aggregates_path}"
+        if self.relation_path is not None:
+            text += f", {self.relation_rows} filas archivo-tag en {self.relation_path}"
+        text += f" ({self.format}, {self.elapsed:.1f} s)"
+        if self.cancelled:
+            text += " - cancelada"
+        return text
+
+
+@dataclass
+class ContentGroup:
+    """Archivos de tags con exactamente el mismo contenido"""
+    digest: str  # Hash del contenido (hexadecimal)
+    size: int  # Bytes de cada archivo
+    tag_count: int  # Tags de cada archivo
+    paths: List[Path] = field(default_factory=list)  # En el orden de escaneo
+    
+    @property
+    def redundant_files(self) -> int:
+        """Archivos que repiten el contenido del primero"""
+        return len(self.paths) - 1
+    
+    @property
+    def redundant_bytes(self) -> int:
+        """Bytes ocupados por las copias"""
+        return self.size * self.redundant_files
@@ -1,5 +1,15 @@
 """Interfaz de usuario PySide6"""
 
-from .main_window import MainWindow
+from typing import TYPE_CHECKING
+
+from ..utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .main_window import MainWindow
+
+# Se importa al primer uso: importar un diálogo suelto no carga la ventana principal
+__getattr__ = lazy_exports(__name__, {
+    "MainWindow": ".main_window",
+})
 
 __all__ = ["MainWindow"]
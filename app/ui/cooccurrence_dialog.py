@@ -0,0 +1,171 @@
+"""Diálogo con las implicaciones y alias candidatos del análisis de co-ocurrencia"""
+
+from typing import List
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QPushButton,
+    QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+
+from ..core.tag_parser import format_tag
+from ..models.tag_models import ImplicationCandidate
+
+
+class ImplicationTableModel(QAbstractTableModel):
+    """Modelo de solo lectura con los candidatos a implicación"""
+    
+    HEADERS = ["Antecedente", "Consecuente", "Archivos", "Confianza", "Inversa", "Alias"]
+    
+    def __init__(self, candidates: List[ImplicationCandidate], parent=None):
+        super().__init__(parent)
+        self._candidates = candidates
+    
+    def candidate_at(self, row: int) -> ImplicationCandidate:
+        """Candidato de la fila dada"""
+        return self._candidates[row]
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de filas"""
+        if parent.isValid():
+            return 0
+        return len(self._candidates)
+    
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de columnas"""
+        return len(self.HEADERS)
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos para el índice dado"""
+        if not index.isValid() or index.row() >= len(self._candidates):
+            return None
+        
+        candidate = self._candidates[index.row()]
+        col = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return format_tag(*candidate.antecedent)
+            elif col == 1:
+                return format_tag(*candidate.consequent)
+            elif col == 2:
+                return str(candidate.support)
+            elif col == 3:
+                return f"{candidate.confidence:.1%}"
+            elif col == 4:
+                return f"{candidate.reverse_confidence:.1%}"
+            elif col == 5:
+                return "Sí" if candidate.alias else ""
+        
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if col >= 2:
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        
+        return None
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos del encabezado"""
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if section < len(self.HEADERS):
+                return self.HEADERS[section]
+        return None
+
+
+class CooccurrenceDialog(QDialog):
+    """
+    Lista de implicaciones candidatas (A casi siempre aparece con B)
+    
+    Las filas seleccionadas se convierten en reglas de reescritura: una
+    implicación `A => B`, o para los alias (confianza alta en ambos
+    sentidos) una fusión `A -> B` hacia el tag más frecuente.
+    """
+    
+    rules_requested = Signal(str)  # reglas a añadir, una por línea
+    
+    def __init__(
+        self,
+        candidates: List[ImplicationCandidate],
+        min_confidence: float,
+        min_support: int,
+        parent=None
+    ):
+        """
+        Inicializa el diálogo
+        
+        Args:
+            candidates: Candidatos ordenados por soporte
+            min_confidence: Confianza mínima usada en el análisis
+            min_support: Soporte mínimo usado en el análisis
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Co-ocurrencias: Implicaciones Candidatas")
+        self.resize(900, 600)
+        self._setup_ui(candidates, min_confidence, min_support)
+    
+    def _setup_ui(self, candidates: List[ImplicationCandidate], min_confidence: float, min_support: int) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        
+        aliases = sum(1 for c in candidates if c.alias)
+        layout.addWidget(QLabel(
+            f"{len(candidates)} candidatos ({aliases} alias) con confianza ≥ "
+            f"{min_confidence:.0%} y al menos {min_support} archivos en común"
+        ))
+        
+        self.model = ImplicationTableModel(candidates, self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table_view.verticalHeader().setVisible(False)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        for col in range(2, self.model.columnCount()):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table_view)
+        
+        buttons_layout = QHBoxLayout()
+        
+        implication_btn = QPushButton("Añadir Implicaciones")
+        implication_btn.setToolTip("Añade `A => B` a las reglas para las filas seleccionadas")
+        implication_btn.clicked.connect(self._on_add_implications)
+        buttons_layout.addWidget(implication_btn)
+        
+        merge_btn = QPushButton("Fusionar Alias")
+        merge_btn.setToolTip("Añade `A -> B` a las reglas para los alias seleccionados")
+        merge_btn.clicked.connect(self._on_merge_aliases)
+        buttons_layout.addWidget(merge_btn)
+        
+        buttons_layout.addStretch()
+        
+        close_btn = QPushButton("Cerrar")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+        
+        layout.addLayout(buttons_layout)
+    
+    def _selected_candidates(self) -> List[ImplicationCandidate]:
+        """Candidatos de las filas seleccionadas, en orden de la tabla"""
+        rows = sorted(index.row() for index in self.table_view.selectionModel().selectedRows())
+        return [self.model.candidate_at(row) for row in rows]
+    
+    def _on_add_implications(self) -> None:
+        """Emite una regla de implicación por cada fila seleccionada"""
+        rules = [
+            f"{format_tag(*c.antecedent)} => {format_tag(*c.consequent)}"
+            for c in self._selected_candidates()
+        ]
+        if rules:
+            self.rules_requested.emit("\n".join(rules))
+    
+    def _on_merge_aliases(self) -> None:
+        """Emite una regla de fusión por cada alias seleccionado"""
+        rules = [
+            f"{format_tag(*c.antecedent)} -> {format_tag(*c.consequent)}"
+            for c in self._selected_candidates() if c.alias
+        ]
+        if rules:
+            self.rules_requested.emit("\n".join(rules))
@@ -0,0 +1,171 @@
+"""Diálogo de diagnóstico con las métricas internas por etapa"""
+
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QPushButton, QHeaderView, QAbstractItemView, QCheckBox, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QTimer
+
+from ..utils.logger import get_logger
+from ..utils.metrics import MetricsRegistry, Counter, Timer, metrics
+
+logger = get_logger(__name__)
+
+
+def _format_value(value: Optional[float], seconds: bool) -> str:
+    """Formatea un valor de métrica (duraciones en ms)"""
+    if value is None:
+        return ""
+    if seconds:
+        return f"{value * 1000:.3f} ms"
+    if float(value).is_integer():
+        return f"{int(value):,}"
+    return f"{value:,.2f}"
+
+
+class DiagnosticsDialog(QDialog):
+    """
+    Tabla con los contadores, timers e histogramas registrados
+    
+    Se actualiza sola mientras está abierta, de modo que se puede seguir un
+    escaneo o una aplicación en curso. Las métricas se exportan como JSON o
+    en el formato de texto de Prometheus.
+    """
+    
+    HEADERS = ["Métrica", "Tipo", "Cantidad", "Total", "Media", "Máximo", "Descripción"]
+    REFRESH_INTERVAL_MS = 1000
+    
+    def __init__(self, registry: MetricsRegistry = metrics, parent=None):
+        """
+        Inicializa el diálogo
+        
+        Args:
+            registry: Registro de métricas a mostrar
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.registry = registry
+        self.setWindowTitle("Diagnóstico")
+        self.resize(900, 500)
+        self._setup_ui()
+        self.refresh()
+        
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(self.REFRESH_INTERVAL_MS)
+    
+    def _setup_ui(self) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        
+        self.enabled_check = QCheckBox("Recolectar métricas")
+        self.enabled_check.setToolTip(
+            "Mide cada etapa (búsqueda, lectura, decodificación, parsing, agregación, "
+            "filtrado, escritura y backup). Desactivado no tiene coste apreciable."
+        )
+        self.enabled_check.setChecked(self.registry.enabled)
+        self.enabled_check.toggled.connect(self._on_enabled_toggled)
+        layout.addWidget(self.enabled_check)
+        
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        for column in range(len(self.HEADERS) - 1):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(len(self.HEADERS) - 1, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+        
+        buttons_layout = QHBoxLayout()
+        
+        reset_btn = QPushButton("Reiniciar")
+        reset_btn.clicked.connect(self._on_reset)
+        buttons_layout.addWidget(reset_btn)
+        
+        json_btn = QPushButton("Exportar JSON...")
+        json_btn.clicked.connect(lambda: self._export("json"))
+        buttons_layout.addWidget(json_btn)
+        
+        prometheus_btn = QPushButton("Exportar Prometheus...")
+        prometheus_btn.clicked.connect(lambda: self._export("prom"))
+        buttons_layout.addWidget(prometheus_btn)
+        
+        buttons_layout.addStretch()
+        
+        close_btn = QPushButton("Cerrar")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+        
+        layout.addLayout(buttons_layout)
+    
+    def refresh(self) -> None:
+        """Vuelve a leer las métricas del registro"""
+        registered = self.registry.metrics()
+        self.table.setRowCount(len(registered))
+        
+        for row, metric in enumerate(registered):
+            if isinstance(metric, Counter):
+                values = ["", _format_value(metric.value, False), "", ""]
+            else:
+                snapshot = metric.snapshot()
+                seconds = isinstance(metric, Timer)
+                values = [
+                    _format_value(snapshot["count"], False),
+                    _format_value(snapshot["sum"], seconds) if snapshot["count"] else "",
+                    _format_value(snapshot["mean"], seconds),
+                    _format_value(snapshot["max"], seconds)
+                ]
+            
+            cells = [metric.name, metric.kind] + values + [metric.description]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if 2 <= column <= 5:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        
+        self.summary_label.setText(
+            f"{len(registered)} métricas registradas"
+            + ("" if self.registry.enabled else " (recolección desactivada)")
+        )
+    
+    def _on_enabled_toggled(self, enabled: bool) -> None:
+        """Activa o desactiva la recolección"""
+        self.registry.set_enabled(enabled)
+        logger.info("Métricas %s", "activadas" if enabled else "desactivadas")
+        self.refresh()
+    
+    def _on_reset(self) -> None:
+        """Pone a cero las métricas"""
+        self.registry.reset()
+        self.refresh()
+    
+    def _export(self, fmt: str) -> None:
+        """Guarda las métricas en un archivo"""
+        if fmt == "json":
+            path, _ = QFileDialog.getSaveFileName(self, "Exportar Métricas", "metrics.json", "JSON (*.json)")
+            content = self.registry.to_json()
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "Exportar Métricas", "metrics.prom", "Prometheus (*.prom *.txt)")
+            content = self.registry.to_prometheus()
+        if not path:
+            return
+        
+        try:
+            Path(path).write_text(content, encoding="utf-8")
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"No se pudieron exportar las métricas:\n{e}")
+            return
+        logger.info("Métricas exportadas a %s", path)
+    
+    def done(self, result: int) -> None:
+        """Detiene el refresco al cerrar"""
+        self._timer.stop()
+        super().done(result)
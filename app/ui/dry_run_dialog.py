@@ -0,0 +1,260 @@
+"""Diálogo de vista previa (dry-run) con diffs por archivo cargados bajo demanda"""
+
+import difflib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QPlainTextEdit,
+    QPushButton, QSplitter, QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont
+
+from ..core.rewrite import RewritePlan
+from ..core.tag_io import read_tag_file
+from ..core.tag_parser import format_tag
+from ..models.tag_models import TagFile, FileRewrite, RewriteSummary
+
+
+class DryRunTableModel(QAbstractTableModel):
+    """Modelo que pagina los archivos afectados a medida que se solicitan"""
+    
+    PAGE_SIZE = 200
+    HEADERS = ["Archivo", "Removidos", "Reemplazados", "Añadidos", "Duplicados", "Líneas finales"]
+    
+    def __init__(self, base_directory: Optional[Path] = None, parent=None):
+        super().__init__(parent)
+        self._base_directory = base_directory
+        self._rewrites: List[FileRewrite] = []
+        self._loaded = 0
+    
+    def append_rewrites(self, rewrites: List[FileRewrite]) -> None:
+        """Añade resultados recibidos del worker (se muestran al paginar)"""
+        was_exhausted = self._loaded == len(self._rewrites)
+        self._rewrites.extend(rewrites)
+        # Si la vista ya mostró todo, cargar la primera página disponible
+        if was_exhausted and self._loaded < self.PAGE_SIZE:
+            self.fetchMore(QModelIndex())
+    
+    def rewrite_at(self, row: int) -> Optional[FileRewrite]:
+        """Retorna el resultado de la fila dada"""
+        if 0 <= row < self._loaded:
+            return self._rewrites[row]
+        return None
+    
+    def total_count(self) -> int:
+        """Número total de archivos afectados recibidos"""
+        return len(self._rewrites)
+    
+    def paths(self) -> List[Path]:
+        """Rutas de todos los archivos recibidos (cargados o no en la vista)"""
+        return [rewrite.path for rewrite in self._rewrites]
+    
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        """Indica si quedan filas por cargar"""
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._rewrites)
+    
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """Carga la siguiente página de filas"""
+        if parent.isValid():
+            return
+        remaining = len(self._rewrites) - self._loaded
+        count = min(self.PAGE_SIZE, remaining)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de filas cargadas"""
+        if parent.isValid():
+            return 0
+        return self._loaded
+    
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de columnas"""
+        return len(self.HEADERS)
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos para el índice dado"""
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        
+        rewrite = self._rewrites[index.row()]
+        col = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return self._display_path(rewrite.path)
+            values = [
+                rewrite.tags_removed,
+                rewrite.tags_replaced,
+                rewrite.tags_added,
+                rewrite.duplicates_removed,
+                rewrite.final_count
+            ]
+            return str(values[col - 1])
+        
+        elif role == Qt.ItemDataRole.ToolTipRole and col == 0:
+            return str(rewrite.path)
+        
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if col > 0:
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        
+        return None
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos del encabezado"""
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if section < len(self.HEADERS):
+                return self.HEADERS[section]
+        return None
+    
+    def _display_path(self, path: Path) -> str:
+        """Ruta relativa al directorio base si es posible"""
+        if self._base_directory is not None:
+            try:
+                return str(path.relative_to(self._base_directory))
+            except ValueError:
+                pass
+        return str(path)
+
+
+class DryRunDialog(QDialog):
+    """Diálogo que muestra en streaming los archivos que modificaría un plan"""
+    
+    def __init__(
+        self,
+        plan: RewritePlan,
+        files_data: Dict[Path, TagFile],
+        base_directory: Optional[Path] = None,
+        parent=None
+    ):
+        """
+        Inicializa el diálogo
+        
+        Args:
+            plan: Plan de reescritura evaluado
+            files_data: Archivos escaneados (los ausentes se releen al ver su diff)
+            base_directory: Directorio base para mostrar rutas relativas
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.plan = plan
+        self.files_data = files_data
+        self._finished = False
+        self.setWindowTitle("Vista Previa (Dry-run)")
+        self.resize(1000, 700)
+        self._setup_ui(base_directory)
+    
+    def _setup_ui(self, base_directory: Optional[Path]) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        
+        self.plan_label = QLabel(f"Plan: {self.plan.describe()}")
+        layout.addWidget(self.plan_label)
+        
+        self.summary_label = QLabel("Calculando...")
+        layout.addWidget(self.summary_label)
+        
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        layout.addWidget(splitter)
+        
+        # Tabla de archivos afectados (paginada)
+        self.model = DryRunTableModel(base_directory, self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table_view.verticalHeader().setVisible(False)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, self.model.columnCount()):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        self.table_view.selectionModel().currentRowChanged.connect(self._on_row_changed)
+        splitter.addWidget(self.table_view)
+        
+        # Diff del archivo seleccionado (se calcula solo al seleccionarlo)
+        self.diff_view = QPlainTextEdit()
+        self.diff_view.setReadOnly(True)
+        self.diff_view.setFont(QFont("monospace"))
+        self.diff_view.setPlaceholderText("Seleccione un archivo para ver el diff")
+        splitter.addWidget(self.diff_view)
+        splitter.setSizes([450, 250])
+        
+        # Botones
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+        
+        self.apply_btn = QPushButton("Aplicar Cambios")
+        self.apply_btn.setEnabled(False)
+        self.apply_btn.setStyleSheet("background-color: #d32f2f; color: white; font-weight: bold;")
+        self.apply_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(self.apply_btn)
+        
+        self.close_btn = QPushButton("Cancelar")
+        self.close_btn.clicked.connect(self.reject)
+        buttons_layout.addWidget(self.close_btn)
+        
+        layout.addLayout(buttons_layout)
+    
+    def add_rewrites(self, rewrites: object) -> None:
+        """Recibe un lote de archivos afectados desde el worker"""
+        self.model.append_rewrites(rewrites)
+    
+    def set_progress(self, current: int, total: int) -> None:
+        """Actualiza el resumen parcial"""
+        if not self._finished:
+            self.summary_label.setText(
+                f"Procesando {current}/{total} archivos... "
+                f"{self.model.total_count()} archivos a modificar"
+            )
+    
+    def set_finished(self, summary: RewriteSummary) -> None:
+        """Muestra el resumen final y habilita la aplicación"""
+        self._finished = True
+        self.summary_label.setText(
+            f"Archivos a modificar: {summary.files_modified} de {summary.files_processed} candidatos | "
+            f"Removidos: {summary.tags_removed} | "
+            f"Reemplazados: {summary.tags_replaced} | "
+            f"Añadidos: {summary.tags_added} | "
+            f"Duplicados colapsados: {summary.duplicates_removed}"
+        )
+        self.apply_btn.setEnabled(summary.files_modified > 0)
+    
+    def modified_files(self) -> List[Path]:
+        """Rutas de todos los archivos que el plan modificaría"""
+        return self.model.paths()
+    
+    def _on_row_changed(self, current: QModelIndex, previous: QModelIndex) -> None:
+        """Calcula y muestra el diff del archivo seleccionado"""
+        rewrite = self.model.rewrite_at(current.row())
+        if rewrite is None:
+            self.diff_view.clear()
+            return
+        
+        tag_file = self.files_data.get(rewrite.path)
+        if tag_file is None:
+            try:
+                tag_file = read_tag_file(rewrite.path)
+            except OSError as e:
+                self.diff_view.setPlainText(f"Archivo no disponible: {e}")
+                return
+        
+        new_tags, _ = self.plan.rewrite_file(rewrite.path, tag_file.tags)
+        old_lines = [format_tag(tag.namespace, tag.tag) for tag in tag_file.tags]
+        new_lines = [format_tag(tag.namespace, tag.tag) for tag in new_tags]
+        diff = difflib.unified_diff(
+            old_lines,
+            new_lines,
+            fromfile=f"{rewrite.path.name} (original)",
+            tofile=f"{rewrite.path.name} (nuevo)",
+            lineterm=""
+        )
+        self.diff_view.setPlainText("\n".join(diff))
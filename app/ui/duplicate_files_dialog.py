@@ -0,0 +1,102 @@
+"""Diálogo con los grupos de archivos de tags con el mismo contenido"""
+
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem,
+    QPushButton, QHeaderView
+)
+from PySide6.QtCore import Qt
+
+from ..core.content_dedup import ContentDeduplicator
+
+
+class DuplicateFilesDialog(QDialog):
+    """
+    Grupos de archivos idénticos, de más a menos copias
+    
+    Las rutas de cada grupo se añaden al expandirlo: un corpus con millones
+    de copias no crea millones de filas al abrir el diálogo.
+    """
+    
+    HEADERS = ["Archivo", "Copias", "Tags", "Bytes redundantes"]
+    
+    # Grupos mostrados como máximo (los de más copias)
+    MAX_GROUPS = 5000
+    
+    def __init__(
+        self,
+        duplicates: ContentDeduplicator,
+        base_directory: Optional[Path] = None,
+        parent=None
+    ):
+        """
+        Inicializa el diálogo
+        
+        Args:
+            duplicates: Resultado de la detección durante el escaneo
+            base_directory: Directorio base para mostrar rutas relativas
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.groups = duplicates.groups()
+        self._base_directory = base_directory
+        self.setWindowTitle("Archivos con Contenido Repetido")
+        self.resize(900, 600)
+        self._setup_ui(duplicates)
+    
+    def _setup_ui(self, duplicates: ContentDeduplicator) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        
+        summary = QLabel(duplicates.describe())
+        summary.setWordWrap(True)
+        layout.addWidget(summary)
+        if len(self.groups) > self.MAX_GROUPS:
+            layout.addWidget(QLabel(f"Se muestran los {self.MAX_GROUPS} grupos con más copias."))
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(self.HEADERS)
+        self.tree.setUniformRowHeights(True)
+        header = self.tree.header()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(self.HEADERS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        
+        for group_index, group in enumerate(self.groups[:self.MAX_GROUPS]):
+            item = QTreeWidgetItem([
+                self._display_path(group.paths[0]),
+                str(group.redundant_files),
+                str(group.tag_count),
+                str(group.redundant_bytes)
+            ])
+            item.setData(0, Qt.ItemDataRole.UserRole, group_index)
+            item.setToolTip(0, f"BLAKE2b {group.digest}")
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+            self.tree.addTopLevelItem(item)
+        self.tree.itemExpanded.connect(self._on_item_expanded)
+        layout.addWidget(self.tree)
+        
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+        close_btn = QPushButton("Cerrar")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
+    
+    def _display_path(self, path: Path) -> str:
+        """Ruta relativa al directorio base si es posible"""
+        if self._base_directory is not None:
+            try:
+                return str(path.relative_to(self._base_directory))
+            except ValueError:
+                pass
+        return str(path)
+    
+    def _on_item_expanded(self, item: QTreeWidgetItem) -> None:
+        """Añade las rutas del grupo la primera vez que se expande"""
+        if item.childCount():
+            return
+        group = self.groups[item.data(0, Qt.ItemDataRole.UserRole)]
+        item.addChildren([QTreeWidgetItem([self._display_path(path)]) for path in group.paths])
@@ -0,0 +1,139 @@
+"""Diálogo con los grupos de tags casi duplicados"""
+
+from typing import List, Optional, Tuple
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem,
+    QPushButton, QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt, Signal
+
+from ..core.tag_parser import format_tag
+from ..models.tag_models import DuplicateGroup, TagAggregate
+
+
+class DuplicatesDialog(QDialog):
+    """
+    Grupos de variantes de un mismo tag, de mayor a menor count combinado
+    
+    Cada grupo se fusiona en su variante más frecuente, o en la variante
+    seleccionada si se elige una fila hija. Las demás variantes se pueden
+    convertir en reglas `a | b -> destino` o marcar para remover.
+    """
+    
+    rules_requested = Signal(str)  # reglas a añadir, una por línea
+    marks_requested = Signal(object)  # List[(namespace, tag)] a marcar
+    
+    HEADERS = ["Tag", "Count", "Variantes"]
+    
+    def __init__(self, groups: List[DuplicateGroup], parent=None):
+        """
+        Inicializa el diálogo
+        
+        Args:
+            groups: Grupos ordenados por count combinado
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.groups = groups
+        self.setWindowTitle("Tags Casi Duplicados")
+        self.resize(800, 600)
+        self._setup_ui()
+    
+    def _setup_ui(self) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        
+        fuzzy = sum(1 for group in self.groups if group.fuzzy)
+        layout.addWidget(QLabel(
+            f"{len(self.groups)} grupos ({fuzzy} con posibles erratas). "
+            f"Seleccione grupos, o una variante para usarla como destino."
+        ))
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(self.HEADERS)
+        self.tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tree.setUniformRowHeights(True)
+        header = self.tree.header()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        
+        for group_index, group in enumerate(self.groups):
+            canonical = group.canonical
+            item = QTreeWidgetItem([
+                format_tag(canonical.namespace, canonical.tag),
+                str(group.total_count),
+                str(len(group.members)) + (" (erratas)" if group.fuzzy else "")
+            ])
+            item.setData(0, Qt.ItemDataRole.UserRole, (group_index, None))
+            for member_index, member in enumerate(group.members):
+                child = QTreeWidgetItem([member.tag, str(member.count), ""])
+                child.setData(0, Qt.ItemDataRole.UserRole, (group_index, member_index))
+                item.addChild(child)
+            self.tree.addTopLevelItem(item)
+        layout.addWidget(self.tree)
+        
+        buttons_layout = QHBoxLayout()
+        
+        merge_btn = QPushButton("Fusionar")
+        merge_btn.setToolTip("Añade `variantes -> destino` a las reglas de reescritura")
+        merge_btn.clicked.connect(self._on_merge)
+        buttons_layout.addWidget(merge_btn)
+        
+        mark_btn = QPushButton("Marcar Variantes")
+        mark_btn.setToolTip("Marca para remover todas las variantes salvo el destino")
+        mark_btn.clicked.connect(self._on_mark)
+        buttons_layout.addWidget(mark_btn)
+        
+        buttons_layout.addStretch()
+        
+        close_btn = QPushButton("Cerrar")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+        
+        layout.addLayout(buttons_layout)
+    
+    def _selected_groups(self) -> List[Tuple[DuplicateGroup, TagAggregate]]:
+        """
+        Grupos seleccionados con su destino
+        
+        Returns:
+            Lista (grupo, destino) en el orden de la lista; el destino es la
+            variante seleccionada o, si no hay, la más frecuente
+        """
+        targets: dict[int, Optional[int]] = {}
+        for item in self.tree.selectedItems():
+            group_index, member_index = item.data(0, Qt.ItemDataRole.UserRole)
+            if member_index is not None or group_index not in targets:
+                targets[group_index] = member_index
+        
+        result = []
+        for group_index in sorted(targets):
+            group = self.groups[group_index]
+            member_index = targets[group_index]
+            target = group.members[member_index] if member_index is not None else group.canonical
+            result.append((group, target))
+        return result
+    
+    def _on_merge(self) -> None:
+        """Emite una regla de fusión por grupo seleccionado"""
+        rules = []
+        for group, target in self._selected_groups():
+            sources = [
+                format_tag(member.namespace, member.tag)
+                for member in group.members if member is not target
+            ]
+            rules.append(f"{' | '.join(sources)} -> {format_tag(target.namespace, target.tag)}")
+        if rules:
+            self.rules_requested.emit("\n".join(rules))
+    
+    def _on_mark(self) -> None:
+        """Emite las variantes no elegidas de los grupos seleccionados"""
+        keys = [
+            (member.namespace, member.tag)
+            for group, target in self._selected_groups()
+            for member in group.members if member is not target
+        ]
+        if keys:
+            self.marks_requested.emit(keys)
@@ -0,0 +1,218 @@
+"""Monitor de latencia del event loop de Qt (detección de bloqueos de la interfaz)"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_LAG_HISTOGRAM = metrics.histogram(
+    "ui.event_loop_lag",
+    "Retraso del event loop de la interfaz (segundos)",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+_STALLS = metrics.counter("ui.stalls", "Bloqueos de la interfaz por encima del umbral")
+
+# Raíz del paquete: los frames de la aplicación identifican al handler bloqueante
+_APP_ROOT = str(Path(__file__).resolve().parent.parent)
+# Punto de entrada: su frame (app.exec()) queda debajo de cualquier handler
+_ENTRY_POINT = str(Path(_APP_ROOT) / "main.py")
+
+
+@dataclass
+class LagStats:
+    """Resumen de la latencia del event loop"""
+    samples: int = 0
+    mean_ms: float = 0.0
+    p95_ms: float = 0.0
+    max_ms: float = 0.0
+    stalls: int = 0
+    worst_stall_ms: float = 0.0
+    top_locations: List[Tuple[str, int]] = field(default_factory=list)  # (handler, bloqueos)
+    
+    def describe(self) -> str:
+        """Resumen legible"""
+        text = (
+            f"Latencia del event loop: media {self.mean_ms:.1f} ms, p95 {self.p95_ms:.1f} ms, "
+            f"máx {self.max_ms:.0f} ms ({self.samples} muestras)\n"
+            f"Bloqueos: {self.stalls} (peor {self.worst_stall_ms:.0f} ms)"
+        )
+        if self.top_locations:
+            text += "\n" + "\n".join(f"  {count}× {location}" for location, count in self.top_locations)
+        return text
+
+
+class EventLoopMonitor(QObject):
+    """
+    Mide el retraso del event loop y muestrea la pila de los bloqueos
+    
+    Un QTimer en el hilo de la interfaz mide cuánto se retrasa cada tick
+    respecto de su intervalo. En paralelo, un hilo vigilante comprueba el
+    último tick: si la interfaz lleva más de `stall_threshold` sin responder,
+    toma la pila del hilo de la interfaz con sys._current_frames(), de modo
+    que el log muestra qué handler la está bloqueando.
+    """
+    
+    # Señales
+    lag_updated = Signal(float)  # mayor retraso (ms) del último segundo
+    stall_detected = Signal(float, str)  # duración (ms), handler bloqueante
+    
+    # Muestras recientes guardadas para la media y el p95
+    HISTORY = 3000
+    # Handlers más frecuentes en el resumen
+    TOP_LOCATIONS = 5
+    
+    def __init__(self, interval_ms: int = 100, stall_threshold_ms: int = 250, parent=None):
+        """
+        Inicializa el monitor (debe crearse en el hilo de la interfaz)
+        
+        Args:
+            interval_ms: Intervalo del timer de medición
+            stall_threshold_ms: Bloqueo a partir del cual se toma la pila y se registra
+            parent: Objeto padre
+        """
+        super().__init__(parent)
+        self.interval = interval_ms / 1000
+        self.stall_threshold = stall_threshold_ms / 1000
+        self._gui_thread_id = threading.get_ident()
+        
+        self._samples: Deque[float] = deque(maxlen=self.HISTORY)
+        self._max_lag = 0.0
+        self._window_max = 0.0
+        self._last_report = time.monotonic()
+        self._stalls = 0
+        self._worst_stall = 0.0
+        self._locations: Counter = Counter()
+        
+        # Estado compartido con el hilo vigilante
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+        self._stall_stack: Optional[str] = None
+        self._stall_location: Optional[str] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._on_tick)
+    
+    def start(self) -> None:
+        """Empieza a medir"""
+        self._last_tick = time.monotonic()
+        self._timer.start()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="EventLoopWatchdog", daemon=True)
+        self._watchdog.start()
+    
+    def stop(self) -> None:
+        """Detiene la medición y el hilo vigilante"""
+        self._timer.stop()
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+    
+    def _on_tick(self) -> None:
+        """Tick del timer: mide el retraso y cierra los bloqueos detectados"""
+        now = time.monotonic()
+        with self._lock:
+            elapsed = now - self._last_tick
+            self._last_tick = now
+            stack, location = self._stall_stack, self._stall_location
+            self._stall_stack = self._stall_location = None
+        
+        lag = max(0.0, elapsed - self.interval)
+        self._samples.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        self._window_max = max(self._window_max, lag)
+        if metrics.enabled:
+            _LAG_HISTOGRAM.observe(lag)
+        
+        if lag >= self.stall_threshold:
+            self._record_stall(lag, stack, location)
+        
+        if now - self._last_report >= 1.0:
+            self.lag_updated.emit(self._window_max * 1000)
+            self._window_max = 0.0
+            self._last_report = now
+    
+    def _record_stall(self, lag: float, stack: Optional[str], location: Optional[str]) -> None:
+        """Registra un bloqueo ya terminado"""
+        location = location or "desconocido (sin muestra de pila)"
+        self._stalls += 1
+        self._worst_stall = max(self._worst_stall, lag)
+        self._locations[location] += 1
+        if metrics.enabled:
+            _STALLS.inc()
+        logger.warning("Interfaz bloqueada %.0f ms en %s", lag * 1000, location)
+        self.stall_detected.emit(lag * 1000, location)
+    
+    def _watch(self) -> None:
+        """Hilo vigilante: toma la pila de la interfaz cuando deja de responder"""
+        sampled_tick = None
+        while not self._stop.wait(self.stall_threshold / 4):
+            with self._lock:
+                last_tick = self._last_tick
+            blocked = time.monotonic() - last_tick - self.interval
+            if blocked < self.stall_threshold or sampled_tick == last_tick:
+                continue
+            
+            # Una muestra por bloqueo, tomada al cruzar el umbral
+            sampled_tick = last_tick
+            frame = sys._current_frames().get(self._gui_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            location = self._app_location(frame)
+            del frame
+            with self._lock:
+                if self._last_tick == last_tick:
+                    self._stall_stack, self._stall_location = stack, location
+            logger.warning(
+                "La interfaz no responde desde hace %.0f ms; pila del hilo de la interfaz:\n%s",
+                blocked * 1000,
+                stack
+            )
+    
+    @staticmethod
+    def _app_location(frame) -> str:
+        """
+        Handler bloqueante: el frame de la aplicación más cercano al event loop
+        y, si es otro, el más interno (dónde estaba trabajando)
+        """
+        names = []
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_APP_ROOT) and filename not in (__file__, _ENTRY_POINT):
+                qualname = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+                names.append(f"{qualname} ({Path(filename).name}:{frame.f_lineno})")
+            frame = frame.f_back
+        if not names:
+            return "código fuera de la aplicación"
+        # names va del frame más interno al más externo
+        return names[-1] if len(names) == 1 else f"{names[-1]} > {names[0]}"
+    
+    def stats(self) -> LagStats:
+        """Resumen de las muestras recientes y de los bloqueos desde el inicio"""
+        samples = sorted(self._samples)
+        if not samples:
+            return LagStats(stalls=self._stalls)
+        return LagStats(
+            samples=len(samples),
+            mean_ms=sum(samples) / len(samples) * 1000,
+            p95_ms=samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            max_ms=self._max_lag * 1000,
+            stalls=self._stalls,
+            worst_stall_ms=self._worst_stall * 1000,
+            top_locations=self._locations.most_common(self.TOP_LOCATIONS)
+        )
@@ -0,0 +1,193 @@
+"""Panel de búsqueda global de tags en todos los namespaces"""
+
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QTableView,
+    QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, Signal
+
+from ..core.search_index import TagSearchIndex, RankedResults, has_wildcards
+
+# Espera tras la última tecla antes de buscar
+SEARCH_DEBOUNCE_MS = 150
+
+# Sin comodines, las consultas más cortas recorren todo el índice
+MIN_QUERY_LENGTH = 2
+
+
+class GlobalSearchModel(QAbstractTableModel):
+    """Modelo que pagina los resultados ordenados de una búsqueda global"""
+    
+    PAGE_SIZE = 100
+    HEADERS = ["Namespace", "Tag", "Count"]
+    
+    def __init__(self, index: TagSearchIndex, parent=None):
+        super().__init__(parent)
+        self._index = index
+        self._results: Optional[RankedResults] = None
+        self._ids = []  # ids de las filas cargadas, en orden de relevancia
+    
+    def set_results(self, results: Optional[RankedResults]) -> None:
+        """Muestra nuevos resultados (se carga la primera página)"""
+        self.beginResetModel()
+        self._results = results
+        self._ids = results.page(0, self.PAGE_SIZE) if results else []
+        self.endResetModel()
+    
+    def total_count(self) -> int:
+        """Número total de resultados (cargados o no)"""
+        return len(self._results) if self._results else 0
+    
+    def key_at(self, row: int) -> Optional[tuple[str, str]]:
+        """Clave (namespace, tag) de la fila dada"""
+        if 0 <= row < len(self._ids):
+            agg = self._index.aggregate(self._ids[row])
+            return agg.namespace, agg.tag
+        return None
+    
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        """Indica si quedan resultados por cargar"""
+        if parent.isValid() or self._results is None:
+            return False
+        return len(self._ids) < len(self._results)
+    
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """Carga la siguiente página de resultados"""
+        if parent.isValid() or self._results is None:
+            return
+        page = self._results.page(len(self._ids), self.PAGE_SIZE)
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._ids), len(self._ids) + len(page) - 1)
+        self._ids.extend(page)
+        self.endInsertRows()
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de filas cargadas"""
+        if parent.isValid():
+            return 0
+        return len(self._ids)
+    
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de columnas"""
+        return len(self.HEADERS)
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos para el índice dado"""
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+        
+        agg = self._index.aggregate(self._ids[index.row()])
+        col = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return agg.namespace
+            elif col == 1:
+                return agg.tag
+            elif col == 2:
+                return str(agg.count)
+        
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if col == 2:
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        
+        return None
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos del encabezado"""
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if section < len(self.HEADERS):
+                return self.HEADERS[section]
+        return None
+
+
+class GlobalSearchPanel(QWidget):
+    """
+    Búsqueda de tags en todos los namespaces sobre un índice compartido
+    
+    Los resultados se ordenan por relevancia (exacto, prefijo, resto; luego
+    count) y se cargan por páginas. Doble click o Enter sobre un resultado
+    emite tag_activated para saltar a su pestaña.
+    """
+    
+    tag_activated = Signal(str, str)  # namespace, tag
+    
+    def __init__(self, index: TagSearchIndex, parent=None):
+        """
+        Inicializa el panel
+        
+        Args:
+            index: Índice compartido (lo mantiene el escaneo)
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.index = index
+        self._setup_ui()
+    
+    def _setup_ui(self) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+        
+        search_layout = QHBoxLayout()
+        self.search_field = QLineEdit()
+        self.search_field.setPlaceholderText(
+            "Búsqueda global... (namespace:texto, * y ? como comodines)"
+        )
+        self.search_field.textChanged.connect(lambda _: self._search_timer.start())
+        self.search_field.returnPressed.connect(self.refresh)
+        search_layout.addWidget(self.search_field)
+        
+        self.result_label = QLabel("")
+        search_layout.addWidget(self.result_label)
+        layout.addLayout(search_layout)
+        
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.refresh)
+        
+        self.model = GlobalSearchModel(self.index, self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.model)
+        self.results_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.results_view.verticalHeader().setVisible(False)
+        header = self.results_view.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        self.results_view.activated.connect(self._on_result_activated)
+        layout.addWidget(self.results_view)
+    
+    def refresh(self) -> None:
+        """Repite la búsqueda actual (ej: tras actualizar el índice)"""
+        self._search_timer.stop()
+        query = self.search_field.text().strip()
+        
+        # `namespace:` sin texto lista el namespace completo
+        term = query.split(':', 1)[-1]
+        if ':' not in query and len(term) < MIN_QUERY_LENGTH and not has_wildcards(term):
+            self.model.set_results(None)
+            self.result_label.setText("")
+            return
+        
+        results = self.index.search(query)
+        self.model.set_results(results)
+        self.result_label.setText(f"{len(results)} resultados")
+    
+    def clear_results(self) -> None:
+        """Vacía los resultados (ej: al iniciar un nuevo escaneo)"""
+        self.model.set_results(None)
+        self.result_label.setText("")
+    
+    def _on_result_activated(self, index: QModelIndex) -> None:
+        """Emite la clave del resultado activado"""
+        key = self.model.key_at(index.row())
+        if key is not None:
+            self.tag_activated.emit(*key)
@@ -1,31 +1,63 @@
 """Ventana principal de la aplicación"""
 
+import logging
+import os
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from typing import TYPE_CHECKING, Dict, List, Set, Optional
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QFileDialog, QSpinBox, QTextEdit, QLabel, QTabWidget, QGroupBox,
-    QComboBox, QProgressBar, QStatusBar, QMessageBox, QSplitter
+    QComboBox, QProgressBar, QStatusBar, QMessageBox, QSplitter, QDialog,
+    QDoubleSpinBox, QCheckBox, QFormLayout, QLineEdit
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QThread, QTimer
+from PySide6.QtGui import QActionGroup
 
 from ..core.aggregator import TagAggregator
 from ..core.filter import TagFilter, BannedMatchMode
-from ..models.tag_models import TagFile, TagAggregate
-from ..workers.scan_worker import ScanWorker
-from ..workers.apply_worker import ApplyWorker
-from ..utils.logger import setup_logger, get_logger
-from ..utils.backup import create_backup
+from ..core.normalize import NormalizationRule, TagNormalizer
+from ..core.rewrite import RewritePlan
+from ..core.tag_parser import format_tag
+from ..models.tag_models import TagFile, TagAggregate, RewriteSummary
+from ..utils.logger import setup_logger, get_logger, set_log_level, get_log_level, LEVEL_NAMES
+from ..utils.metrics import metrics
+from ..utils.throttle import IOBudget, IOScheduler
+from .event_loop_monitor import EventLoopMonitor
 from .namespace_tab import NamespaceTab
 
+# Workers, diálogos, paneles, backup y checkpoints se importan al usarse por
+# primera vez: importar el módulo no los carga y acorta el arranque
+if TYPE_CHECKING:
+    from ..core.content_dedup import ContentDeduplicator
+    from ..core.cooccurrence import CooccurrenceIndex
+    from ..core.search_index import TagSearchIndex
+    from .global_search_panel import GlobalSearchPanel
+    from .tag_detail_panel import TagDetailPanel
+    from ..utils.checkpoint import JobCheckpoint
+    from ..workers.scan_worker import ScanWorker
+    from ..workers.apply_worker import ApplyWorker
+    from ..workers.dry_run_worker import DryRunWorker
+    from ..workers.cooccurrence_worker import CooccurrenceWorker
+    from ..workers.duplicate_worker import DuplicateWorker
+    from ..workers.export_worker import ExportWorker
+    from ..workers.merge_worker import MergeWorker
+
 logger = get_logger(__name__)
 
+_REFRESH_TIMER = metrics.timer("ui.refresh_tags", "Tiempo de filtrado y actualización de las pestañas")
+
 
 class MainWindow(QMainWindow):
     """Ventana principal de la aplicación"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        io_budget: Optional[IOBudget] = None,
+        low_memory: bool = False,
+        profile: bool = False,
+        stall_threshold_ms: int = 250
+    ):
         super().__init__()
         self.setWindowTitle("Tag File Editor - Revisión y Limpieza de Tags")
         self.setMinimumSize(1200, 800)
@@ -34,17 +66,41 @@ class MainWindow(QMainWindow):
         setup_logger()
         
         # Estado de la aplicación
-        self.directory: Optional[Path] = None
+        self.directories: List[Path] = []  # raíces a escanear, en orden
         self.files_data: Dict[Path, TagFile] = {}
         self.aggregator = TagAggregator()
         self.filter = TagFilter(threshold=5)
         self.namespace_tabs: Dict[str, NamespaceTab] = {}
+        self.marked_tags: Set[tuple[str, str]] = set()  # compartido por todas las pestañas
+        # Índice de búsqueda global; lo actualiza el ScanWorker al terminar
+        from ..core.search_index import TagSearchIndex
+        self.search_index: "TagSearchIndex" = TagSearchIndex()
+        # Análisis de co-ocurrencia del escaneo actual (se calcula a demanda)
+        self.cooccurrence: Optional["CooccurrenceIndex"] = None
+        # Archivos con el mismo contenido en el último escaneo
+        self.content_duplicates: Optional["ContentDeduplicator"] = None
+        self._low_memory = low_memory
+        # Perfilar escaneos y aplicaciones (cProfile + tracemalloc, informes en logs/)
+        self._profile_jobs = profile
+        # Monitor de latencia de la interfaz (0 = desactivado)
+        self._stall_threshold_ms = stall_threshold_ms
+        self.event_loop_monitor: Optional[EventLoopMonitor] = None
+        
+        # Limitador de E/S compartido por los workers (ajustable en caliente)
+        self.io_scheduler = IOScheduler(io_budget or IOBudget())
         
         # Workers
-        self.scan_worker: Optional[ScanWorker] = None
-        self.apply_worker: Optional[ApplyWorker] = None
+        self.scan_worker: Optional["ScanWorker"] = None
+        self.apply_worker: Optional["ApplyWorker"] = None
+        self.dry_run_worker: Optional["DryRunWorker"] = None
+        self.cooccurrence_worker: Optional["CooccurrenceWorker"] = None
+        self.duplicate_worker: Optional["DuplicateWorker"] = None
+        self.export_worker: Optional["ExportWorker"] = None
+        self.merge_worker: Optional["MergeWorker"] = None
         
         self._setup_ui()
+        # El monitor arranca con el event loop: no mide la construcción ni retrasa el primer pintado
+        QTimer.singleShot(0, self._start_event_loop_monitor)
         logger.info("Aplicación iniciada")
     
     def _setup_ui(self) -> None:
@@ -56,6 +112,8 @@ class MainWindow(QMainWindow):
         main_layout.setSpacing(10)
         main_layout.setContentsMargins(10, 10, 10, 10)
         
+        self._create_menu()
+        
         # Splitter horizontal
         splitter = QSplitter(Qt.Orientation.Horizontal)
         main_layout.addWidget(splitter)
@@ -68,9 +126,16 @@ class MainWindow(QMainWindow):
         right_panel = self._create_right_panel()
         splitter.addWidget(right_panel)
         
+        # Panel de detalle (archivos del tag seleccionado)
+        from .tag_detail_panel import TagDetailPanel
+        self.tag_detail: "TagDetailPanel" = TagDetailPanel()
+        self.tag_detail.related_activated.connect(self._on_global_tag_activated)
+        splitter.addWidget(self.tag_detail)
+        
         splitter.setStretchFactor(0, 0)
         splitter.setStretchFactor(1, 1)
-        splitter.setSizes([300, 900])
+        splitter.setStretchFactor(2, 0)
+        splitter.setSizes([300, 650, 350])
         
         # Barra de estado
         self.status_bar = QStatusBar()
@@ -81,6 +146,58 @@ class MainWindow(QMainWindow):
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         self.status_bar.addPermanentWidget(self.progress_bar)
+        
+        # Indicador de latencia del event loop (lo actualiza el monitor)
+        self.lag_label = QLabel()
+        self.lag_label.setVisible(False)
+        self.status_bar.addPermanentWidget(self.lag_label)
+    
+    def _start_event_loop_monitor(self) -> None:
+        """Mide la latencia de la interfaz y registra los bloqueos con su pila"""
+        if self._stall_threshold_ms <= 0:
+            return
+        self.event_loop_monitor = EventLoopMonitor(stall_threshold_ms=self._stall_threshold_ms, parent=self)
+        self.event_loop_monitor.lag_updated.connect(self._on_lag_updated)
+        self.event_loop_monitor.stall_detected.connect(self._on_stall_detected)
+        self.event_loop_monitor.start()
+        self.lag_label.setVisible(True)
+        self.latency_action.setEnabled(True)
+    
+    def _create_menu(self) -> None:
+        """Crea la barra de menú"""
+        file_menu = self.menuBar().addMenu("Archivo")
+        open_partials_action = file_menu.addAction("Abrir Escaneo Repartido...")
+        open_partials_action.setToolTip("Combina los agregados parciales (.tagagg) de python -m app.cli scan-shard")
+        open_partials_action.triggered.connect(self._on_open_partials)
+        
+        tools_menu = self.menuBar().addMenu("Herramientas")
+        diagnostics_action = tools_menu.addAction("Diagnóstico...")
+        diagnostics_action.triggered.connect(self._on_show_diagnostics)
+        
+        self.profile_action = tools_menu.addAction("Perfilar Escaneos y Aplicaciones")
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(self._profile_jobs)
+        self.profile_action.setToolTip("Guarda en logs/ un .prof y un informe de memoria de cada trabajo")
+        self.profile_action.toggled.connect(self._on_profile_toggled)
+        
+        self.content_duplicates_action = tools_menu.addAction("Archivos con Contenido Repetido...")
+        self.content_duplicates_action.setEnabled(False)  # se habilita si el escaneo encuentra copias
+        self.content_duplicates_action.triggered.connect(self._on_show_content_duplicates)
+        
+        self.latency_action = tools_menu.addAction("Latencia de la Interfaz...")
+        self.latency_action.setEnabled(False)  # se habilita al iniciar el monitor
+        self.latency_action.triggered.connect(self._on_show_latency)
+        
+        # Nivel de log en caliente (DEBUG incluye resúmenes periódicos por archivo)
+        level_menu = tools_menu.addMenu("Nivel de Log")
+        level_group = QActionGroup(self)
+        current_level = logging.getLevelName(get_log_level())
+        for name in LEVEL_NAMES:
+            action = level_menu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name == current_level)
+            action.triggered.connect(lambda checked, level=name: set_log_level(level))
+            level_group.addAction(action)
     
     def _create_left_panel(self) -> QWidget:
         """Crea el panel izquierdo con controles"""
@@ -96,13 +213,73 @@ class MainWindow(QMainWindow):
         self.dir_label.setWordWrap(True)
         dir_layout.addWidget(self.dir_label)
         
+        dir_buttons = QHBoxLayout()
         self.select_dir_btn = QPushButton("Seleccionar Directorio")
         self.select_dir_btn.clicked.connect(self._on_select_directory)
-        dir_layout.addWidget(self.select_dir_btn)
+        dir_buttons.addWidget(self.select_dir_btn)
+        
+        self.add_root_btn = QPushButton("Añadir Raíz...")
+        self.add_root_btn.setToolTip(
+            "Escanear varios directorios a la vez; los archivos repetidos entre raíces se cuentan una vez"
+        )
+        self.add_root_btn.clicked.connect(self._on_add_root)
+        dir_buttons.addWidget(self.add_root_btn)
+        dir_layout.addLayout(dir_buttons)
+        
+        # Filtro por raíz (solo visible tras escanear varias raíces)
+        self.root_combo = QComboBox()
+        self.root_combo.setToolTip(
+            "Mostrar solo los tags de los archivos de una raíz\n"
+            "Las marcas y reglas se aplican a los archivos de todas las raíces"
+        )
+        self.root_combo.setVisible(False)
+        self.root_combo.currentIndexChanged.connect(self._on_root_filter_changed)
+        dir_layout.addWidget(self.root_combo)
+        
+        self.low_memory_check = QCheckBox("Modo bajo consumo de memoria")
+        self.low_memory_check.setToolTip(
+            "Conserva solo agregados y postings; los archivos se releen al aplicar"
+        )
+        self.low_memory_check.setChecked(self._low_memory)
+        dir_layout.addWidget(self.low_memory_check)
         
         dir_group.setLayout(dir_layout)
         layout.addWidget(dir_group)
         
+        # Normalización de tags (se aplica al escanear)
+        self.normalize_group = QGroupBox("Normalizar Tags")
+        self.normalize_group.setCheckable(True)
+        self.normalize_group.setChecked(False)
+        self.normalize_group.setToolTip(
+            "Agrupa las grafías de un mismo tag (requiere volver a escanear)"
+        )
+        normalize_layout = QFormLayout()
+        
+        self.casefold_check = QCheckBox("Mayúsculas/minúsculas")
+        self.casefold_check.setChecked(True)
+        normalize_layout.addRow(self.casefold_check)
+        
+        self.nfkc_check = QCheckBox("Unicode (NFKC)")
+        self.nfkc_check.setChecked(True)
+        normalize_layout.addRow(self.nfkc_check)
+        
+        self.separators_check = QCheckBox("Espacios y guiones bajos")
+        self.separators_check.setChecked(True)
+        normalize_layout.addRow(self.separators_check)
+        
+        self.normalize_exclude_edit = QLineEdit()
+        self.normalize_exclude_edit.setPlaceholderText("ej: artist, meta")
+        normalize_layout.addRow("Excluir namespaces:", self.normalize_exclude_edit)
+        
+        self.canonicalize_check = QCheckBox("Canonicalizar grafías al aplicar")
+        self.canonicalize_check.setToolTip(
+            "Reescribe cada grafía con la forma más frecuente de su tag"
+        )
+        normalize_layout.addRow(self.canonicalize_check)
+        
+        self.normalize_group.setLayout(normalize_layout)
+        layout.addWidget(self.normalize_group)
+        
         # Configuración de filtros
         filter_group = QGroupBox("Filtros")
         filter_layout = QVBoxLayout()
@@ -144,6 +321,59 @@ class MainWindow(QMainWindow):
         filter_group.setLayout(filter_layout)
         layout.addWidget(filter_group)
         
+        # Reglas de reescritura (renombrar, fusionar, añadir)
+        rules_group = QGroupBox("Reglas de Reescritura")
+        rules_layout = QVBoxLayout()
+        
+        self.rewrite_rules_edit = QTextEdit()
+        self.rewrite_rules_edit.setMaximumHeight(150)
+        self.rewrite_rules_edit.setPlaceholderText(
+            "Una regla por línea\nEjemplo:\n"
+            "artist:foo -> artist:bar\n"
+            "alias1 | alias2 -> tag\n"
+            "species:domestic cat => cat"
+        )
+        rules_layout.addWidget(self.rewrite_rules_edit)
+        
+        rules_group.setLayout(rules_layout)
+        layout.addWidget(rules_group)
+        
+        # Límites de E/S (0 = sin límite), aplicados en caliente
+        io_group = QGroupBox("Límites de E/S")
+        io_layout = QFormLayout()
+        budget = self.io_scheduler.budget
+        
+        self.max_files_spin = QDoubleSpinBox()
+        self.max_files_spin.setRange(0, 1_000_000)
+        self.max_files_spin.setDecimals(0)
+        self.max_files_spin.setSpecialValueText("Sin límite")
+        self.max_files_spin.setValue(budget.max_files_per_sec)
+        self.max_files_spin.valueChanged.connect(self._on_io_budget_changed)
+        io_layout.addRow("Archivos/s:", self.max_files_spin)
+        
+        self.max_mb_spin = QDoubleSpinBox()
+        self.max_mb_spin.setRange(0, 100_000)
+        self.max_mb_spin.setDecimals(1)
+        self.max_mb_spin.setSpecialValueText("Sin límite")
+        self.max_mb_spin.setValue(budget.max_mb_per_sec)
+        self.max_mb_spin.valueChanged.connect(self._on_io_budget_changed)
+        io_layout.addRow("MB/s:", self.max_mb_spin)
+        
+        self.max_open_spin = QSpinBox()
+        self.max_open_spin.setRange(0, 10_000)
+        self.max_open_spin.setSpecialValueText("Sin límite")
+        self.max_open_spin.setValue(budget.max_open_files)
+        self.max_open_spin.valueChanged.connect(self._on_io_budget_changed)
+        io_layout.addRow("Archivos abiertos:", self.max_open_spin)
+        
+        self.low_priority_check = QCheckBox("Prioridad baja")
+        self.low_priority_check.setChecked(budget.low_priority)
+        self.low_priority_check.toggled.connect(self._on_io_budget_changed)
+        io_layout.addRow(self.low_priority_check)
+        
+        io_group.setLayout(io_layout)
+        layout.addWidget(io_group)
+        
         # Acciones
         actions_group = QGroupBox("Acciones")
         actions_layout = QVBoxLayout()
@@ -164,6 +394,43 @@ class MainWindow(QMainWindow):
         self.apply_btn.setStyleSheet("background-color: #d32f2f; color: white; font-weight: bold;")
         actions_layout.addWidget(self.apply_btn)
         
+        self.cooccurrence_btn = QPushButton("Analizar Co-ocurrencias")
+        self.cooccurrence_btn.setToolTip(
+            "Busca pares de tags que casi siempre aparecen juntos (implicaciones y alias)"
+        )
+        self.cooccurrence_btn.clicked.connect(self._on_cooccurrence)
+        self.cooccurrence_btn.setEnabled(False)
+        actions_layout.addWidget(self.cooccurrence_btn)
+        
+        self.duplicates_btn = QPushButton("Buscar Duplicados")
+        self.duplicates_btn.setToolTip(
+            "Agrupa variantes de un mismo tag (mayúsculas, separadores y erratas)"
+        )
+        self.duplicates_btn.clicked.connect(self._on_find_duplicates)
+        self.duplicates_btn.setEnabled(False)
+        actions_layout.addWidget(self.duplicates_btn)
+        
+        self.export_btn = QPushButton("Exportar Resultados...")
+        self.export_btn.setToolTip(
+            "Exporta los agregados y, opcionalmente, la relación archivo ↔ tag (CSV, JSONL o Parquet)"
+        )
+        self.export_btn.clicked.connect(self._on_export)
+        self.export_btn.setEnabled(False)
+        actions_layout.addWidget(self.export_btn)
+        
+        # Control del trabajo en curso (escaneo o aplicación)
+        job_layout = QHBoxLayout()
+        self.pause_btn = QPushButton("Pausar")
+        self.pause_btn.clicked.connect(self._on_pause_resume)
+        self.pause_btn.setEnabled(False)
+        job_layout.addWidget(self.pause_btn)
+        
+        self.cancel_btn = QPushButton("Cancelar")
+        self.cancel_btn.clicked.connect(self._on_cancel_job)
+        self.cancel_btn.setEnabled(False)
+        job_layout.addWidget(self.cancel_btn)
+        actions_layout.addLayout(job_layout)
+        
         actions_group.setLayout(actions_layout)
         layout.addWidget(actions_group)
         
@@ -177,8 +444,21 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(panel)
         layout.setContentsMargins(0, 0, 0, 0)
         
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        layout.addWidget(splitter)
+        
+        # Búsqueda global en todos los namespaces
+        from .global_search_panel import GlobalSearchPanel
+        self.global_search: "GlobalSearchPanel" = GlobalSearchPanel(self.search_index)
+        self.global_search.tag_activated.connect(self._on_global_tag_activated)
+        splitter.addWidget(self.global_search)
+        
         self.namespace_tabs_widget = QTabWidget()
-        layout.addWidget(self.namespace_tabs_widget)
+        splitter.addWidget(self.namespace_tabs_widget)
+        
+        splitter.setStretchFactor(0, 0)
+        splitter.setStretchFactor(1, 1)
+        splitter.setSizes([200, 600])
         
         return panel
     
@@ -191,18 +471,75 @@ class MainWindow(QMainWindow):
         )
         
         if directory:
-            self.directory = Path(directory)
-            self.dir_label.setText(str(self.directory))
+            self.directories = [Path(directory)]
+            self._update_dir_label()
             self.scan_btn.setEnabled(True)
-            self.status_bar.showMessage(f"Directorio seleccionado: {self.directory}")
-            logger.info(f"Directorio seleccionado: {self.directory}")
+            self.status_bar.showMessage(f"Directorio seleccionado: {directory}")
+            logger.info("Directorio seleccionado: %s", directory)
+            self._offer_resume_apply()
+    
+    def _on_add_root(self) -> None:
+        """Añade otra raíz al conjunto a escanear"""
+        directory = QFileDialog.getExistingDirectory(
+            self,
+            "Añadir Raíz",
+            str(self.directories[-1] if self.directories else Path.home())
+        )
+        if not directory:
+            return
+        
+        root = Path(directory)
+        if root.resolve() in {existing.resolve() for existing in self.directories}:
+            self.status_bar.showMessage(f"La raíz ya está en la lista: {root}")
+            return
+        self.directories.append(root)
+        self._update_dir_label()
+        self.scan_btn.setEnabled(True)
+        self.status_bar.showMessage(f"Raíz añadida: {root} (vuelva a escanear)")
+        logger.info("Raíz añadida: %s (%s raíces)", root, len(self.directories))
+        self._offer_resume_apply()
+    
+    def _update_dir_label(self) -> None:
+        """Muestra las raíces seleccionadas"""
+        self.dir_label.setText("\n".join(str(root) for root in self.directories) or "No seleccionado")
+    
+    def _display_base(self) -> Optional[Path]:
+        """Directorio común de las raíces, para mostrar rutas relativas"""
+        if not self.directories:
+            return None
+        try:
+            return Path(os.path.commonpath(self.directories))
+        except ValueError:
+            # Raíces en unidades distintas
+            return None
+    
+    def _update_root_filter(self) -> None:
+        """Rellena el filtro por raíz con las raíces del último escaneo"""
+        roots = self.aggregator.roots
+        self.root_combo.blockSignals(True)
+        self.root_combo.clear()
+        self.root_combo.addItem(f"Todas las raíces ({self.aggregator.file_count} archivos)", None)
+        for root_id, root in enumerate(roots):
+            self.root_combo.addItem(f"{root} ({self.aggregator.root_file_count(root_id)} archivos)", root_id)
+        self.root_combo.blockSignals(False)
+        self.root_combo.setVisible(len(roots) > 1)
+    
+    def _on_root_filter_changed(self, index: int) -> None:
+        """Refresca las pestañas con los agregados de la raíz elegida"""
+        if self.aggregator.file_count:
+            self._refresh_tags_display()
+            if self.root_combo.currentData() is not None:
+                self.status_bar.showMessage(
+                    "Mostrando una raíz: las marcas se comparten con las demás vistas "
+                    "y se aplican a los archivos de todas las raíces"
+                )
     
     def _on_threshold_changed(self, value: int) -> None:
         """Maneja cambios en el threshold"""
         self.filter.set_threshold(value)
-        if self.files_data:
+        if self.aggregator.file_count:
             self._refresh_tags_display()
-        logger.debug(f"Threshold cambiado a {value}")
+        logger.debug("Threshold cambiado a %s", value)
     
     def _on_banned_tags_changed(self) -> None:
         """Maneja cambios en los tags prohibidos"""
@@ -213,20 +550,41 @@ class MainWindow(QMainWindow):
             if line.strip()
         }
         self.filter.set_banned_tags(banned_set)
-        if self.files_data:
+        if self.aggregator.file_count:
             self._refresh_tags_display()
-        logger.debug(f"Tags prohibidos actualizados: {len(banned_set)} tags")
+        logger.debug("Tags prohibidos actualizados: %s tags", len(banned_set))
     
     def _on_match_mode_changed(self, mode: str) -> None:
         """Maneja cambios en el modo de coincidencia"""
         self.filter.set_match_mode(mode)
-        if self.files_data:
+        if self.aggregator.file_count:
             self._refresh_tags_display()
-        logger.debug(f"Modo de coincidencia cambiado a {mode}")
+        logger.debug("Modo de coincidencia cambiado a %s", mode)
+    
+    def _on_io_budget_changed(self, *args) -> None:
+        """Aplica el nuevo presupuesto de E/S (también al trabajo en curso)"""
+        budget = IOBudget(
+            max_files_per_sec=self.max_files_spin.value(),
+            max_mb_per_sec=self.max_mb_spin.value(),
+            max_open_files=self.max_open_spin.value(),
+            low_priority=self.low_priority_check.isChecked()
+        )
+        self.io_scheduler.set_budget(budget)
+        
+        worker = self._running_worker()
+        if worker is not None:
+            worker.setPriority(self._worker_priority())
+        logger.debug("Límites de E/S: %s", budget.describe())
+    
+    def _worker_priority(self) -> QThread.Priority:
+        """Prioridad de los workers según el modo de prioridad baja"""
+        if self.io_scheduler.budget.low_priority:
+            return QThread.Priority.LowestPriority
+        return QThread.Priority.InheritPriority
     
     def _on_scan(self) -> None:
         """Inicia el escaneo de archivos"""
-        if not self.directory:
+        if not self.directories:
             QMessageBox.warning(self, "Error", "Por favor seleccione un directorio")
             return
         
@@ -234,16 +592,25 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Ya hay un escaneo en progreso")
             return
         
-        # Limpiar datos anteriores
-        self.files_data.clear()
-        self.aggregator.clear()
-        self.namespace_tabs.clear()
-        self.namespace_tabs_widget.clear()
+        # Ofrecer reanudar un escaneo interrumpido
+        from ..utils.path_utils import roots_key
+        checkpoint = self._get_checkpoint("scan")
+        state = checkpoint.load()
+        if state and state.get("directory") == roots_key(self.directories):
+            reply = QMessageBox.question(
+                self,
+                "Reanudar Escaneo",
+                (
+                    f"Hay un escaneo interrumpido de este directorio "
+                    f"({state.get('cursor', 0)}/{state.get('total', 0)} archivos).\n\n"
+                    f"¿Desea reanudarlo?"
+                ),
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                checkpoint.clear()
         
-        # Deshabilitar botones
-        self.scan_btn.setEnabled(False)
-        self.dry_run_btn.setEnabled(False)
-        self.apply_btn.setEnabled(False)
+        self._clear_scan_results()
         
         # Mostrar progreso
         self.progress_bar.setVisible(True)
@@ -251,15 +618,114 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("Escaneando archivos...")
         
         # Crear y ejecutar worker
-        self.scan_worker = ScanWorker(self.directory)
+        from ..workers.scan_worker import ScanWorker
+        self.scan_worker = ScanWorker(
+            self.directories,
+            checkpoint,
+            self.io_scheduler,
+            low_memory=self.low_memory_check.isChecked(),
+            search_index=self.search_index,
+            normalizer=self._build_normalizer()
+        )
         self.scan_worker.progress.connect(self._on_scan_progress)
         self.scan_worker.file_processed.connect(self._on_file_processed)
         self.scan_worker.finished.connect(self._on_scan_finished)
         self.scan_worker.error.connect(self._on_scan_error)
-        self.scan_worker.start()
+        self.scan_worker.paused.connect(self._on_job_paused)
+        self.scan_worker.profile_saved.connect(self._on_profile_saved)
+        self.scan_worker.profile = self._profile_jobs
+        self.scan_worker.start(self._worker_priority())
+        self._set_job_controls_enabled(True)
         
         logger.info("Iniciando escaneo...")
     
+    def _clear_scan_results(self) -> None:
+        """Descarta el resultado anterior y deshabilita las acciones que dependen de él"""
+        # Limpiar datos anteriores
+        self.files_data.clear()
+        self.aggregator.clear()
+        self.marked_tags.clear()
+        self.namespace_tabs.clear()
+        self.namespace_tabs_widget.clear()
+        # El worker actualiza el índice: no consultarlo mientras escanea
+        self.global_search.clear_results()
+        self.global_search.setEnabled(False)
+        self.tag_detail.clear()
+        self.cooccurrence = None
+        self.tag_detail.set_cooccurrence(None)
+        self.content_duplicates = None
+        self.content_duplicates_action.setEnabled(False)
+        self.root_combo.setVisible(False)
+        
+        # Deshabilitar botones
+        self.scan_btn.setEnabled(False)
+        self.dry_run_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.cooccurrence_btn.setEnabled(False)
+        self.duplicates_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+    
+    def _on_open_partials(self) -> None:
+        """Carga y combina los agregados parciales de un escaneo repartido"""
+        if self._running_worker() is not None:
+            QMessageBox.warning(self, "Error", "Hay un trabajo en progreso")
+            return
+        
+        from ..core.shards import PARTIAL_SUFFIX
+        paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Abrir Escaneo Repartido",
+            str(self._display_base() or Path.home()),
+            f"Agregados parciales (*{PARTIAL_SUFFIX})"
+        )
+        if not paths:
+            return
+        
+        self._clear_scan_results()
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage(f"Combinando {len(paths)} agregados parciales...")
+        
+        from ..workers.merge_worker import MergeWorker
+        self.merge_worker = MergeWorker([Path(path) for path in paths], search_index=self.search_index)
+        self.merge_worker.progress.connect(self._on_merge_progress)
+        self.merge_worker.finished.connect(self._on_merge_finished)
+        self.merge_worker.error.connect(self._on_merge_error)
+        self.merge_worker.start(self._worker_priority())
+        logger.info("Combinando %s agregados parciales", len(paths))
+    
+    def _on_merge_progress(self, current: int, total: int) -> None:
+        """Actualiza el progreso de la combinación"""
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+        self.status_bar.showMessage(f"Combinando: {current}/{total} agregados parciales")
+    
+    def _on_merge_finished(self, partial: object) -> None:
+        """Muestra el agregado combinado como el resultado de un escaneo"""
+        if partial is None:
+            self.global_search.setEnabled(True)
+            self.progress_bar.setVisible(False)
+            self.scan_btn.setEnabled(bool(self.directories))
+            return
+        
+        # Las raíces del escaneo repartido pasan a ser las actuales (al aplicar se releen de disco)
+        self.directories = list(partial.aggregator.roots)
+        self._update_dir_label()
+        self.scan_worker = None
+        self._on_scan_finished(partial.aggregator)
+        if partial.missing:
+            QMessageBox.warning(
+                self,
+                "Escaneo Incompleto",
+                f"Faltan los fragmentos {partial.missing} de {partial.shard_count}: "
+                f"los conteos no incluyen esos archivos."
+            )
+    
+    def _on_merge_error(self, error_message: str) -> None:
+        """Maneja errores de la combinación"""
+        self.status_bar.showMessage(f"Error: {error_message}")
+        QMessageBox.critical(self, "Error", f"Error al combinar agregados parciales:\n{error_message}")
+    
     def _on_scan_progress(self, current: int, total: int) -> None:
         """Actualiza el progreso del escaneo"""
         self.progress_bar.setMaximum(total)
@@ -270,45 +736,64 @@ class MainWindow(QMainWindow):
         """Maneja un archivo procesado"""
         pass  # Puede usarse para logging adicional
     
-    def _on_scan_finished(self, files_data: object) -> None:
+    def _on_scan_finished(self, aggregator: object) -> None:
         """Maneja la finalización del escaneo"""
-        # Convertir object a Dict[Path, TagFile]
-        if not isinstance(files_data, dict):
-            logger.error(f"Tipo inesperado recibido: {type(files_data)}")
+        self._set_job_controls_enabled(False)
+        # El worker ya sincronizó el índice global con los nuevos agregados
+        self.global_search.setEnabled(True)
+        self.global_search.refresh()
+        
+        if not isinstance(aggregator, TagAggregator):
+            logger.error("Tipo inesperado recibido: %s", type(aggregator))
             self.progress_bar.setVisible(False)
             self.status_bar.showMessage("Error: datos inválidos recibidos")
             self.scan_btn.setEnabled(True)
             return
         
-        self.files_data = files_data  # type: Dict[Path, TagFile]
+        # La agregación se hizo en el worker; en modo de bajo consumo no hay TagFile
+        self.aggregator = aggregator
+        self.files_data = aggregator.get_files()
         
-        if not files_data:
+        if not aggregator.file_count:
             self.progress_bar.setVisible(False)
             self.status_bar.showMessage("No se encontraron archivos .txt")
             self.scan_btn.setEnabled(True)
             QMessageBox.information(self, "Información", "No se encontraron archivos .txt")
             return
         
-        # Agregar archivos al agregador
-        for file_path, tag_file in files_data.items():
-            self.aggregator.add_file(file_path, tag_file.tags)
-        
         # Refrescar display
+        self._update_root_filter()
         self._refresh_tags_display()
         
         # Ocultar progreso
         self.progress_bar.setVisible(False)
+        io_report = self.scan_worker.io_report() if self.scan_worker else None
+        duplicates = self.scan_worker.content_duplicates if self.scan_worker else None
+        if duplicates is not None and duplicates.duplicate_files:
+            self.content_duplicates = duplicates
+            self.content_duplicates_action.setEnabled(True)
         self.status_bar.showMessage(
-            f"Escaneo completado: {len(files_data)} archivos, "
-            f"{sum(len(tf.tags) for tf in files_data.values())} tags totales"
+            f"Escaneo completado: {aggregator.file_count} archivos, "
+            f"{aggregator.total_occurrences} tags totales"
+            + (
+                f" | {duplicates.duplicate_files} con contenido repetido "
+                f"({duplicates.duplicate_files / duplicates.file_count:.0%})"
+                if self.content_duplicates else ""
+            )
+            + (f" | E/S: {io_report.describe()}" if io_report else "")
         )
+        if io_report:
+            logger.info("Rendimiento de E/S del escaneo: %s", io_report.describe())
         
         # Habilitar botones
         self.scan_btn.setEnabled(True)
         self.dry_run_btn.setEnabled(True)
         self.apply_btn.setEnabled(True)
+        self.cooccurrence_btn.setEnabled(True)
+        self.duplicates_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
         
-        logger.info(f"Escaneo completado: {len(files_data)} archivos")
+        logger.info("Escaneo completado: %s archivos", aggregator.file_count)
     
     def _on_scan_error(self, error_message: str) -> None:
         """Maneja errores del escaneo"""
@@ -316,22 +801,291 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(f"Error: {error_message}")
         self.scan_btn.setEnabled(True)
         QMessageBox.critical(self, "Error", f"Error durante el escaneo:\n{error_message}")
-        logger.error(f"Error en escaneo: {error_message}")
+        logger.error("Error en escaneo: %s", error_message)
+    
+    def _on_cooccurrence(self) -> None:
+        """Calcula (o reutiliza) el análisis de co-ocurrencia y muestra los candidatos"""
+        if not self.aggregator.file_count:
+            return
+        if self.cooccurrence is not None:
+            self._show_cooccurrence_dialog()
+            return
+        if self._running_worker() is not None:
+            QMessageBox.warning(self, "Error", "Hay un trabajo en progreso")
+            return
+        
+        # El agregador no debe cambiar mientras el worker lo recorre
+        self.scan_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.cooccurrence_btn.setEnabled(False)
+        self.duplicates_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage("Analizando co-ocurrencias...")
+        
+        from ..workers.cooccurrence_worker import CooccurrenceWorker
+        self.cooccurrence_worker = CooccurrenceWorker(self.aggregator)
+        self.cooccurrence_worker.progress.connect(self._on_cooccurrence_progress)
+        self.cooccurrence_worker.finished.connect(self._on_cooccurrence_finished)
+        self.cooccurrence_worker.error.connect(self._on_cooccurrence_error)
+        self.cooccurrence_worker.paused.connect(self._on_job_paused)
+        self.cooccurrence_worker.start(self._worker_priority())
+        self._set_job_controls_enabled(True)
+    
+    def _on_cooccurrence_progress(self, current: int, total: int) -> None:
+        """Actualiza el progreso del análisis"""
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+        self.status_bar.showMessage(f"Analizando co-ocurrencias: {current}/{total} tags")
+    
+    def _on_cooccurrence_finished(self, index: object) -> None:
+        """Guarda el índice y muestra los candidatos"""
+        self._set_job_controls_enabled(False)
+        self.progress_bar.setVisible(False)
+        self.scan_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        self.cooccurrence_btn.setEnabled(True)
+        self.duplicates_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        
+        from ..core.cooccurrence import CooccurrenceIndex
+        if not isinstance(index, CooccurrenceIndex):
+            self.status_bar.showMessage("Análisis de co-ocurrencia cancelado")
+            return
+        
+        self.cooccurrence = index
+        self.tag_detail.set_cooccurrence(index)
+        self.status_bar.showMessage(
+            f"Co-ocurrencias: {len(index)} tags analizados (backend {index.backend})"
+        )
+        self._show_cooccurrence_dialog()
+    
+    def _on_cooccurrence_error(self, error_message: str) -> None:
+        """Maneja errores del análisis"""
+        QMessageBox.critical(self, "Error", f"Error analizando co-ocurrencias:\n{error_message}")
+        logger.error("Error en co-ocurrencias: %s", error_message)
+    
+    def _show_cooccurrence_dialog(self) -> None:
+        """Muestra las implicaciones candidatas (ya calculadas y cacheadas)"""
+        worker = self.cooccurrence_worker
+        min_confidence = worker.min_confidence if worker else 0.95
+        min_support = worker.min_support if worker else 5
+        candidates = self.cooccurrence.implication_candidates(min_confidence, min_support)
+        from .cooccurrence_dialog import CooccurrenceDialog
+        dialog = CooccurrenceDialog(candidates, min_confidence, min_support, self)
+        dialog.rules_requested.connect(self._append_rewrite_rules)
+        dialog.exec()
+    
+    def _on_find_duplicates(self) -> None:
+        """Busca grupos de tags casi duplicados en background"""
+        if not self.aggregator.file_count:
+            return
+        if self._running_worker() is not None:
+            QMessageBox.warning(self, "Error", "Hay un trabajo en progreso")
+            return
+        
+        self.scan_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.cooccurrence_btn.setEnabled(False)
+        self.duplicates_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage("Buscando duplicados...")
+        
+        from ..workers.duplicate_worker import DuplicateWorker
+        self.duplicate_worker = DuplicateWorker(list(self.aggregator.iter_aggregates()))
+        self.duplicate_worker.progress.connect(self._on_duplicates_progress)
+        self.duplicate_worker.finished.connect(self._on_duplicates_finished)
+        self.duplicate_worker.error.connect(self._on_duplicates_error)
+        self.duplicate_worker.paused.connect(self._on_job_paused)
+        self.duplicate_worker.start(self._worker_priority())
+        self._set_job_controls_enabled(True)
+    
+    def _on_duplicates_progress(self, current: int, total: int) -> None:
+        """Actualiza el progreso de la búsqueda de duplicados"""
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+        self.status_bar.showMessage(f"Buscando duplicados: {current}/{total} tags")
+    
+    def _on_duplicates_finished(self, groups: object) -> None:
+        """Muestra los grupos encontrados"""
+        self._set_job_controls_enabled(False)
+        self.progress_bar.setVisible(False)
+        self.scan_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        self.cooccurrence_btn.setEnabled(True)
+        self.duplicates_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        
+        if groups is None:
+            self.status_bar.showMessage("Búsqueda de duplicados cancelada")
+            return
+        if not groups:
+            self.status_bar.showMessage("No se encontraron tags duplicados")
+            return
+        
+        self.status_bar.showMessage(f"{len(groups)} grupos de tags duplicados")
+        from .duplicates_dialog import DuplicatesDialog
+        dialog = DuplicatesDialog(groups, self)
+        dialog.rules_requested.connect(self._append_rewrite_rules)
+        dialog.marks_requested.connect(self._mark_keys)
+        dialog.exec()
+    
+    def _on_duplicates_error(self, error_message: str) -> None:
+        """Maneja errores de la búsqueda de duplicados"""
+        QMessageBox.critical(self, "Error", f"Error buscando duplicados:\n{error_message}")
+        logger.error("Error en búsqueda de duplicados: %s", error_message)
+    
+    def _on_export(self) -> None:
+        """Exporta los agregados (y opcionalmente la relación archivo ↔ tag) en background"""
+        if not self.aggregator.file_count:
+            return
+        if self._running_worker() is not None:
+            QMessageBox.warning(self, "Error", "Hay un trabajo en progreso")
+            return
+        
+        from ..core.export import ExportFormat, available_formats, format_from_path, relation_path_for
+        filters = {
+            ExportFormat.CSV: "CSV (*.csv)",
+            ExportFormat.JSONL: "JSON Lines (*.jsonl)",
+            ExportFormat.PARQUET: "Parquet (*.parquet)"
+        }
+        formats = available_formats()
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Resultados",
+            str((self._display_base() or Path.home()) / "tags.csv"),
+            ";;".join(filters[fmt] for fmt in formats)
+        )
+        if not path:
+            return
+        
+        path = Path(path)
+        fmt = format_from_path(path)
+        if fmt is None:
+            # Sin extensión reconocida: la del filtro elegido
+            fmt = next((name for name in formats if filters[name] == selected_filter), ExportFormat.CSV)
+            path = path.with_name(f"{path.name}.{fmt}")
+        if fmt not in formats:
+            QMessageBox.warning(self, "Error", "La exportación a Parquet requiere pyarrow (pip install pyarrow)")
+            return
+        
+        relation_path = relation_path_for(path)
+        reply = QMessageBox.question(
+            self,
+            "Relación Archivo ↔ Tag",
+            f"¿Exportar también la relación archivo ↔ tag ({self.aggregator.relation_size:,} filas) "
+            f"a {relation_path.name}?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
+            QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Cancel:
+            return
+        if reply != QMessageBox.StandardButton.Yes:
+            relation_path = None
+        
+        # El agregador no debe cambiar mientras el worker lo recorre
+        self.scan_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.cooccurrence_btn.setEnabled(False)
+        self.duplicates_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage("Exportando resultados...")
+        
+        from ..workers.export_worker import ExportWorker
+        self.export_worker = ExportWorker(self.aggregator, path, fmt, relation_path)
+        self.export_worker.progress.connect(self._on_export_progress)
+        self.export_worker.finished.connect(self._on_export_finished)
+        self.export_worker.error.connect(self._on_export_error)
+        self.export_worker.paused.connect(self._on_job_paused)
+        self.export_worker.start(self._worker_priority())
+        self._set_job_controls_enabled(True)
+    
+    def _on_export_progress(self, current: int, total: int) -> None:
+        """Actualiza el progreso de la exportación"""
+        # QProgressBar usa int de 32 bits: escalar a porcentaje
+        self.progress_bar.setMaximum(100)
+        self.progress_bar.setValue(int(current * 100 / total) if total else 100)
+        self.status_bar.showMessage(f"Exportando: {current:,}/{total:,} filas")
+    
+    def _on_export_finished(self, summary: object) -> None:
+        """Informa del resultado de la exportación"""
+        self._set_job_controls_enabled(False)
+        self.progress_bar.setVisible(False)
+        self.scan_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        self.cooccurrence_btn.setEnabled(True)
+        self.duplicates_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        
+        if summary is None:
+            self.status_bar.showMessage("Exportación fallida")
+            return
+        if summary.cancelled:
+            self.status_bar.showMessage("Exportación cancelada")
+            return
+        self.status_bar.showMessage(f"Exportados {summary.describe()}")
+    
+    def _on_export_error(self, error_message: str) -> None:
+        """Maneja errores de la exportación"""
+        QMessageBox.critical(self, "Error", f"Error exportando resultados:\n{error_message}")
+        logger.error("Error en exportación: %s", error_message)
+    
+    def _mark_keys(self, keys: object) -> None:
+        """Marca tags para remover desde fuera de las pestañas (ej: diálogo de duplicados)"""
+        namespaces = set()
+        for namespace, tag in keys:
+            self.marked_tags.add((namespace, tag))
+            namespaces.add(namespace)
+        for namespace in namespaces:
+            tab = self.namespace_tabs.get(namespace)
+            if tab is not None:
+                tab.refresh_marks()
+        self.status_bar.showMessage(f"{len(keys)} tags marcados para remover")
+    
+    def _append_rewrite_rules(self, rules: str) -> None:
+        """Añade reglas al final del editor de reglas de reescritura"""
+        current = self.rewrite_rules_edit.toPlainText().rstrip("\n")
+        self.rewrite_rules_edit.setPlainText(f"{current}\n{rules}" if current else rules)
+        self.status_bar.showMessage(f"{len(rules.splitlines())} reglas añadidas")
+    
+    def _on_tag_selected(self, namespace: str, tag: str) -> None:
+        """Muestra en el panel de detalle los archivos del tag seleccionado"""
+        self.tag_detail.show_tag(self.aggregator, namespace, tag, self._display_base())
+    
+    def _on_global_tag_activated(self, namespace: str, tag: str) -> None:
+        """Salta a la pestaña del tag elegido en la búsqueda global"""
+        tab = self.namespace_tabs.get(namespace)
+        if tab is not None:
+            self.namespace_tabs_widget.setCurrentWidget(tab)
+            if tab.reveal_tag(tag):
+                return
+        self.status_bar.showMessage(
+            f"{format_tag(namespace, tag)} está oculto por los filtros (threshold o prohibidos)"
+        )
     
     def _refresh_tags_display(self) -> None:
         """Refresca la visualización de tags"""
-        # Obtener agregados
-        all_aggregates = self.aggregator.get_aggregates()
-        
-        # Filtrar
-        filtered_aggregates = self.filter.filter(all_aggregates)
+        with _REFRESH_TIMER.time():
+            self._update_namespace_tabs()
+    
+    def _update_namespace_tabs(self) -> None:
+        """Filtra los agregados y actualiza las pestañas de namespaces"""
+        # Filtrar sin ordenar: cada pestaña ordena su modelo al mostrarse
+        root = self.root_combo.currentData()  # None = todas las raíces
+        filtered_aggregates = self.filter.filter(self.aggregator.iter_aggregates(root))
         
         # Agrupar por namespace
         namespace_groups: Dict[str, List[TagAggregate]] = {}
         for agg in filtered_aggregates:
-            if agg.namespace not in namespace_groups:
-                namespace_groups[agg.namespace] = []
-            namespace_groups[agg.namespace].append(agg)
+            group = namespace_groups.get(agg.namespace)
+            if group is None:
+                group = namespace_groups[agg.namespace] = []
+            group.append(agg)
         
         # Actualizar tabs
         current_tabs = set(self.namespace_tabs.keys())
@@ -343,11 +1097,14 @@ class MainWindow(QMainWindow):
             idx = self.namespace_tabs_widget.indexOf(tab)
             if idx >= 0:
                 self.namespace_tabs_widget.removeTab(idx)
+            tab.deleteLater()
         
-        # Añadir/actualizar tabs
-        for namespace, aggregates in namespace_groups.items():
+        # Añadir/actualizar tabs; solo la pestaña visible construye su modelo,
+        # las demás quedan pendientes hasta activarse
+        for namespace in sorted(namespace_groups):
             if namespace not in self.namespace_tabs:
-                tab = NamespaceTab(namespace, self)
+                tab = NamespaceTab(namespace, self.marked_tags, self)
+                tab.tag_selected.connect(self._on_tag_selected)
                 self.namespace_tabs[namespace] = tab
                 # Ordenar nombres de tabs: general primero, luego alfabético
                 if namespace == "general":
@@ -355,7 +1112,7 @@ class MainWindow(QMainWindow):
                 else:
                     self.namespace_tabs_widget.addTab(tab, namespace)
             
-            self.namespace_tabs[namespace].set_aggregates(aggregates)
+            self.namespace_tabs[namespace].set_aggregates(namespace_groups[namespace])
         
         # Actualizar estado
         total_tags = len(filtered_aggregates)
@@ -365,87 +1122,178 @@ class MainWindow(QMainWindow):
             f"(threshold={self.filter.threshold})"
         )
     
-    def _on_dry_run(self) -> None:
-        """Ejecuta un dry-run para mostrar vista previa"""
-        if not self.files_data:
-            QMessageBox.warning(self, "Error", "Primero debe escanear archivos")
+    def _on_show_diagnostics(self) -> None:
+        """Muestra las métricas internas (no modal: se actualiza durante los trabajos)"""
+        from .diagnostics_dialog import DiagnosticsDialog
+        dialog = DiagnosticsDialog(metrics, self)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
+    
+    def _on_lag_updated(self, lag_ms: float) -> None:
+        """Muestra el mayor retraso del último segundo en la barra de estado"""
+        self.lag_label.setText(f"UI: {lag_ms:.0f} ms")
+        if lag_ms >= self._stall_threshold_ms:
+            self.lag_label.setStyleSheet("color: #c62828; font-weight: bold;")
+        else:
+            self.lag_label.setStyleSheet("")
+        self.lag_label.setToolTip(self.event_loop_monitor.stats().describe())
+    
+    def _on_stall_detected(self, duration_ms: float, location: str) -> None:
+        """Informa de un bloqueo de la interfaz ya terminado"""
+        self.status_bar.showMessage(f"La interfaz estuvo bloqueada {duration_ms:.0f} ms en {location}", 10000)
+    
+    def _on_show_content_duplicates(self) -> None:
+        """Muestra los grupos de archivos con el mismo contenido del último escaneo"""
+        if self.content_duplicates is None:
             return
-        
-        # Obtener tags marcados para remover
+        from .duplicate_files_dialog import DuplicateFilesDialog
+        DuplicateFilesDialog(self.content_duplicates, self._display_base(), self).exec()
+    
+    def _on_show_latency(self) -> None:
+        """Muestra el resumen de latencia y los handlers que más bloquean"""
+        if self.event_loop_monitor is None:
+            return
+        QMessageBox.information(
+            self,
+            "Latencia de la Interfaz",
+            self.event_loop_monitor.stats().describe()
+            + "\n\nLa pila de cada bloqueo queda en el log (logs/tag_editor.log)."
+        )
+    
+    def _on_profile_toggled(self, enabled: bool) -> None:
+        """Activa el perfilado de los próximos escaneos y aplicaciones"""
+        self._profile_jobs = enabled
+        logger.info("Perfilado de trabajos %s", "activado" if enabled else "desactivado")
+    
+    def _on_profile_saved(self, report_path: str) -> None:
+        """Informa dónde quedó el perfil del último trabajo"""
+        self.status_bar.showMessage(f"Perfil guardado en {report_path}")
+    
+    def _build_rewrite_plan(self) -> Optional[RewritePlan]:
+        """
+        Construye el plan de reescritura a partir de las reglas, los tags
+        marcados y los tags prohibidos
+        
+        Returns:
+            RewritePlan o None si las reglas no son válidas
+        """
+        try:
+            plan = RewritePlan.parse_rules(self.rewrite_rules_edit.toPlainText())
+        except ValueError as e:
+            QMessageBox.warning(self, "Reglas inválidas", str(e))
+            return None
+        
+        # Las reglas escritas alcanzan todas las grafías, como las marcas
+        if self.aggregator.normalizer is not None:
+            plan.expand_keys(lambda key: self.aggregator.get_variant_keys(*key))
+        
+        # Grafías -> forma canónica; las reglas escritas tienen prioridad
+        if self.aggregator.normalizer is not None and self.canonicalize_check.isChecked():
+            canonical = RewritePlan.from_variants(self.aggregator.iter_aggregates())
+            canonical.update(plan)
+            plan = canonical
+        
+        # Tags marcados para remover (conjunto compartido por las pestañas),
+        # con todas sus grafías si el escaneo normalizó los tags
         tags_to_remove: Set[tuple[str, str]] = set()
-        
-        for tab in self.namespace_tabs.values():
-            marked = tab.get_marked_tags()
-            tags_to_remove.update(marked)
+        for namespace, tag in self.marked_tags:
+            tags_to_remove.update(self.aggregator.get_variant_keys(namespace, tag))
         
         # También incluir banned tags
-        for agg in self.aggregator.get_aggregates():
+        for agg in self.aggregator.iter_aggregates():
             if self.filter.is_banned(agg.namespace, agg.tag):
-                tags_to_remove.add((agg.namespace, agg.tag))
+                tags_to_remove.update(self.aggregator.get_variant_keys(agg.namespace, agg.tag))
+        
+        # Las marcas explícitas tienen prioridad sobre las reglas
+        plan.update(RewritePlan.from_removals(tags_to_remove))
+        return plan
+    
+    def _build_normalizer(self) -> Optional[TagNormalizer]:
+        """Normalizador configurado en el panel, o None si está desactivado"""
+        if not self.normalize_group.isChecked():
+            return None
+        rule = NormalizationRule(
+            casefold=self.casefold_check.isChecked(),
+            nfkc=self.nfkc_check.isChecked(),
+            fold_separators=self.separators_check.isChecked()
+        )
+        if rule.is_identity():
+            return None
+        excluded = [
+            namespace.strip()
+            for namespace in self.normalize_exclude_edit.text().split(',')
+            if namespace.strip()
+        ]
+        return TagNormalizer.excluding(excluded, rule)
+    
+    def _on_dry_run(self) -> None:
+        """Ejecuta un dry-run en background y muestra la vista previa"""
+        if not self.aggregator.file_count:
+            QMessageBox.warning(self, "Error", "Primero debe escanear archivos")
+            return
+        
+        plan = self._build_rewrite_plan()
+        if plan is None:
+            return
         
-        if not tags_to_remove:
+        if plan.is_empty():
             QMessageBox.information(
                 self,
                 "Dry-run",
-                "No hay tags marcados para remover"
+                "No hay tags marcados para remover ni reglas de reescritura"
             )
             return
         
-        # Calcular estadísticas
-        files_to_modify = set()
-        total_tags_to_remove = 0
-        
-        for file_path, tag_file in self.files_data.items():
-            file_tags_to_remove = sum(
-                1 for tag in tag_file.tags
-                if (tag.namespace, tag.tag) in tags_to_remove
-            )
-            if file_tags_to_remove > 0:
-                files_to_modify.add(file_path)
-                total_tags_to_remove += file_tags_to_remove
+        # El diálogo recibe los cambios por archivo a medida que el worker los calcula
+        from .dry_run_dialog import DryRunDialog
+        from ..workers.dry_run_worker import DryRunWorker
+        dialog = DryRunDialog(plan, self.files_data, self._display_base(), self)
         
-        # Mostrar resumen
-        message = (
-            f"Vista Previa (Dry-run):\n\n"
-            f"Tags a remover: {len(tags_to_remove)}\n"
-            f"Archivos a modificar: {len(files_to_modify)}\n"
-            f"Total de tags removidos: {total_tags_to_remove}\n\n"
-            f"¿Desea proceder con la aplicación?"
+        self.dry_run_worker = DryRunWorker(
+            self._get_candidate_files(plan),
+            plan,
+            files_data=self.files_data,
+            scheduler=self.io_scheduler
         )
+        self.dry_run_worker.progress.connect(dialog.set_progress)
+        self.dry_run_worker.batch_ready.connect(dialog.add_rewrites)
+        self.dry_run_worker.finished.connect(dialog.set_finished)
+        self.dry_run_worker.error.connect(self._on_dry_run_error)
+        self.dry_run_worker.start()
         
-        reply = QMessageBox.question(
-            self,
-            "Dry-run",
-            message,
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-        )
+        logger.info("Dry-run iniciado: %s", plan.describe())
+        
+        accepted = dialog.exec() == QDialog.DialogCode.Accepted
         
-        if reply == QMessageBox.StandardButton.Yes:
-            self._on_apply()
+        # Si el usuario cerró antes de terminar, detener el worker
+        self.dry_run_worker.cancel()
+        self.dry_run_worker.wait()
+        modified_files = dialog.modified_files()
+        dialog.deleteLater()
+        
+        if accepted:
+            self._start_apply(plan, modified_files)
+    
+    def _on_dry_run_error(self, error_message: str) -> None:
+        """Maneja errores del dry-run"""
+        QMessageBox.critical(self, "Error", f"Error durante el dry-run:\n{error_message}")
+        logger.error("Error en dry-run: %s", error_message)
     
     def _on_apply(self) -> None:
         """Aplica los cambios a los archivos"""
-        if not self.files_data:
+        if not self.aggregator.file_count:
             QMessageBox.warning(self, "Error", "Primero debe escanear archivos")
             return
         
-        # Obtener tags marcados para remover
-        tags_to_remove: Set[tuple[str, str]] = set()
-        
-        for tab in self.namespace_tabs.values():
-            marked = tab.get_marked_tags()
-            tags_to_remove.update(marked)
-        
-        # También incluir banned tags
-        for agg in self.aggregator.get_aggregates():
-            if self.filter.is_banned(agg.namespace, agg.tag):
-                tags_to_remove.add((agg.namespace, agg.tag))
+        plan = self._build_rewrite_plan()
+        if plan is None:
+            return
         
-        if not tags_to_remove:
+        if plan.is_empty():
             QMessageBox.information(
                 self,
                 "Aplicar",
-                "No hay tags marcados para remover"
+                "No hay tags marcados para remover ni reglas de reescritura"
             )
             return
         
@@ -454,7 +1302,7 @@ class MainWindow(QMainWindow):
             self,
             "Confirmar Aplicación",
             (
-                f"Se removerán {len(tags_to_remove)} tags.\n"
+                f"Plan: {plan.describe()}.\n"
                 f"Se crearán backups antes de modificar archivos.\n\n"
                 f"¿Desea continuar?"
             ),
@@ -464,16 +1312,41 @@ class MainWindow(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        # Calcular archivos a modificar
+        # Calcular archivos a modificar (en modo de bajo consumo, los candidatos)
         files_to_modify = []
-        for file_path, tag_file in self.files_data.items():
-            has_tags_to_remove = any(
-                (tag.namespace, tag.tag) in tags_to_remove
-                for tag in tag_file.tags
-            )
-            if has_tags_to_remove:
-                files_to_modify.append(file_path)
-        
+        for file_path in self._get_candidate_files(plan):
+            tag_file = self.files_data.get(file_path)
+            if tag_file is not None:
+                _, rewrite = plan.rewrite_file(file_path, tag_file.tags)
+                if not rewrite.modified:
+                    continue
+            files_to_modify.append(file_path)
+        
+        self._start_apply(plan, files_to_modify)
+    
+    def _get_candidate_files(self, plan: RewritePlan) -> List[Path]:
+        """
+        Archivos que el plan puede modificar, según las postings del agregador
+        
+        Args:
+            plan: Plan de reescritura
+        
+        Returns:
+            Rutas en el orden de escaneo
+        """
+        return self.aggregator.get_files_for_keys(
+            plan.source_keys(),
+            all_files=bool(plan.additions)
+        )
+    
+    def _start_apply(self, plan: RewritePlan, files_to_modify: List[Path]) -> None:
+        """
+        Crea el backup y lanza el worker de aplicación
+        
+        Args:
+            plan: Plan de reescritura a aplicar
+            files_to_modify: Archivos que el plan modifica
+        """
         if not files_to_modify:
             QMessageBox.information(
                 self,
@@ -482,13 +1355,15 @@ class MainWindow(QMainWindow):
             )
             return
         
-        # Crear backup
+        # Crear backup (uno en cada raíz afectada)
+        from ..utils.backup import create_root_backups
+        backup_dirs: List[Path] = []
         try:
-            backup_dir = create_backup(files_to_modify, self.directory)
+            backup_dirs = create_root_backups(files_to_modify, self.directories)
             QMessageBox.information(
                 self,
                 "Backup Creado",
-                f"Backup creado en:\n{backup_dir}"
+                "Backup creado en:\n" + "\n".join(str(backup_dir) for backup_dir in backup_dirs)
             )
         except Exception as e:
             reply = QMessageBox.critical(
@@ -500,25 +1375,143 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.No:
                 return
         
+        # Crear y ejecutar worker (solo sobre los archivos afectados)
+        from ..workers.apply_worker import ApplyWorker
+        self._run_apply_worker(
+            ApplyWorker(
+                files_to_modify,
+                plan,
+                files_data=self.files_data,
+                checkpoint=self._get_checkpoint("apply"),
+                backup_dirs=backup_dirs,
+                scheduler=self.io_scheduler
+            )
+        )
+        
+        logger.info("Aplicando cambios: %s", plan.describe())
+    
+    def _run_apply_worker(self, worker: "ApplyWorker") -> None:
+        """Conecta y lanza un worker de aplicación"""
         # Deshabilitar botones
         self.apply_btn.setEnabled(False)
         self.dry_run_btn.setEnabled(False)
         self.scan_btn.setEnabled(False)
+        self.cooccurrence_btn.setEnabled(False)
+        self.duplicates_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
         
         # Mostrar progreso
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.status_bar.showMessage("Aplicando cambios...")
         
-        # Crear y ejecutar worker
-        self.apply_worker = ApplyWorker(self.files_data, tags_to_remove)
+        self.apply_worker = worker
         self.apply_worker.progress.connect(self._on_apply_progress)
         self.apply_worker.file_processed.connect(self._on_file_processed_apply)
         self.apply_worker.finished.connect(self._on_apply_finished)
         self.apply_worker.error.connect(self._on_apply_error)
-        self.apply_worker.start()
+        self.apply_worker.paused.connect(self._on_job_paused)
+        self.apply_worker.profile_saved.connect(self._on_profile_saved)
+        self.apply_worker.profile = self._profile_jobs
+        self.apply_worker.start(self._worker_priority())
+        self._set_job_controls_enabled(True)
+    
+    def _offer_resume_apply(self) -> None:
+        """Ofrece reanudar una aplicación interrumpida del directorio actual"""
+        checkpoint = self._get_checkpoint("apply")
+        state = checkpoint.load()
+        if not state:
+            return
+        
+        cursor = state.get("cursor", 0)
+        file_count = state.get("file_count", 0)
+        # Los checkpoints anteriores guardaban un único backup_dir
+        backup_dirs = state.get("backup_dirs") or ([state["backup_dir"]] if state.get("backup_dir") else [])
+        reply = QMessageBox.question(
+            self,
+            "Reanudar Aplicación",
+            (
+                f"Hay una aplicación de cambios interrumpida en este directorio "
+                f"({cursor}/{file_count} archivos procesados).\n"
+                f"Backup: {', '.join(backup_dirs) or 'no disponible'}\n\n"
+                f"¿Desea reanudarla? (No descarta el avance guardado)"
+            ),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            checkpoint.clear()
+            return
         
-        logger.info(f"Aplicando cambios: {len(tags_to_remove)} tags a remover")
+        # Reanudar sin re-escanear: el worker relee de disco los archivos pendientes
+        plan = RewritePlan.from_dict(state["plan"])
+        files = [Path(record["p"]) for record in checkpoint.iter_partial(file_count)]
+        from ..workers.apply_worker import ApplyWorker
+        self._run_apply_worker(
+            ApplyWorker(
+                files,
+                plan,
+                checkpoint=checkpoint,
+                backup_dirs=[Path(backup_dir) for backup_dir in backup_dirs],
+                scheduler=self.io_scheduler
+            )
+        )
+        logger.info("Reanudando aplicación: %s/%s archivos", cursor, file_count)
+    
+    def _get_checkpoint(self, job: str) -> "JobCheckpoint":
+        """Checkpoint del trabajo indicado para las raíces actuales"""
+        from ..utils.checkpoint import JobCheckpoint, checkpoint_key
+        from ..utils.path_utils import roots_key
+        return JobCheckpoint(job, checkpoint_key(roots_key(self.directories)))
+    
+    def _running_worker(self):
+        """Retorna el worker de escaneo, aplicación o análisis en curso, si hay alguno"""
+        for worker in (
+            self.scan_worker, self.apply_worker, self.cooccurrence_worker, self.duplicate_worker, self.export_worker,
+            self.merge_worker
+        ):
+            if worker is not None and worker.isRunning():
+                return worker
+        return None
+    
+    def _set_job_controls_enabled(self, enabled: bool) -> None:
+        """Habilita los controles de pausa/cancelación"""
+        self.pause_btn.setEnabled(enabled)
+        self.cancel_btn.setEnabled(enabled)
+        self.pause_btn.setText("Pausar")
+    
+    def _on_pause_resume(self) -> None:
+        """Pausa o reanuda el trabajo en curso"""
+        worker = self._running_worker()
+        if worker is None:
+            return
+        if worker.is_paused():
+            worker.resume()
+        else:
+            worker.pause()
+    
+    def _on_job_paused(self, paused: bool) -> None:
+        """Actualiza la interfaz al pausar/reanudar"""
+        self.pause_btn.setText("Reanudar" if paused else "Pausar")
+        if paused:
+            self.status_bar.showMessage("Trabajo en pausa (se puede cerrar y reanudar más tarde)")
+    
+    def _on_cancel_job(self) -> None:
+        """Cancela el trabajo en curso (el avance queda guardado)"""
+        worker = self._running_worker()
+        if worker is not None:
+            worker.cancel()
+            self.status_bar.showMessage("Cancelando... el avance queda guardado para reanudar")
+    
+    def closeEvent(self, event) -> None:
+        """Detiene los workers guardando su checkpoint antes de cerrar"""
+        worker = self._running_worker()
+        if worker is not None:
+            worker.cancel()
+            worker.wait()
+        if self.event_loop_monitor is not None:
+            self.event_loop_monitor.stop()
+            logger.info("%s", self.event_loop_monitor.stats().describe())
+        super().closeEvent(event)
     
     def _on_apply_progress(self, current: int, total: int) -> None:
         """Actualiza el progreso de la aplicación"""
@@ -530,12 +1523,13 @@ class MainWindow(QMainWindow):
         """Maneja un archivo procesado durante la aplicación"""
         pass
     
-    def _on_apply_finished(self, files_modified: int, tags_removed: int) -> None:
+    def _on_apply_finished(self, summary: RewriteSummary) -> None:
         """Maneja la finalización de la aplicación"""
+        self._set_job_controls_enabled(False)
         self.progress_bar.setVisible(False)
         self.status_bar.showMessage(
-            f"Aplicación completada: {files_modified} archivos modificados, "
-            f"{tags_removed} tags removidos"
+            f"Aplicación completada: {summary.files_modified} archivos modificados, "
+            f"{summary.tags_removed} tags removidos"
         )
         
         # Habilitar botones
@@ -543,19 +1537,40 @@ class MainWindow(QMainWindow):
         self.dry_run_btn.setEnabled(True)
         self.apply_btn.setEnabled(True)
         
+        io_report = self.apply_worker.io_report() if self.apply_worker else None
+        if self.apply_worker is not None and self.apply_worker.is_cancelled():
+            QMessageBox.information(
+                self,
+                "Aplicación Interrumpida",
+                (
+                    f"Aplicación interrumpida tras {summary.files_processed} archivos "
+                    f"({summary.files_modified} modificados).\n\n"
+                    f"El avance quedó guardado: al volver a seleccionar el directorio "
+                    f"se ofrecerá reanudarla."
+                )
+            )
+            logger.info("Aplicación interrumpida: %s archivos procesados", summary.files_processed)
+            return
+        
         QMessageBox.information(
             self,
             "Aplicación Completada",
             (
                 f"Cambios aplicados exitosamente:\n\n"
-                f"Archivos modificados: {files_modified}\n"
-                f"Tags removidos: {tags_removed}"
+                f"Archivos modificados: {summary.files_modified}\n"
+                f"Tags removidos: {summary.tags_removed}\n"
+                f"Tags reemplazados: {summary.tags_replaced}\n"
+                f"Tags añadidos: {summary.tags_added}"
+                + (f"\n\nE/S: {io_report.describe()}" if io_report else "")
             )
         )
+        if io_report:
+            logger.info("Rendimiento de E/S de la aplicación: %s", io_report.describe())
         
         logger.info(
-            f"Aplicación completada: {files_modified} archivos, "
-            f"{tags_removed} tags removidos"
+            "Aplicación completada: %s archivos, "
+            "%s tags removidos",
+            summary.files_modified, summary.tags_removed
         )
         
         # Recargar para reflejar cambios
@@ -568,5 +1583,8 @@ class MainWindow(QMainWindow):
         self.scan_btn.setEnabled(True)
         self.dry_run_btn.setEnabled(True)
         self.apply_btn.setEnabled(True)
+        self.cooccurrence_btn.setEnabled(True)
+        self.duplicates_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
         QMessageBox.critical(self, "Error", f"Error durante la aplicación:\n{error_message}")
-        logger.error(f"Error en aplicación: {error_message}")
+        logger.error("Error en aplicación: %s", error_message)
@@ -1,29 +1,46 @@
 """Widget de pestaña para mostrar tags de un namespace"""
 
-from typing import List
+from typing import List, Optional, Set, Tuple
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLineEdit, QTableView, QHeaderView
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QTableView, QHeaderView,
+    QPushButton, QAbstractItemView, QInputDialog
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QModelIndex, Signal
 
 from ..models.tag_models import TagAggregate
-from .tag_table_model import TagTableModel
+from .tag_table_model import TagTableModel, MarkAction
+
+# Espera tras la última tecla antes de filtrar
+SEARCH_DEBOUNCE_MS = 150
 
 
 class NamespaceTab(QWidget):
-    """Widget de pestaña para un namespace específico"""
+    """
+    Widget de pestaña para un namespace específico
+    
+    La pestaña solo guarda una referencia a los agregados de su namespace; el
+    modelo se construye y ordena al mostrarse por primera vez, y las pestañas
+    ocultas se marcan como pendientes en lugar de reconstruirse.
+    """
+    
+    tag_selected = Signal(str, str)  # namespace, tag de la fila actual
     
-    def __init__(self, namespace: str, parent=None):
+    def __init__(self, namespace: str, marked_keys: Optional[Set[Tuple[str, str]]] = None, parent=None):
         """
         Inicializa la pestaña
         
         Args:
             namespace: Nombre del namespace
+            marked_keys: Conjunto de claves marcadas compartido entre pestañas
             parent: Widget padre
         """
         super().__init__(parent)
         self.namespace = namespace
+        self._marked_keys: Set[Tuple[str, str]] = marked_keys if marked_keys is not None else set()
+        self._aggregates: List[TagAggregate] = []
+        self._dirty = False
+        self.model: Optional[TagTableModel] = None
         self._setup_ui()
     
     def _setup_ui(self) -> None:
@@ -34,14 +51,60 @@ class NamespaceTab(QWidget):
         
         # Campo de búsqueda
         self.search_field = QLineEdit()
-        self.search_field.setPlaceholderText("Buscar tags...")
+        self.search_field.setPlaceholderText("Buscar tags... (* y ? como comodines)")
         self.search_field.textChanged.connect(self._on_search_changed)
+        self.search_field.returnPressed.connect(self._apply_search)
         layout.addWidget(self.search_field)
         
-        # Tabla de tags
+        # Búsqueda con debounce: se filtra al dejar de escribir
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._apply_search)
+        
+        # Marcado en bloque
+        marks_layout = QHBoxLayout()
+        marks_layout.setSpacing(5)
+        
+        mark_visible_btn = QPushButton("Marcar visibles")
+        mark_visible_btn.setToolTip("Marca todos los tags que coinciden con la búsqueda")
+        mark_visible_btn.clicked.connect(lambda: self._mark_visible(MarkAction.MARK))
+        marks_layout.addWidget(mark_visible_btn)
+        
+        unmark_visible_btn = QPushButton("Desmarcar visibles")
+        unmark_visible_btn.clicked.connect(lambda: self._mark_visible(MarkAction.UNMARK))
+        marks_layout.addWidget(unmark_visible_btn)
+        
+        invert_visible_btn = QPushButton("Invertir visibles")
+        invert_visible_btn.clicked.connect(lambda: self._mark_visible(MarkAction.INVERT))
+        marks_layout.addWidget(invert_visible_btn)
+        
+        mark_selection_btn = QPushButton("Marcar selección")
+        mark_selection_btn.clicked.connect(self._mark_selection)
+        marks_layout.addWidget(mark_selection_btn)
+        
+        mark_pattern_btn = QPushButton("Marcar por patrón...")
+        mark_pattern_btn.setToolTip("Marca todos los tags del namespace que coinciden con un patrón")
+        mark_pattern_btn.clicked.connect(self._mark_by_pattern)
+        marks_layout.addWidget(mark_pattern_btn)
+        
+        marks_layout.addStretch()
+        layout.addLayout(marks_layout)
+        
+        # Tabla de tags (el modelo se crea al mostrar la pestaña)
         self.table_view = QTableView()
-        self.model = TagTableModel(self)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.table_view)
+    
+    def _ensure_model(self) -> TagTableModel:
+        """Crea el modelo y configura la tabla la primera vez"""
+        if self.model is not None:
+            return self.model
+        
+        self.model = TagTableModel(self._marked_keys, self)
         self.table_view.setModel(self.model)
+        self.table_view.selectionModel().currentRowChanged.connect(self._on_current_row_changed)
         
         # Configurar columnas
         self.table_view.setColumnWidth(0, 30)  # Checkbox
@@ -55,22 +118,121 @@ class NamespaceTab(QWidget):
         
         # Habilitar ordenamiento
         self.table_view.setSortingEnabled(True)
-        self.table_view.sortByColumn(1, Qt.SortOrder.DescendingOrder)  # Ordenar por count desc
+        self.table_view.sortByColumn(TagTableModel.COLUMN_COUNT, Qt.SortOrder.DescendingOrder)  # Ordenar por count desc
         
-        layout.addWidget(self.table_view)
+        return self.model
+    
+    def _populate(self) -> None:
+        """Carga los agregados pendientes en el modelo"""
+        model = self._ensure_model()
+        self._search_timer.stop()
+        model.set_aggregates(self._aggregates)
+        model.filter_by_text(self.search_field.text())
+        self._dirty = False
+    
+    def showEvent(self, event) -> None:
+        """Construye o actualiza el modelo al activar la pestaña"""
+        super().showEvent(event)
+        if self._dirty:
+            self._populate()
     
     def _on_search_changed(self, text: str) -> None:
-        """Maneja cambios en el campo de búsqueda"""
-        self.model.filter_by_text(text)
+        """Maneja cambios en el campo de búsqueda (reinicia el debounce)"""
+        self._search_timer.start()
+    
+    def _apply_search(self) -> None:
+        """Filtra el modelo con el texto actual"""
+        self._search_timer.stop()
+        if self.model is not None and not self._dirty:
+            self.model.filter_by_text(self.search_field.text())
+    
+    def _on_current_row_changed(self, current: QModelIndex, previous: QModelIndex) -> None:
+        """Notifica el tag de la fila actual"""
+        agg = self.model.aggregate_at(current.row())
+        if agg is not None:
+            self.tag_selected.emit(agg.namespace, agg.tag)
+    
+    def _active_model(self) -> Optional[TagTableModel]:
+        """Modelo poblado y actualizado, o None si la pestaña está pendiente"""
+        if self.model is None or self._dirty:
+            return None
+        return self.model
+    
+    def _mark_visible(self, action: str) -> None:
+        """Aplica una operación de marcado a todas las filas visibles"""
+        model = self._active_model()
+        if model is not None:
+            model.mark_visible(action)
+    
+    def _mark_selection(self) -> None:
+        """Marca las filas seleccionadas"""
+        model = self._active_model()
+        if model is None:
+            return
+        rows = [index.row() for index in self.table_view.selectionModel().selectedRows()]
+        model.mark_rows(rows, MarkAction.MARK)
+    
+    def _mark_by_pattern(self) -> None:
+        """Marca los tags del namespace que coinciden con un patrón"""
+        model = self._active_model()
+        if model is None:
+            return
+        pattern, ok = QInputDialog.getText(
+            self,
+            "Marcar por patrón",
+            "Subcadena, o patrón con * y ? (ej: *_(artist)):",
+            text=self.search_field.text()
+        )
+        if ok and pattern:
+            model.mark_matching(pattern, MarkAction.MARK)
+    
+    def refresh_marks(self) -> None:
+        """Refleja marcas añadidas al conjunto compartido desde fuera de la pestaña"""
+        model = self._active_model()
+        if model is not None:
+            model.refresh_marks()
+    
+    def reveal_tag(self, tag: str) -> bool:
+        """
+        Selecciona un tag y hace scroll hasta él (limpia la búsqueda si lo oculta)
+        
+        Args:
+            tag: Texto del tag
+        
+        Returns:
+            True si el tag está en la pestaña
+        """
+        if self._dirty or self.model is None:
+            self._populate()
+        
+        row = self.model.row_for_key(self.namespace, tag)
+        if row is None and self.search_field.text():
+            self.search_field.clear()
+            self._apply_search()
+            row = self.model.row_for_key(self.namespace, tag)
+        if row is None:
+            return False
+        
+        index = self.model.index(row, TagTableModel.COLUMN_TAG)
+        self.table_view.selectRow(row)
+        self.table_view.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+        return True
     
     def set_aggregates(self, aggregates: List[TagAggregate]) -> None:
         """
-        Establece los agregados a mostrar
+        Establece los agregados a mostrar (se cargan al mostrar la pestaña)
         
         Args:
             aggregates: Lista de agregados del namespace
         """
-        self.model.set_aggregates(aggregates)
+        self._aggregates = aggregates
+        self._dirty = True
+        if self.isVisible():
+            self._populate()
+    
+    def tag_count(self) -> int:
+        """Número de tags del namespace (sin filtro de búsqueda)"""
+        return len(self._aggregates)
     
     def get_marked_tags(self) -> List[tuple[str, str]]:
         """
@@ -79,4 +241,4 @@ class NamespaceTab(QWidget):
         Returns:
             Lista de tuplas (namespace, tag)
         """
-        return self.model.get_marked_tags()
+        return [key for key in self._marked_keys if key[0] == self.namespace]
@@ -0,0 +1,265 @@
+"""Panel de detalle: archivos que contienen un tag, vista previa y co-ocurrencias"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QListView, QPlainTextEdit, QSplitter,
+    QAbstractItemView, QListWidget, QListWidgetItem
+)
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, Signal
+from PySide6.QtGui import QFont
+
+from ..core.aggregator import TagAggregator
+from ..core.tag_io import read_tag_file
+from ..core.tag_parser import format_tag
+
+# Solo para anotaciones: el índice (y numpy/scipy) se carga al pedir co-ocurrencias
+if TYPE_CHECKING:
+    from ..core.cooccurrence import CooccurrenceIndex
+
+
+class TagFilesModel(QAbstractListModel):
+    """Lista de archivos de un tag, pedida al agregador página a página"""
+    
+    PAGE_SIZE = 500
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._aggregator: Optional[TagAggregator] = None
+        self._key: Optional[tuple[str, str]] = None
+        self._base_directory: Optional[Path] = None
+        self._total = 0
+        self._paths: List[Path] = []  # rutas resueltas de las páginas cargadas
+    
+    def set_tag(
+        self,
+        aggregator: Optional[TagAggregator],
+        namespace: str = "",
+        tag: str = "",
+        base_directory: Optional[Path] = None
+    ) -> None:
+        """
+        Muestra los archivos de un tag (sin agregador se vacía la lista)
+        
+        Args:
+            aggregator: Agregador con las postings del escaneo
+            namespace: Namespace del tag
+            tag: Texto del tag
+            base_directory: Directorio base para mostrar rutas relativas
+        """
+        self.beginResetModel()
+        self._aggregator = aggregator
+        self._key = (namespace, tag) if aggregator is not None else None
+        self._base_directory = base_directory
+        self._total = aggregator.get_file_count_for_tag(namespace, tag) if aggregator is not None else 0
+        self._paths = []
+        self._load_page()
+        self.endResetModel()
+    
+    def total_count(self) -> int:
+        """Número total de archivos del tag (cargados o no)"""
+        return self._total
+    
+    def path_at(self, row: int) -> Optional[Path]:
+        """Ruta del archivo de la fila dada"""
+        if 0 <= row < len(self._paths):
+            return self._paths[row]
+        return None
+    
+    def _load_page(self) -> List[Path]:
+        """Resuelve la siguiente página de rutas"""
+        if self._aggregator is None or self._key is None:
+            return []
+        page = self._aggregator.get_file_page(*self._key, len(self._paths), self.PAGE_SIZE)
+        self._paths.extend(page)
+        return page
+    
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        """Indica si quedan archivos por cargar"""
+        if parent.isValid():
+            return False
+        return len(self._paths) < self._total
+    
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """Carga la siguiente página de archivos"""
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, self._total - len(self._paths))
+        if count <= 0:
+            return
+        start = len(self._paths)
+        self.beginInsertRows(QModelIndex(), start, start + count - 1)
+        self._load_page()
+        self.endInsertRows()
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Retorna el número de filas cargadas"""
+        if parent.isValid():
+            return 0
+        return len(self._paths)
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        """Retorna los datos para el índice dado"""
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        
+        path = self._paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display_path(path)
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return str(path)
+        return None
+    
+    def _display_path(self, path: Path) -> str:
+        """Ruta relativa al directorio base si es posible"""
+        if self._base_directory is not None:
+            try:
+                return str(path.relative_to(self._base_directory))
+            except ValueError:
+                pass
+        return str(path)
+
+
+class TagDetailPanel(QWidget):
+    """
+    Detalle del tag seleccionado: archivos donde aparece y tags de un archivo
+    
+    La lista es virtualizada (filas de altura uniforme) y se carga por
+    páginas, así que un tag presente en millones de archivos se abre al
+    instante. Los tags del archivo elegido se leen del escaneo si están
+    conservados o del disco en modo de bajo consumo. Si hay un análisis de
+    co-ocurrencia, se listan los tags que más acompañan al seleccionado.
+    """
+    
+    # Tags co-ocurrentes mostrados
+    RELATED_COUNT = 20
+    
+    related_activated = Signal(str, str)  # namespace, tag
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._aggregator: Optional[TagAggregator] = None
+        self._cooccurrence: Optional["CooccurrenceIndex"] = None
+        self._setup_ui()
+    
+    def _setup_ui(self) -> None:
+        """Configura la interfaz"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+        
+        self.title_label = QLabel("Seleccione un tag para ver sus archivos")
+        self.title_label.setWordWrap(True)
+        layout.addWidget(self.title_label)
+        
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        layout.addWidget(splitter)
+        
+        self.model = TagFilesModel(self)
+        self.files_view = QListView()
+        self.files_view.setModel(self.model)
+        self.files_view.setUniformItemSizes(True)
+        self.files_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.files_view.selectionModel().currentRowChanged.connect(self._on_file_changed)
+        splitter.addWidget(self.files_view)
+        
+        self.preview = QPlainTextEdit()
+        self.preview.setReadOnly(True)
+        self.preview.setFont(QFont("monospace"))
+        self.preview.setPlaceholderText("Seleccione un archivo para ver sus tags")
+        splitter.addWidget(self.preview)
+        
+        self.related_list = QListWidget()
+        self.related_list.setUniformItemSizes(True)
+        self.related_list.setToolTip("Tags que más aparecen junto al seleccionado (doble click para ir)")
+        self.related_list.itemActivated.connect(self._on_related_activated)
+        self.related_list.setVisible(False)
+        splitter.addWidget(self.related_list)
+        splitter.setSizes([400, 250, 200])
+    
+    def set_cooccurrence(self, index: Optional["CooccurrenceIndex"]) -> None:
+        """
+        Usa un índice de co-ocurrencia para listar tags relacionados
+        
+        Args:
+            index: Índice del último análisis (None para ocultar la lista)
+        """
+        self._cooccurrence = index
+        self.related_list.clear()
+        self.related_list.setVisible(index is not None)
+    
+    def show_tag(
+        self,
+        aggregator: TagAggregator,
+        namespace: str,
+        tag: str,
+        base_directory: Optional[Path] = None
+    ) -> None:
+        """
+        Muestra los archivos que contienen un tag
+        
+        Args:
+            aggregator: Agregador del último escaneo
+            namespace: Namespace del tag
+            tag: Texto del tag
+            base_directory: Directorio base para mostrar rutas relativas
+        """
+        self._aggregator = aggregator
+        self.model.set_tag(aggregator, namespace, tag, base_directory)
+        self.title_label.setText(
+            f"{format_tag(namespace, tag)}: {self.model.total_count()} archivos"
+        )
+        self.preview.clear()
+        self._show_related(namespace, tag)
+    
+    def _show_related(self, namespace: str, tag: str) -> None:
+        """Lista los tags que más co-ocurren con el dado"""
+        self.related_list.clear()
+        if self._cooccurrence is None:
+            return
+        for related in self._cooccurrence.cooccurring(namespace, tag, self.RELATED_COUNT):
+            item = QListWidgetItem(
+                f"{format_tag(related.namespace, related.tag)}  "
+                f"{related.p_given_query:.0%} ({related.together})"
+            )
+            item.setData(Qt.ItemDataRole.UserRole, (related.namespace, related.tag))
+            item.setToolTip(
+                f"En {related.together} archivos juntos | "
+                f"P(relacionado | tag) = {related.p_given_query:.1%} | "
+                f"P(tag | relacionado) = {related.p_query_given:.1%}"
+            )
+            self.related_list.addItem(item)
+    
+    def _on_related_activated(self, item: QListWidgetItem) -> None:
+        """Emite la clave del tag relacionado activado"""
+        key = item.data(Qt.ItemDataRole.UserRole)
+        if key:
+            self.related_activated.emit(*key)
+    
+    def clear(self) -> None:
+        """Vacía el panel (ej: al iniciar un nuevo escaneo)"""
+        self._aggregator = None
+        self.model.set_tag(None)
+        self.title_label.setText("Seleccione un tag para ver sus archivos")
+        self.preview.clear()
+        self.related_list.clear()
+    
+    def _on_file_changed(self, current: QModelIndex, previous: QModelIndex) -> None:
+        """Muestra los tags del archivo seleccionado"""
+        path = self.model.path_at(current.row())
+        if path is None or self._aggregator is None:
+            self.preview.clear()
+            return
+        
+        tag_file = self._aggregator.get_tag_file(path)
+        if tag_file is None:
+            try:
+                tag_file = read_tag_file(path)
+            except OSError as e:
+                self.preview.setPlainText(f"Archivo no disponible: {e}")
+                return
+        
+        self.preview.setPlainText(
+            "\n".join(format_tag(tag.namespace, tag.tag) for tag in tag_file.tags)
+        )
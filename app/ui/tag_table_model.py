@@ -1,71 +1,301 @@
 """Modelo de tabla para mostrar tags con checkboxes"""
 
-from typing import List
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
+from ..core.search_index import TrigramIndex, has_wildcards
 from ..models.tag_models import TagAggregate
 
+TagKey = Tuple[str, str]
+
+
+class MarkAction:
+    """Operaciones de marcado en bloque"""
+    MARK = "mark"
+    UNMARK = "unmark"
+    INVERT = "invert"
+
 
 class TagTableModel(QAbstractTableModel):
-    """Modelo de tabla para mostrar TagAggregate con checkboxes"""
+    """
+    Modelo de tabla para mostrar TagAggregate con checkboxes
+    
+    Las filas visibles son ids de agregados en un array. Los órdenes por tag y
+    por count se calculan una vez por versión de datos como permutaciones, y
+    filtrar o cambiar de columna solo recorre (o intersecta) la permutación.
+    
+    Los cambios se notifican con rangos precisos (filas insertadas, removidas
+    y modificadas) y los reordenamientos actualizan los índices persistentes,
+    de modo que la vista conserva la selección y la posición de scroll.
+    
+    Las marcas se guardan solo en un conjunto de claves (namespace, tag) que
+    puede compartirse entre modelos (ver get_marked_tags): la vista de una
+    raíz y la de todas muestran agregados distintos con las mismas marcas.
+    """
+    
+    COLUMN_CHECK = 0
+    COLUMN_TAG = 1
+    COLUMN_COUNT = 2
     
-    def __init__(self, parent=None):
+    def __init__(self, marked_keys: Optional[Set[TagKey]] = None, parent=None):
+        """
+        Inicializa el modelo
+        
+        Args:
+            marked_keys: Conjunto de claves marcadas (compartido entre pestañas)
+            parent: Objeto padre
+        """
         super().__init__(parent)
+        self._marked_keys: Set[TagKey] = marked_keys if marked_keys is not None else set()
+        self._namespaces: Set[str] = set()
         self._aggregates: List[TagAggregate] = []
-        self._filtered_aggregates: List[TagAggregate] = []
-        self._sort_column = 1  # Columna de count por defecto
+        self._rows = array('I')  # fila -> id de agregado
+        self._filter_text = ""
+        self._filter_ids: Optional[List[int]] = None  # None = sin filtro de texto
+        # Permutaciones ascendentes por columna: (orden, rango de cada id)
+        self._orders: Dict[int, Tuple[array, array]] = {}
+        self._sort_column = self.COLUMN_COUNT
         self._sort_order = Qt.SortOrder.DescendingOrder
+        # Índice de búsqueda (se construye con la primera búsqueda)
+        self._index: Optional[TrigramIndex] = None
+        self._namespace_ids: Dict[str, List[int]] = {}
     
     def set_aggregates(self, aggregates: List[TagAggregate]) -> None:
-        """Establece los agregados a mostrar"""
-        self.beginResetModel()
+        """
+        Establece los agregados a mostrar
+        
+        Compara las filas visibles antes y después (por clave namespace/tag) y
+        emite remociones, un reordenamiento de las filas que se mantienen,
+        inserciones y dataChanged solo de las filas cuyo contenido cambió.
+        """
+        old_aggregates = self._aggregates
+        old_rows = self._rows
+        
+        # Calcular el nuevo estado manteniendo filtro de texto y orden
         self._aggregates = aggregates
-        self._apply_filter_and_sort()
-        self.endResetModel()
-    
-    def _apply_filter_and_sort(self) -> None:
-        """Aplica filtro y ordenamiento"""
-        self._filtered_aggregates = self._aggregates.copy()
-        self._sort_data()
-    
-    def _sort_data(self) -> None:
-        """Ordena los datos según la columna y orden actuales"""
-        if self._sort_column == 0:  # Tag name
-            reverse = self._sort_order == Qt.SortOrder.DescendingOrder
-            self._filtered_aggregates.sort(
-                key=lambda x: x.tag.lower(),
-                reverse=reverse
-            )
-        elif self._sort_column == 1:  # Count
-            reverse = self._sort_order == Qt.SortOrder.DescendingOrder
-            self._filtered_aggregates.sort(
-                key=lambda x: x.count,
-                reverse=reverse
-            )
+        self._namespaces = {agg.namespace for agg in aggregates}
+        self._orders = {}
+        self._index = None
+        self._namespace_ids = {}
+        self._filter_ids = self._search(self._filter_text) if self._filter_text else None
+        self._update_rows()
+        new_rows = self._rows
+        
+        # Las notificaciones parten del estado visible anterior
+        self._aggregates = old_aggregates
+        self._rows = old_rows
+        
+        if not old_rows or not new_rows:
+            self.beginResetModel()
+            self._aggregates = aggregates
+            self._rows = new_rows
+            self.endResetModel()
+            return
+        
+        old_keys = [(old_aggregates[i].namespace, old_aggregates[i].tag) for i in old_rows]
+        new_keys = [(aggregates[i].namespace, aggregates[i].tag) for i in new_rows]
+        old_key_set = set(old_keys)
+        new_key_set = set(new_keys)
+        
+        # 1. Remover las filas que desaparecen (de abajo hacia arriba)
+        self._rows = array('I', old_rows)
+        removed = [row for row, key in enumerate(old_keys) if key not in new_key_set]
+        for start, end in reversed(list(_runs(removed))):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self._rows[start:end + 1]
+            del old_keys[start:end + 1]
+            self.endRemoveRows()
+        
+        # 2. Reordenar las filas que se mantienen según el nuevo orden
+        kept_keys = [key for key in new_keys if key in old_key_set]
+        kept_rows = array('I', (i for i, key in zip(new_rows, new_keys) if key in old_key_set))
+        if kept_keys != old_keys:
+            self.layoutAboutToBeChanged.emit()
+            positions = {key: row for row, key in enumerate(kept_keys)}
+            self._aggregates = aggregates
+            self._rows = kept_rows
+            self._remap_persistent(lambda row: positions.get(old_keys[row]))
+            self.layoutChanged.emit()
+        else:
+            self._aggregates = aggregates
+            self._rows = kept_rows
+        
+        # 3. Insertar las filas nuevas (de arriba hacia abajo, en su posición final)
+        inserted = [row for row, key in enumerate(new_keys) if key not in old_key_set]
+        for start, end in _runs(inserted):
+            self.beginInsertRows(QModelIndex(), start, end)
+            self._rows[start:start] = new_rows[start:end + 1]
+            self.endInsertRows()
+        
+        # 4. Notificar las filas cuyo count cambió (las marcas van por clave)
+        old_by_key = {(agg.namespace, agg.tag): agg for agg in (old_aggregates[i] for i in old_rows)}
+        changed = []
+        for row, (item_id, key) in enumerate(zip(new_rows, new_keys)):
+            old = old_by_key.get(key)
+            if old is None:
+                continue
+            new = aggregates[item_id]
+            if new.count != old.count:
+                changed.append(row)
+        self._emit_rows_changed(changed)
+    
+    def _get_order(self, column: int) -> Tuple[array, array]:
+        """
+        Obtiene la permutación ascendente de una columna (se calcula una vez)
+        
+        Returns:
+            Tupla (ids en orden, posición de cada id en el orden)
+        """
+        order = self._orders.get(column)
+        if order is None:
+            aggregates = self._aggregates
+            tag_keys = [agg.tag.casefold() for agg in aggregates]
+            if column == self.COLUMN_TAG:
+                key = tag_keys.__getitem__
+            else:
+                key = lambda i: (aggregates[i].count, tag_keys[i])
+            permutation = array('I', sorted(range(len(aggregates)), key=key))
+            rank = array('I', bytes(permutation.itemsize * len(permutation)))
+            for position, item_id in enumerate(permutation):
+                rank[item_id] = position
+            order = self._orders[column] = (permutation, rank)
+        return order
+    
+    def _update_rows(self) -> None:
+        """Recalcula las filas visibles a partir del filtro y el orden actuales"""
+        ids = self._filter_ids
+        if self._sort_column not in (self.COLUMN_TAG, self.COLUMN_COUNT):
+            rows = array('I', ids if ids is not None else range(len(self._aggregates)))
+        else:
+            permutation, rank = self._get_order(self._sort_column)
+            if ids is None:
+                rows = array('I', permutation)
+            elif len(ids) * 16 < len(permutation):
+                # Pocos resultados: ordenarlos por su posición en la permutación
+                rows = array('I', sorted(ids, key=rank.__getitem__))
+            else:
+                # Muchos resultados: recorrer la permutación con una máscara
+                mask = bytearray(len(permutation))
+                for item_id in ids:
+                    mask[item_id] = 1
+                rows = array('I', [i for i in permutation if mask[i]])
+            if self._sort_order == Qt.SortOrder.DescendingOrder:
+                rows.reverse()
+        self._rows = rows
+    
+    def _get_index(self) -> TrigramIndex:
+        """Construye el índice de trigramas de los tags si no existe"""
+        if self._index is None:
+            self._index = TrigramIndex()
+            self._namespace_ids = {}
+            for item_id, agg in enumerate(self._aggregates):
+                self._index.add(agg.tag)
+                self._namespace_ids.setdefault(agg.namespace, []).append(item_id)
+        return self._index
+    
+    def _search(self, text: str) -> List[int]:
+        """
+        Ids de los agregados que coinciden con el texto de búsqueda
+        
+        Args:
+            text: Subcadena a buscar en el tag o el namespace, o patrón con
+                comodines `*` y `?` anclado al tag (case-insensitive)
+        """
+        ids = self._get_index().search(text)
+        
+        # Sin comodines, un namespace que contiene el texto incluye todos sus tags
+        if not has_wildcards(text):
+            query = text.casefold()
+            matched_namespaces = [
+                namespace_ids for namespace, namespace_ids in self._namespace_ids.items()
+                if query in namespace.casefold()
+            ]
+            if matched_namespaces:
+                merged = set(ids)
+                for namespace_ids in matched_namespaces:
+                    merged.update(namespace_ids)
+                ids = sorted(merged)
+        
+        return ids
     
     def filter_by_text(self, text: str) -> None:
         """
         Filtra tags por texto de búsqueda
         
         Args:
-            text: Texto a buscar (case-insensitive)
+            text: Subcadena a buscar en el tag o el namespace, o patrón con
+                comodines `*` y `?` anclado al tag (case-insensitive)
         """
-        if not text:
-            self._filtered_aggregates = self._aggregates.copy()
-        else:
-            text_lower = text.lower()
-            self._filtered_aggregates = [
-                agg for agg in self._aggregates
-                if text_lower in agg.tag.lower() or text_lower in agg.namespace.lower()
-            ]
+        if text == self._filter_text:
+            return
+        
+        ids = self._search(text) if text else None
         
-        self._sort_data()
+        def change():
+            self._filter_text = text
+            self._filter_ids = ids
+        
+        self._relayout(change)
+    
+    def _relayout(self, change) -> None:
+        """
+        Aplica un cambio de filtro u orden como cambio de layout
+        
+        Args:
+            change: Función que actualiza el estado del filtro u orden
+        """
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self._rows
+        change()
+        self._update_rows()
+        
+        # Buscar la nueva fila solo de los ids con índices persistentes
+        persistent_ids = {old_rows[index.row()] for index in self.persistentIndexList()
+                          if index.row() < len(old_rows)}
+        positions = {}
+        if persistent_ids:
+            for row, item_id in enumerate(self._rows):
+                if item_id in persistent_ids:
+                    positions[item_id] = row
+                    if len(positions) == len(persistent_ids):
+                        break
+        self._remap_persistent(lambda row: positions.get(old_rows[row]))
         self.layoutChanged.emit()
     
+    def _remap_persistent(self, new_row_of) -> None:
+        """
+        Actualiza los índices persistentes (selección, índice actual)
+        
+        Args:
+            new_row_of: Función fila anterior -> fila nueva (None si ya no es visible)
+        """
+        old_indexes = self.persistentIndexList()
+        if not old_indexes:
+            return
+        new_indexes = []
+        for index in old_indexes:
+            row = new_row_of(index.row())
+            new_indexes.append(
+                self.index(row, index.column()) if row is not None else QModelIndex()
+            )
+        self.changePersistentIndexList(old_indexes, new_indexes)
+    
+    def _emit_rows_changed(self, rows: Sequence[int]) -> None:
+        """
+        Emite dataChanged agrupando filas consecutivas en rangos
+        
+        Args:
+            rows: Filas modificadas en orden ascendente
+        """
+        last_column = self.columnCount() - 1
+        for start, end in _runs(rows):
+            self.dataChanged.emit(self.index(start, 0), self.index(end, last_column))
+    
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
         """Retorna el número de filas"""
-        return len(self._filtered_aggregates)
+        return len(self._rows)
     
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         """Retorna el número de columnas"""
@@ -73,10 +303,10 @@ class TagTableModel(QAbstractTableModel):
     
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
         """Retorna los datos para el índice dado"""
-        if not index.isValid() or index.row() >= len(self._filtered_aggregates):
+        if not index.isValid() or index.row() >= len(self._rows):
             return None
         
-        agg = self._filtered_aggregates[index.row()]
+        agg = self._aggregates[self._rows[index.row()]]
         col = index.column()
         
         if role == Qt.ItemDataRole.DisplayRole:
@@ -89,7 +319,13 @@ class TagTableModel(QAbstractTableModel):
                 return str(agg.count)
         
         elif role == Qt.ItemDataRole.CheckStateRole and col == 0:
-            return Qt.CheckState.Checked if agg.marked_for_removal else Qt.CheckState.Unchecked
+            marked = (agg.namespace, agg.tag) in self._marked_keys
+            return Qt.CheckState.Checked if marked else Qt.CheckState.Unchecked
+        
+        elif role == Qt.ItemDataRole.ToolTipRole and col == 1 and agg.variants and len(agg.variants) > 1:
+            # Grafías agrupadas por la normalización, de más a menos frecuente
+            variants = sorted(agg.variants.items(), key=lambda item: -item[1])
+            return "Grafías:\n" + "\n".join(f"{spelling} ({count})" for spelling, count in variants)
         
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             if col == 2:  # Count
@@ -100,13 +336,15 @@ class TagTableModel(QAbstractTableModel):
     
     def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
         """Establece los datos para el índice dado"""
-        if not index.isValid() or index.row() >= len(self._filtered_aggregates):
+        if not index.isValid() or index.row() >= len(self._rows):
             return False
         
         if index.column() == 0 and role == Qt.ItemDataRole.CheckStateRole:
-            agg = self._filtered_aggregates[index.row()]
-            agg.marked_for_removal = (value == Qt.CheckState.Checked)
-            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+            # Qt puede entregar el estado como int o como Qt.CheckState
+            checked = Qt.CheckState(value) == Qt.CheckState.Checked
+            action = MarkAction.MARK if checked else MarkAction.UNMARK
+            if self._set_marks([self._rows[index.row()]], action):
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
             return True
         
         return False
@@ -133,24 +371,161 @@ class TagTableModel(QAbstractTableModel):
     
     def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
         """Ordena la tabla por la columna especificada"""
-        self._sort_column = column
-        self._sort_order = order
-        self._sort_data()
-        self.layoutChanged.emit()
+        if column not in (self.COLUMN_TAG, self.COLUMN_COUNT):
+            return
+        if column == self._sort_column and order == self._sort_order:
+            return
+        
+        def change():
+            self._sort_column = column
+            self._sort_order = order
+        
+        self._relayout(change)
+    
+    def _set_marks(self, ids: Iterable[int], action: str) -> List[int]:
+        """
+        Actualiza las marcas de varios agregados en una sola pasada
+        
+        Args:
+            ids: Ids de agregados
+            action: MarkAction a aplicar
+        
+        Returns:
+            Ids cuyo estado cambió
+        """
+        aggregates = self._aggregates
+        marked_keys = self._marked_keys
+        changed = []
+        for item_id in ids:
+            agg = aggregates[item_id]
+            key = (agg.namespace, agg.tag)
+            marked = key in marked_keys
+            if action == MarkAction.INVERT:
+                value = not marked
+            else:
+                value = action == MarkAction.MARK
+            if value == marked:
+                continue
+            if value:
+                marked_keys.add(key)
+            else:
+                marked_keys.discard(key)
+            changed.append(item_id)
+        return changed
+    
+    def _emit_marks_changed(self, rows: Sequence[int]) -> None:
+        """Emite un único dataChanged de checkbox que cubre las filas dadas"""
+        if rows:
+            self.dataChanged.emit(
+                self.index(min(rows), self.COLUMN_CHECK),
+                self.index(max(rows), self.COLUMN_CHECK),
+                [Qt.ItemDataRole.CheckStateRole]
+            )
+    
+    def mark_rows(self, rows: Iterable[int], action: str = MarkAction.MARK) -> int:
+        """
+        Marca, desmarca o invierte filas visibles
+        
+        Args:
+            rows: Filas de la vista
+            action: MarkAction a aplicar
+        
+        Returns:
+            Número de tags cuyo estado cambió
+        """
+        visible = self._rows
+        rows = [row for row in rows if 0 <= row < len(visible)]
+        changed = set(self._set_marks((visible[row] for row in rows), action))
+        self._emit_marks_changed([row for row in rows if visible[row] in changed])
+        return len(changed)
     
-    def get_marked_tags(self) -> List[tuple[str, str]]:
+    def mark_visible(self, action: str = MarkAction.MARK) -> int:
+        """
+        Marca, desmarca o invierte todas las filas visibles (según la búsqueda)
+        
+        Returns:
+            Número de tags cuyo estado cambió
+        """
+        return self.mark_rows(range(len(self._rows)), action)
+    
+    def mark_matching(self, pattern: str, action: str = MarkAction.MARK) -> int:
+        """
+        Marca los tags que coinciden con un patrón, visibles o no
+        
+        Args:
+            pattern: Subcadena, o patrón con comodines `*` y `?` (como la búsqueda)
+            action: MarkAction a aplicar
+        
+        Returns:
+            Número de tags cuyo estado cambió
+        """
+        if not pattern:
+            return 0
+        changed = set(self._set_marks(self._search(pattern), action))
+        if changed:
+            self._emit_marks_changed(
+                [row for row, item_id in enumerate(self._rows) if item_id in changed]
+            )
+        return len(changed)
+    
+    def refresh_marks(self) -> None:
+        """Repinta los checkboxes tras cambiar el conjunto de marcas desde fuera"""
+        if self._rows:
+            self._emit_marks_changed([0, len(self._rows) - 1])
+    
+    def get_marked_tags(self) -> List[TagKey]:
         """
         Obtiene las tuplas (namespace, tag) de los tags marcados para remover
         
+        Recorre el conjunto de claves marcadas, no los agregados.
+        
         Returns:
-            Lista de tuplas (namespace, tag)
+            Lista de tuplas (namespace, tag) de los namespaces de este modelo
         """
-        return [
-            (agg.namespace, agg.tag)
-            for agg in self._aggregates
-            if agg.marked_for_removal
-        ]
+        namespaces = self._namespaces
+        return [key for key in self._marked_keys if key[0] in namespaces]
+    
+    def aggregate_at(self, row: int) -> Optional[TagAggregate]:
+        """Agregado de la fila visible dada"""
+        if 0 <= row < len(self._rows):
+            return self._aggregates[self._rows[row]]
+        return None
+    
+    def row_for_key(self, namespace: str, tag: str) -> Optional[int]:
+        """
+        Busca la fila visible de un tag
+        
+        Returns:
+            Fila, o None si el tag no está visible (filtrado o inexistente)
+        """
+        aggregates = self._aggregates
+        for row, item_id in enumerate(self._rows):
+            agg = aggregates[item_id]
+            if agg.tag == tag and agg.namespace == namespace:
+                return row
+        return None
     
     def get_all_aggregates(self) -> List[TagAggregate]:
-        """Obtiene todos los agregados (filtrados)"""
-        return self._filtered_aggregates.copy()
+        """Obtiene todos los agregados (filtrados, en el orden visible)"""
+        aggregates = self._aggregates
+        return [aggregates[i] for i in self._rows]
+
+
+def _runs(rows: Sequence[int]) -> Iterator[Tuple[int, int]]:
+    """
+    Agrupa filas ascendentes en rangos consecutivos
+    
+    Yields:
+        Tuplas (primera, última) de cada rango
+    """
+    start = end = None
+    for row in rows:
+        if start is None:
+            start = end = row
+        elif row == end + 1:
+            end = row
+        else:
+            yield start, end
+            start = end = row
+    if start is not None:
+        yield start, end
@@ -1,7 +1,25 @@
 """Utilidades: logging, backup, path utils"""
 
-from .logger import setup_logger
-from .backup import create_backup
-from .path_utils import find_txt_files
+from typing import TYPE_CHECKING
 
-__all__ = ["setup_logger", "create_backup", "find_txt_files"]
+from .lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .logger import setup_logger
+    from .backup import create_backup
+    from .path_utils import find_txt_files, discover_txt_files
+    from .metrics import MetricsRegistry, metrics
+    from .profiling import RunProfiler
+
+# Se importan al primer uso: el logger no debe cargar backup ni el perfilador
+__getattr__ = lazy_exports(__name__, {
+    "setup_logger": ".logger",
+    "create_backup": ".backup",
+    "find_txt_files": ".path_utils",
+    "discover_txt_files": ".path_utils",
+    "MetricsRegistry": ".metrics",
+    "metrics": ".metrics",
+    "RunProfiler": ".profiling",
+})
+
+__all__ = ["setup_logger", "create_backup", "find_txt_files", "discover_txt_files", "MetricsRegistry", "metrics", "RunProfiler"]
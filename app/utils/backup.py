@@ -1,14 +1,20 @@
 """Utilidades para crear backups de archivos"""
 
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Sequence
 
-from .logger import get_logger
+from .logger import get_logger, LogSummary
+from .metrics import metrics
 
 logger = get_logger(__name__)
 
+_BACKUP_TIMER = metrics.timer("backup.total", "Tiempo total de creación de backups")
+_BACKUP_FILES = metrics.counter("backup.files", "Archivos respaldados")
+_BACKUP_BYTES = metrics.counter("backup.bytes", "Bytes respaldados")
+
 
 def create_backup(files: List[Path], base_directory: Path) -> Path:
     """
@@ -24,13 +30,16 @@ def create_backup(files: List[Path], base_directory: Path) -> Path:
     if not files:
         raise ValueError("No hay archivos para respaldar")
     
+    started = time.perf_counter()
+    file_log = LogSummary(logger, "Archivos respaldados")
+    
     # Crear nombre de backup con timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_dir = base_directory / f"backup_{timestamp}"
     
     backup_dir.mkdir(parents=True, exist_ok=True)
     
-    logger.info(f"Creando backup en: {backup_dir}")
+    logger.info("Creando backup en: %s", backup_dir)
     
     # Copiar cada archivo manteniendo estructura relativa
     for file_path in files:
@@ -46,11 +55,52 @@ def create_backup(files: List[Path], base_directory: Path) -> Path:
             backup_file_path.parent.mkdir(parents=True, exist_ok=True)
             
             shutil.copy2(file_path, backup_file_path)
-            logger.debug(f"Respaldado: {file_path} -> {backup_file_path}")
+            if metrics.enabled:
+                _BACKUP_FILES.inc()
+                _BACKUP_BYTES.inc(backup_file_path.stat().st_size)
+            file_log.add(backup_file_path)
         
         except Exception as e:
-            logger.error(f"Error al respaldar {file_path}: {e}")
+            logger.error("Error al respaldar %s: %s", file_path, e)
             raise
     
-    logger.info(f"Backup completado: {len(files)} archivos respaldados")
+    file_log.flush()
+    if metrics.enabled:
+        _BACKUP_TIMER.observe(time.perf_counter() - started)
+    logger.info("Backup completado: %s archivos respaldados", len(files))
     return backup_dir
+
+
+def _owner_root(file_path: Path, roots: Sequence[Path]) -> Path:
+    """Primera raíz que contiene el archivo (la primera raíz si ninguna lo contiene)"""
+    for root in roots:
+        try:
+            file_path.relative_to(root)
+            return root
+        except ValueError:
+            continue
+    return roots[0]
+
+
+def create_root_backups(files: List[Path], roots: Sequence[Path]) -> List[Path]:
+    """
+    Crea un backup en cada raíz con los archivos que le pertenecen
+    
+    Cada archivo se asigna a la primera raíz que lo contiene (el mismo orden
+    en que se descubrió), así que nunca se respalda dos veces.
+    
+    Args:
+        files: Lista de archivos a respaldar
+        roots: Directorios raíz, en orden
+        
+    Returns:
+        Rutas de los directorios de backup creados (uno por raíz afectada)
+    """
+    if not files:
+        raise ValueError("No hay archivos para respaldar")
+    
+    by_root: Dict[Path, List[Path]] = {}
+    for file_path in files:
+        by_root.setdefault(_owner_root(file_path, roots), []).append(file_path)
+    
+    return [create_backup(root_files, root) for root, root_files in by_root.items()]
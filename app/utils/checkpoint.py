@@ -0,0 +1,155 @@
+"""Checkpoints persistentes para reanudar trabajos largos (escaneo y aplicación)"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .logger import get_logger
+from .path_utils import get_app_data_dir
+
+logger = get_logger(__name__)
+
+
+def checkpoint_key(*parts: str) -> str:
+    """
+    Calcula una clave estable para identificar un trabajo
+    
+    Args:
+        parts: Componentes que identifican el trabajo (ej: directorio)
+    
+    Returns:
+        Hash hexadecimal corto
+    """
+    payload = "\0".join(parts).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+class JobCheckpoint:
+    """
+    Checkpoint de un trabajo: estado en JSON y resultados parciales en JSONL
+    
+    El estado se escribe de forma atómica (archivo temporal + rename) y guarda
+    cuántos registros parciales son válidos, de modo que un registro escrito
+    justo antes de un cierre inesperado se ignora al reanudar.
+    """
+    
+    def __init__(self, job: str, key: str, directory: Optional[Path] = None) -> None:
+        """
+        Inicializa el checkpoint
+        
+        Args:
+            job: Tipo de trabajo ("scan" o "apply")
+            key: Clave del trabajo (ver checkpoint_key)
+            directory: Directorio de checkpoints (por defecto checkpoints/ en el proyecto)
+        """
+        if directory is None:
+            directory = get_app_data_dir("checkpoints")
+        self.job = job
+        self.state_path = directory / f"{job}_{key}.json"
+        self.partial_path = directory / f"{job}_{key}.partial.jsonl"
+    
+    def exists(self) -> bool:
+        """True si hay un checkpoint guardado"""
+        return self.state_path.exists()
+    
+    def load(self) -> Optional[dict]:
+        """
+        Carga el estado guardado
+        
+        Returns:
+            Diccionario de estado o None si no existe o está corrupto
+        """
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Checkpoint ilegible %s: %s", self.state_path, e)
+            return None
+        
+        if state.get("job") != self.job:
+            return None
+        return state
+    
+    def save(self, state: dict) -> None:
+        """
+        Guarda el estado de forma atómica
+        
+        Args:
+            state: Estado serializable a JSON
+        """
+        state = dict(state, job=self.job, updated_at=time.time())
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+    
+    def append_partial(self, records: List[dict]) -> None:
+        """
+        Añade resultados parciales (llamar antes de save() con el nuevo conteo)
+        
+        Args:
+            records: Registros serializables a JSON
+        """
+        if not records:
+            return
+        with open(self.partial_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def iter_partial(self, limit: Optional[int] = None) -> Iterator[dict]:
+        """
+        Itera los resultados parciales guardados
+        
+        Args:
+            limit: Número de registros válidos (según el estado guardado)
+        
+        Yields:
+            Registros en el orden en que se guardaron
+        """
+        if not self.partial_path.exists():
+            return
+        with open(self.partial_path, 'r', encoding='utf-8') as f:
+            for idx, line in enumerate(f):
+                if limit is not None and idx >= limit:
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Línea truncada por un cierre inesperado
+                    break
+    
+    def truncate_partial(self, count: int) -> None:
+        """
+        Descarta los registros parciales posteriores a los `count` válidos
+        
+        Args:
+            count: Número de registros válidos (según el estado guardado)
+        """
+        if not self.partial_path.exists():
+            return
+        tmp_path = self.partial_path.with_suffix(".tmp")
+        with open(self.partial_path, 'r', encoding='utf-8') as src, \
+                open(tmp_path, 'w', encoding='utf-8') as dst:
+            for idx, line in enumerate(src):
+                if idx >= count or not line.endswith("\n"):
+                    break
+                dst.write(line)
+        os.replace(tmp_path, self.partial_path)
+    
+    def clear(self) -> None:
+        """Elimina el checkpoint y sus resultados parciales"""
+        for path in (self.state_path, self.partial_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,30 @@
+"""Re-exportaciones perezosas para los paquetes (PEP 562)"""
+
+import importlib
+from typing import Callable, Dict
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], object]:
+    """
+    Crea el __getattr__ de un paquete que importa cada nombre al primer uso
+    
+    Así, importar un submódulo (ej: app.utils.logger) no carga todos los que
+    el paquete re-exporta. El valor se guarda en el paquete: los accesos
+    siguientes no pasan por __getattr__.
+    
+    Args:
+        package: Nombre del paquete (__name__)
+        exports: Nombre exportado -> submódulo relativo que lo define (ej: ".backup")
+    
+    Returns:
+        Función para asignar a __getattr__ en el paquete
+    """
+    def __getattr__(name: str) -> object:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+    
+    return __getattr__
@@ -1,28 +1,72 @@
 """Configuración de logging para la aplicación"""
 
+import atexit
 import logging
+import os
+import queue
 import sys
+import time
 from pathlib import Path
-from typing import Optional
-from logging.handlers import RotatingFileHandler
+from typing import Optional, Union
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+# Variable de entorno con el nivel inicial (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL_ENV_VAR = "TAG_EDITOR_LOG_LEVEL"
+DEFAULT_LEVEL = logging.INFO
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR")
 
 
 _logger: Optional[logging.Logger] = None
+_listener: Optional[QueueListener] = None
+
+
+class _DeferredFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler que crea el directorio y abre el archivo al primer registro
+    
+    El primer registro lo escribe el hilo del QueueListener, así que el
+    arranque no toca el disco para preparar el log.
+    """
+    
+    def __init__(self, filename: Path, **kwargs) -> None:
+        super().__init__(filename, delay=True, **kwargs)
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
 
+def _parse_level(level: Union[int, str, None]) -> int:
+    """Convierte un nombre o número de nivel (None = variable de entorno o INFO)"""
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV_VAR) or DEFAULT_LEVEL
+    if isinstance(level, str):
+        value = logging.getLevelName(level.strip().upper())
+        return value if isinstance(value, int) else DEFAULT_LEVEL
+    return level
 
-def setup_logger(log_dir: Path = None) -> logging.Logger:
+
+def setup_logger(log_dir: Path = None, level: Union[int, str, None] = None) -> logging.Logger:
     """
     Configura el logger de la aplicación
     
+    Los registros se encolan en el hilo que los emite y un QueueListener los
+    escribe en archivo y consola desde su propio hilo: la escritura a disco y
+    la rotación no bloquean a los workers ni a la interfaz.
+    
     Args:
         log_dir: Directorio para archivos de log (por defecto logs/ en el proyecto)
-        
+        level: Nivel inicial (por defecto TAG_EDITOR_LOG_LEVEL o INFO)
+    
     Returns:
         Logger configurado
     """
-    global _logger
+    global _logger, _listener
     
     if _logger is not None:
+        # Ya configurado al importar algún módulo: solo aplicar el nivel pedido
+        if level is not None:
+            _logger.setLevel(_parse_level(level))
         return _logger
     
     if log_dir is None:
@@ -30,13 +74,11 @@ def setup_logger(log_dir: Path = None) -> logging.Logger:
         project_root = Path(__file__).parent.parent.parent
         log_dir = project_root / "logs"
     
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
     log_file = log_dir / "tag_editor.log"
     
-    # Crear logger
+    # Crear logger; el nivel del logger decide qué se registra (ajustable en caliente)
     logger = logging.getLogger("TagEditor")
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(_parse_level(level))
     
     # Formato
     formatter = logging.Formatter(
@@ -44,11 +86,12 @@ def setup_logger(log_dir: Path = None) -> logging.Logger:
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    # Handler para archivo (rotating)
-    file_handler = RotatingFileHandler(
+    # Handler para archivo (rotating; directorio y archivo se crean al primer registro)
+    file_handler = _DeferredFileHandler(
         log_file,
         maxBytes=10 * 1024 * 1024,  # 10MB
-        backupCount=5
+        backupCount=5,
+        encoding='utf-8'
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
@@ -58,20 +101,51 @@ def setup_logger(log_dir: Path = None) -> logging.Logger:
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Cola sin límite: emitir un registro nunca espera a la E/S
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logger)
     
     _logger = logger
     return logger
 
 
+def shutdown_logger() -> None:
+    """Escribe los registros pendientes y detiene el hilo de logging"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def set_log_level(level: Union[int, str], announce: bool = True) -> None:
+    """
+    Cambia el nivel de log en caliente
+    
+    Args:
+        level: Nivel (ej: logging.DEBUG o "DEBUG")
+        announce: Registrar el cambio (False en procesos auxiliares)
+    """
+    logger = setup_logger()
+    logger.setLevel(_parse_level(level))
+    if announce:
+        logger.info("Nivel de log: %s", logging.getLevelName(logger.level))
+
+
+def get_log_level() -> int:
+    """Nivel de log actual"""
+    return setup_logger().level
+
+
 def get_logger(name: str = None) -> logging.Logger:
     """
     Obtiene un logger (configura si es necesario)
     
     Args:
         name: Nombre del logger (opcional)
-        
+    
     Returns:
         Logger
     """
@@ -81,3 +155,73 @@ def get_logger(name: str = None) -> logging.Logger:
     if name:
         return logging.getLogger(f"TagEditor.{name}")
     return _logger or logging.getLogger("TagEditor")
+
+
+class LogSummary:
+    """
+    Agrupa un evento por archivo en un resumen periódico
+    
+    En lugar de una línea de debug por archivo, acumula conteos y emite una
+    línea cada `interval` segundos (y al llamar a flush). Si el nivel no está
+    habilitado, add() solo consulta el nivel del logger.
+    """
+    
+    def __init__(
+        self,
+        logger: logging.Logger,
+        label: str,
+        interval: float = 5.0,
+        level: int = logging.DEBUG
+    ) -> None:
+        """
+        Inicializa el resumen
+        
+        Args:
+            logger: Logger donde emitir
+            label: Descripción del evento (ej: "Archivos procesados")
+            interval: Segundos entre resúmenes
+            level: Nivel de los resúmenes
+        """
+        self.logger = logger
+        self.label = label
+        self.interval = interval
+        self.level = level
+        self._events = 0
+        self._totals: dict = {}
+        self._last: object = None
+        self._since = time.monotonic()
+    
+    def add(self, item: object = None, **counts: int) -> None:
+        """
+        Registra un evento
+        
+        Args:
+            item: Último elemento procesado (se muestra como ejemplo)
+            counts: Cantidades a acumular (ej: tags=12)
+        """
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self._events += 1
+        for name, value in counts.items():
+            self._totals[name] = self._totals.get(name, 0) + value
+        self._last = item
+        if time.monotonic() - self._since >= self.interval:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Emite el resumen acumulado (si hay eventos)"""
+        if self._events:
+            totals = ", ".join(f"{value} {name}" for name, value in self._totals.items())
+            self.logger.log(
+                self.level,
+                "%s: %d en %.1f s%s (último: %s)",
+                self.label,
+                self._events,
+                time.monotonic() - self._since,
+                f", {totals}" if totals else "",
+                self._last
+            )
+        self._events = 0
+        self._totals = {}
+        self._last = None
+        self._since = time.monotonic()
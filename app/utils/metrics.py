@@ -0,0 +1,256 @@
+"""Métricas internas (contadores, timers, histogramas) exportables a JSON y Prometheus"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+# Variable de entorno para activar las métricas al iniciar
+METRICS_ENV_VAR = "TAG_EDITOR_METRICS"
+
+# Prefijo de los nombres en el formato de Prometheus
+PROMETHEUS_PREFIX = "tag_editor_"
+
+# Límites (segundos) de los timers: de 10 µs a 10 s
+DEFAULT_TIME_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005,
+    0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0
+)
+
+
+class Counter:
+    """Contador monótono"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self.value = 0
+    
+    def inc(self, amount: int = 1) -> None:
+        """Incrementa el contador"""
+        with self._lock:
+            self.value += amount
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.value = 0
+    
+    def snapshot(self) -> dict:
+        return {"type": self.kind, "description": self.description, "value": self.value}
+
+
+class Histogram:
+    """Distribución de valores en buckets acumulativos (estilo Prometheus)"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_TIME_BUCKETS) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def observe(self, value: float) -> None:
+        """Registra un valor"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+    
+    def reset(self) -> None:
+        with self._lock:
+            # Un bucket por límite más el de +Inf
+            self._counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self.min = float("inf")
+            self.max = 0.0
+    
+    def cumulative_counts(self) -> List[int]:
+        """Conteos acumulados por límite (el último es +Inf)"""
+        result = []
+        total = 0
+        for count in self._counts:
+            total += count
+            result.append(total)
+        return result
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "type": self.kind,
+                "description": self.description,
+                "count": self.count,
+                "sum": self.sum,
+                "min": self.min if self.count else None,
+                "max": self.max if self.count else None,
+                "mean": self.sum / self.count if self.count else None,
+                "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.cumulative_counts()))
+            }
+
+
+class _NullTiming:
+    """Context manager vacío que se usa cuando las métricas están desactivadas"""
+    
+    def __enter__(self) -> "_NullTiming":
+        return self
+    
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_TIMING = _NullTiming()
+
+
+class _Timing:
+    """Mide un bloque con perf_counter y lo registra en un Timer"""
+    
+    __slots__ = ("_timer", "_start")
+    
+    def __init__(self, timer: "Timer") -> None:
+        self._timer = timer
+        self._start = 0.0
+    
+    def __enter__(self) -> "_Timing":
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc) -> bool:
+        self._timer.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Timer(Histogram):
+    """Histograma de duraciones en segundos"""
+    
+    kind = "timer"
+    
+    def __init__(self, name: str, description: str = "", registry: Optional["MetricsRegistry"] = None) -> None:
+        super().__init__(name, description, DEFAULT_TIME_BUCKETS)
+        self._registry = registry
+    
+    def time(self) -> Union[_Timing, _NullTiming]:
+        """
+        Context manager que mide el bloque
+        
+        Con las métricas desactivadas retorna un objeto compartido que no hace nada.
+        """
+        if self._registry is not None and not self._registry.enabled:
+            return _NULL_TIMING
+        return _Timing(self)
+
+
+Metric = Union[Counter, Histogram, Timer]
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del proceso
+    
+    Los módulos registran sus métricas al importarse y, en los bucles
+    calientes, consultan `enabled` antes de medir: desactivado, el coste es
+    una lectura de atributo por archivo. Los valores se pueden leer desde
+    cualquier hilo mientras los workers escriben.
+    """
+    
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self.started_at = time.time()
+    
+    def _register(self, name: str, factory) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+    
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Obtiene (o crea) un contador"""
+        return self._register(name, lambda: Counter(name, description))
+    
+    def timer(self, name: str, description: str = "") -> Timer:
+        """Obtiene (o crea) un timer"""
+        return self._register(name, lambda: Timer(name, description, self))
+    
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_TIME_BUCKETS) -> Histogram:
+        """Obtiene (o crea) un histograma"""
+        return self._register(name, lambda: Histogram(name, description, buckets))
+    
+    def time(self, name: str) -> Union[_Timing, _NullTiming]:
+        """Mide un bloque con el timer `name` (no hace nada si está desactivado)"""
+        if not self.enabled:
+            return _NULL_TIMING
+        return _Timing(self.timer(name))
+    
+    def set_enabled(self, enabled: bool) -> None:
+        """Activa o desactiva la recolección (los valores se conservan)"""
+        self.enabled = enabled
+    
+    def reset(self) -> None:
+        """Pone a cero todas las métricas (siguen registradas)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            self.started_at = time.time()
+        for metric in metrics:
+            metric.reset()
+    
+    def metrics(self) -> List[Metric]:
+        """Métricas registradas, ordenadas por nombre"""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+    
+    def snapshot(self) -> dict:
+        """Valores actuales de todas las métricas"""
+        return {
+            "enabled": self.enabled,
+            "started_at": self.started_at,
+            "metrics": {metric.name: metric.snapshot() for metric in self.metrics()}
+        }
+    
+    def to_json(self) -> str:
+        """Exporta las métricas como JSON"""
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+    
+    def to_prometheus(self) -> str:
+        """Exporta las métricas en el formato de texto de Prometheus"""
+        lines = []
+        for metric in self.metrics():
+            name = PROMETHEUS_PREFIX + metric.name.replace(".", "_").replace("-", "_")
+            if isinstance(metric, Counter):
+                name += "_total"
+            elif isinstance(metric, Timer):
+                name += "_seconds"
+            if metric.description:
+                lines.append(f"# HELP {name} {metric.description}")
+            if isinstance(metric, Counter):
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {metric.value}")
+                continue
+            
+            lines.append(f"# TYPE {name} histogram")
+            for bound, count in zip(list(metric.buckets) + ["+Inf"], metric.cumulative_counts()):
+                lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+            lines.append(f"{name}_sum {metric.sum}")
+            lines.append(f"{name}_count {metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _env_enabled() -> bool:
+    return os.environ.get(METRICS_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# Registro global del proceso (desactivado salvo TAG_EDITOR_METRICS=1 o --metrics)
+metrics = MetricsRegistry(enabled=_env_enabled())
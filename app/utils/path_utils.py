@@ -1,7 +1,39 @@
 """Utilidades para manejo de rutas y búsqueda de archivos"""
 
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+_WALK_TIMER = metrics.timer("discovery.walk", "Tiempo de búsqueda recursiva de archivos .txt")
+_FILES_FOUND = metrics.counter("discovery.files", "Archivos .txt encontrados")
+_DUPLICATES_SKIPPED = metrics.counter(
+    "discovery.duplicates",
+    "Archivos omitidos por ser el mismo inodo que otro ya encontrado (enlaces o raíces solapadas)"
+)
+
+# Máximo de raíces recorridas a la vez
+MAX_WALK_THREADS = 8
+
+
+def get_app_data_dir(name: str) -> Path:
+    """
+    Obtiene (y crea) un directorio de datos de la aplicación en el proyecto
+    
+    Args:
+        name: Nombre del subdirectorio (ej: "checkpoints")
+        
+    Returns:
+        Ruta del directorio
+    """
+    project_root = Path(__file__).parent.parent.parent
+    data_dir = project_root / name
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
 
 
 def find_txt_files(
@@ -25,8 +57,100 @@ def find_txt_files(
     
     txt_files = []
     
-    for file_path in directory.rglob("*.txt"):
-        if file_path.is_file():
-            txt_files.append(file_path)
+    with _WALK_TIMER.time():
+        for file_path in directory.rglob("*.txt"):
+            if file_path.is_file():
+                txt_files.append(file_path)
+        txt_files.sort()
+    
+    if metrics.enabled:
+        _FILES_FOUND.inc(len(txt_files))
+    return txt_files
+
+
+@dataclass
+class TxtDiscovery:
+    """Archivos .txt encontrados en varias raíces, sin repetir inodos"""
+    roots: List[Path]
+    files: List[Path] = field(default_factory=list)
+    root_ids: List[int] = field(default_factory=list)  # índice de raíz de cada archivo
+    found: List[int] = field(default_factory=list)  # .txt encontrados por raíz
+    skipped: List[int] = field(default_factory=list)  # duplicados omitidos por raíz
+    
+    @property
+    def duplicates(self) -> int:
+        """Total de archivos omitidos por duplicados"""
+        return sum(self.skipped)
+
+
+def roots_key(roots: Sequence[Path]) -> str:
+    """
+    Identificador estable de un conjunto ordenado de raíces
+    
+    Con una sola raíz es su ruta, igual que antes de admitir varias, para
+    que los checkpoints existentes sigan siendo válidos.
+    """
+    return os.pathsep.join(str(root) for root in roots)
+
+
+def _walk_root(root: Path) -> List[Tuple[Path, Tuple[int, int]]]:
+    """Archivos .txt de una raíz, ordenados, con su (st_dev, st_ino)"""
+    if not root.is_dir():
+        return []
+    entries = []
+    for file_path in root.rglob("*.txt"):
+        try:
+            st = file_path.stat()
+        except OSError:
+            # Enlace roto o archivo borrado durante el recorrido
+            continue
+        if stat.S_ISREG(st.st_mode):
+            entries.append((file_path, (st.st_dev, st.st_ino)))
+    entries.sort()
+    return entries
+
+
+def discover_txt_files(roots: Sequence[Path]) -> TxtDiscovery:
+    """
+    Encuentra los archivos .txt de varias raíces, recorriéndolas en paralelo
+    
+    Un mismo archivo puede aparecer varias veces (enlaces duros o simbólicos,
+    raíces anidadas o montadas dos veces): se identifica por (st_dev, st_ino)
+    y solo se conserva la primera aparición, en el orden de las raíces y de
+    las rutas dentro de cada una. Así el resultado es determinista y cada
+    archivo se cuenta y se reescribe una única vez.
+    
+    Args:
+        roots: Directorios raíz, en orden de prioridad
+    
+    Returns:
+        TxtDiscovery con los archivos y sus raíces
+    """
+    discovery = TxtDiscovery(roots=list(roots))
+    if not roots:
+        return discovery
+    
+    with _WALK_TIMER.time():
+        if len(roots) == 1:
+            walks = [_walk_root(roots[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(roots), MAX_WALK_THREADS)) as pool:
+                walks = list(pool.map(_walk_root, roots))
+        
+        seen = set()
+        for root_id, entries in enumerate(walks):
+            skipped = 0
+            for file_path, inode in entries:
+                if inode in seen:
+                    skipped += 1
+                    continue
+                seen.add(inode)
+                discovery.files.append(file_path)
+                discovery.root_ids.append(root_id)
+            discovery.found.append(len(entries))
+            discovery.skipped.append(skipped)
     
-    return sorted(txt_files)
+    if metrics.enabled:
+        _FILES_FOUND.inc(len(discovery.files))
+        _DUPLICATES_SKIPPED.inc(discovery.duplicates)
+    return discovery
@@ -0,0 +1,163 @@
+"""Perfilado a demanda de trabajos (cProfile + tracemalloc)"""
+
+import io
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from .logger import get_logger
+from .path_utils import get_app_data_dir
+
+if TYPE_CHECKING:
+    import cProfile
+
+logger = get_logger(__name__)
+
+# Variable de entorno para perfilar los trabajos desde el inicio
+PROFILE_ENV_VAR = "TAG_EDITOR_PROFILE"
+
+
+def profiling_env_enabled() -> bool:
+    """True si TAG_EDITOR_PROFILE pide perfilar los trabajos"""
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class RunProfiler:
+    """
+    Perfila un trabajo con cProfile y tracemalloc
+    
+    Se inicia y se detiene en el hilo del trabajo: cProfile solo mide el
+    hilo donde se activa. Al terminar escribe en logs/ un `.prof` (para
+    snakeviz o pstats) y un informe de texto con las funciones más costosas y
+    las líneas que más memoria asignaron, etiquetados con el tamaño del dataset.
+    """
+    
+    # Frames guardados por asignación (más frames = más coste)
+    TRACEMALLOC_FRAMES = 5
+    TOP_ALLOCATIONS = 30
+    TOP_FUNCTIONS = 40
+    
+    def __init__(self, job: str, output_dir: Optional[Path] = None) -> None:
+        """
+        Inicializa el perfilador
+        
+        Args:
+            job: Nombre del trabajo (ej: "scan", "apply")
+            output_dir: Directorio de salida (por defecto logs/ en el proyecto)
+        """
+        self.job = job
+        self.output_dir = output_dir
+        self._profile: Optional["cProfile.Profile"] = None
+        self._owns_tracemalloc = False
+        self._started = 0.0
+        self._started_at = ""
+    
+    def start(self) -> bool:
+        """
+        Activa cProfile y tracemalloc en el hilo actual
+        
+        Returns:
+            False si no se pudo activar cProfile (ej: otro perfilador activo)
+        """
+        # cProfile y pstats se importan al perfilar: no pesan en el arranque
+        import cProfile
+        
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            logger.warning("No se pudo activar el perfilador para %s: %s", self.job, e)
+            return False
+        self._profile = profile
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        self._started = time.perf_counter()
+        self._started_at = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return True
+    
+    def stop(self, **dataset: int) -> List[Path]:
+        """
+        Detiene el perfilado y escribe los informes
+        
+        Args:
+            dataset: Tamaño del dataset (ej: files=..., tags=...), se incluye en
+                el nombre de los archivos y en el informe
+        
+        Returns:
+            Rutas del `.prof` y del informe de texto (vacío si no estaba activo)
+        """
+        if self._profile is None:
+            return []
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started
+        
+        snapshot = None
+        current = peak = 0
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        
+        output_dir = self.output_dir or get_app_data_dir("logs")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        size_tag = "_".join(f"{value}{name}" for name, value in dataset.items())
+        stem = f"profile_{self.job}_{self._started_at}" + (f"_{size_tag}" if size_tag else "")
+        prof_path = output_dir / f"{stem}.prof"
+        report_path = output_dir / f"{stem}.txt"
+        
+        self._profile.dump_stats(str(prof_path))
+        report_path.write_text(
+            self._format_report(elapsed, dataset, current, peak, snapshot),
+            encoding="utf-8"
+        )
+        self._profile = None
+        
+        logger.info("Perfil de %s guardado en %s (%.1f s)", self.job, prof_path, elapsed)
+        return [prof_path, report_path]
+    
+    def _format_report(
+        self,
+        elapsed: float,
+        dataset: dict,
+        current: int,
+        peak: int,
+        snapshot: Optional[tracemalloc.Snapshot]
+    ) -> str:
+        """Informe de texto: resumen, funciones más costosas y mayores asignaciones"""
+        import pstats
+        
+        lines = [
+            f"Perfil de {self.job} ({self._started_at})",
+            "Dataset: " + (", ".join(f"{value} {name}" for name, value in dataset.items()) or "desconocido"),
+            f"Duración: {elapsed:.2f} s",
+            f"Memoria (tracemalloc): pico {peak / (1024 * 1024):.1f} MB, "
+            f"al terminar {current / (1024 * 1024):.1f} MB",
+            ""
+        ]
+        
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.TOP_FUNCTIONS)
+        lines.append(f"== {self.TOP_FUNCTIONS} funciones con más tiempo acumulado ==")
+        lines.append(stream.getvalue().strip())
+        lines.append("")
+        
+        lines.append(f"== {self.TOP_ALLOCATIONS} líneas con más memoria asignada (vivas al terminar) ==")
+        if snapshot is None:
+            lines.append("tracemalloc no disponible")
+        else:
+            for stat in snapshot.statistics("lineno")[:self.TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"{stat.size / 1024:10.1f} KiB {stat.count:9d} bloques  {frame.filename}:{frame.lineno}"
+                )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,66 @@
+"""Medición del arranque: importaciones, construcción de la ventana y primer pintado"""
+
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+# Variable de entorno para medir el arranque
+STARTUP_TIMING_ENV_VAR = "TAG_EDITOR_STARTUP_TIMING"
+
+
+def startup_timing_env_enabled() -> bool:
+    """True si TAG_EDITOR_STARTUP_TIMING pide medir el arranque"""
+    return os.environ.get(STARTUP_TIMING_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class StartupTimer:
+    """
+    Registra las fases del arranque hasta que la ventana se pinta
+    
+    Cada marca guarda el tiempo desde `origin` (el inicio de main.py) y los
+    módulos cargados hasta ese momento. Desactivado, mark() no hace nada.
+    Para el detalle por módulo: `python -X importtime app/main.py`.
+    """
+    
+    def __init__(self, origin: Optional[float] = None, enabled: bool = True) -> None:
+        """
+        Inicializa el registro
+        
+        Args:
+            origin: Instante inicial (time.perf_counter), por defecto ahora
+            enabled: Si False, las marcas se ignoran
+        """
+        self.origin = time.perf_counter() if origin is None else origin
+        self.enabled = enabled
+        self._marks: List[Tuple[str, float, int]] = []  # (fase, segundos desde origin, módulos)
+    
+    def mark(self, phase: str) -> None:
+        """Marca el fin de una fase"""
+        if self.enabled:
+            self._marks.append((phase, time.perf_counter() - self.origin, len(sys.modules)))
+    
+    def elapsed(self) -> float:
+        """Segundos hasta la última marca"""
+        return self._marks[-1][1] if self._marks else 0.0
+    
+    def report(self) -> str:
+        """Tabla de fases con su duración y los módulos que cargó cada una"""
+        if not self._marks:
+            return "Arranque: sin marcas"
+        lines = [f"Arranque: {self.elapsed() * 1000:.0f} ms hasta {self._marks[-1][0]}"]
+        previous_time = 0.0
+        previous_modules = self._marks[0][2]
+        for phase, at, modules in self._marks:
+            lines.append(
+                f"  {phase:<28} {(at - previous_time) * 1000:8.1f} ms"
+                f"  (acumulado {at * 1000:8.1f} ms, {modules} módulos, +{modules - previous_modules})"
+            )
+            previous_time, previous_modules = at, modules
+        return "\n".join(lines)
+    
+    def log(self, logger: logging.Logger) -> None:
+        """Escribe el informe en el log (si está activado)"""
+        if self.enabled and self._marks:
+            logger.info("%s", self.report())
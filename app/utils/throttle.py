@@ -0,0 +1,203 @@
+"""Límites de E/S (archivos/s, MB/s, archivos abiertos) con token buckets"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass
+class IOBudget:
+    """Presupuesto de E/S; 0 significa sin límite"""
+    max_files_per_sec: float = 0.0
+    max_mb_per_sec: float = 0.0
+    max_open_files: int = 0
+    low_priority: bool = False
+    
+    def is_unlimited(self) -> bool:
+        """True si no hay ningún límite configurado"""
+        return not (self.max_files_per_sec or self.max_mb_per_sec or self.max_open_files)
+    
+    def describe(self) -> str:
+        """Resumen legible del presupuesto"""
+        parts = [
+            f"{self.max_files_per_sec:g} archivos/s" if self.max_files_per_sec else "archivos/s sin límite",
+            f"{self.max_mb_per_sec:g} MB/s" if self.max_mb_per_sec else "MB/s sin límite",
+            f"{self.max_open_files} abiertos" if self.max_open_files else "abiertos sin límite"
+        ]
+        return ", ".join(parts)
+
+
+@dataclass
+class IOReport:
+    """Rendimiento obtenido por un trabajo frente a su presupuesto"""
+    files: int
+    bytes: int
+    elapsed: float
+    throttled_seconds: float
+    budget: IOBudget
+    
+    @property
+    def files_per_sec(self) -> float:
+        """Archivos por segundo obtenidos"""
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def mb_per_sec(self) -> float:
+        """MB por segundo obtenidos"""
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def describe(self) -> str:
+        """Resumen legible: rendimiento obtenido / límite"""
+        files_limit = f"{self.budget.max_files_per_sec:g}" if self.budget.max_files_per_sec else "∞"
+        mb_limit = f"{self.budget.max_mb_per_sec:g}" if self.budget.max_mb_per_sec else "∞"
+        return (
+            f"{self.files_per_sec:.1f}/{files_limit} archivos/s, "
+            f"{self.mb_per_sec:.2f}/{mb_limit} MB/s, "
+            f"{self.throttled_seconds:.1f} s en espera"
+        )
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe
+    
+    Permite ráfagas de hasta `capacity` tokens y un consumo medio de `rate`
+    tokens por segundo. Las peticiones mayores que la capacidad se conceden
+    dejando el balance en negativo, de modo que las siguientes esperan.
+    """
+    
+    def __init__(self, rate: float = 0.0, capacity: float = 0.0) -> None:
+        """
+        Inicializa el bucket
+        
+        Args:
+            rate: Tokens por segundo (0 = sin límite)
+            capacity: Tamaño máximo de ráfaga (por defecto un segundo de tokens)
+        """
+        self._lock = threading.Lock()
+        self._rate = 0.0
+        self._capacity = 0.0
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.set_rate(rate, capacity)
+    
+    def set_rate(self, rate: float, capacity: float = 0.0) -> None:
+        """Cambia la tasa en caliente"""
+        with self._lock:
+            self._refill()
+            self._rate = max(0.0, rate)
+            self._capacity = capacity or self._rate
+            self._tokens = min(self._tokens, self._capacity)
+    
+    def _refill(self) -> None:
+        """Repone tokens según el tiempo transcurrido (con el lock tomado)"""
+        now = time.monotonic()
+        if self._rate > 0:
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+    
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Consume tokens esperando lo necesario
+        
+        Args:
+            amount: Tokens a consumir
+        
+        Returns:
+            Segundos esperados
+        """
+        with self._lock:
+            if self._rate <= 0:
+                return 0.0
+            self._refill()
+            self._tokens -= amount
+        
+        # Esperar en intervalos cortos para reaccionar a cambios de tasa en caliente
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._rate <= 0 or self._tokens >= 0:
+                    if self._rate <= 0:
+                        self._tokens = 0.0
+                    return waited
+                wait = min(0.1, -self._tokens / self._rate)
+            time.sleep(wait)
+            waited += wait
+
+
+class IOScheduler:
+    """Aplica un IOBudget a las lecturas y escrituras de los workers"""
+    
+    def __init__(self, budget: IOBudget = None) -> None:
+        """
+        Inicializa el scheduler
+        
+        Args:
+            budget: Presupuesto inicial (por defecto sin límites)
+        """
+        self._files = TokenBucket()
+        self._bytes = TokenBucket()
+        self._open_cond = threading.Condition()
+        self._open_files = 0
+        self._stats_lock = threading.Lock()
+        self.budget = IOBudget()
+        self.set_budget(budget or IOBudget())
+        self.reset_stats()
+    
+    def set_budget(self, budget: IOBudget) -> None:
+        """Cambia el presupuesto en caliente (afecta al trabajo en curso)"""
+        self.budget = budget
+        self._files.set_rate(budget.max_files_per_sec)
+        self._bytes.set_rate(budget.max_mb_per_sec * 1024 * 1024)
+        with self._open_cond:
+            self._open_cond.notify_all()
+    
+    def reset_stats(self) -> None:
+        """Reinicia las estadísticas al empezar un trabajo"""
+        with self._stats_lock:
+            self._started = time.monotonic()
+            self._file_count = 0
+            self._byte_count = 0
+            self._throttled = 0.0
+    
+    def throttle_file(self) -> None:
+        """Cuenta un archivo y espera si se supera el límite de archivos/s"""
+        waited = self._files.acquire(1)
+        with self._stats_lock:
+            self._file_count += 1
+            self._throttled += waited
+    
+    def throttle_bytes(self, count: int) -> None:
+        """Cuenta bytes leídos/escritos y espera si se supera el límite de MB/s"""
+        waited = self._bytes.acquire(count)
+        with self._stats_lock:
+            self._byte_count += count
+            self._throttled += waited
+    
+    @contextmanager
+    def open_slot(self) -> Iterator[None]:
+        """Limita el número de archivos abiertos simultáneamente"""
+        with self._open_cond:
+            while self.budget.max_open_files and self._open_files >= self.budget.max_open_files:
+                self._open_cond.wait()
+            self._open_files += 1
+        try:
+            yield
+        finally:
+            with self._open_cond:
+                self._open_files -= 1
+                self._open_cond.notify()
+    
+    def report(self) -> IOReport:
+        """Rendimiento obtenido desde el último reset_stats()"""
+        with self._stats_lock:
+            return IOReport(
+                files=self._file_count,
+                bytes=self._byte_count,
+                elapsed=time.monotonic() - self._started,
+                throttled_seconds=self._throttled,
+                budget=self.budget
+            )
@@ -1,6 +1,27 @@
 """Workers para operaciones en background"""
 
-from .scan_worker import ScanWorker
-from .apply_worker import ApplyWorker
+from typing import TYPE_CHECKING
 
-__all__ = ["ScanWorker", "ApplyWorker"]
+from ..utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .scan_worker import ScanWorker
+    from .apply_worker import ApplyWorker
+    from .dry_run_worker import DryRunWorker
+    from .cooccurrence_worker import CooccurrenceWorker
+    from .duplicate_worker import DuplicateWorker
+    from .export_worker import ExportWorker
+    from .merge_worker import MergeWorker
+
+# Se importan al primer uso (al lanzar cada trabajo)
+__getattr__ = lazy_exports(__name__, {
+    "ScanWorker": ".scan_worker",
+    "ApplyWorker": ".apply_worker",
+    "DryRunWorker": ".dry_run_worker",
+    "CooccurrenceWorker": ".cooccurrence_worker",
+    "DuplicateWorker": ".duplicate_worker",
+    "ExportWorker": ".export_worker",
+    "MergeWorker": ".merge_worker",
+})
+
+__all__ = ["ScanWorker", "ApplyWorker", "DryRunWorker", "CooccurrenceWorker", "DuplicateWorker", "ExportWorker", "MergeWorker"]
@@ -1,153 +1,296 @@
 """Worker para aplicar cambios a archivos en background"""
 
+import hashlib
+import time
+from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, Set, Tuple, List
+from typing import Dict, List, Optional, Set
 
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import Signal
 
-from ..core.tag_parser import format_tag
-from ..models.tag_models import Tag, TagFile
-from ..utils.logger import get_logger
+from ..core.rewrite import RewritePlan, format_content
+from ..core.tag_io import read_tag_file, write_tag_file
+from ..models.tag_models import TagFile, FileRewrite, RewriteSummary
+from ..utils.checkpoint import JobCheckpoint
+from ..utils.logger import get_logger, LogSummary
+from ..utils.metrics import metrics
+from ..utils.throttle import IOScheduler
+from .base_worker import BaseWorker
 
 logger = get_logger(__name__)
 
+_APPLY_TIMER = metrics.timer("apply.total", "Duración de las aplicaciones")
+_APPLY_FILE_TIMER = metrics.timer("apply.file", "Tiempo de reescritura por archivo")
+_FILES_MODIFIED = metrics.counter("apply.files_modified", "Archivos modificados al aplicar")
+_APPLY_ERRORS = metrics.counter("apply.errors", "Archivos con error al aplicar")
 
-class ApplyWorker(QThread):
-    """Worker thread para aplicar cambios (remover tags) a archivos"""
+
+class ApplyWorker(BaseWorker):
+    """
+    Worker thread para aplicar un plan de reescritura a archivos
+    
+    Un plan no es idempotente (`a -> b` y `b -> c` convierten `a` en `b` y,
+    aplicado otra vez, en `c`), así que reanudar nunca debe reescribir un
+    archivo ya escrito. Antes de escribir cada archivo modificado se añade al
+    checkpoint un registro con el hash del contenido nuevo; al reanudar, los
+    archivos posteriores al cursor cuyo contenido coincide con su registro se
+    dan por hechos.
+    """
+    
+    # Intervalo entre checkpoints del cursor (segundos)
+    CHECKPOINT_INTERVAL = 2.0
     
     # Señales
     progress = Signal(int, int)  # current, total
     file_processed = Signal(str, bool)  # file_path (str), modified
-    finished = Signal(int, int)  # files_modified, tags_removed
+    finished = Signal(object)  # RewriteSummary
     error = Signal(str)  # error_message
     
     def __init__(
         self,
-        files_data: Dict[Path, TagFile],
-        tags_to_remove: Set[tuple[str, str]],  # Set de (namespace, tag)
+        files: List[Path],
+        plan: RewritePlan,
+        files_data: Optional[Dict[Path, TagFile]] = None,
+        checkpoint: Optional[JobCheckpoint] = None,
+        backup_dirs: Optional[List[Path]] = None,
+        scheduler: Optional[IOScheduler] = None,
         parent=None
     ):
         """
         Inicializa el worker
         
         Args:
-            files_data: Diccionario de archivos con sus tags
-            tags_to_remove: Set de tuplas (namespace, tag) a remover
+            files: Archivos a procesar, en orden
+            plan: Plan de reescritura a aplicar
+            files_data: Tags ya escaneados; los archivos ausentes se leen de disco
+            checkpoint: Checkpoint para guardar el avance y reanudar (opcional)
+            backup_dirs: Backups creados antes de aplicar, uno por raíz (se guardan en el checkpoint)
+            scheduler: Limitador de E/S (opcional)
             parent: Widget padre
         """
-        super().__init__(parent)
-        self.files_data = files_data
-        self.tags_to_remove = tags_to_remove
-        self._cancelled = False
-    
-    def cancel(self) -> None:
-        """Cancela la aplicación"""
-        self._cancelled = True
+        super().__init__(scheduler, parent)
+        self.files = files
+        self.plan = plan
+        self.files_data = files_data or {}
+        self.checkpoint = checkpoint
+        self.backup_dirs = backup_dirs or []
+        # Resumen periódico en lugar de una línea de debug por archivo
+        self._file_log = LogSummary(logger, "Archivos modificados")
     
     def run(self) -> None:
         """Ejecuta la aplicación de cambios"""
+        profiler = self._start_profiler("apply")
+        self._file_log = LogSummary(logger, "Archivos modificados")
+        with _APPLY_TIMER.time():
+            self._apply()
+        self._file_log.flush()
+        self._finish_profiler(profiler, files=len(self.files))
+    
+    def _apply(self) -> None:
+        """Procesa los archivos pendientes y guarda checkpoints"""
         try:
-            logger.info(f"Aplicando cambios a {len(self.files_data)} archivos")
-            logger.info(f"Tags a remover: {len(self.tags_to_remove)}")
+            logger.info("Aplicando cambios a %s archivos", len(self.files))
+            logger.info("Plan: %s", self.plan.describe())
             
-            files_modified = 0
-            total_tags_removed = 0
-            total_files = len(self.files_data)
+            total_files = len(self.files)
+            start, summary, written = self._restore_checkpoint()
+            if self.scheduler is not None:
+                self.scheduler.reset_stats()
+            last_checkpoint = time.monotonic()
+            cursor = start
             
-            for idx, (file_path, tag_file) in enumerate(self.files_data.items()):
-                if self._cancelled:
+            for idx in range(start, total_files):
+                if not self._wait_if_paused():
                     logger.info("Aplicación cancelada por el usuario")
                     break
                 
+                file_path = self.files[idx]
+                if idx in written:
+                    # Escrito antes de la interrupción (ya contado en el resumen)
+                    cursor = idx + 1
+                    self.file_processed.emit(str(file_path), True)
+                    self.progress.emit(cursor, total_files)
+                    continue
                 try:
-                    modified, tags_removed = self._process_file(file_path, tag_file)
-                    
-                    if modified:
-                        files_modified += 1
-                        total_tags_removed += tags_removed
-                    
-                    self.file_processed.emit(str(file_path), modified)
+                    with _APPLY_FILE_TIMER.time():
+                        rewrite = self._process_file(file_path, self.files_data.get(file_path), idx)
+                    summary.add(rewrite)
+                    self.file_processed.emit(str(file_path), rewrite.modified)
+                    if metrics.enabled and rewrite.modified:
+                        _FILES_MODIFIED.inc()
                 
                 except Exception as e:
-                    logger.error(f"Error procesando {file_path}: {e}")
+                    if metrics.enabled:
+                        _APPLY_ERRORS.inc()
+                    logger.error("Error procesando %s: %s", file_path, e)
                     self.error.emit(f"Error en {file_path.name}: {str(e)}")
                 
-                self.progress.emit(idx + 1, total_files)
+                cursor = idx + 1
+                self.progress.emit(cursor, total_files)
+                
+                now = time.monotonic()
+                if now - last_checkpoint >= self.CHECKPOINT_INTERVAL:
+                    self._save_checkpoint(cursor, summary)
+                    last_checkpoint = now
+            
+            if self.checkpoint is not None:
+                if cursor < total_files:
+                    # Interrumpido: guardar para reanudar más tarde
+                    self._save_checkpoint(cursor, summary)
+                else:
+                    self.checkpoint.clear()
             
             logger.info(
-                f"Aplicación completada: {files_modified} archivos modificados, "
-                f"{total_tags_removed} tags removidos"
+                "Aplicación completada: %s archivos modificados, "
+                "%s tags removidos, %s reemplazados, "
+                "%s añadidos",
+                summary.files_modified, summary.tags_removed, summary.tags_replaced, summary.tags_added
             )
-            self.finished.emit(files_modified, total_tags_removed)
+            self.finished.emit(summary)
         
         except Exception as e:
-            logger.error(f"Error en aplicación: {e}", exc_info=True)
+            logger.error("Error en aplicación: %s", e, exc_info=True)
             self.error.emit(f"Error fatal: {str(e)}")
-            self.finished.emit(0, 0)
+            self.finished.emit(RewriteSummary())
+    
+    def _restore_checkpoint(self) -> tuple[int, RewriteSummary, Set[int]]:
+        """
+        Retoma una aplicación interrumpida o registra una nueva
+        
+        Returns:
+            Tupla (índice del primer archivo pendiente, resumen acumulado,
+            índices posteriores al cursor que ya se escribieron)
+        """
+        if self.checkpoint is None:
+            return 0, RewriteSummary(), set()
+        
+        state = self.checkpoint.load()
+        if (
+            state
+            and state.get("plan_hash") == self.plan.fingerprint()
+            and state.get("file_count") == len(self.files)
+        ):
+            cursor = state.get("cursor", 0)
+            summary = RewriteSummary(**state.get("summary", {}))
+            written = self._restore_writes(cursor, summary)
+            logger.info(
+                "Reanudando aplicación en el archivo %s/%s (%s archivos posteriores ya escritos)",
+                cursor, len(self.files), len(written)
+            )
+            return cursor, summary, written
+        
+        # Nuevo trabajo: guardar plan y lista de archivos antes de tocar nada
+        self.checkpoint.clear()
+        self.checkpoint.append_partial([{"p": str(path)} for path in self.files])
+        self._save_checkpoint(0, RewriteSummary())
+        return 0, RewriteSummary(), set()
+    
+    def _restore_writes(self, cursor: int, summary: RewriteSummary) -> Set[int]:
+        """
+        Archivos posteriores al cursor que se escribieron antes de la interrupción
+        
+        Los registros de escritura siguen a la lista de archivos en el parcial.
+        Un archivo cuenta como escrito si su contenido actual tiene el hash de
+        su registro; si no (cierre justo antes de escribir), se procesa otra vez.
+        Sus estadísticas se suman al resumen.
+        """
+        file_count = len(self.files)
+        pending: Dict[int, dict] = {}
+        valid = 0
+        for valid, record in enumerate(self.checkpoint.iter_partial(), 1):
+            if valid > file_count and record["i"] >= cursor:
+                pending[record["i"]] = record
+        # Una línea truncada al final impediría leer los registros que se añadan después
+        self.checkpoint.truncate_partial(valid)
+        
+        written = set()
+        for index, record in pending.items():
+            file_path = self.files[index]
+            try:
+                data = file_path.read_bytes()
+            except OSError:
+                continue
+            if _content_digest(data) == record["h"]:
+                written.add(index)
+                summary.add(FileRewrite(file_path, *record["r"]))
+        return written
+    
+    def _save_checkpoint(self, cursor: int, summary: RewriteSummary) -> None:
+        """Persiste el cursor y los totales acumulados"""
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.save({
+                "plan": self.plan.to_dict(),
+                "plan_hash": self.plan.fingerprint(),
+                "file_count": len(self.files),
+                "cursor": cursor,
+                "summary": asdict(summary),
+                "backup_dirs": [str(backup_dir) for backup_dir in self.backup_dirs]
+            })
+        except OSError as e:
+            logger.warning("No se pudo guardar el checkpoint de aplicación: %s", e)
+    
+    def _record_write(self, index: int, data: bytes, rewrite: FileRewrite) -> None:
+        """Registra en el checkpoint, antes de escribirlo, el contenido nuevo de un archivo"""
+        if self.checkpoint is None:
+            return
+        self.checkpoint.append_partial([{
+            "i": index,
+            "h": _content_digest(data),
+            "r": [
+                rewrite.original_count, rewrite.final_count, rewrite.tags_removed,
+                rewrite.tags_replaced, rewrite.tags_added, rewrite.duplicates_removed
+            ]
+        }])
     
     def _process_file(
         self,
         file_path: Path,
-        tag_file: TagFile
-    ) -> Tuple[bool, int]:
+        tag_file: Optional[TagFile],
+        index: int
+    ) -> FileRewrite:
         """
-        Procesa un archivo y remueve los tags especificados
+        Procesa un archivo aplicando el plan en una sola pasada
         
         Args:
             file_path: Ruta del archivo
-            tag_file: TagFile con los tags originales
+            tag_file: TagFile con los tags originales (None para leerlo de disco)
+            index: Posición del archivo en la lista (para el checkpoint)
             
         Returns:
-            Tupla (modified, tags_removed)
+            FileRewrite con las estadísticas del archivo
         """
-        # Filtrar tags a mantener
-        tags_to_keep: List[Tag] = []
-        tags_removed = 0
+        if tag_file is None:
+            tag_file = read_tag_file(file_path, self.scheduler)
         
-        for tag in tag_file.tags:
-            key = (tag.namespace, tag.tag)
-            if key not in self.tags_to_remove:
-                tags_to_keep.append(tag)
-            else:
-                tags_removed += 1
+        new_tags, rewrite = self.plan.rewrite_file(file_path, tag_file.tags)
         
         # Si no hay cambios, no escribir
-        if tags_removed == 0:
-            return False, 0
-        
-        # Escribir archivo con tags restantes
-        # Mantener orden original (solo remover los seleccionados)
-        # Remover duplicados manteniendo orden
-        seen = set()
-        unique_tags = []
-        for tag in tags_to_keep:
-            key = (tag.namespace, tag.tag)
-            if key not in seen:
-                seen.add(key)
-                unique_tags.append(tag)
-        
-        # Formatear líneas
-        lines = []
-        for tag in unique_tags:
-            formatted = format_tag(tag.namespace, tag.tag)
-            lines.append(formatted)
-        
-        # Escribir archivo
-        content = tag_file.line_endings.join(lines)
-        if lines:  # Si hay líneas, añadir line ending al final
-            content += tag_file.line_endings
+        if not rewrite.modified:
+            return rewrite
         
+        # Escribir archivo manteniendo orden y line endings originales
         try:
-            with open(file_path, 'w', encoding='utf-8', newline='') as f:
-                f.write(content)
+            self._record_write(
+                index, format_content(new_tags, tag_file.line_endings).encode('utf-8'), rewrite
+            )
+            write_tag_file(file_path, new_tags, tag_file.line_endings, self.scheduler)
             
-            logger.debug(
-                f"Archivo modificado {file_path}: {tags_removed} tags removidos, "
-                f"{len(unique_tags)} tags restantes"
+            self._file_log.add(
+                file_path,
+                removidos=rewrite.tags_removed,
+                reemplazados=rewrite.tags_replaced,
+                agregados=rewrite.tags_added
             )
             
-            return True, tags_removed
+            return rewrite
         
         except Exception as e:
-            logger.error(f"Error escribiendo {file_path}: {e}")
+            logger.error("Error escribiendo %s: %s", file_path, e)
             raise
+
+
+def _content_digest(data: bytes) -> str:
+    """Hash del contenido de un archivo reescrito"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
@@ -0,0 +1,99 @@
+"""Base común para workers cancelables y pausables"""
+
+import threading
+from typing import Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from ..utils.logger import get_logger
+from ..utils.profiling import RunProfiler
+from ..utils.throttle import IOScheduler, IOReport
+
+logger = get_logger(__name__)
+
+
+class BaseWorker(QThread):
+    """Worker thread con soporte de cancelación, pausa y reanudación"""
+    
+    # Señales
+    paused = Signal(bool)  # True al pausar, False al reanudar
+    profile_saved = Signal(str)  # ruta del informe de perfilado
+    
+    def __init__(self, scheduler: Optional[IOScheduler] = None, parent=None):
+        """
+        Inicializa el worker
+        
+        Args:
+            scheduler: Limitador de E/S compartido (opcional)
+            parent: Widget padre
+        """
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self._cancelled = False
+        self._running = threading.Event()
+        self._running.set()
+        # Perfilar el trabajo con cProfile y tracemalloc (lo activa la ventana)
+        self.profile = False
+    
+    def cancel(self) -> None:
+        """Cancela el trabajo (también si está pausado)"""
+        self._cancelled = True
+        self._running.set()
+    
+    def pause(self) -> None:
+        """Pausa el trabajo antes del siguiente archivo"""
+        if self._running.is_set():
+            self._running.clear()
+            self.paused.emit(True)
+    
+    def resume(self) -> None:
+        """Reanuda un trabajo pausado"""
+        if not self._running.is_set():
+            self._running.set()
+            self.paused.emit(False)
+    
+    def is_cancelled(self) -> bool:
+        """True si el trabajo fue cancelado"""
+        return self._cancelled
+    
+    def is_paused(self) -> bool:
+        """True si el trabajo está pausado"""
+        return not self._running.is_set()
+    
+    def io_report(self) -> Optional[IOReport]:
+        """Rendimiento de E/S del trabajo frente al presupuesto"""
+        if self.scheduler is None:
+            return None
+        return self.scheduler.report()
+    
+    def _start_profiler(self, job: str) -> Optional[RunProfiler]:
+        """Activa el perfilador en el hilo del worker si se pidió"""
+        if not self.profile:
+            return None
+        profiler = RunProfiler(job)
+        return profiler if profiler.start() else None
+    
+    def _finish_profiler(self, profiler: Optional[RunProfiler], **dataset: int) -> None:
+        """Detiene el perfilador y avisa dónde quedó el informe"""
+        if profiler is None:
+            return
+        try:
+            paths = profiler.stop(**dataset)
+        except Exception as e:
+            # Un fallo del perfilado no debe afectar al resultado del trabajo
+            logger.error("Error guardando el perfil: %s", e, exc_info=True)
+            return
+        if paths:
+            self.profile_saved.emit(str(paths[-1]))
+    
+    def _wait_if_paused(self) -> bool:
+        """
+        Bloquea el worker mientras esté pausado y aplica el límite de archivos/s
+        
+        Returns:
+            True si el trabajo debe continuar, False si fue cancelado
+        """
+        self._running.wait()
+        if self.scheduler is not None and not self._cancelled:
+            self.scheduler.throttle_file()
+        return not self._cancelled
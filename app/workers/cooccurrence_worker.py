@@ -0,0 +1,79 @@
+"""Worker para construir el índice de co-ocurrencia en background"""
+
+from PySide6.QtCore import Signal
+
+from ..core.aggregator import TagAggregator
+from ..core.cooccurrence import CooccurrenceIndex
+from ..utils.logger import get_logger
+from .base_worker import BaseWorker
+
+logger = get_logger(__name__)
+
+
+class CooccurrenceWorker(BaseWorker):
+    """Worker thread que construye la matriz de co-ocurrencia y busca implicaciones"""
+    
+    # Señales
+    progress = Signal(int, int)  # current, total
+    finished = Signal(object)  # CooccurrenceIndex (None si falló o se canceló)
+    error = Signal(str)  # error_message
+    
+    def __init__(
+        self,
+        aggregator: TagAggregator,
+        top_k: int = 500,
+        min_confidence: float = 0.95,
+        min_support: int = 5,
+        parent=None
+    ):
+        """
+        Inicializa el worker
+        
+        Args:
+            aggregator: Agregador del último escaneo
+            top_k: Tags más frecuentes cuyas filas se precalculan
+            min_confidence: Confianza mínima de las implicaciones
+            min_support: Mínimo de archivos con ambos tags
+            parent: Widget padre
+        """
+        super().__init__(None, parent)
+        self.aggregator = aggregator
+        self.top_k = top_k
+        self.min_confidence = min_confidence
+        self.min_support = min_support
+    
+    def _should_stop(self) -> bool:
+        """Espera si está pausado; True si fue cancelado"""
+        self._running.wait()
+        return self._cancelled
+    
+    def run(self) -> None:
+        """Construye el índice, precalcula los tags frecuentes y busca implicaciones"""
+        try:
+            index = CooccurrenceIndex(self.aggregator)
+            logger.info(
+                "Matriz de co-ocurrencia: %s tags, "
+                "%s archivos (backend %s)",
+                len(index), index.file_total, index.backend
+            )
+            
+            index.precompute(self.top_k, should_stop=self._should_stop)
+            candidates = index.implication_candidates(
+                self.min_confidence,
+                self.min_support,
+                progress=self.progress.emit,
+                should_stop=self._should_stop
+            )
+            
+            if self._cancelled:
+                logger.info("Análisis de co-ocurrencia cancelado por el usuario")
+                self.finished.emit(None)
+                return
+            
+            logger.info("Implicaciones candidatas: %s", len(candidates))
+            self.finished.emit(index)
+        
+        except Exception as e:
+            logger.error("Error en análisis de co-ocurrencia: %s", e, exc_info=True)
+            self.error.emit(f"Error fatal: {str(e)}")
+            self.finished.emit(None)
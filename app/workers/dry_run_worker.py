@@ -0,0 +1,104 @@
+"""Worker para calcular la vista previa (dry-run) en background"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import Signal
+
+from ..core.rewrite import RewritePlan
+from ..core.tag_io import read_tag_file
+from ..models.tag_models import TagFile, FileRewrite, RewriteSummary
+from ..utils.logger import get_logger
+from ..utils.throttle import IOScheduler
+from .base_worker import BaseWorker
+
+logger = get_logger(__name__)
+
+
+class DryRunWorker(BaseWorker):
+    """Worker thread que aplica un plan en memoria y emite los cambios por archivo"""
+    
+    # Máximo de archivos acumulados antes de emitir un lote
+    BATCH_SIZE = 500
+    # Intervalo máximo entre lotes (segundos)
+    BATCH_INTERVAL = 0.25
+    
+    # Señales
+    progress = Signal(int, int)  # current, total
+    batch_ready = Signal(object)  # List[FileRewrite] de archivos modificados
+    finished = Signal(object)  # RewriteSummary
+    error = Signal(str)  # error_message
+    
+    def __init__(
+        self,
+        files: List[Path],
+        plan: RewritePlan,
+        files_data: Optional[Dict[Path, TagFile]] = None,
+        scheduler: Optional[IOScheduler] = None,
+        parent=None
+    ):
+        """
+        Inicializa el worker
+        
+        Args:
+            files: Archivos candidatos a evaluar, en orden
+            plan: Plan de reescritura a evaluar
+            files_data: Tags ya escaneados; los archivos ausentes se leen de disco
+            scheduler: Limitador de E/S (solo afecta a las relecturas)
+            parent: Widget padre
+        """
+        super().__init__(scheduler, parent)
+        self.files = files
+        self.plan = plan
+        self.files_data = files_data or {}
+    
+    def run(self) -> None:
+        """Ejecuta el dry-run"""
+        try:
+            logger.info("Dry-run sobre %s archivos: %s", len(self.files), self.plan.describe())
+            
+            summary = RewriteSummary()
+            total_files = len(self.files)
+            batch: List[FileRewrite] = []
+            last_emit = time.monotonic()
+            
+            for idx, file_path in enumerate(self.files):
+                if self._cancelled:
+                    logger.info("Dry-run cancelado por el usuario")
+                    break
+                
+                tag_file = self.files_data.get(file_path)
+                try:
+                    if tag_file is None:
+                        self._wait_if_paused()
+                        tag_file = read_tag_file(file_path, self.scheduler)
+                except OSError as e:
+                    logger.error("Error leyendo %s: %s", file_path, e)
+                    self.error.emit(f"Error en {file_path.name}: {str(e)}")
+                    continue
+                
+                _, rewrite = self.plan.rewrite_file(file_path, tag_file.tags)
+                summary.add(rewrite)
+                if rewrite.modified:
+                    batch.append(rewrite)
+                
+                now = time.monotonic()
+                if len(batch) >= self.BATCH_SIZE or now - last_emit >= self.BATCH_INTERVAL:
+                    if batch:
+                        self.batch_ready.emit(batch)
+                        batch = []
+                    self.progress.emit(idx + 1, total_files)
+                    last_emit = now
+            
+            if batch:
+                self.batch_ready.emit(batch)
+            self.progress.emit(summary.files_processed, total_files)
+            
+            logger.info("Dry-run completado: %s archivos a modificar", summary.files_modified)
+            self.finished.emit(summary)
+        
+        except Exception as e:
+            logger.error("Error en dry-run: %s", e, exc_info=True)
+            self.error.emit(f"Error fatal: {str(e)}")
+            self.finished.emit(RewriteSummary())
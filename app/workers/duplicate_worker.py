@@ -0,0 +1,63 @@
+"""Worker para detectar tags casi duplicados en background"""
+
+from typing import List
+
+from PySide6.QtCore import Signal
+
+from ..core.duplicates import find_duplicate_groups
+from ..models.tag_models import TagAggregate
+from ..utils.logger import get_logger
+from .base_worker import BaseWorker
+
+logger = get_logger(__name__)
+
+
+class DuplicateWorker(BaseWorker):
+    """Worker thread que agrupa variantes de tags por namespace"""
+    
+    # Señales
+    progress = Signal(int, int)  # current, total
+    finished = Signal(object)  # List[DuplicateGroup] (None si falló o se canceló)
+    error = Signal(str)  # error_message
+    
+    def __init__(self, aggregates: List[TagAggregate], fuzzy: bool = True, parent=None):
+        """
+        Inicializa el worker
+        
+        Args:
+            aggregates: Agregados a analizar (copia tomada en el hilo principal)
+            fuzzy: Buscar también erratas (una edición de distancia)
+            parent: Widget padre
+        """
+        super().__init__(None, parent)
+        self.aggregates = aggregates
+        self.fuzzy = fuzzy
+    
+    def _should_stop(self) -> bool:
+        """Espera si está pausado; True si fue cancelado"""
+        self._running.wait()
+        return self._cancelled
+    
+    def run(self) -> None:
+        """Agrupa las variantes"""
+        try:
+            logger.info("Buscando duplicados entre %s tags", len(self.aggregates))
+            groups = find_duplicate_groups(
+                self.aggregates,
+                self.fuzzy,
+                progress=self.progress.emit,
+                should_stop=self._should_stop
+            )
+            
+            if self._cancelled:
+                logger.info("Búsqueda de duplicados cancelada por el usuario")
+                self.finished.emit(None)
+                return
+            
+            logger.info("Grupos de duplicados: %s", len(groups))
+            self.finished.emit(groups)
+        
+        except Exception as e:
+            logger.error("Error buscando duplicados: %s", e, exc_info=True)
+            self.error.emit(f"Error fatal: {str(e)}")
+            self.finished.emit(None)
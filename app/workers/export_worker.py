@@ -0,0 +1,69 @@
+"""Worker para exportar los resultados del escaneo en background"""
+
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import Signal
+
+from ..core.aggregator import TagAggregator
+from ..core.export import export_scan
+from ..utils.logger import get_logger
+from .base_worker import BaseWorker
+
+logger = get_logger(__name__)
+
+
+class ExportWorker(BaseWorker):
+    """Worker thread que escribe agregados y relación archivo ↔ tag por bloques"""
+    
+    # Señales
+    progress = Signal(int, int)  # filas escritas, filas totales
+    finished = Signal(object)  # ExportSummary (None si falló)
+    error = Signal(str)  # error_message
+    
+    def __init__(
+        self,
+        aggregator: TagAggregator,
+        path: Path,
+        fmt: str,
+        relation_path: Optional[Path] = None,
+        parent=None
+    ):
+        """
+        Inicializa el worker
+        
+        Args:
+            aggregator: Resultado del escaneo (no debe cambiar durante la exportación)
+            path: Archivo de agregados
+            fmt: Formato (ver ExportFormat)
+            relation_path: Archivo de la relación archivo ↔ tag (None = no exportarla)
+            parent: Widget padre
+        """
+        super().__init__(None, parent)
+        self.aggregator = aggregator
+        self.path = path
+        self.fmt = fmt
+        self.relation_path = relation_path
+    
+    def _should_stop(self) -> bool:
+        """Espera si está pausado; True si fue cancelado"""
+        self._running.wait()
+        return self._cancelled
+    
+    def run(self) -> None:
+        """Ejecuta la exportación"""
+        try:
+            summary = export_scan(
+                self.aggregator,
+                self.path,
+                self.fmt,
+                self.relation_path,
+                progress=self.progress.emit,
+                should_stop=self._should_stop
+            )
+            self.finished.emit(summary)
+        
+        except Exception as e:
+            logger.error("Error exportando: %s", e, exc_info=True)
+            self.error.emit(str(e))
+            self.finished.emit(None)
@@ -0,0 +1,59 @@
+"""Worker para combinar agregados parciales de un escaneo repartido en background"""
+
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from PySide6.QtCore import Signal
+
+from ..core.search_index import TagSearchIndex
+from ..core.shards import merge_partials
+from ..utils.logger import get_logger
+from .base_worker import BaseWorker
+
+logger = get_logger(__name__)
+
+
+class MergeWorker(BaseWorker):
+    """Worker thread que carga y combina archivos .tagagg"""
+    
+    # Señales
+    progress = Signal(int, int)  # parciales combinados, total
+    finished = Signal(object)  # PartialAggregate (None si falló)
+    error = Signal(str)  # error_message
+    
+    def __init__(
+        self,
+        paths: List[Path],
+        search_index: Optional[TagSearchIndex] = None,
+        parent=None
+    ):
+        """
+        Inicializa el worker
+        
+        Args:
+            paths: Agregados parciales a combinar
+            search_index: Índice de búsqueda global a sincronizar con el resultado (opcional)
+            parent: Widget padre
+        """
+        super().__init__(None, parent)
+        self.paths = paths
+        self.search_index = search_index
+    
+    def run(self) -> None:
+        """Ejecuta la combinación"""
+        try:
+            partial = merge_partials(self.paths, progress=self.progress.emit)
+            if self.search_index is not None:
+                started = time.monotonic()
+                added, removed = self.search_index.sync(partial.aggregator.iter_aggregates())
+                logger.info(
+                    "Índice de búsqueda actualizado: +%s -%s tags (%.2f s)",
+                    added, removed, time.monotonic() - started
+                )
+            self.finished.emit(partial)
+        
+        except Exception as e:
+            logger.error("Error combinando agregados parciales: %s", e, exc_info=True)
+            self.error.emit(str(e))
+            self.finished.emit(None)
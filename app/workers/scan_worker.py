@@ -1,85 +1,297 @@
 """Worker para escanear archivos .txt en background"""
 
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import Signal
 
-from ..core.tag_parser import parse_line
+from ..core.aggregator import TagAggregator
+from ..core.content_dedup import DEFAULT_CACHE_SIZE, ContentDeduplicator
+from ..core.normalize import TagNormalizer
+from ..core.search_index import TagSearchIndex
+from ..core.tag_io import read_tag_file
 from ..models.tag_models import Tag, TagFile
-from ..utils.logger import get_logger
-from ..utils.path_utils import find_txt_files
+from ..utils.checkpoint import JobCheckpoint
+from ..utils.logger import get_logger, LogSummary
+from ..utils.metrics import metrics
+from ..utils.path_utils import discover_txt_files, roots_key
+from ..utils.throttle import IOScheduler
+from .base_worker import BaseWorker
 
 logger = get_logger(__name__)
 
+_SCAN_TIMER = metrics.timer("scan.total", "Duración de los escaneos")
+_SCAN_FILES = metrics.counter("scan.files", "Archivos escaneados")
+_SCAN_ERRORS = metrics.counter("scan.errors", "Archivos con error durante el escaneo")
+_CHECKPOINT_TIMER = metrics.timer("scan.checkpoint", "Tiempo de guardado de checkpoints de escaneo")
+_SEARCH_INDEX_TIMER = metrics.timer("scan.search_index", "Tiempo de sincronización del índice de búsqueda")
 
-class ScanWorker(QThread):
+
+class ScanWorker(BaseWorker):
     """Worker thread para escanear archivos .txt y extraer tags"""
     
+    # Intervalo entre checkpoints (segundos)
+    CHECKPOINT_INTERVAL = 2.0
+    
+    # Formato de los registros parciales (2: tags por id y hash del contenido)
+    CHECKPOINT_FORMAT = 2
+    
     # Señales
     progress = Signal(int, int)  # current, total
     file_processed = Signal(str, int)  # file_path (str), tag_count
-    finished = Signal(object)  # {path: TagFile} - usar object para dict
+    finished = Signal(object)  # TagAggregator
     error = Signal(str)  # error_message
     
-    def __init__(self, directory: Path, parent=None):
+    def __init__(
+        self,
+        roots: List[Path],
+        checkpoint: Optional[JobCheckpoint] = None,
+        scheduler: Optional[IOScheduler] = None,
+        low_memory: bool = False,
+        search_index: Optional[TagSearchIndex] = None,
+        normalizer: Optional[TagNormalizer] = None,
+        parent=None
+    ):
         """
         Inicializa el worker
         
         Args:
-            directory: Directorio a escanear
+            roots: Directorios a escanear (los archivos repetidos entre raíces se leen una vez)
+            checkpoint: Checkpoint para guardar el avance y reanudar (opcional)
+            scheduler: Limitador de E/S (opcional)
+            low_memory: No conservar los tags de cada archivo, solo agregados y postings
+            search_index: Índice de búsqueda global a sincronizar con el resultado (opcional)
+            normalizer: Agrupar los tags por su forma normalizada (opcional)
             parent: Widget padre
         """
-        super().__init__(parent)
-        self.directory = directory
-        self._cancelled = False
-    
-    def cancel(self) -> None:
-        """Cancela el escaneo"""
-        self._cancelled = True
+        super().__init__(scheduler, parent)
+        self.roots = list(roots)
+        self.low_memory = low_memory
+        self.search_index = search_index
+        self.normalizer = normalizer
+        self.checkpoint = checkpoint
+        # Archivos con el mismo contenido: se parsean una vez (en bajo consumo, solo los recientes)
+        self.content_duplicates = ContentDeduplicator(DEFAULT_CACHE_SIZE if low_memory else None)
+        self._pending_records: List[dict] = []
+        self._saved_records = 0
+        # Ids de los tags ya escritos en los registros parciales
+        self._tag_ids: Dict[Tuple[str, str], int] = {}
+        # Resumen periódico en lugar de una línea de debug por archivo
+        self._file_log = LogSummary(logger, "Archivos escaneados")
     
     def run(self) -> None:
         """Ejecuta el escaneo"""
+        aggregator = TagAggregator(retain_files=not self.low_memory, normalizer=self.normalizer, roots=self.roots)
+        profiler = self._start_profiler("scan")
+        self._file_log = LogSummary(logger, "Archivos escaneados")
+        self.content_duplicates = ContentDeduplicator(DEFAULT_CACHE_SIZE if self.low_memory else None)
+        self._pending_records = []
+        self._saved_records = 0
+        self._tag_ids = {}
+        with _SCAN_TIMER.time():
+            self._scan(aggregator)
+        self._file_log.flush()
+        self._finish_profiler(
+            profiler,
+            files=aggregator.file_count,
+            tags=aggregator.tag_count,
+            occurrences=aggregator.total_occurrences
+        )
+    
+    def _scan(self, aggregator: TagAggregator) -> None:
+        """Recorre las raíces y agrega los archivos"""
         try:
-            logger.info(f"Iniciando escaneo de directorio: {self.directory}")
+            logger.info("Iniciando escaneo de directorio: %s", ", ".join(str(root) for root in self.roots))
+            if self.normalizer is not None:
+                logger.info("Normalización de tags: %s", self.normalizer.describe())
             
-            # Encontrar todos los archivos .txt
-            txt_files = find_txt_files(self.directory)
+            # Encontrar todos los archivos .txt, sin repetir inodos entre raíces
+            discovery = discover_txt_files(self.roots)
+            txt_files = discovery.files
+            for root, found, skipped in zip(self.roots, discovery.found, discovery.skipped):
+                if len(self.roots) > 1 or skipped:
+                    logger.info("Raíz %s: %s archivos .txt (%s duplicados omitidos)", root, found, skipped)
             
             if not txt_files:
                 logger.warning("No se encontraron archivos .txt")
-                self.finished.emit({})
+                self._sync_search_index(aggregator)
+                self.finished.emit(aggregator)
                 return
             
             total_files = len(txt_files)
-            logger.info(f"Encontrados {total_files} archivos .txt")
+            logger.info("Encontrados %s archivos .txt", total_files)
             
-            files_data: Dict[Path, TagFile] = {}
+            restored = self._restore_checkpoint(aggregator)
+            if self.scheduler is not None:
+                self.scheduler.reset_stats()
+            last_checkpoint = time.monotonic()
             
-            for idx, file_path in enumerate(txt_files):
-                if self._cancelled:
+            for idx, (file_path, root_id) in enumerate(zip(txt_files, discovery.root_ids)):
+                # Archivo ya procesado antes de la interrupción
+                if restored and str(file_path) in restored:
+                    continue
+                
+                if not self._wait_if_paused():
                     logger.info("Escaneo cancelado por el usuario")
                     break
                 
                 try:
                     tag_file = self._process_file(file_path)
                     if tag_file:
-                        files_data[file_path] = tag_file
+                        # Agregar en el worker: en modo de bajo consumo el TagFile se descarta aquí
+                        aggregator.add_file(file_path, tag_file.tags, tag_file.line_endings, root_id)
+                        self._record(tag_file, root_id)
                         self.file_processed.emit(str(file_path), len(tag_file.tags))
+                        if metrics.enabled:
+                            _SCAN_FILES.inc()
                 
                 except Exception as e:
-                    logger.error(f"Error procesando {file_path}: {e}")
+                    if metrics.enabled:
+                        _SCAN_ERRORS.inc()
+                    logger.error("Error procesando %s: %s", file_path, e)
                     self.error.emit(f"Error en {file_path.name}: {str(e)}")
                 
                 self.progress.emit(idx + 1, total_files)
+                
+                now = time.monotonic()
+                if now - last_checkpoint >= self.CHECKPOINT_INTERVAL:
+                    with _CHECKPOINT_TIMER.time():
+                        self._save_checkpoint(idx + 1, total_files)
+                    last_checkpoint = now
+            
+            if self.checkpoint is not None:
+                if self._cancelled:
+                    # Guardar para poder reanudar más tarde
+                    self._save_checkpoint(aggregator.file_count, total_files)
+                else:
+                    self.checkpoint.clear()
             
-            logger.info(f"Escaneo completado: {len(files_data)} archivos procesados")
-            self.finished.emit(files_data)
+            logger.info("Escaneo completado: %s archivos procesados", aggregator.file_count)
+            if self.content_duplicates.duplicate_files:
+                logger.info("Contenido repetido: %s", self.content_duplicates.describe())
+            self._sync_search_index(aggregator)
+            self.finished.emit(aggregator)
         
         except Exception as e:
-            logger.error(f"Error en escaneo: {e}", exc_info=True)
+            logger.error("Error en escaneo: %s", e, exc_info=True)
             self.error.emit(f"Error fatal: {str(e)}")
-            self.finished.emit({})
+            aggregator = TagAggregator(roots=self.roots)
+            self._sync_search_index(aggregator)
+            self.finished.emit(aggregator)
+    
+    def _sync_search_index(self, aggregator: TagAggregator) -> None:
+        """Actualiza el índice de búsqueda global en el hilo del worker"""
+        if self.search_index is None:
+            return
+        started = time.monotonic()
+        with _SEARCH_INDEX_TIMER.time():
+            added, removed = self.search_index.sync(aggregator.iter_aggregates())
+        logger.info(
+            "Índice de búsqueda actualizado: +%s -%s tags "
+            "(%s en total, %.2f s)",
+            added, removed, len(self.search_index), time.monotonic() - started
+        )
+    
+    def _restore_checkpoint(self, aggregator: TagAggregator) -> Set[str]:
+        """
+        Recupera los archivos ya procesados de un escaneo interrumpido
+        
+        Los registros se reproducen en el mismo orden sobre el detector de
+        contenido repetido: sus grupos quedan completos y, con la misma caché,
+        las copias sin tags guardados vuelven a encontrar su resultado parseado.
+        
+        Args:
+            aggregator: Agregador donde añadir los resultados parciales
+        
+        Returns:
+            Rutas (str) ya procesadas
+        """
+        restored: Set[str] = set()
+        if self.checkpoint is None:
+            return restored
+        
+        state = self.checkpoint.load()
+        if (
+            not state
+            or state.get("directory") != roots_key(self.roots)
+            or state.get("format") != self.CHECKPOINT_FORMAT
+        ):
+            self.checkpoint.clear()
+            return restored
+        
+        count = state.get("partial_count", 0)
+        self.checkpoint.truncate_partial(count)
+        vocabulary: List[Tag] = []
+        saved = 0
+        for record in self.checkpoint.iter_partial(count):
+            saved += 1
+            if "k" in record:
+                namespace, tag = record["k"]
+                self._tag_ids[(namespace, tag)] = len(vocabulary)
+                vocabulary.append(Tag(namespace=namespace, tag=tag))
+                continue
+            
+            file_path = Path(record["p"])
+            digest = bytes.fromhex(record["h"])
+            if "t" in record:
+                tags = [vocabulary[tag_id] for tag_id in record["t"]]
+                tag_file = TagFile(path=file_path, tags=tags, line_endings=record["e"])
+                self.content_duplicates.add(digest, tag_file, record["s"])
+            else:
+                # Copia de un contenido anterior: sus tags siguen en la caché del detector
+                tag_file = self.content_duplicates.reuse(digest, file_path, record["s"])
+                if tag_file is None:
+                    continue
+            aggregator.add_file(file_path, tag_file.tags, tag_file.line_endings, record.get("r", 0))
+            restored.add(record["p"])
+        
+        self._saved_records = saved
+        logger.info("Reanudando escaneo: %s archivos ya procesados", len(restored))
+        return restored
+    
+    def _record(self, tag_file: TagFile, root_id: int) -> None:
+        """
+        Acumula un archivo procesado para el próximo checkpoint
+        
+        Cada tag se escribe una vez (registro "k") y los archivos lo citan por
+        su posición; las copias de un contenido con el resultado parseado en
+        caché solo guardan el hash, sin tags.
+        """
+        if self.checkpoint is None:
+            return
+        digest, size, reused = self.content_duplicates.last
+        record = {"p": str(tag_file.path), "r": root_id, "h": digest.hex(), "s": size}
+        if not reused:
+            ids = []
+            for tag in tag_file.tags:
+                key = (tag.namespace, tag.tag)
+                tag_id = self._tag_ids.get(key)
+                if tag_id is None:
+                    tag_id = self._tag_ids[key] = len(self._tag_ids)
+                    self._pending_records.append({"k": [tag.namespace, tag.tag]})
+                ids.append(tag_id)
+            record["e"] = tag_file.line_endings
+            record["t"] = ids
+        self._pending_records.append(record)
+    
+    def _save_checkpoint(self, cursor: int, total_files: int) -> None:
+        """Persiste los resultados parciales y el cursor"""
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.append_partial(self._pending_records)
+            self._saved_records += len(self._pending_records)
+            self._pending_records = []
+            self.checkpoint.save({
+                "directory": roots_key(self.roots),
+                "format": self.CHECKPOINT_FORMAT,
+                "cursor": cursor,
+                "total": total_files,
+                "partial_count": self._saved_records
+            })
+        except OSError as e:
+            logger.warning("No se pudo guardar el checkpoint de escaneo: %s", e)
     
     def _process_file(self, file_path: Path) -> Optional[TagFile]:
         """
@@ -87,69 +299,15 @@ class ScanWorker(QThread):
         
         Args:
             file_path: Ruta del archivo
-            
+        
         Returns:
             TagFile con los tags encontrados o None si hay error
         """
         try:
-            # Detectar line endings
-            with open(file_path, 'r', encoding='utf-8', newline='') as f:
-                content = f.read()
-            
-            # Detectar line endings
-            if '\r\n' in content:
-                line_ending = '\r\n'
-            elif '\r' in content:
-                line_ending = '\r'
-            else:
-                line_ending = '\n'
-            
-            lines = content.splitlines()
-            tags: List[Tag] = []
-            
-            for line in lines:
-                parsed = parse_line(line)
-                if parsed:
-                    namespace, tag = parsed
-                    tags.append(Tag(namespace=namespace, tag=tag))
-            
-            tag_file = TagFile(path=file_path, tags=tags, line_endings=line_ending)
-            logger.debug(f"Procesado {file_path}: {len(tags)} tags")
-            
+            tag_file = read_tag_file(file_path, self.scheduler, self.content_duplicates)
+            self._file_log.add(file_path, tags=len(tag_file.tags))
             return tag_file
         
-        except UnicodeDecodeError:
-            # Intentar con Latin-1 como fallback
-            logger.warning(f"Error de codificación UTF-8 en {file_path}, intentando Latin-1")
-            try:
-                with open(file_path, 'r', encoding='latin-1', newline='') as f:
-                    content = f.read()
-                
-                if '\r\n' in content:
-                    line_ending = '\r\n'
-                elif '\r' in content:
-                    line_ending = '\r'
-                else:
-                    line_ending = '\n'
-                
-                lines = content.splitlines()
-                tags: List[Tag] = []
-                
-                for line in lines:
-                    parsed = parse_line(line)
-                    if parsed:
-                        namespace, tag = parsed
-                        tags.append(Tag(namespace=namespace, tag=tag))
-                
-                tag_file = TagFile(path=file_path, tags=tags, line_endings=line_ending)
-                logger.debug(f"Procesado {file_path} (Latin-1): {len(tags)} tags")
-                
-                return tag_file
-            
-            except Exception as e:
-                logger.error(f"Error procesando {file_path} con Latin-1: {e}")
-                raise
-        
         except Exception as e:
-            logger.error(f"Error procesando {file_path}: {e}")
+            logger.error("Error procesando %s: %s", file_path, e)
             raise
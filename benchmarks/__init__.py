@@ -0,0 +1 @@
+"""Benchmarks reproducibles sobre corpus sintéticos de archivos de tags"""
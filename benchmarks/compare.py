@@ -0,0 +1,89 @@
+"""
+Compara dos resultados de `benchmarks.run`
+
+Uso:
+    python -m benchmarks.compare base.json nuevo.json --threshold 0.1
+
+Retorna código 1 si algún benchmark pierde más de `threshold` de throughput
+o aumenta su pico de memoria en más de esa fracción.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Diferencias de memoria menores no cuentan como regresión (ruido del allocator)
+MIN_MEMORY_DELTA_MB = 1.0
+
+
+def _change(base: Optional[float], new: Optional[float]) -> Optional[float]:
+    """Variación relativa (None si no es comparable)"""
+    if not base or new is None:
+        return None
+    return (new - base) / base
+
+
+def compare(base: dict, new: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """
+    Compara benchmark a benchmark
+    
+    Returns:
+        Tupla (líneas del informe, nombres de benchmarks con regresión)
+    """
+    lines = [
+        f"{'benchmark':<24} {'throughput':>12} {'memoria':>10}",
+    ]
+    regressions = []
+    base_results = base.get("results", {})
+    new_results = new.get("results", {})
+    
+    for name in sorted(set(base_results) | set(new_results)):
+        if name not in base_results or name not in new_results:
+            lines.append(f"{name:<24} {'(solo en ' + ('base' if name in base_results else 'nuevo') + ')':>23}")
+            continue
+        old, current = base_results[name], new_results[name]
+        speed = _change(old.get("throughput"), current.get("throughput"))
+        memory = _change(old.get("peak_mb"), current.get("peak_mb"))
+        
+        memory_grew = (
+            memory is not None and memory > threshold
+            and current["peak_mb"] - old["peak_mb"] >= MIN_MEMORY_DELTA_MB
+        )
+        regressed = (speed is not None and speed < -threshold) or memory_grew
+        if regressed:
+            regressions.append(name)
+        lines.append(
+            f"{name:<24} "
+            f"{'n/d' if speed is None else f'{speed:+.1%}':>12} "
+            f"{'n/d' if memory is None else f'{memory:+.1%}':>10}"
+            f"{'  REGRESIÓN' if regressed else ''}"
+        )
+    
+    if base.get("meta", {}).get("corpus") != new.get("meta", {}).get("corpus"):
+        lines.append("Aviso: los corpus no coinciden, la comparación no es directa")
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks")
+    parser.add_argument("base", type=Path, help="JSON de referencia")
+    parser.add_argument("new", type=Path, help="JSON a comparar")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Variación tolerada (fracción, por defecto 0.1)")
+    args = parser.parse_args(argv)
+    
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    lines, regressions = compare(base, new, args.threshold)
+    
+    print(f"{base['meta'].get('commit') or args.base.name} -> {new['meta'].get('commit') or args.new.name}")
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regresiones: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
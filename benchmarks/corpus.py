@@ -0,0 +1,138 @@
+"""Generador determinista de corpus sintéticos de archivos de tags"""
+
+import bisect
+import itertools
+import random
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Sílabas para construir tags con aspecto de palabras
+_SYLLABLES = [
+    "ka", "to", "mi", "ra", "ne", "su", "lo", "vi", "da", "pe", "ri", "go",
+    "chi", "wa", "ba", "ze", "no", "fu", "hal", "mor", "tan", "ver", "sil", "dro"
+]
+# Caracteres fuera de ASCII: fuerzan el fallback a Latin-1 en esos archivos
+_ACCENTED = ["é", "ñ", "ü", "ç", "á", "ø"]
+
+
+@dataclass
+class CorpusSpec:
+    """Parámetros del corpus (mismo spec y semilla = mismos archivos)"""
+    files: int = 10_000
+    tags_per_file: int = 25
+    vocabulary: int = 50_000  # Tags distintos
+    zipf_exponent: float = 1.1  # Exponente de la distribución de frecuencias
+    namespaces: Dict[str, float] = field(default_factory=lambda: {
+        "general": 0.70,
+        "character": 0.12,
+        "artist": 0.08,
+        "species": 0.06,
+        "meta": 0.04
+    })
+    crlf_ratio: float = 0.3  # Fracción de archivos con CRLF
+    latin1_ratio: float = 0.05  # Fracción de archivos codificados en Latin-1
+    files_per_directory: int = 500
+    seed: int = 42
+    
+    def to_dict(self) -> dict:
+        """Representación serializable (para el JSON de resultados)"""
+        return asdict(self)
+
+
+@dataclass
+class CorpusStats:
+    """Resumen del corpus generado"""
+    files: int = 0
+    lines: int = 0
+    bytes: int = 0
+    crlf_files: int = 0
+    latin1_files: int = 0
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def build_vocabulary(spec: CorpusSpec) -> List[Tuple[str, str]]:
+    """
+    Genera los tags distintos del corpus, del más al menos frecuente
+    
+    Returns:
+        Lista de (namespace, tag)
+    """
+    rng = random.Random(spec.seed)
+    names = list(spec.namespaces)
+    cumulative = list(itertools.accumulate(spec.namespaces.values()))
+    
+    vocabulary = []
+    seen = set()
+    while len(vocabulary) < spec.vocabulary:
+        words = [
+            "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        if rng.random() < 0.02:
+            words[-1] += rng.choice(_ACCENTED)
+        tag = " ".join(words)
+        namespace = names[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])]
+        if (namespace, tag) in seen:
+            continue
+        seen.add((namespace, tag))
+        vocabulary.append((namespace, tag))
+    return vocabulary
+
+
+def _zipf_cumulative(size: int, exponent: float) -> List[float]:
+    """Pesos acumulados de una distribución de Zipf sobre `size` rangos"""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, size + 1)))
+
+
+def generate_corpus(spec: CorpusSpec, directory: Path) -> CorpusStats:
+    """
+    Escribe el corpus en un directorio (en subdirectorios de files_per_directory)
+    
+    Args:
+        spec: Parámetros del corpus
+        directory: Directorio destino (se crea si no existe)
+    
+    Returns:
+        CorpusStats con el tamaño del corpus
+    """
+    vocabulary = build_vocabulary(spec)
+    lines = [tag if namespace == "general" else f"{namespace}:{tag}" for namespace, tag in vocabulary]
+    accented = [line for line in lines if any(c in line for c in _ACCENTED)] or [f"caf{_ACCENTED[0]}"]
+    cumulative = _zipf_cumulative(len(lines), spec.zipf_exponent)
+    total_weight = cumulative[-1]
+    
+    rng = random.Random(spec.seed + 1)
+    stats = CorpusStats()
+    directory.mkdir(parents=True, exist_ok=True)
+    
+    for index in range(spec.files):
+        subdir = directory / f"d{index // spec.files_per_directory:04d}"
+        if index % spec.files_per_directory == 0:
+            subdir.mkdir(exist_ok=True)
+        
+        count = max(1, int(rng.gauss(spec.tags_per_file, spec.tags_per_file / 4)))
+        file_lines = [
+            lines[bisect.bisect_left(cumulative, rng.random() * total_weight)]
+            for _ in range(count)
+        ]
+        
+        latin1 = rng.random() < spec.latin1_ratio
+        if latin1:
+            file_lines.append(rng.choice(accented))
+        crlf = rng.random() < spec.crlf_ratio
+        line_ending = "\r\n" if crlf else "\n"
+        
+        content = line_ending.join(file_lines) + line_ending
+        data = content.encode("latin-1" if latin1 else "utf-8")
+        (subdir / f"f{index:07d}.txt").write_bytes(data)
+        
+        stats.files += 1
+        stats.lines += len(file_lines)
+        stats.bytes += len(data)
+        stats.crlf_files += crlf
+        stats.latin1_files += latin1
+    
+    return stats
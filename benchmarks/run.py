@@ -0,0 +1,386 @@
+"""
+Ejecuta los benchmarks headless sobre un corpus sintético
+
+Uso:
+    python -m benchmarks.run --files 20000 --output bench/base.json
+    python -m benchmarks.run --only parsing,aggregation --repeat 5
+
+Cada benchmark se mide `--repeat` veces (se reporta la mejor) y una vez más
+bajo tracemalloc para el pico de memoria. El resultado es un JSON
+comparable entre commits con `python -m benchmarks.compare`.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.core.aggregator import TagAggregator
+from app.core.filter import TagFilter, BannedMatchMode
+from app.core.normalize import TagNormalizer
+from app.core.rewrite import RewritePlan
+from app.core.tag_io import read_tag_file, write_tag_file
+from app.core.tag_parser import parse_line, format_tag
+from app.models.tag_models import RewriteSummary, TagFile
+from app.utils.backup import create_backup
+from app.utils.path_utils import find_txt_files
+
+from .corpus import CorpusSpec, CorpusStats, generate_corpus
+
+# Tags más frecuentes usados para construir los filtros y el plan
+BANNED_COUNT = 200
+PLAN_REMOVALS = 50
+
+
+class BenchContext:
+    """Corpus y datos intermedios compartidos entre benchmarks (calculados una vez)"""
+    
+    def __init__(self, corpus_dir: Path, work_dir: Path) -> None:
+        self.corpus_dir = corpus_dir
+        self.work_dir = work_dir
+        self._files: Optional[List[Path]] = None
+        self._tag_files: Optional[List[TagFile]] = None
+        self._aggregator: Optional[TagAggregator] = None
+        self._scratch_count = 0
+    
+    @property
+    def files(self) -> List[Path]:
+        if self._files is None:
+            self._files = find_txt_files(self.corpus_dir)
+        return self._files
+    
+    @property
+    def tag_files(self) -> List[TagFile]:
+        if self._tag_files is None:
+            self._tag_files = [read_tag_file(path) for path in self.files]
+        return self._tag_files
+    
+    @property
+    def aggregator(self) -> TagAggregator:
+        if self._aggregator is None:
+            self._aggregator = TagAggregator(retain_files=False)
+            for tag_file in self.tag_files:
+                self._aggregator.add_file(tag_file.path, tag_file.tags, tag_file.line_endings)
+        return self._aggregator
+    
+    def top_keys(self, count: int) -> List[tuple]:
+        """Los `count` tags más frecuentes del corpus"""
+        aggregates = sorted(self.aggregator.iter_aggregates(), key=lambda agg: (-agg.count, agg.namespace, agg.tag))
+        return [(agg.namespace, agg.tag) for agg in aggregates[:count]]
+    
+    def scratch_copy(self) -> Path:
+        """Copia del corpus en un directorio temporal (se borra tras cada medición)"""
+        self._scratch_count += 1
+        target = self.work_dir / f"scratch_{self._scratch_count}"
+        shutil.copytree(self.corpus_dir, target)
+        return target
+    
+    def clear_scratch(self) -> None:
+        """Borra las copias temporales"""
+        for path in self.work_dir.glob("scratch_*"):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@dataclass
+class Benchmark:
+    """
+    Un benchmark: `prepare(ctx)` hace el trabajo no medido y retorna la
+    función medida, que a su vez retorna el número de elementos procesados
+    """
+    name: str
+    unit: str
+    prepare: Callable[[BenchContext], Callable[[], int]]
+
+
+def _bench_discovery(ctx: BenchContext) -> Callable[[], int]:
+    return lambda: len(find_txt_files(ctx.corpus_dir))
+
+
+def _bench_parse_line(ctx: BenchContext) -> Callable[[], int]:
+    lines = [
+        line
+        for path in ctx.files
+        for line in path.read_bytes().decode("utf-8", errors="replace").splitlines()
+    ]
+    
+    def run() -> int:
+        for line in lines:
+            parse_line(line)
+        return len(lines)
+    return run
+
+
+def _bench_parsing(ctx: BenchContext) -> Callable[[], int]:
+    files = ctx.files
+    
+    def run() -> int:
+        for path in files:
+            read_tag_file(path)
+        return len(files)
+    return run
+
+
+def _aggregation(normalizer_factory: Optional[Callable[[], TagNormalizer]]):
+    def prepare(ctx: BenchContext) -> Callable[[], int]:
+        tag_files = ctx.tag_files
+        
+        def run() -> int:
+            aggregator = TagAggregator(
+                retain_files=False,
+                normalizer=normalizer_factory() if normalizer_factory else None
+            )
+            for tag_file in tag_files:
+                aggregator.add_file(tag_file.path, tag_file.tags, tag_file.line_endings)
+            return len(tag_files)
+        return run
+    return prepare
+
+
+def _banned_tags(ctx: BenchContext, match_mode: str) -> set:
+    """Tags prohibidos deterministas para cada modo de coincidencia"""
+    keys = ctx.top_keys(BANNED_COUNT)
+    if match_mode == BannedMatchMode.EXACT:
+        return {format_tag(namespace, tag) for namespace, tag in keys}
+    # Subcadenas/regex a partir de los tags más frecuentes (menos patrones: cada uno se prueba contra todos los tags)
+    words = sorted({tag.split()[0] for _, tag in keys[:BANNED_COUNT // 10]})
+    if match_mode == BannedMatchMode.SUBSTRING:
+        return set(words)
+    return {rf"^{re.escape(word)}\b" for word in words}
+
+
+def _filter(match_mode: str):
+    def prepare(ctx: BenchContext) -> Callable[[], int]:
+        aggregates = ctx.aggregator.get_aggregates()
+        # Sin threshold: así se evalúan los tags prohibidos sobre todos los agregados
+        tag_filter = TagFilter(0, _banned_tags(ctx, match_mode), match_mode)
+        
+        def run() -> int:
+            tag_filter.filter(aggregates)
+            return len(aggregates)
+        return run
+    return prepare
+
+
+def _build_plan(ctx: BenchContext) -> RewritePlan:
+    """Plan representativo: remociones, un rename, una fusión y una implicación"""
+    keys = ctx.top_keys(PLAN_REMOVALS + 4)
+    plan = RewritePlan.from_removals(keys[:PLAN_REMOVALS])
+    extra = keys[PLAN_REMOVALS:]
+    if len(extra) == 4:
+        plan.rename(extra[0], (extra[0][0], extra[0][1] + " renamed"))
+        plan.merge([extra[1]], extra[2])
+        plan.add([("meta", "benchmark")], when=extra[3])
+    return plan
+
+
+def _bench_dry_run(ctx: BenchContext) -> Callable[[], int]:
+    plan = _build_plan(ctx)
+    tag_files = ctx.tag_files
+    
+    def run() -> int:
+        summary = RewriteSummary()
+        for tag_file in tag_files:
+            _, rewrite = plan.rewrite_file(tag_file.path, tag_file.tags)
+            summary.add(rewrite)
+        return summary.files_processed
+    return run
+
+
+def _bench_apply(ctx: BenchContext) -> Callable[[], int]:
+    plan = _build_plan(ctx)
+    files = find_txt_files(ctx.scratch_copy())
+    
+    def run() -> int:
+        # Mismo recorrido que ApplyWorker sin checkpoint: releer, reescribir y escribir si cambia
+        for path in files:
+            tag_file = read_tag_file(path)
+            new_tags, rewrite = plan.rewrite_file(path, tag_file.tags)
+            if rewrite.modified:
+                write_tag_file(path, new_tags, tag_file.line_endings)
+        return len(files)
+    return run
+
+
+def _bench_backup(ctx: BenchContext) -> Callable[[], int]:
+    base = ctx.scratch_copy()
+    files = find_txt_files(base)
+    return lambda: len(files) if create_backup(files, base) else 0
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("discovery", "files", _bench_discovery),
+    Benchmark("parse_line", "lines", _bench_parse_line),
+    Benchmark("parsing", "files", _bench_parsing),
+    Benchmark("aggregation", "files", _aggregation(None)),
+    Benchmark("aggregation_normalized", "files", _aggregation(TagNormalizer)),
+    Benchmark("filter_exact", "tags", _filter(BannedMatchMode.EXACT)),
+    Benchmark("filter_substring", "tags", _filter(BannedMatchMode.SUBSTRING)),
+    Benchmark("filter_regex", "tags", _filter(BannedMatchMode.REGEX)),
+    Benchmark("dry_run", "files", _bench_dry_run),
+    Benchmark("apply", "files", _bench_apply),
+    Benchmark("backup", "files", _bench_backup),
+]
+
+
+def run_benchmark(benchmark: Benchmark, ctx: BenchContext, repeat: int) -> dict:
+    """
+    Mide un benchmark
+    
+    Returns:
+        Dict con el mejor tiempo, elementos, throughput y pico de memoria (MB)
+    """
+    best = float("inf")
+    items = 0
+    try:
+        for _ in range(repeat):
+            run = benchmark.prepare(ctx)
+            start = time.perf_counter()
+            items = run()
+            best = min(best, time.perf_counter() - start)
+            ctx.clear_scratch()
+        
+        # Pasada aparte para la memoria: tracemalloc ralentiza la ejecución
+        run = benchmark.prepare(ctx)
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        ctx.clear_scratch()
+    
+    return {
+        "unit": benchmark.unit,
+        "items": items,
+        "seconds": round(best, 6),
+        "throughput": round(items / best, 2) if best > 0 else None,
+        "peak_mb": round(peak / (1024 * 1024), 3)
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Commit actual del repositorio (None si no hay git)"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    defaults = CorpusSpec()
+    parser = argparse.ArgumentParser(description="Benchmarks headless del editor de tags")
+    parser.add_argument("--files", type=int, default=defaults.files, help="Archivos del corpus")
+    parser.add_argument("--tags-per-file", type=int, default=defaults.tags_per_file, help="Tags promedio por archivo")
+    parser.add_argument("--vocabulary", type=int, default=defaults.vocabulary, help="Tags distintos")
+    parser.add_argument("--zipf", type=float, default=defaults.zipf_exponent, help="Exponente de Zipf")
+    parser.add_argument("--crlf-ratio", type=float, default=defaults.crlf_ratio, help="Fracción de archivos CRLF")
+    parser.add_argument("--latin1-ratio", type=float, default=defaults.latin1_ratio, help="Fracción de archivos Latin-1")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Semilla del generador")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por benchmark (se reporta la mejor)")
+    parser.add_argument("--only", help="Benchmarks a ejecutar, separados por comas")
+    parser.add_argument("--output", type=Path, help="Archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--corpus-dir", type=Path, help="Reutilizar/generar el corpus en este directorio")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar el log de la aplicación")
+    args = parser.parse_args(argv)
+    
+    if args.only:
+        names = {benchmark.name for benchmark in BENCHMARKS}
+        unknown = set(args.only.split(",")) - names
+        if unknown:
+            parser.error(f"benchmarks desconocidos: {', '.join(sorted(unknown))} (disponibles: {', '.join(sorted(names))})")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.verbose:
+        # Los archivos Latin-1 generan un warning cada uno
+        logging.getLogger("TagEditor").setLevel(logging.ERROR)
+    
+    spec = CorpusSpec(
+        files=args.files,
+        tags_per_file=args.tags_per_file,
+        vocabulary=args.vocabulary,
+        zipf_exponent=args.zipf,
+        crlf_ratio=args.crlf_ratio,
+        latin1_ratio=args.latin1_ratio,
+        seed=args.seed
+    )
+    selected = [
+        benchmark for benchmark in BENCHMARKS
+        if not args.only or benchmark.name in args.only.split(",")
+    ]
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="tag_bench_"))
+    try:
+        corpus_dir = args.corpus_dir or work_dir / "corpus"
+        spec_file = corpus_dir / "corpus_spec.json"
+        if corpus_dir.exists() and spec_file.exists() and json.loads(spec_file.read_text()) == spec.to_dict():
+            print(f"Reutilizando corpus en {corpus_dir}", file=sys.stderr)
+            stats = CorpusStats(**json.loads((corpus_dir / "corpus_stats.json").read_text()))
+        else:
+            if corpus_dir.exists():
+                shutil.rmtree(corpus_dir)
+            print(f"Generando corpus de {spec.files} archivos en {corpus_dir}", file=sys.stderr)
+            start = time.perf_counter()
+            stats = generate_corpus(spec, corpus_dir)
+            spec_file.write_text(json.dumps(spec.to_dict()))
+            (corpus_dir / "corpus_stats.json").write_text(json.dumps(stats.to_dict()))
+            print(f"Corpus generado en {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        
+        ctx = BenchContext(corpus_dir, work_dir)
+        results: Dict[str, dict] = {}
+        for benchmark in selected:
+            result = results[benchmark.name] = run_benchmark(benchmark, ctx, max(1, args.repeat))
+            print(
+                f"{benchmark.name:<24} {result['seconds']:>10.4f}s "
+                f"{result['throughput'] or 0:>14,.0f} {benchmark.unit}/s "
+                f"{result['peak_mb']:>10.1f} MB",
+                file=sys.stderr
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "corpus": spec.to_dict(),
+            "corpus_stats": stats.to_dict()
+        },
+        "results": results
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Resultados en {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
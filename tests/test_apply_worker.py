@@ -0,0 +1,69 @@
+"""Pruebas de la reanudación del ApplyWorker tras una interrupción"""
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+
+from app.core.rewrite import RewritePlan
+from app.utils.checkpoint import JobCheckpoint
+from app.workers import apply_worker
+from app.workers.apply_worker import ApplyWorker
+
+
+class _Crash(BaseException):
+    """Cierre inesperado (no lo captura el manejo de errores del worker)"""
+
+
+def _make_files(tmp_path, count):
+    files = []
+    for index in range(count):
+        path = tmp_path / f"{index:03d}.txt"
+        path.write_text("a\nkeep\n" if index % 2 == 0 else "keep\n", encoding='utf-8')
+        files.append(path)
+    return files
+
+
+def _apply(files, checkpoint):
+    """Aplica `a -> b` y `b -> c` (no idempotente) y retorna el resumen"""
+    plan = RewritePlan.parse_rules("a -> b\nb -> c")
+    worker = ApplyWorker(files, plan, checkpoint=checkpoint)
+    summaries = []
+    worker.finished.connect(summaries.append)
+    worker.run()
+    return summaries[0]
+
+
+@pytest.mark.parametrize("crash_after_record", [False, True])
+def test_resume_does_not_rewrite_written_files(tmp_path, monkeypatch, crash_after_record):
+    data = tmp_path / "data"
+    data.mkdir()
+    files = _make_files(data, 20)
+    checkpoint = JobCheckpoint("apply", "test", tmp_path)
+    # El cursor no llega a guardarse: todo depende de los registros por archivo
+    monkeypatch.setattr(ApplyWorker, "CHECKPOINT_INTERVAL", 1e9)
+
+    real_write = apply_worker.write_tag_file
+    writes = []
+
+    def crashing_write(file_path, *args, **kwargs):
+        # Interrumpir en la sexta escritura: antes de escribir o justo después
+        if len(writes) == 5 and crash_after_record:
+            raise _Crash()
+        real_write(file_path, *args, **kwargs)
+        writes.append(file_path)
+        if len(writes) == 5 and not crash_after_record:
+            raise _Crash()
+
+    monkeypatch.setattr(apply_worker, "write_tag_file", crashing_write)
+    with pytest.raises(_Crash):
+        _apply(files, checkpoint)
+    monkeypatch.setattr(apply_worker, "write_tag_file", real_write)
+
+    summary = _apply(files, checkpoint)
+    for index, path in enumerate(files):
+        expected = "b\nkeep\n" if index % 2 == 0 else "keep\n"
+        assert path.read_text(encoding='utf-8') == expected, path.name
+    assert summary.files_processed == 20
+    assert summary.files_modified == 10
+    assert summary.tags_replaced == 10
+    assert not checkpoint.exists()
@@ -0,0 +1,97 @@
+"""Pruebas de la línea de comandos: scan, scan-shard, merge y export"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.cli import main
+from app.core.shards import read_partial
+
+SHARDS = 3
+
+
+def _make_tree(root: Path, count: int = 24) -> Path:
+    """Directorio con subcarpetas y archivos de tags"""
+    for index in range(count):
+        folder = root / f"set{index % 3}"
+        folder.mkdir(parents=True, exist_ok=True)
+        tags = [f"tag{index % 5}", f"character:name{index % 4}", "solo"]
+        (folder / f"{index:03d}.txt").write_text("\n".join(tags) + "\n", encoding='utf-8')
+    return root
+
+
+def _lines(path: Path):
+    """Encabezado y filas ordenadas (el orden de la relación depende de los ids de archivo)"""
+    header, *rows = path.read_text(encoding='utf-8').splitlines()
+    return header, sorted(rows)
+
+
+def _scan_shards(root: Path, directory: Path):
+    """Ejecuta scan-shard para cada fragmento y retorna los parciales"""
+    paths = []
+    for index in range(SHARDS):
+        path = directory / f"shard_{index}.tagagg"
+        assert main(["scan-shard", str(root), "--shard", str(index), "--shards", str(SHARDS), "-o", str(path)]) == 0
+        paths.append(str(path))
+    return paths
+
+
+def test_shard_merge_export_matches_direct_export(tmp_path):
+    root = _make_tree(tmp_path / "data")
+    paths = _scan_shards(root, tmp_path / "partials")
+
+    merged = tmp_path / "merged.tagagg"
+    assert main(["merge", *paths, "-o", str(merged)]) == 0
+    partial = read_partial(merged)
+    assert partial.complete and partial.aggregator.file_count == 24
+
+    direct = tmp_path / "direct.csv"
+    from_merge = tmp_path / "from_merge.csv"
+    from_shards = tmp_path / "from_shards.csv"
+    assert main(["export", str(root), str(direct), "--relation"]) == 0
+    assert main(["export", str(merged), str(from_merge), "--relation"]) == 0
+    assert main(["export", *paths, str(from_shards)]) == 0
+
+    assert from_merge.read_bytes() == direct.read_bytes()
+    assert from_shards.read_bytes() == direct.read_bytes()
+    assert _lines(tmp_path / "from_merge_files.csv") == _lines(tmp_path / "direct_files.csv")
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_scan_writes_complete_partial(tmp_path, processes):
+    root = _make_tree(tmp_path / "data")
+    output = tmp_path / "scan.tagagg"
+    kept = tmp_path / "kept"
+    assert main(["scan", str(root), "-o", str(output), "--processes", str(processes), "--keep-partials", str(kept)]) == 0
+    partial = read_partial(output)
+    assert partial.complete and partial.shard_count == processes
+    assert partial.aggregator.file_count == 24
+    assert len(list(kept.glob("*.tagagg"))) == (processes if processes > 1 else 0)
+
+
+def test_export_with_root_remaps_relation_paths(tmp_path):
+    root = _make_tree(tmp_path / "mount_a" / "data")
+    merged = tmp_path / "merged.tagagg"
+    assert main(["merge", *_scan_shards(root, tmp_path / "partials"), "-o", str(merged)]) == 0
+
+    local = tmp_path / "local"
+    shutil.copytree(root, local)
+    relation = tmp_path / "relation.jsonl"
+    assert main(["export", str(merged), str(tmp_path / "tags.jsonl"), "--relation", str(relation), "--root", str(local)]) == 0
+    text = relation.read_text(encoding='utf-8')
+    assert str(local) in text
+    assert str(root) not in text
+
+
+def test_invalid_inputs_return_error(tmp_path):
+    root = _make_tree(tmp_path / "data")
+    paths = _scan_shards(root, tmp_path / "partials")
+    output = str(tmp_path / "out.tagagg")
+
+    assert main(["merge", paths[0], paths[0], "-o", output]) == 1  # fragmento repetido
+    assert main(["scan-shard", str(root), "--shard", "3", "--shards", "3", "-o", output]) == 1
+    assert main(["scan", str(tmp_path / "missing"), "-o", output]) == 1
+    assert main(["export", str(tmp_path / "missing"), str(tmp_path / "out.csv")]) == 1
+    assert main(["export", str(root), str(tmp_path / "out.unknown")]) == 1
+    assert not (tmp_path / "out.tagagg").exists()
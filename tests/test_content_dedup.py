@@ -0,0 +1,91 @@
+"""Pruebas de la detección de archivos de tags con contenido idéntico"""
+
+from pathlib import Path
+
+from app.core.content_dedup import ContentDeduplicator
+from app.core.tag_io import parse_content, read_tag_file
+
+
+def _read(dedup, path: Path, data: bytes):
+    """Registra un contenido como read_tag_file (reutiliza o parsea y añade)"""
+    digest = dedup.digest(data)
+    tag_file = dedup.reuse(digest, path, len(data))
+    if tag_file is None:
+        tag_file = parse_content(path, data.decode('utf-8'))
+        dedup.add(digest, tag_file, len(data))
+    return tag_file
+
+
+def test_reuse_shares_parsed_result():
+    dedup = ContentDeduplicator(cache_size=None)
+    data = b"1girl\r\nsolo\r\n"
+    assert dedup.reuse(dedup.digest(data), Path("a.txt"), len(data)) is None
+
+    first = _read(dedup, Path("a.txt"), data)
+    assert dedup.last == (dedup.digest(data), len(data), False)
+    copy = _read(dedup, Path("b.txt"), data)
+    assert dedup.last == (dedup.digest(data), len(data), True)
+    assert copy.path == Path("b.txt")
+    assert copy.tags is first.tags
+    assert copy.line_endings == "\r\n"
+
+
+def test_groups_and_counts():
+    dedup = ContentDeduplicator(cache_size=None)
+    contents = {"a": b"1girl\nsolo\n", "b": b"cat\n", "c": b"unique\n"}
+    order = ["a", "b", "a", "c", "a", "b"]
+    for index, name in enumerate(order):
+        _read(dedup, Path(f"{index}_{name}.txt"), contents[name])
+
+    assert dedup.file_count == 6
+    assert dedup.unique_count == 3
+    assert dedup.duplicate_files == 3
+    assert dedup.total_bytes == sum(len(contents[name]) for name in order)
+    assert dedup.redundant_bytes == 2 * len(contents["a"]) + len(contents["b"])
+
+    groups = dedup.groups()
+    assert [[path.name for path in group.paths] for group in groups] == [
+        ["0_a.txt", "2_a.txt", "4_a.txt"],
+        ["1_b.txt", "5_b.txt"],
+    ]
+    assert groups[0].digest == dedup.digest(contents["a"]).hex()
+    assert (groups[0].size, groups[0].tag_count, groups[0].redundant_files) == (len(contents["a"]), 2, 2)
+    assert "3 de 6 archivos" in dedup.describe()
+    assert ContentDeduplicator().describe() == "sin archivos"
+
+
+def test_evicted_contents_are_parsed_again_but_still_grouped():
+    dedup = ContentDeduplicator(cache_size=2)
+    a, b, c = b"a\n", b"b\n", b"c\n"
+    _read(dedup, Path("1.txt"), a)
+    _read(dedup, Path("2.txt"), b)
+    # Reutilizar a lo vuelve el más reciente: al añadir c se expulsa b
+    _read(dedup, Path("3.txt"), a)
+    _read(dedup, Path("4.txt"), c)
+    assert dedup.reuse(dedup.digest(a), Path("5.txt"), len(a)) is not None
+    assert dedup.reuse(dedup.digest(b), Path("6.txt"), len(b)) is None
+
+    _read(dedup, Path("6.txt"), b)
+    assert dedup.last[2] is False
+    assert [[path.name for path in group.paths] for group in dedup.groups()] == [
+        ["1.txt", "3.txt", "5.txt"],
+        ["2.txt", "6.txt"],
+    ]
+    assert dedup.file_count == 6
+
+
+def test_read_tag_file_with_dedup(tmp_path):
+    dedup = ContentDeduplicator()
+    files = []
+    for index, data in enumerate([b"1girl\nsolo\n", b"1girl\r\nsolo\r\n", b"1girl\nsolo\n"]):
+        path = tmp_path / f"{index}.txt"
+        path.write_bytes(data)
+        files.append(path)
+
+    results = [read_tag_file(path, dedup=dedup) for path in files]
+    assert [result.path for result in results] == files
+    assert [[tag.tag for tag in result.tags] for result in results] == [["1girl", "solo"]] * 3
+    assert [result.line_endings for result in results] == ["\n", "\r\n", "\n"]
+    # Mismos tags con otros fines de línea no es el mismo contenido
+    assert [[path.name for path in group.paths] for group in dedup.groups()] == [["0.txt", "2.txt"]]
+    assert results[2].tags is results[0].tags
@@ -0,0 +1,167 @@
+"""Pruebas de la matriz de co-ocurrencia y de las implicaciones candidatas"""
+
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from app.core import cooccurrence
+from app.core.aggregator import TagAggregator
+from app.core.cooccurrence import CooccurrenceIndex
+from app.models.tag_models import Tag
+
+
+@pytest.fixture(params=["python", "scipy"])
+def backend(request, monkeypatch):
+    """Ejecuta cada prueba con el respaldo puro de Python y, si está instalado, con scipy"""
+    if request.param == "python":
+        monkeypatch.setattr(cooccurrence, "sparse", None)
+    elif not cooccurrence.scipy_available():
+        pytest.skip("scipy no está instalado")
+    return request.param
+
+
+def _corpus(seed: int = 7, count: int = 120):
+    """Archivos pseudoaleatorios (conjuntos de claves) con implicaciones y un alias"""
+    rng = random.Random(seed)
+    pool = [("general", f"tag{i:02d}") for i in range(15)]
+    files = []
+    for _ in range(count):
+        keys = set(rng.sample(pool, rng.randrange(1, 6)))
+        if rng.random() < 0.4:
+            # cat_ears implica animal_ears; kitty y kitten son alias
+            keys.update({("general", "cat_ears"), ("general", "animal_ears")})
+        if rng.random() < 0.2:
+            keys.add(("general", "animal_ears"))
+        if rng.random() < 0.3:
+            keys.update({("character", "kitty"), ("character", "kitten")})
+        files.append(sorted(keys))
+    return files
+
+
+def _aggregator(files):
+    aggregator = TagAggregator(retain_files=False)
+    for index, keys in enumerate(files):
+        aggregator.add_file(Path(f"{index:04d}.txt"), [Tag(namespace=ns, tag=tag) for ns, tag in keys])
+    return aggregator
+
+
+def _pair_counts(files):
+    """Archivos en común de cada par ordenado de claves (fuerza bruta)"""
+    pairs = Counter()
+    for keys in files:
+        for a in keys:
+            for b in keys:
+                if a != b:
+                    pairs[(a, b)] += 1
+    return pairs
+
+
+def _expected_row(index, files, key):
+    pairs = _pair_counts(files)
+    row = [(index._ids[b], together) for (a, b), together in pairs.items() if a == key]
+    row.sort(key=lambda item: (-item[1], item[0]))
+    return row
+
+
+def _expected_implications(files, min_confidence, min_support):
+    file_counts = Counter(key for keys in files for key in keys)
+    expected = []
+    for (a, b), together in _pair_counts(files).items():
+        if file_counts[a] < min_support or together < max(min_support, min_confidence * file_counts[a]):
+            continue
+        alias = together / file_counts[b] >= min_confidence
+        if alias and (file_counts[a], a) > (file_counts[b], b):
+            continue
+        expected.append((a, b, together, alias))
+    expected.sort(key=lambda item: (-item[2], -item[2] / file_counts[item[0]], item[0], item[1]))
+    return expected
+
+
+def _summary(candidates):
+    return [(c.antecedent, c.consequent, c.support, c.alias) for c in candidates]
+
+
+def test_rows_match_brute_force(backend):
+    files = _corpus()
+    index = CooccurrenceIndex(_aggregator(files))
+    assert index.backend == backend
+    assert len(index) == len({key for keys in files for key in keys})
+    for key in index.keys:
+        assert index._row(index._ids[key]) == _expected_row(index, files, key), key
+
+
+def test_python_transpose_lists_tags_of_each_file(monkeypatch):
+    monkeypatch.setattr(cooccurrence, "sparse", None)
+    files = _corpus(seed=3)
+    index = CooccurrenceIndex(_aggregator(files))
+    for file_id, keys in enumerate(files):
+        row = index._file_tags[index._file_ptr[file_id]:index._file_ptr[file_id + 1]]
+        assert sorted(index.keys[tag_id] for tag_id in row) == keys
+
+
+def test_empty_aggregator(backend):
+    index = CooccurrenceIndex(TagAggregator(retain_files=False))
+    assert index.backend == "python"
+    assert len(index) == 0
+    assert index.cooccurring("general", "missing") == []
+    assert index.implication_candidates() == []
+
+
+def test_cooccurring_probabilities(backend):
+    files = _corpus()
+    index = CooccurrenceIndex(_aggregator(files))
+    file_counts = Counter(key for keys in files for key in keys)
+    result = index.cooccurring("general", "cat_ears", top_n=3)
+    assert len(result) == 3
+    top = result[0]
+    assert (top.namespace, top.tag) == ("general", "animal_ears")
+    assert top.together == file_counts[("general", "cat_ears")]
+    assert top.p_given_query == 1.0
+    assert top.p_query_given == top.together / file_counts[("general", "animal_ears")]
+
+
+def test_cached_rows_beyond_cache_top_n(backend):
+    files = _corpus()
+    index = CooccurrenceIndex(_aggregator(files))
+    index.CACHE_TOP_N = 3
+    index.LRU_SIZE = 2
+    assert index.precompute(top_k=2) == 2
+    assert len(index._pinned) == 2
+    for tag_id, row in index._pinned.items():
+        assert row == _expected_row(index, files, index.keys[tag_id])[:3]
+
+    # Una fila precalculada se completa si se piden más resultados que los guardados
+    pinned_key = index.keys[next(iter(index._pinned))]
+    full = _expected_row(index, files, pinned_key)
+    assert [(index._ids[(c.namespace, c.tag)], c.together) for c in index.cooccurring(*pinned_key, top_n=50)] == full
+
+    # La caché LRU no supera LRU_SIZE y conserva los tags consultados más recientemente
+    others = [key for key in index.keys if index._ids[key] not in index._pinned][:3]
+    for key in others:
+        index.cooccurring(*key)
+    assert list(index._lru) == [index._ids[key] for key in others[1:]]
+
+
+@pytest.mark.parametrize("min_confidence,min_support", [(0.95, 5), (0.5, 1), (0.2, 10)])
+def test_implication_candidates(backend, min_confidence, min_support):
+    files = _corpus()
+    index = CooccurrenceIndex(_aggregator(files))
+    candidates = index.implication_candidates(min_confidence, min_support)
+    assert _summary(candidates) == _expected_implications(files, min_confidence, min_support)
+    assert index.implication_candidates(min_confidence, min_support) is candidates
+
+
+def test_implications_with_truncated_pinned_rows(backend):
+    # Filas precalculadas recortadas a 2 columnas: las que podrían seguir por
+    # encima del umbral se recalculan enteras
+    files = _corpus()
+    index = CooccurrenceIndex(_aggregator(files))
+    index.CACHE_TOP_N = 2
+    index.precompute(top_k=len(index))
+    candidates = index.implication_candidates(0.3, 1)
+    assert _summary(candidates) == _expected_implications(files, 0.3, 1)
+    assert any(c.antecedent == ("general", "cat_ears") and c.consequent == ("general", "animal_ears") for c in candidates)
+    assert any(c.alias and {c.antecedent, c.consequent} == {("character", "kitty"), ("character", "kitten")}
+               for c in candidates)
@@ -0,0 +1,127 @@
+"""Pruebas de la detección de tags casi duplicados"""
+
+import random
+import string
+
+import pytest
+
+from app.core import duplicates
+from app.core.duplicates import _is_typo_edit, find_duplicate_groups, fold_tag, squash_tag
+from app.models.tag_models import TagAggregate
+
+
+def _groups(result):
+    return sorted((group.namespace, sorted(agg.tag for agg in group.members), group.fuzzy) for group in result)
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    ("witch hat", "witch hat", False),
+    ("catgirl", "catgirk", True),  # sustitución
+    ("catgirl", "catgril", True),  # transposición de vecinos
+    ("catgirl", "cltgira", False),  # dos sustituciones
+    ("catgirl", "latgirc", False),  # intercambio no vecino
+    ("catgirl", "catgirls", True),  # inserción al final
+    ("catgirl", "cattgirl", True),  # inserción en medio
+    ("cattgirl", "catgirl", True),  # borrado (orden indiferente)
+    ("catgirl", "catgirlss", False),  # dos inserciones
+    ("page 1", "page 2", False),  # dígito sustituido
+    ("page 1", "page 12", False),  # dígito insertado
+    ("page1x", "page1y", True),  # la edición no toca el dígito
+])
+def test_is_typo_edit(a, b, expected):
+    assert _is_typo_edit(a, b) is expected
+    assert _is_typo_edit(b, a) is expected
+
+
+def test_fold_and_squash():
+    assert fold_tag("Witch_Hat") == "witch hat"
+    assert fold_tag("  witch -_ hat ") == "witch hat"
+    assert fold_tag("ｗｉｔｃｈ") == "witch"  # NFKC
+    assert squash_tag("witch_hat") == squash_tag("WitchHat") == "witchhat"
+
+
+def test_groups_by_separator_case_and_typo():
+    aggregates = [
+        TagAggregate("general", "witch_hat", 10),
+        TagAggregate("general", "Witch Hat", 3),
+        TagAggregate("general", "witchhat", 1),
+        TagAggregate("general", "thighhighs", 8),
+        TagAggregate("general", "thighhihgs", 2),
+        TagAggregate("general", "cat", 5),
+        TagAggregate("general", "bat", 5),  # demasiado corto para buscar erratas
+        TagAggregate("artist", "witch_hat", 4),  # otro namespace
+    ]
+    result = find_duplicate_groups(aggregates)
+    assert _groups(result) == [
+        ("general", ["Witch Hat", "witch_hat", "witchhat"], False),
+        ("general", ["thighhighs", "thighhihgs"], True),
+    ]
+    # De mayor a menor count combinado, con la variante más frecuente primero
+    assert [group.total_count for group in result] == [14, 10]
+    assert result[0].canonical.tag == "witch_hat"
+    assert result[1].canonical.tag == "thighhighs"
+
+    assert _groups(find_duplicate_groups(aggregates, fuzzy=False)) == [
+        ("general", ["Witch Hat", "witch_hat", "witchhat"], False),
+    ]
+
+
+def test_typos_join_transitively():
+    aggregates = [TagAggregate("general", tag, 1) for tag in ("longhair", "longhiar", "longhiars", "longhair_")]
+    assert _groups(find_duplicate_groups(aggregates)) == [
+        ("general", ["longhair", "longhair_", "longhiar", "longhiars"], True),
+    ]
+
+
+def _brute_force_groups(aggregates):
+    """Componentes conexas comparando todos los pares"""
+    keys = sorted({(agg.namespace, squash_tag(agg.tag)) for agg in aggregates})
+    parent = {key: key for key in keys}
+
+    def find(key):
+        while parent[key] != key:
+            key = parent[key]
+        return key
+
+    fuzzy = set()
+    for i, a in enumerate(keys):
+        for b in keys[i + 1:]:
+            if a[0] == b[0] and min(len(a[1]), len(b[1])) >= duplicates.MIN_FUZZY_LENGTH and _is_typo_edit(a[1], b[1]):
+                parent[find(b)] = find(a)
+                fuzzy.update((a, b))
+    components = {}
+    for agg in aggregates:
+        key = (agg.namespace, squash_tag(agg.tag))
+        components.setdefault(find(key), []).append((key, agg.tag))
+    return sorted(
+        (root[0], sorted(tag for _, tag in members), any(key in fuzzy for key, _ in members))
+        for root, members in components.items() if len(members) > 1
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed, monkeypatch):
+    rng = random.Random(seed)
+    letters = "abcde"
+    tags = set()
+    while len(tags) < 300:
+        tags.add("".join(rng.choice(letters) for _ in range(rng.randrange(3, 8))))
+        if rng.random() < 0.2:
+            tags.add(rng.choice(sorted(tags)).upper() + rng.choice(["", "_", " "]))
+    aggregates = [TagAggregate(rng.choice(["general", "meta"]), tag, rng.randrange(1, 50)) for tag in sorted(tags)]
+    # Con un alfabeto tan pequeño casi todo es una errata de algo: sin límite de cubeta
+    monkeypatch.setattr(duplicates, "MAX_BUCKET_SIZE", len(aggregates))
+    assert _groups(find_duplicate_groups(aggregates)) == _brute_force_groups(aggregates)
+
+
+def test_progress_and_stop(monkeypatch):
+    monkeypatch.setattr(duplicates, "PROGRESS_INTERVAL", 1)
+    aggregates = [TagAggregate("general", "".join(random.Random(i).sample(string.ascii_lowercase, 6)), 1)
+                  for i in range(20)]
+    calls = []
+    find_duplicate_groups(aggregates, progress=lambda done, total: calls.append((done, total)))
+    assert calls[-1] == (20, 20)
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+
+    aggregates += [TagAggregate("general", "Foo_Bar", 1), TagAggregate("general", "foobar", 1)]
+    assert find_duplicate_groups(aggregates, should_stop=lambda: True) == []
@@ -0,0 +1,96 @@
+"""Pruebas de la reanudación del ScanWorker tras una interrupción"""
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+
+from app.utils.checkpoint import JobCheckpoint
+from app.workers import scan_worker
+from app.workers.scan_worker import ScanWorker
+
+# Pocos contenidos distintos: la mayoría de los archivos son copias
+_CONTENTS = [
+    "1girl\nsolo\n",
+    "1girl\nartist:foo\nsmile\n",
+    "landscape\r\nsky\r\n",
+    "solo\nsmile\n",
+    "cat\n",
+]
+
+
+class _Crash(BaseException):
+    """Cierre inesperado (no lo captura el manejo de errores del worker)"""
+
+
+def _make_files(tmp_path, count):
+    for index in range(count):
+        content = _CONTENTS[(index * 7) % len(_CONTENTS)] if index % 3 else _CONTENTS[index % 2]
+        (tmp_path / f"{index:03d}.txt").write_bytes(content.encode('utf-8'))
+
+
+def _scan(root, checkpoint=None, low_memory=False):
+    """Escanea y retorna el worker y el agregador resultante"""
+    worker = ScanWorker([root], checkpoint=checkpoint, low_memory=low_memory)
+    results = []
+    worker.finished.connect(results.append)
+    worker.run()
+    return worker, results[0]
+
+
+def _summary(worker, aggregator):
+    aggregates = sorted((agg.namespace, agg.tag, agg.count) for agg in aggregator.iter_aggregates())
+    groups = sorted(
+        (group.digest, group.size, group.tag_count, sorted(str(path) for path in group.paths))
+        for group in worker.content_duplicates.groups()
+    )
+    dedup = worker.content_duplicates
+    return aggregates, groups, aggregator.file_count, dedup.file_count, dedup.total_bytes
+
+
+@pytest.mark.parametrize("low_memory", [False, True])
+def test_resume_keeps_aggregates_and_duplicate_groups(tmp_path, monkeypatch, low_memory):
+    data = tmp_path / "data"
+    data.mkdir()
+    _make_files(data, 40)
+    # Caché mínima: algunas copias se expulsan y vuelven a parsearse
+    monkeypatch.setattr(scan_worker, "DEFAULT_CACHE_SIZE", 2)
+    expected = _summary(*_scan(data, low_memory=low_memory))
+
+    checkpoint = JobCheckpoint("scan", "test", tmp_path)
+    monkeypatch.setattr(ScanWorker, "CHECKPOINT_INTERVAL", 0)
+    real_read = scan_worker.read_tag_file
+    reads = []
+
+    def crashing_read(file_path, *args, **kwargs):
+        if len(reads) == 25:
+            raise _Crash()
+        reads.append(file_path)
+        return real_read(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(scan_worker, "read_tag_file", crashing_read)
+    with pytest.raises(_Crash):
+        _scan(data, checkpoint, low_memory)
+    monkeypatch.setattr(scan_worker, "read_tag_file", real_read)
+
+    records = list(checkpoint.iter_partial())
+    files = [record for record in records if "p" in record]
+    assert len(files) == 25
+    # Cada tag se guarda una vez; las copias en caché no repiten sus tags
+    assert len([record for record in records if "k" in record]) == 7
+    assert any("t" not in record for record in files)
+
+    assert _summary(*_scan(data, checkpoint, low_memory)) == expected
+    assert not checkpoint.exists()
+
+
+def test_old_checkpoint_format_is_discarded(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    _make_files(data, 5)
+    checkpoint = JobCheckpoint("scan", "test", tmp_path)
+    checkpoint.append_partial([{"p": str(data / "000.txt"), "e": "\n", "t": [["general", "old"]], "r": 0}])
+    checkpoint.save({"directory": str(data), "cursor": 1, "total": 5, "partial_count": 1})
+
+    worker, aggregator = _scan(data, checkpoint)
+    assert aggregator.file_count == 5
+    assert aggregator.get_aggregate("general", "old") is None
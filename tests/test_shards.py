@@ -0,0 +1,150 @@
+"""Pruebas del escaneo repartido en fragmentos y de la combinación de parciales"""
+
+import shutil
+import zlib
+from pathlib import Path
+
+import pytest
+
+from app.core.shards import (
+    PARTIAL_SUFFIX, PartialAggregate, merge_partials, read_partial, scan_shard, select_shard, shard_of, write_partial
+)
+from app.utils.path_utils import discover_txt_files
+
+SHARDS = 3
+
+
+def _make_tree(root: Path, count: int = 30) -> Path:
+    """Directorio con subcarpetas y archivos de tags (algunos repetidos)"""
+    for index in range(count):
+        folder = root / f"set{index % 4}"
+        folder.mkdir(parents=True, exist_ok=True)
+        tags = [f"tag{index % 7}", f"artist:name{index % 3}", "solo" if index % 2 else "1girl"]
+        (folder / f"{index:03d}.txt").write_text("\n".join(tags) + "\n", encoding='utf-8')
+    return root
+
+
+def _summary(aggregator):
+    """Agregados y archivos de cada tag, independientes del orden de los ids"""
+    return sorted(
+        (agg.namespace, agg.tag, agg.count, agg.file_count,
+         sorted(str(path) for path in aggregator.get_file_paths_for_tag(agg.namespace, agg.tag)))
+        for agg in aggregator.iter_aggregates()
+    )
+
+
+def _write_shards(roots, directory: Path, shard_count: int = SHARDS):
+    """Escanea cada fragmento y guarda su parcial"""
+    paths = []
+    for index in range(shard_count):
+        path = directory / f"shard_{index}{PARTIAL_SUFFIX}"
+        write_partial(PartialAggregate(scan_shard(roots, index, shard_count), shard_count, [index]), path)
+        paths.append(path)
+    return paths
+
+
+def test_shard_of_is_stable_and_in_range():
+    assert shard_of("set1/001.txt", 8) == zlib.crc32(b"set1/001.txt") % 8
+    assert all(0 <= shard_of(f"set{i}/{i}.txt", 5) < 5 for i in range(100))
+    assert shard_of("a.txt", 1) == 0
+
+
+def test_select_shard_partitions_by_relative_path(tmp_path):
+    first = _make_tree(tmp_path / "mount_a" / "data")
+    second = tmp_path / "mount_b" / "elsewhere"
+    shutil.copytree(first, second)
+
+    discovery = discover_txt_files([first])
+    selected = [select_shard(discovery, index, SHARDS) for index in range(SHARDS)]
+    assert sorted(path for shard in selected for path, _ in shard) == sorted(discovery.files)
+    assert all(shard for shard in selected)
+
+    # Otra ruta de montaje: mismo reparto
+    moved = discover_txt_files([second])
+    for index in range(SHARDS):
+        assert [path.relative_to(second) for path, _ in select_shard(moved, index, SHARDS)] == \
+            [path.relative_to(first) for path, _ in selected[index]]
+
+    with pytest.raises(ValueError):
+        select_shard(discovery, SHARDS, SHARDS)
+
+
+def test_partial_round_trip(tmp_path):
+    root = _make_tree(tmp_path / "data")
+    aggregator = scan_shard([root])
+    path = tmp_path / f"full{PARTIAL_SUFFIX}"
+    write_partial(PartialAggregate(aggregator, 1, [0]), path)
+
+    partial = read_partial(path)
+    assert partial.complete
+    assert partial.aggregator.file_count == aggregator.file_count
+    assert partial.aggregator.total_occurrences == aggregator.total_occurrences
+    assert _summary(partial.aggregator) == _summary(aggregator)
+
+
+def test_read_partial_rejects_other_files(tmp_path):
+    path = tmp_path / f"bad{PARTIAL_SUFFIX}"
+    path.write_text("no es gzip", encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_partial(path)
+
+
+def test_merge_equals_full_scan(tmp_path):
+    roots = [_make_tree(tmp_path / "a"), _make_tree(tmp_path / "b", 12)]
+    paths = _write_shards(roots, tmp_path / "partials")
+    calls = []
+    merged = merge_partials(paths, progress=lambda done, total: calls.append((done, total)))
+    assert merged.complete and merged.shards == list(range(SHARDS))
+    assert calls == [(1, SHARDS), (2, SHARDS), (3, SHARDS)]
+
+    full = scan_shard(roots)
+    assert _summary(merged.aggregator) == _summary(full)
+    assert merged.aggregator.file_count == full.file_count
+    assert [merged.aggregator.root_file_count(i) for i in range(2)] == [full.root_file_count(i) for i in range(2)]
+
+
+def test_merge_of_merges_and_missing_shards(tmp_path):
+    root = _make_tree(tmp_path / "data")
+    paths = _write_shards([root], tmp_path / "partials")
+
+    first = merge_partials(paths[:2])
+    assert first.missing == [2]
+    combined = tmp_path / f"first_two{PARTIAL_SUFFIX}"
+    write_partial(first, combined)
+    assert _summary(merge_partials([combined, paths[2]]).aggregator) == _summary(scan_shard([root]))
+
+
+def test_merge_rejects_overlap_and_other_splits(tmp_path):
+    root = _make_tree(tmp_path / "data")
+    paths = _write_shards([root], tmp_path / "partials")
+    with pytest.raises(ValueError, match="repite fragmentos"):
+        merge_partials([paths[0], paths[1], paths[0]])
+
+    other = _write_shards([root], tmp_path / "other", shard_count=2)
+    with pytest.raises(ValueError, match="2 fragmentos"):
+        merge_partials([paths[0], other[1]])
+
+    with pytest.raises(ValueError):
+        merge_partials([])
+
+
+def test_merge_remaps_roots(tmp_path):
+    # Dos máquinas montan el mismo almacenamiento en rutas distintas
+    first = _make_tree(tmp_path / "mount_a" / "data")
+    second = tmp_path / "mount_b" / "data"
+    shutil.copytree(first, second)
+    paths = _write_shards([first], tmp_path / "partials_a")[:2] + _write_shards([second], tmp_path / "partials_b")[2:]
+
+    # Sin raíces: las del primer parcial
+    merged = merge_partials(paths)
+    assert merged.aggregator.roots == [first]
+    assert _summary(merged.aggregator) == _summary(scan_shard([first]))
+
+    # Con raíces: todas las rutas se resuelven en ellas
+    target = tmp_path / "local"
+    shutil.copytree(first, target)
+    merged = merge_partials(paths, roots=[target])
+    assert _summary(merged.aggregator) == _summary(scan_shard([target]))
+
+    with pytest.raises(ValueError, match="raíces"):
+        merge_partials(paths, roots=[first, second])
@@ -0,0 +1,158 @@
+"""Pruebas del modelo de tabla de tags sin pantalla (QT_QPA_PLATFORM=offscreen)"""
+
+import os
+import random
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+
+from PySide6.QtCore import Qt, QPersistentModelIndex
+from PySide6.QtWidgets import QApplication, QTableView
+
+from app.models.tag_models import TagAggregate
+from app.ui.tag_table_model import MarkAction, TagTableModel
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    """Aplicación Qt compartida por las pruebas del módulo"""
+    return QApplication.instance() or QApplication([])
+
+
+def _aggregates(seed: int, count: int = 200):
+    """Agregados pseudoaleatorios con counts repetidos (para probar el desempate)"""
+    rng = random.Random(seed)
+    return [
+        TagAggregate(rng.choice(["general", "artist"]), f"tag{rng.randrange(count * 2):04d}", rng.randrange(1, 20))
+        for _ in range(count)
+    ]
+
+
+def _unique(aggregates):
+    """Quita claves repetidas conservando la primera aparición"""
+    seen = set()
+    result = []
+    for agg in aggregates:
+        key = (agg.namespace, agg.tag)
+        if key not in seen:
+            seen.add(key)
+            result.append(agg)
+    return result
+
+
+def _expected(aggregates, column, order, text=""):
+    """Filas esperadas calculadas por fuerza bruta"""
+    query = text.casefold()
+    rows = [
+        agg for agg in aggregates
+        if not query or query in agg.tag.casefold() or query in agg.namespace.casefold()
+    ]
+    if column == TagTableModel.COLUMN_TAG:
+        rows.sort(key=lambda agg: agg.tag.casefold())
+    else:
+        rows.sort(key=lambda agg: (agg.count, agg.tag.casefold()))
+    if order == Qt.SortOrder.DescendingOrder:
+        rows.reverse()
+    return [(agg.namespace, agg.tag, agg.count) for agg in rows]
+
+
+def _at(model, row):
+    """Agregado de una fila visible (None si no existe)"""
+    aggregates = model.get_all_aggregates()
+    return aggregates[row] if 0 <= row < len(aggregates) else None
+
+
+def _visible(model):
+    """Filas visibles del modelo"""
+    return [(agg.namespace, agg.tag, agg.count) for agg in model.get_all_aggregates()]
+
+
+def test_sort(qapp):
+    aggregates = _unique(_aggregates(1))
+    model = TagTableModel()
+    model.set_aggregates(aggregates)
+    for column in (TagTableModel.COLUMN_TAG, TagTableModel.COLUMN_COUNT):
+        for order in (Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder):
+            model.sort(column, order)
+            assert _visible(model) == _expected(aggregates, column, order)
+
+
+def test_filter_keeps_selection(qapp):
+    aggregates = _unique(_aggregates(2))
+    model = TagTableModel()
+    model.set_aggregates(aggregates)
+    selected = _at(model, 5)
+    persistent = QPersistentModelIndex(model.index(5, TagTableModel.COLUMN_TAG))
+
+    model.filter_by_text(selected.tag[-2:])
+    assert _visible(model) == _expected(
+        aggregates, TagTableModel.COLUMN_COUNT, Qt.SortOrder.DescendingOrder, selected.tag[-2:]
+    )
+    assert persistent.isValid()
+    assert _at(model, persistent.row()) is selected
+
+    model.filter_by_text("no-coincide-con-nada")
+    assert model.rowCount() == 0
+    assert not persistent.isValid()
+
+    model.filter_by_text("")
+    assert _visible(model) == _expected(aggregates, TagTableModel.COLUMN_COUNT, Qt.SortOrder.DescendingOrder)
+
+
+def test_set_aggregates_diff(qapp):
+    model = TagTableModel()
+    model.sort(TagTableModel.COLUMN_TAG, Qt.SortOrder.AscendingOrder)
+    model.filter_by_text("1")
+    for seed in range(3, 10):
+        aggregates = _unique(_aggregates(seed))
+        kept = _at(model, 0)
+        persistent = QPersistentModelIndex(model.index(0, TagTableModel.COLUMN_TAG))
+        model.set_aggregates(aggregates)
+        assert _visible(model) == _expected(aggregates, TagTableModel.COLUMN_TAG, Qt.SortOrder.AscendingOrder, "1")
+        # La selección sigue al tag si se mantiene visible
+        if kept is not None:
+            survivor = next(
+                (agg for agg in model.get_all_aggregates() if (agg.namespace, agg.tag) == (kept.namespace, kept.tag)),
+                None
+            )
+            if survivor is None:
+                assert not persistent.isValid()
+            else:
+                assert _at(model, persistent.row()) is survivor
+
+
+def test_view_sort_by_column(qapp):
+    aggregates = _unique(_aggregates(11))
+    model = TagTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.setSortingEnabled(True)
+    model.set_aggregates(aggregates)
+    view.selectRow(3)
+    selected = _at(model, 3)
+
+    view.sortByColumn(TagTableModel.COLUMN_TAG, Qt.SortOrder.AscendingOrder)
+    assert _visible(model) == _expected(aggregates, TagTableModel.COLUMN_TAG, Qt.SortOrder.AscendingOrder)
+    rows = view.selectionModel().selectedRows()
+    assert [_at(model, index.row()) for index in rows] == [selected]
+
+
+def test_marks_shared_between_views(qapp):
+    # La vista de una raíz y la de todas tienen agregados distintos con las mismas claves
+    marked = set()
+    all_roots = TagTableModel(marked)
+    one_root = TagTableModel(marked)
+    all_roots.set_aggregates([TagAggregate("general", "tag1", 5), TagAggregate("general", "tag2", 3)])
+    one_root.set_aggregates([TagAggregate("general", "tag1", 2)])
+
+    one_root.mark_rows([0])
+    row = all_roots.row_for_key("general", "tag1")
+    assert all_roots.index(row, TagTableModel.COLUMN_CHECK).data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+
+    all_roots.mark_rows([row], MarkAction.INVERT)
+    assert marked == set()
+    assert one_root.index(0, TagTableModel.COLUMN_CHECK).data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Unchecked